@@ -0,0 +1,193 @@
+"""
+Apoio aos scripts de teste (test_*.py)
+Dublês compartilhados pelos testes, para que nenhum deles precise de banco
+nem de esperar o relógio.
+"""
+
+
+class RelogioFalso:
+    """Substitui o módulo time de quem está sob teste: monotonic() só anda quando o teste manda"""
+
+    def __init__(self, agora: float = 1000.0):
+        self.agora = agora
+
+    def monotonic(self) -> float:
+        return self.agora
+
+    def avancar(self, segundos: float):
+        self.agora += segundos
+
+
+def com_relogio(*modulos):
+    """
+    Decorator de teste: troca o time dos módulos informados por um RelogioFalso,
+    passado ao teste como primeiro argumento, e restaura ao final.
+    O teste decorado não recebe argumentos (para rodar via pytest ou pelo __main__).
+    """
+    def decorar(teste):
+        def executar():
+            originais = [modulo.time for modulo in modulos]
+            relogio = RelogioFalso()
+            for modulo in modulos:
+                modulo.time = relogio
+            try:
+                teste(relogio)
+            finally:
+                for modulo, original in zip(modulos, originais):
+                    modulo.time = original
+        executar.__name__ = teste.__name__
+        executar.__doc__ = teste.__doc__
+        return executar
+    return decorar
+
+
+def consulta_contada(decorador, falhar=None):
+    """
+    Consulta falsa decorada (ex: cache.memoizar), que conta as execuções
+
+    Returns:
+        (consultar, chamadas): consultar(data_inicio, data_fim=None, filiais=None)
+        devolve f"{data_inicio}#{n}", n = número da execução; chamadas lista os
+        argumentos de cada execução. Se falhar() for verdadeiro, a execução levanta ConnectionError.
+    """
+    chamadas = []
+
+    @decorador
+    def consultar(data_inicio, data_fim=None, filiais=None):
+        chamadas.append((data_inicio, data_fim, filiais))
+        if falhar and falhar():
+            raise ConnectionError("Senior indisponível")
+        return f"{data_inicio}#{len(chamadas)}"
+
+    return consultar, chamadas
+
+
+class PoolFalso:
+    """Pool do executor falso: guarda as tarefas submetidas; executar() roda as pendentes"""
+
+    def __init__(self):
+        self.pendentes = []
+        self.saturado = False
+
+    def submeter(self, func, *args, **kwargs):
+        if self.saturado:
+            raise RuntimeError("pool saturado")
+        self.pendentes.append((func, args, kwargs))
+
+    def executar(self):
+        pendentes, self.pendentes = self.pendentes, []
+        for func, args, kwargs in pendentes:
+            func(*args, **kwargs)
+
+
+# Parâmetros por comando aceitos pelo SQL Server
+MAX_PARAMETROS_SQL_SERVER = 2100
+
+# Valor que faz o CursorFalso recusar o INSERT inteiro (como uma violação de constraint)
+RECUSADO = 'recusado'
+
+
+class CursorFalso:
+    """
+    Cursor pymssql falso
+
+    - fetchmany / fetchall / fetchone devolvem as linhas informadas
+    - INSERTs (com a quantidade de colunas informada) vão para `gravadas`; o envio
+      inteiro é recusado (ValueError) se alguma linha tiver RECUSADO, e um comando
+      com mais de 2100 parâmetros falha o teste
+    - SAVE TRANSACTION / ROLLBACK TRANSACTION desfazem o que foi gravado após o savepoint
+    - todos os comandos ficam em `comandos`, como (sql, parâmetros)
+    """
+
+    def __init__(self, linhas=(), colunas: int = None):
+        self.linhas = list(linhas)
+        self.colunas = colunas
+        self.gravadas = []
+        self.comandos = []
+        self.fechado = False
+        self._savepoints = {}
+
+    def execute(self, sql, parametros=None):
+        self.comandos.append((sql, parametros))
+        if sql.startswith('SAVE TRANSACTION '):
+            self._savepoints[sql.split()[-1]] = len(self.gravadas)
+        elif sql.startswith('ROLLBACK TRANSACTION '):
+            del self.gravadas[self._savepoints[sql.split()[-1]]:]
+        elif sql.startswith('INSERT') and self.colunas:
+            assert len(parametros) == sql.count('%s')
+            for comando in sql.split(';\n'):
+                assert comando.count('%s') <= MAX_PARAMETROS_SQL_SERVER, "comando com mais de 2100 parâmetros"
+            linhas = [tuple(parametros[i:i + self.colunas]) for i in range(0, len(parametros), self.colunas)]
+            if any(RECUSADO in linha for linha in linhas):
+                raise ValueError("linha recusada")
+            self.gravadas.extend(linhas)
+
+    def executemany(self, sql, linhas):
+        self.comandos.append((sql, linhas))
+        self.gravadas.extend(linhas)
+
+    def fetchmany(self, tamanho):
+        lote, self.linhas = self.linhas[:tamanho], self.linhas[tamanho:]
+        return lote
+
+    def fetchall(self):
+        return self.fetchmany(len(self.linhas))
+
+    def fetchone(self):
+        lote = self.fetchmany(1)
+        return lote[0] if lote else None
+
+    def close(self):
+        self.fechado = True
+
+    def inserts(self):
+        return [(sql, parametros) for sql, parametros in self.comandos if sql.startswith('INSERT')]
+
+
+class ConexaoFalsa:
+    """
+    Conexão pymssql falsa: cursor() devolve um CursorFalso com as linhas informadas
+    Com viva = False, cursor() e rollback() falham como numa conexão caída.
+    """
+
+    def __init__(self, linhas=()):
+        self.linhas = list(linhas)
+        self.viva = True
+        self.fechada = False
+        self.rollbacks = 0
+        self.cursores = []
+
+    def cursor(self):
+        if not self.viva:
+            raise OSError("conexão perdida")
+        cursor = CursorFalso(self.linhas)
+        self.cursores.append(cursor)
+        return cursor
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        if not self.viva:
+            raise OSError("conexão perdida")
+        self.rollbacks += 1
+
+    def close(self):
+        self.fechada = True
+
+
+class BancoFalso:
+    """
+    Substitui o db (database.py) de quem está sob teste
+    execute_query devolve as linhas informadas e guarda (query, parâmetros, enviado),
+    enviado = texto formatado com os parâmetros como o pymssql faz (operador %).
+    """
+
+    def __init__(self, linhas=None):
+        self.linhas = linhas or []
+        self.chamadas = []
+
+    def execute_query(self, query, params=None):
+        enviado = query % tuple(repr(p) for p in params or ())
+        self.chamadas.append((query, params, enviado))
+        return self.linhas
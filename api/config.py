@@ -18,6 +18,53 @@ class Settings(BaseSettings):
     SENIOR_DB_USER: str
     SENIOR_DB_PASSWORD: str
 
+    # Pool de conexões (valores por banco)
+    DB_POOL_MIN_SIZE: int = 1
+    DB_POOL_MAX_SIZE: int = 10
+    SENIOR_DB_POOL_MIN_SIZE: int = 0
+    SENIOR_DB_POOL_MAX_SIZE: int = 5
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0  # Espera máxima por uma conexão livre
+    DB_POOL_MAX_IDLE_SECONDS: int = 300  # Conexões ociosas além disso são fechadas
+    DB_POOL_MAX_LIFETIME_SECONDS: int = 1800  # Conexões são recicladas após esse tempo
+    DB_POOL_PING_AFTER_IDLE_SECONDS: int = 30  # Testa a conexão no checkout se ficou ociosa
+
+    # Pools de execução das chamadas bloqueantes (threads por tipo de carga)
+    # A soma dos workers que usam cada banco não deve passar do max_size do pool de conexões
+    # (a sincronização usa até SYNC_MAX_PARALELISMO conexões de cada banco)
+    # Cada /api/dashboard/overview ocupa 1-2 tarefas do pool 'local' com o snapshot carregado
+    # e até 8 sem ele: a fila comporta ~EXECUTOR_LOCAL_MAX_FILA / 8 overviews simultâneos nesse caso
+    EXECUTOR_LOCAL_WORKERS: int = 6
+    EXECUTOR_LOCAL_MAX_FILA: int = 100
+    EXECUTOR_SENIOR_WORKERS: int = 3
+    EXECUTOR_SENIOR_MAX_FILA: int = 30
+    EXECUTOR_SINCRONIZACAO_WORKERS: int = 1
+    EXECUTOR_SINCRONIZACAO_MAX_FILA: int = 5
+    EXECUTOR_AUTH_WORKERS: int = 2
+    EXECUTOR_AUTH_MAX_FILA: int = 50
+
+    # Sincronização: estratégia de inserção em massa ('valores' = INSERT multi-linha, 'executemany' = uma linha por INSERT)
+    SYNC_BULK_ESTRATEGIA: str = "valores"
+    SYNC_BULK_LINHAS_POR_ENVIO: int = 1000  # Linhas enviadas ao servidor por ida e volta
+    SYNC_MODO_PADRAO: str = "incremental"  # 'incremental' (só o que mudou) ou 'completo' (reparo)
+    SYNC_MAX_PARALELISMO: int = 2  # Etapas independentes de sincronizar_tudo rodando ao mesmo tempo
+
+    # Dashboard: snapshot em memória dos títulos, recarregado a cada sincronização
+    SNAPSHOT_ANALITICO_ATIVO: bool = True
+
+    # Cache de resultados das consultas do dashboard, invalidado a cada sincronização
+    CACHE_CONSULTAS_ATIVO: bool = True
+    CACHE_CONSULTAS_MAX_ITENS: int = 500
+    CACHE_CONSULTAS_TTL_SEGUNDOS: int = 600  # Limite para alterações feitas fora da sincronização
+    ETAG_ATIVO: bool = True  # ETag/304 em /api/dashboard e /api/projetado (ver utils/etag.py)
+
+    # Cache stale-while-revalidate das consultas diretas ao Senior (rotas /api/contas-*-senior)
+    SENIOR_CACHE_ATIVO: bool = True
+    SENIOR_CACHE_MAX_ITENS: int = 50  # Conjuntos de títulos por (período, filiais)
+    SENIOR_CACHE_FRESCO_SEGUNDOS: int = 120  # Até aqui responde do cache sem consultar o Senior
+    SENIOR_CACHE_MAX_STALE_SEGUNDOS: int = 1800  # Até aqui responde o valor antigo e atualiza em segundo plano
+    SENIOR_LISTA_SPLIT: str = "string_split"  # Listas nas consultas parametrizadas; 'xml' se o nível de compatibilidade for < 130
+    SENIOR_RATEIO_MODO: str = "outer_apply"  # CODCCU/CTAFIN do E301RAT: subconsulta, outer_apply ou hash_join
+
     # API
     API_HOST: str = "0.0.0.0"
     API_PORT: int = 8000
@@ -1,9 +1,302 @@
-import pymssql
+import threading
+import time
+from collections import deque
 from contextlib import contextmanager
-from typing import Optional
+from typing import Callable, Optional
+
+import pymssql
 from config import settings
 
 
+class PoolTimeoutError(Exception):
+    """Nenhuma conexão do pool ficou livre dentro do tempo limite"""
+
+
+class _ConexaoFisica:
+    """Conexão física mantida pelo pool com os metadados de idade e uso"""
+
+    __slots__ = ('conn', 'criada_em', 'devolvida_em')
+
+    def __init__(self, conn):
+        agora = time.monotonic()
+        self.conn = conn
+        self.criada_em = agora
+        self.devolvida_em = agora
+
+
+class ConexaoPooled:
+    """
+    Proxy para a conexão emprestada pelo pool.
+    Delega tudo para a conexão pymssql, mas close() devolve a conexão ao pool
+    em vez de encerrá-la. Use descartar() se a conexão não puder ser reaproveitada.
+    """
+
+    def __init__(self, pool: 'ConnectionPool', fisica: _ConexaoFisica):
+        self._pool = pool
+        self._fisica = fisica
+
+    def __getattr__(self, nome):
+        if self._fisica is None:
+            raise pymssql.InterfaceError("Conexão já devolvida ao pool")
+        return getattr(self._fisica.conn, nome)
+
+    def close(self):
+        """Devolve a conexão ao pool"""
+        if self._fisica is not None:
+            fisica, self._fisica = self._fisica, None
+            self._pool.devolver(fisica)
+
+    def descartar(self):
+        """Fecha a conexão física e a remove do pool"""
+        if self._fisica is not None:
+            fisica, self._fisica = self._fisica, None
+            self._pool.devolver(fisica, descartar=True)
+
+
+class ConnectionPool:
+    """
+    Pool de conexões limitado e thread-safe.
+    - Nunca mantém mais que max_size conexões abertas (ociosas + em uso)
+    - Conexões ociosas além de max_idle são fechadas, preservando min_size
+    - Conexões mais antigas que max_lifetime são recicladas
+    - No checkout, conexões que ficaram ociosas por algum tempo são testadas com SELECT 1
+    """
+
+    def __init__(
+        self,
+        nome: str,
+        fabrica: Callable,
+        min_size: int,
+        max_size: int,
+        timeout: float,
+        max_idle: float,
+        max_lifetime: float,
+        ping_apos_ociosidade: float
+    ):
+        self.nome = nome
+        self._fabrica = fabrica
+        self.min_size = max(0, min_size)
+        self.max_size = max(1, max_size)
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+        self.ping_apos_ociosidade = ping_apos_ociosidade
+
+        self._cond = threading.Condition()
+        self._ociosas = deque()  # Mais recentes à direita
+        self._total = 0  # Conexões abertas ou sendo abertas
+        self._em_uso = 0
+        self._aguardando = 0
+
+        # Métricas acumuladas
+        self._checkouts = 0
+        self._criadas = 0
+        self._descartadas = 0
+        self._timeouts = 0
+        self._espera_total = 0.0
+        self._espera_maxima = 0.0
+
+    # ------------------------------------------------------------------
+    # Checkout / devolução
+    # ------------------------------------------------------------------
+
+    def obter(self) -> ConexaoPooled:
+        """Obtém uma conexão do pool, aguardando até o timeout se estiver esgotado"""
+        inicio = time.monotonic()
+        limite = inicio + self.timeout
+
+        while True:
+            fisica = None
+            criar = False
+            expiradas = []
+
+            with self._cond:
+                self._aguardando += 1
+                try:
+                    while True:
+                        expiradas.extend(self._coletar_expiradas())
+                        if self._ociosas:
+                            fisica = self._ociosas.pop()
+                            break
+                        if self._total < self.max_size:
+                            self._total += 1
+                            criar = True
+                            break
+                        restante = limite - time.monotonic()
+                        if restante <= 0:
+                            self._timeouts += 1
+                            raise PoolTimeoutError(
+                                f"Pool '{self.nome}' esgotado: nenhuma conexão livre em {self.timeout}s "
+                                f"(max_size={self.max_size})"
+                            )
+                        self._cond.wait(restante)
+                finally:
+                    self._aguardando -= 1
+                self._em_uso += 1
+
+            self._fechar(expiradas)
+
+            if criar:
+                try:
+                    fisica = _ConexaoFisica(self._fabrica())
+                except Exception:
+                    with self._cond:
+                        self._total -= 1
+                        self._em_uso -= 1
+                        self._cond.notify()
+                    raise
+                with self._cond:
+                    self._criadas += 1
+            elif not self._valida(fisica):
+                # Conexão morta ou velha: descarta e tenta de novo
+                self.devolver(fisica, descartar=True)
+                continue
+
+            espera = time.monotonic() - inicio
+            with self._cond:
+                self._checkouts += 1
+                self._espera_total += espera
+                self._espera_maxima = max(self._espera_maxima, espera)
+
+            return ConexaoPooled(self, fisica)
+
+    def devolver(self, fisica: _ConexaoFisica, descartar: bool = False):
+        """Devolve uma conexão ao pool (desfaz transação pendente) ou a descarta"""
+        if not descartar:
+            try:
+                # Garante que nenhuma transação aberta vaze para o próximo uso
+                fisica.conn.rollback()
+            except Exception:
+                descartar = True
+
+        agora = time.monotonic()
+        if not descartar and agora - fisica.criada_em > self.max_lifetime:
+            descartar = True
+
+        with self._cond:
+            self._em_uso -= 1
+            if descartar:
+                self._total -= 1
+                self._descartadas += 1
+            else:
+                fisica.devolvida_em = agora
+                self._ociosas.append(fisica)
+            self._cond.notify()
+
+        if descartar:
+            self._fechar([fisica])
+
+    def _valida(self, fisica: _ConexaoFisica) -> bool:
+        """Verifica idade e, se ficou ociosa por tempo suficiente, a liveness da conexão"""
+        agora = time.monotonic()
+        if agora - fisica.criada_em > self.max_lifetime:
+            return False
+        if agora - fisica.devolvida_em < self.ping_apos_ociosidade:
+            return True
+        try:
+            cursor = fisica.conn.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchall()
+            cursor.close()
+            return True
+        except Exception:
+            return False
+
+    def _coletar_expiradas(self) -> list:
+        """Remove conexões ociosas vencidas (chamar com o lock), preservando min_size"""
+        agora = time.monotonic()
+        expiradas = []
+        for fisica in list(self._ociosas):
+            if self._total <= self.min_size:
+                break
+            if agora - fisica.devolvida_em > self.max_idle or agora - fisica.criada_em > self.max_lifetime:
+                self._ociosas.remove(fisica)
+                self._total -= 1
+                self._descartadas += 1
+                expiradas.append(fisica)
+        return expiradas
+
+    @staticmethod
+    def _fechar(fisicas):
+        for fisica in fisicas:
+            try:
+                fisica.conn.close()
+            except Exception:
+                pass
+
+    def fechar_ociosas(self):
+        """Fecha todas as conexões ociosas (ex: no shutdown da aplicação)"""
+        with self._cond:
+            fisicas = list(self._ociosas)
+            self._ociosas.clear()
+            self._total -= len(fisicas)
+            self._descartadas += len(fisicas)
+        self._fechar(fisicas)
+
+    # ------------------------------------------------------------------
+    # Métricas
+    # ------------------------------------------------------------------
+
+    def estatisticas(self) -> dict:
+        """Retorna métricas do pool para dimensionamento sob carga"""
+        with self._cond:
+            return {
+                'nome': self.nome,
+                'min_size': self.min_size,
+                'max_size': self.max_size,
+                'abertas': self._total,
+                'em_uso': self._em_uso,
+                'ociosas': len(self._ociosas),
+                'aguardando': self._aguardando,
+                'checkouts': self._checkouts,
+                'conexoes_criadas': self._criadas,
+                'conexoes_descartadas': self._descartadas,
+                'timeouts': self._timeouts,
+                'espera_total_ms': round(self._espera_total * 1000, 2),
+                'espera_media_ms': round(self._espera_total * 1000 / self._checkouts, 2) if self._checkouts else 0.0,
+                'espera_maxima_ms': round(self._espera_maxima * 1000, 2)
+            }
+
+
+def _criar_pool(nome: str, fabrica: Callable, min_size: int, max_size: int) -> ConnectionPool:
+    return ConnectionPool(
+        nome=nome,
+        fabrica=fabrica,
+        min_size=min_size,
+        max_size=max_size,
+        timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        max_idle=settings.DB_POOL_MAX_IDLE_SECONDS,
+        max_lifetime=settings.DB_POOL_MAX_LIFETIME_SECONDS,
+        ping_apos_ociosidade=settings.DB_POOL_PING_AFTER_IDLE_SECONDS
+    )
+
+
+def _iterar_em_lotes(get_connection: Callable, query: str, params: Optional[tuple], batch_size: int):
+    """
+    Executa a query e devolve o resultado em lotes de até batch_size linhas (fetchmany).
+    Se o consumidor abandonar o gerador antes do fim, o resultado pendente deixaria a
+    conexão inutilizável, então ela é descartada em vez de voltar ao pool.
+    """
+    with get_connection() as conn:
+        concluido = False
+        try:
+            cursor = conn.cursor()
+            if params:
+                cursor.execute(query, params)
+            else:
+                cursor.execute(query)
+            while True:
+                lote = cursor.fetchmany(batch_size)
+                if not lote:
+                    break
+                yield lote
+            cursor.close()
+            concluido = True
+        finally:
+            if not concluido:
+                conn.descartar()
+
+
 class DatabaseConnection:
     """Gerenciador de conexão com SQL Server"""
 
@@ -13,28 +306,31 @@ class DatabaseConnection:
         self.database = settings.DB_NAME
         self.user = settings.DB_USER
         self.password = settings.DB_PASSWORD
+        self.pool = _criar_pool('local', self._conectar, settings.DB_POOL_MIN_SIZE, settings.DB_POOL_MAX_SIZE)
+
+    def _conectar(self):
+        """Abre uma nova conexão física (usado pelo pool)"""
+        return pymssql.connect(
+            server=self.server,
+            port=self.port,
+            user=self.user,
+            password=self.password,
+            database=self.database,
+            as_dict=True,
+            timeout=60,
+            login_timeout=30
+        )
 
     @contextmanager
     def get_connection(self):
-        """Context manager para conexão com o banco"""
+        """Context manager para conexão com o banco (emprestada do pool)"""
         conn = None
         try:
-            conn = pymssql.connect(
-                server=self.server,
-                port=self.port,
-                user=self.user,
-                password=self.password,
-                database=self.database,
-                as_dict=True,
-                timeout=60,
-                login_timeout=30
-            )
+            conn = self.pool.obter()
             yield conn
-        except Exception as e:
-            if conn:
-                conn.rollback()
-            raise e
         finally:
+            # Devolver ao pool desfaz o que não foi commitado;
+            # conexões quebradas são descartadas automaticamente
             if conn:
                 conn.close()
 
@@ -62,6 +358,13 @@ class DatabaseConnection:
             cursor.close()
             return result
 
+    def iter_query(self, query: str, params: Optional[tuple] = None, batch_size: int = 5000):
+        """
+        Executa query e devolve os resultados em lotes (listas de até batch_size linhas),
+        mantendo apenas um lote em memória por vez
+        """
+        return _iterar_em_lotes(self.get_connection, query, params, batch_size)
+
 
 class SeniorDatabaseConnection:
     """Gerenciador de conexão com SQL Server Senior (Apenas Leitura)"""
@@ -72,22 +375,29 @@ class SeniorDatabaseConnection:
         self.database = settings.SENIOR_DB_NAME
         self.user = settings.SENIOR_DB_USER
         self.password = settings.SENIOR_DB_PASSWORD
+        self.pool = _criar_pool(
+            'senior', self._conectar, settings.SENIOR_DB_POOL_MIN_SIZE, settings.SENIOR_DB_POOL_MAX_SIZE
+        )
+
+    def _conectar(self):
+        """Abre uma nova conexão física (usado pelo pool)"""
+        return pymssql.connect(
+            server=self.server,
+            port=self.port,
+            user=self.user,
+            password=self.password,
+            database=self.database,
+            as_dict=True,
+            timeout=120,
+            login_timeout=30
+        )
 
     @contextmanager
     def get_connection(self):
-        """Context manager para conexão com o banco Senior"""
+        """Context manager para conexão com o banco Senior (emprestada do pool)"""
         conn = None
         try:
-            conn = pymssql.connect(
-                server=self.server,
-                port=self.port,
-                user=self.user,
-                password=self.password,
-                database=self.database,
-                as_dict=True,
-                timeout=120,
-                login_timeout=30
-            )
+            conn = self.pool.obter()
             yield conn
         except Exception as e:
             raise Exception(f"Erro ao conectar ao banco Senior: {str(e)}")
@@ -107,6 +417,13 @@ class SeniorDatabaseConnection:
             cursor.close()
             return results
 
+    def iter_query(self, query: str, params: Optional[tuple] = None, batch_size: int = 5000):
+        """
+        Executa query de leitura e devolve os resultados em lotes (listas de até batch_size linhas),
+        mantendo apenas um lote em memória por vez
+        """
+        return _iterar_em_lotes(self.get_connection, query, params, batch_size)
+
 
 # Instâncias globais
 db = DatabaseConnection()  # Banco local (Financeiro)
@@ -115,16 +432,8 @@ senior_db = SeniorDatabaseConnection()  # Banco Senior (Sapiens - Leitura)
 
 def get_db_connection():
     """
-    Retorna uma conexão direta com o banco de dados local
-    Use para operações que precisam de controle manual de conexão
+    Retorna uma conexão do pool do banco de dados local
+    Use para operações que precisam de controle manual de conexão.
+    conn.close() devolve a conexão ao pool.
     """
-    return pymssql.connect(
-        server=settings.DB_SERVER,
-        port=settings.DB_PORT,
-        user=settings.DB_USER,
-        password=settings.DB_PASSWORD,
-        database=settings.DB_NAME,
-        as_dict=True,
-        timeout=60,
-        login_timeout=30
-    )
+    return db.pool.obter()
@@ -0,0 +1,157 @@
+"""
+Camada de execução das chamadas bloqueantes (pymssql, bcrypt, OpenAI)
+As rotas são async, mas os services são síncronos: rodar um service direto na
+rota congela o event loop do worker até a query terminar. Aqui cada tipo de
+carga roda num pool de threads próprio, com limite de concorrência e de fila,
+para que um endpoint pesado não deixe /health ou o login sem resposta.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict
+
+from fastapi import HTTPException
+
+from config import settings
+
+
+class ExecutorSaturadoError(HTTPException):
+    """Fila do pool de execução cheia - a requisição é recusada com 503"""
+
+    def __init__(self, nome: str, max_fila: int):
+        super().__init__(
+            status_code=503,
+            detail=f"Servidor ocupado (pool '{nome}' com {max_fila} tarefas na fila). Tente novamente.",
+            headers={"Retry-After": "5"}
+        )
+
+
+class PoolExecucao:
+    """
+    Pool de threads limitado com métricas de fila.
+    - No máximo max_workers chamadas rodando ao mesmo tempo
+    - No máximo max_fila chamadas aguardando; além disso a submissão é recusada
+    """
+
+    def __init__(self, nome: str, max_workers: int, max_fila: int):
+        self.nome = nome
+        self.max_workers = max(1, max_workers)
+        self.max_fila = max(0, max_fila)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=f"exec-{nome}")
+
+        self._lock = threading.Lock()
+        self._na_fila = 0
+        self._em_execucao = 0
+
+        # Métricas acumuladas
+        self._concluidas = 0
+        self._falhas = 0
+        self._rejeitadas = 0
+        self._pico_fila = 0
+        self._espera_total = 0.0
+        self._espera_maxima = 0.0
+        self._execucao_total = 0.0
+
+    def submeter(self, func: Callable, *args, **kwargs) -> Future:
+        """Agenda func no pool; levanta ExecutorSaturadoError se a fila estiver cheia"""
+        with self._lock:
+            if self._na_fila >= self.max_fila and self._em_execucao >= self.max_workers:
+                self._rejeitadas += 1
+                raise ExecutorSaturadoError(self.nome, self.max_fila)
+            self._na_fila += 1
+            self._pico_fila = max(self._pico_fila, self._na_fila)
+
+        enfileirada_em = time.monotonic()
+
+        def tarefa():
+            inicio = time.monotonic()
+            espera = inicio - enfileirada_em
+            with self._lock:
+                self._na_fila -= 1
+                self._em_execucao += 1
+                self._espera_total += espera
+                self._espera_maxima = max(self._espera_maxima, espera)
+
+            sucesso = False
+            try:
+                resultado = func(*args, **kwargs)
+                sucesso = True
+                return resultado
+            finally:
+                with self._lock:
+                    self._em_execucao -= 1
+                    self._concluidas += 1
+                    if not sucesso:
+                        self._falhas += 1
+                    self._execucao_total += time.monotonic() - inicio
+
+        try:
+            return self._executor.submit(tarefa)
+        except Exception:
+            with self._lock:
+                self._na_fila -= 1
+            raise
+
+    async def executar(self, func: Callable, *args, **kwargs):
+        """Executa func no pool sem bloquear o event loop"""
+        return await asyncio.wrap_future(self.submeter(func, *args, **kwargs))
+
+    def encerrar(self):
+        """Encerra o pool aguardando as tarefas em andamento"""
+        self._executor.shutdown(wait=True)
+
+    def estatisticas(self) -> dict:
+        """Retorna métricas do pool para dimensionamento sob carga"""
+        with self._lock:
+            return {
+                'nome': self.nome,
+                'max_workers': self.max_workers,
+                'max_fila': self.max_fila,
+                'em_execucao': self._em_execucao,
+                'na_fila': self._na_fila,
+                'pico_fila': self._pico_fila,
+                'concluidas': self._concluidas,
+                'falhas': self._falhas,
+                'rejeitadas': self._rejeitadas,
+                'espera_media_ms': round(self._espera_total * 1000 / self._concluidas, 2) if self._concluidas else 0.0,
+                'espera_maxima_ms': round(self._espera_maxima * 1000, 2),
+                'execucao_media_ms': round(self._execucao_total * 1000 / self._concluidas, 2) if self._concluidas else 0.0
+            }
+
+
+# Pools por tipo de carga
+# - local: consultas ao banco Financeiro (dashboard, projetado, status)
+# - senior: consultas diretas ao Senior, que podem levar dezenas de segundos
+# - sincronizacao: cargas Senior -> local (poucas, longas)
+# - auth: login/2FA (bcrypt + lookup do usuário), isolado para nunca esperar atrás de relatórios
+pools: Dict[str, PoolExecucao] = {
+    'local': PoolExecucao('local', settings.EXECUTOR_LOCAL_WORKERS, settings.EXECUTOR_LOCAL_MAX_FILA),
+    'senior': PoolExecucao('senior', settings.EXECUTOR_SENIOR_WORKERS, settings.EXECUTOR_SENIOR_MAX_FILA),
+    'sincronizacao': PoolExecucao(
+        'sincronizacao', settings.EXECUTOR_SINCRONIZACAO_WORKERS, settings.EXECUTOR_SINCRONIZACAO_MAX_FILA
+    ),
+    'auth': PoolExecucao('auth', settings.EXECUTOR_AUTH_WORKERS, settings.EXECUTOR_AUTH_MAX_FILA),
+}
+
+
+async def executar(pool: str, func: Callable, *args, **kwargs):
+    """
+    Executa uma chamada bloqueante no pool indicado
+
+    Exemplo:
+        dados = await executar('local', DashboardService.obter_resumo, data_inicio, data_fim)
+    """
+    return await pools[pool].executar(func, *args, **kwargs)
+
+
+def estatisticas() -> dict:
+    """Métricas de todos os pools de execução"""
+    return {nome: pool.estatisticas() for nome, pool in pools.items()}
+
+
+def encerrar():
+    """Encerra todos os pools de execução"""
+    for pool in pools.values():
+        pool.encerrar()
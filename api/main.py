@@ -1,7 +1,11 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from config import settings
-from routes import dashboard, contas, sincronizacao, projetado, recebiveis_cartao, contas_receber_senior, contas_pagar_senior, auth
+from database import db, senior_db
+import executor
+from services.snapshot_analitico import snapshot_analitico
+from utils.etag import ETagMiddleware
+from routes import dashboard, contas, sincronizacao, projetado, recebiveis_cartao, contas_receber_senior, contas_pagar_senior, auth, metricas
 
 # Inicializa FastAPI
 app = FastAPI(
@@ -12,6 +16,10 @@ app = FastAPI(
     redoc_url="/redoc"
 )
 
+# ETag / GET condicional (registrado antes do CORS para que o 304 também receba os cabeçalhos CORS)
+if settings.ETAG_ATIVO:
+    app.add_middleware(ETagMiddleware)
+
 # Configuração CORS
 app.add_middleware(
     CORSMiddleware,
@@ -30,6 +38,21 @@ app.include_router(projetado.router)
 app.include_router(recebiveis_cartao.router)
 app.include_router(contas_receber_senior.router)
 app.include_router(contas_pagar_senior.router)
+app.include_router(metricas.router)
+
+
+@app.on_event("startup")
+def carregar_snapshot_analitico():
+    """Carrega o snapshot do dashboard em segundo plano (as primeiras requisições usam o banco)"""
+    snapshot_analitico.agendar_carga()
+
+
+@app.on_event("shutdown")
+def fechar_pools_conexao():
+    """Encerra os pools de execução e fecha as conexões ociosas ao encerrar a aplicação"""
+    executor.encerrar()
+    db.pool.fechar_ociosas()
+    senior_db.pool.fechar_ociosas()
 
 
 @app.get("/")
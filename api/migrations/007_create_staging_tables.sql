@@ -0,0 +1,166 @@
+-- ================================================
+-- Migration: 007_create_staging_tables
+-- Descrição: Cria as tabelas de carga (staging) usadas pela sincronização completa
+-- Data: 2026-10-18
+-- ================================================
+-- A sincronização completa carrega contas_receber_staging / contas_pagar_staging
+-- e depois publica com ALTER TABLE ... SWITCH TO, que é só metadados e atômico.
+-- O SWITCH exige que a staging tenha EXATAMENTE a mesma estrutura da tabela final
+-- (colunas, tipos, nulabilidade, PK e índices). Toda migration que alterar
+-- contas_receber ou contas_pagar precisa aplicar a mesma alteração na staging.
+
+IF NOT EXISTS (SELECT * FROM sys.objects WHERE object_id = OBJECT_ID(N'[dbo].[contas_receber_staging]') AND type in (N'U'))
+BEGIN
+    CREATE TABLE [dbo].[contas_receber_staging] (
+        -- Identificador único gerado pela aplicação
+        [id] UNIQUEIDENTIFIER NOT NULL PRIMARY KEY DEFAULT NEWID(),
+
+        -- Campos da empresa/filial
+        [CODEMP] INT NOT NULL,
+        [CODFIL] INT NOT NULL,
+
+        -- Dados do cliente
+        [CODCLI] INT NOT NULL,
+        [NOMCLI] VARCHAR(150) NULL,
+        [CIDCLI] VARCHAR(100) NULL,
+        [BAICLI] VARCHAR(100) NULL,
+        [TIPCLI] VARCHAR(10) NULL,
+        [USU_UNICLI] VARCHAR(50) NULL,
+
+        -- Dados do título
+        [NUMTIT] VARCHAR(20) NOT NULL,
+        [SITTIT] VARCHAR(2) NULL,
+        [CODTPT] VARCHAR(10) NULL,
+        [CODTNS] VARCHAR(10) NULL,
+        [DESTNS] VARCHAR(100) NULL,
+
+        -- Valores
+        [VLRABE] DECIMAL(18, 2) NULL DEFAULT 0,
+        [VLRORI] DECIMAL(18, 2) NULL DEFAULT 0,
+        [VLRDSC] DECIMAL(18, 2) NULL DEFAULT 0,
+
+        -- Percentuais
+        [PERMUL] DECIMAL(5, 2) NULL DEFAULT 0,
+        [PERDSC] DECIMAL(5, 2) NULL DEFAULT 0,
+        [PERJRS] DECIMAL(5, 2) NULL DEFAULT 0,
+
+        -- Configurações
+        [RECDEC] INT NULL DEFAULT 0,
+        [RECSOM] INT NULL DEFAULT 0,
+        [RECVJM] INT NULL DEFAULT 0,
+        [RECVMM] INT NULL DEFAULT 0,
+        [RECVDM] INT NULL DEFAULT 0,
+        [TOLJRS] DECIMAL(5, 2) NULL DEFAULT 0,
+        [TOLMUL] DECIMAL(5, 2) NULL DEFAULT 0,
+        [TIPJRS] VARCHAR(1) NULL,
+        [JRSDIA] DECIMAL(5, 2) NULL DEFAULT 0,
+
+        -- Datas
+        [DATEMI] DATE NULL,
+        [VCTPRO] DATE NULL,
+        [VCTORI] DATE NULL,
+        [DATPPT] DATE NULL,
+        [ULTPGT] VARCHAR(10) NULL,
+
+        -- Observações e outros
+        [OBSTCR] VARCHAR(MAX) NULL,
+        [CODREP] VARCHAR(10) NULL,
+        [NUMCTR] VARCHAR(20) NULL,
+        [CODSNF] VARCHAR(10) NULL,
+        [NUMNFV] VARCHAR(20) NULL,
+        [CODFPG] VARCHAR(10) NULL,
+
+        -- Centro de custo e conta financeira
+        [CODCCU] INT NULL DEFAULT 0,
+        [CTAFIN] INT NULL DEFAULT 0,
+
+        -- Controle de auditoria
+        [created_at] DATETIME2 NOT NULL DEFAULT GETDATE(),
+        [updated_at] DATETIME2 NOT NULL DEFAULT GETDATE()
+    );
+
+    -- Cria índices para melhor performance
+    CREATE INDEX [IX_contas_receber_staging_empresa_filial] ON [dbo].[contas_receber_staging] ([CODEMP], [CODFIL]);
+    CREATE INDEX [IX_contas_receber_staging_cliente] ON [dbo].[contas_receber_staging] ([CODCLI]);
+    CREATE INDEX [IX_contas_receber_staging_numtit] ON [dbo].[contas_receber_staging] ([NUMTIT]);
+    CREATE INDEX [IX_contas_receber_staging_vctpro] ON [dbo].[contas_receber_staging] ([VCTPRO]);
+    CREATE INDEX [IX_contas_receber_staging_sittit] ON [dbo].[contas_receber_staging] ([SITTIT]);
+
+    -- Cria índice composto para chave única (pode ser usado para detectar duplicatas)
+    CREATE UNIQUE INDEX [IX_contas_receber_staging_unique] ON [dbo].[contas_receber_staging]
+        ([CODEMP], [CODFIL], [NUMTIT], [CODTPT], [CODCLI]);
+
+    PRINT 'Tabela contas_receber_staging criada com sucesso!';
+END
+ELSE
+BEGIN
+    PRINT 'Tabela contas_receber_staging já existe.';
+END
+GO
+
+IF NOT EXISTS (SELECT * FROM sys.objects WHERE object_id = OBJECT_ID(N'[dbo].[contas_pagar_staging]') AND type in (N'U'))
+BEGIN
+    CREATE TABLE [dbo].[contas_pagar_staging] (
+        -- Identificador único gerado pela aplicação
+        [id] UNIQUEIDENTIFIER NOT NULL PRIMARY KEY DEFAULT NEWID(),
+
+        -- Campos da empresa/filial
+        [CODEMP] INT NOT NULL,
+        [CODFIL] INT NOT NULL,
+
+        -- Dados do título
+        [NUMTIT] VARCHAR(20) NOT NULL,
+        [SEQMOV] INT NOT NULL,
+        [CODTPT] VARCHAR(10) NULL,
+        [SITTIT] VARCHAR(2) NULL,
+
+        -- Dados do fornecedor
+        [CODFOR] INT NOT NULL,
+        [NOMFOR] VARCHAR(100) NULL,
+
+        -- Transação e forma de pagamento
+        [CODTNS] VARCHAR(10) NULL,
+        [CODFPG] VARCHAR(10) NULL,
+
+        -- Valores
+        [VLRORI] DECIMAL(18, 2) NULL DEFAULT 0,
+        [VLRABE] DECIMAL(18, 2) NULL DEFAULT 0,
+        [VLRRAT] DECIMAL(18, 2) NULL DEFAULT 0,
+
+        -- Datas
+        [DATMOV] DATE NULL,
+        [DATEMI] DATE NULL,
+        [VCTPRO] DATE NULL,
+        [ULTPGT] DATE NULL,
+
+        -- Centro de custo e contas
+        [CODCCU] INT NULL DEFAULT 0,
+        [CTAFIN] INT NULL DEFAULT 0,
+        [CTARED] INT NULL DEFAULT 0,
+
+        -- Observações
+        [OBSTCP] VARCHAR(MAX) NULL,
+
+        -- Controle de auditoria
+        [created_at] DATETIME2 NOT NULL DEFAULT GETDATE(),
+        [updated_at] DATETIME2 NOT NULL DEFAULT GETDATE()
+    );
+
+    -- Cria índices para melhor performance
+    CREATE INDEX [IX_contas_pagar_staging_empresa_filial] ON [dbo].[contas_pagar_staging] ([CODEMP], [CODFIL]);
+    CREATE INDEX [IX_contas_pagar_staging_fornecedor] ON [dbo].[contas_pagar_staging] ([CODFOR]);
+    CREATE INDEX [IX_contas_pagar_staging_numtit] ON [dbo].[contas_pagar_staging] ([NUMTIT]);
+    CREATE INDEX [IX_contas_pagar_staging_vctpro] ON [dbo].[contas_pagar_staging] ([VCTPRO]);
+    CREATE INDEX [IX_contas_pagar_staging_sittit] ON [dbo].[contas_pagar_staging] ([SITTIT]);
+
+    -- Índice composto NÃO-ÚNICO para performance (permite registros com mesma chave)
+    CREATE INDEX [IX_contas_pagar_staging_composite] ON [dbo].[contas_pagar_staging]
+        ([CODEMP], [CODFIL], [NUMTIT], [SEQMOV], [CODTPT], [CODFOR]);
+
+    PRINT 'Tabela contas_pagar_staging criada com sucesso!';
+END
+ELSE
+BEGIN
+    PRINT 'Tabela contas_pagar_staging já existe.';
+END
+GO
@@ -0,0 +1,52 @@
+-- ================================================
+-- Migration: 008_add_hash_linha
+-- Descrição: Adiciona HASH_LINHA (impressão digital da linha do Senior) às tabelas
+--            sincronizadas e às respectivas staging, para a sincronização incremental
+-- Data: 2026-10-18
+-- ================================================
+-- Após aplicar, execute uma sincronização completa (modo=completo) para
+-- regravar as linhas com ids derivados da chave natural e HASH_LINHA preenchido.
+
+IF NOT EXISTS (SELECT * FROM sys.columns WHERE name = 'HASH_LINHA' AND object_id = OBJECT_ID('dbo.contas_receber'))
+BEGIN
+    ALTER TABLE [dbo].[contas_receber] ADD [HASH_LINHA] BINARY(16) NULL;
+    PRINT 'Coluna HASH_LINHA adicionada em contas_receber.';
+END
+ELSE
+BEGIN
+    PRINT 'Coluna HASH_LINHA já existe em contas_receber.';
+END
+GO
+
+IF NOT EXISTS (SELECT * FROM sys.columns WHERE name = 'HASH_LINHA' AND object_id = OBJECT_ID('dbo.contas_receber_staging'))
+BEGIN
+    ALTER TABLE [dbo].[contas_receber_staging] ADD [HASH_LINHA] BINARY(16) NULL;
+    PRINT 'Coluna HASH_LINHA adicionada em contas_receber_staging.';
+END
+ELSE
+BEGIN
+    PRINT 'Coluna HASH_LINHA já existe em contas_receber_staging.';
+END
+GO
+
+IF NOT EXISTS (SELECT * FROM sys.columns WHERE name = 'HASH_LINHA' AND object_id = OBJECT_ID('dbo.contas_pagar'))
+BEGIN
+    ALTER TABLE [dbo].[contas_pagar] ADD [HASH_LINHA] BINARY(16) NULL;
+    PRINT 'Coluna HASH_LINHA adicionada em contas_pagar.';
+END
+ELSE
+BEGIN
+    PRINT 'Coluna HASH_LINHA já existe em contas_pagar.';
+END
+GO
+
+IF NOT EXISTS (SELECT * FROM sys.columns WHERE name = 'HASH_LINHA' AND object_id = OBJECT_ID('dbo.contas_pagar_staging'))
+BEGIN
+    ALTER TABLE [dbo].[contas_pagar_staging] ADD [HASH_LINHA] BINARY(16) NULL;
+    PRINT 'Coluna HASH_LINHA adicionada em contas_pagar_staging.';
+END
+ELSE
+BEGIN
+    PRINT 'Coluna HASH_LINHA já existe em contas_pagar_staging.';
+END
+GO
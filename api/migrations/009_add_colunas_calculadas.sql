@@ -0,0 +1,216 @@
+-- ================================================
+-- Migration: 009_add_colunas_calculadas
+-- Descrição: Materializa DATA_AJUSTADA (dia útil) e VALOR_CALCULADO (regra do BI)
+--            como colunas calculadas persistidas em contas_receber / contas_pagar
+--            (e nas staging), com índices de cobertura para as consultas por período
+-- Data: 2026-10-18
+-- ================================================
+-- As consultas do dashboard filtravam por um CASE DATEPART(WEEKDAY, ...), que não
+-- usa índice (varredura da tabela inteira a cada requisição). Com as colunas
+-- persistidas o filtro vira busca no índice (DATA_AJUSTADA, CODFIL).
+--
+-- DATEPART(WEEKDAY) depende de SET DATEFIRST e por isso não pode ser persistido;
+-- aqui o dia da semana vem de DATEDIFF(DAY, 0, data) % 7, onde 0 = 01/01/1900 (segunda):
+--   0 = segunda, 1 = terça, 2 = quarta, 3 = quinta, 4 = sexta, 5 = sábado, 6 = domingo
+--
+-- contas_pagar (VCTPRO):   sábado +2, domingo +1 (segunda-feira)
+-- contas_receber (DATPPT): sexta +3, sábado +3, domingo +2, segunda a quinta +1
+--
+-- As colunas são adicionadas na mesma ordem nas tabelas finais e nas staging,
+-- para que o ALTER TABLE ... SWITCH da sincronização completa continue válido.
+
+-- contas_receber
+
+IF NOT EXISTS (SELECT * FROM sys.columns WHERE name = 'DATA_AJUSTADA' AND object_id = OBJECT_ID('dbo.contas_receber'))
+BEGIN
+    ALTER TABLE [dbo].[contas_receber] ADD [DATA_AJUSTADA] AS (
+        CASE DATEDIFF(DAY, 0, [DATPPT]) % 7
+            WHEN 4 THEN DATEADD(DAY, 3, [DATPPT])  -- Sexta → +3
+            WHEN 5 THEN DATEADD(DAY, 3, [DATPPT])  -- Sábado → +3
+            WHEN 6 THEN DATEADD(DAY, 2, [DATPPT])  -- Domingo → +2
+            ELSE DATEADD(DAY, 1, [DATPPT])         -- Segunda a quinta → +1
+        END
+    ) PERSISTED;
+    PRINT 'Coluna DATA_AJUSTADA adicionada em contas_receber.';
+END
+ELSE
+BEGIN
+    PRINT 'Coluna DATA_AJUSTADA já existe em contas_receber.';
+END
+GO
+
+IF NOT EXISTS (SELECT * FROM sys.columns WHERE name = 'VALOR_CALCULADO' AND object_id = OBJECT_ID('dbo.contas_receber'))
+BEGIN
+    ALTER TABLE [dbo].[contas_receber] ADD [VALOR_CALCULADO] AS (
+        CASE
+            WHEN [VLRABE] != 0 AND [RECDEC] = 2 THEN -[VLRABE]
+            WHEN [VLRABE] = 0 AND [RECDEC] = 2 THEN -[VLRORI]
+            WHEN [VLRABE] != 0 AND [RECDEC] = 1 THEN [VLRABE]
+            ELSE [VLRORI]
+        END
+    ) PERSISTED;
+    PRINT 'Coluna VALOR_CALCULADO adicionada em contas_receber.';
+END
+ELSE
+BEGIN
+    PRINT 'Coluna VALOR_CALCULADO já existe em contas_receber.';
+END
+GO
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_contas_receber_data_ajustada' AND object_id = OBJECT_ID('dbo.contas_receber'))
+BEGIN
+    CREATE INDEX [IX_contas_receber_data_ajustada] ON [dbo].[contas_receber] ([DATA_AJUSTADA], [CODFIL])
+        INCLUDE ([VALOR_CALCULADO], [CTAFIN], [CODCCU]);
+    PRINT 'Índice IX_contas_receber_data_ajustada criado.';
+END
+ELSE
+BEGIN
+    PRINT 'Índice IX_contas_receber_data_ajustada já existe.';
+END
+GO
+
+-- contas_receber_staging
+
+IF NOT EXISTS (SELECT * FROM sys.columns WHERE name = 'DATA_AJUSTADA' AND object_id = OBJECT_ID('dbo.contas_receber_staging'))
+BEGIN
+    ALTER TABLE [dbo].[contas_receber_staging] ADD [DATA_AJUSTADA] AS (
+        CASE DATEDIFF(DAY, 0, [DATPPT]) % 7
+            WHEN 4 THEN DATEADD(DAY, 3, [DATPPT])  -- Sexta → +3
+            WHEN 5 THEN DATEADD(DAY, 3, [DATPPT])  -- Sábado → +3
+            WHEN 6 THEN DATEADD(DAY, 2, [DATPPT])  -- Domingo → +2
+            ELSE DATEADD(DAY, 1, [DATPPT])         -- Segunda a quinta → +1
+        END
+    ) PERSISTED;
+    PRINT 'Coluna DATA_AJUSTADA adicionada em contas_receber_staging.';
+END
+ELSE
+BEGIN
+    PRINT 'Coluna DATA_AJUSTADA já existe em contas_receber_staging.';
+END
+GO
+
+IF NOT EXISTS (SELECT * FROM sys.columns WHERE name = 'VALOR_CALCULADO' AND object_id = OBJECT_ID('dbo.contas_receber_staging'))
+BEGIN
+    ALTER TABLE [dbo].[contas_receber_staging] ADD [VALOR_CALCULADO] AS (
+        CASE
+            WHEN [VLRABE] != 0 AND [RECDEC] = 2 THEN -[VLRABE]
+            WHEN [VLRABE] = 0 AND [RECDEC] = 2 THEN -[VLRORI]
+            WHEN [VLRABE] != 0 AND [RECDEC] = 1 THEN [VLRABE]
+            ELSE [VLRORI]
+        END
+    ) PERSISTED;
+    PRINT 'Coluna VALOR_CALCULADO adicionada em contas_receber_staging.';
+END
+ELSE
+BEGIN
+    PRINT 'Coluna VALOR_CALCULADO já existe em contas_receber_staging.';
+END
+GO
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_contas_receber_staging_data_ajustada' AND object_id = OBJECT_ID('dbo.contas_receber_staging'))
+BEGIN
+    CREATE INDEX [IX_contas_receber_staging_data_ajustada] ON [dbo].[contas_receber_staging] ([DATA_AJUSTADA], [CODFIL])
+        INCLUDE ([VALOR_CALCULADO], [CTAFIN], [CODCCU]);
+    PRINT 'Índice IX_contas_receber_staging_data_ajustada criado.';
+END
+ELSE
+BEGIN
+    PRINT 'Índice IX_contas_receber_staging_data_ajustada já existe.';
+END
+GO
+
+-- contas_pagar
+
+IF NOT EXISTS (SELECT * FROM sys.columns WHERE name = 'DATA_AJUSTADA' AND object_id = OBJECT_ID('dbo.contas_pagar'))
+BEGIN
+    ALTER TABLE [dbo].[contas_pagar] ADD [DATA_AJUSTADA] AS (
+        CASE DATEDIFF(DAY, 0, [VCTPRO]) % 7
+            WHEN 5 THEN DATEADD(DAY, 2, [VCTPRO])  -- Sábado → +2 = Segunda
+            WHEN 6 THEN DATEADD(DAY, 1, [VCTPRO])  -- Domingo → +1 = Segunda
+            ELSE [VCTPRO]
+        END
+    ) PERSISTED;
+    PRINT 'Coluna DATA_AJUSTADA adicionada em contas_pagar.';
+END
+ELSE
+BEGIN
+    PRINT 'Coluna DATA_AJUSTADA já existe em contas_pagar.';
+END
+GO
+
+IF NOT EXISTS (SELECT * FROM sys.columns WHERE name = 'VALOR_CALCULADO' AND object_id = OBJECT_ID('dbo.contas_pagar'))
+BEGIN
+    ALTER TABLE [dbo].[contas_pagar] ADD [VALOR_CALCULADO] AS (
+        CASE
+            WHEN [VLRABE] > [VLRRAT] THEN [VLRRAT]
+            WHEN [VLRABE] = 0 THEN [VLRRAT]
+            ELSE [VLRABE]
+        END
+    ) PERSISTED;
+    PRINT 'Coluna VALOR_CALCULADO adicionada em contas_pagar.';
+END
+ELSE
+BEGIN
+    PRINT 'Coluna VALOR_CALCULADO já existe em contas_pagar.';
+END
+GO
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_contas_pagar_data_ajustada' AND object_id = OBJECT_ID('dbo.contas_pagar'))
+BEGIN
+    CREATE INDEX [IX_contas_pagar_data_ajustada] ON [dbo].[contas_pagar] ([DATA_AJUSTADA], [CODFIL])
+        INCLUDE ([VALOR_CALCULADO], [CTAFIN], [CODCCU], [SITTIT], [SEQMOV], [VLRABE]);
+    PRINT 'Índice IX_contas_pagar_data_ajustada criado.';
+END
+ELSE
+BEGIN
+    PRINT 'Índice IX_contas_pagar_data_ajustada já existe.';
+END
+GO
+
+-- contas_pagar_staging
+
+IF NOT EXISTS (SELECT * FROM sys.columns WHERE name = 'DATA_AJUSTADA' AND object_id = OBJECT_ID('dbo.contas_pagar_staging'))
+BEGIN
+    ALTER TABLE [dbo].[contas_pagar_staging] ADD [DATA_AJUSTADA] AS (
+        CASE DATEDIFF(DAY, 0, [VCTPRO]) % 7
+            WHEN 5 THEN DATEADD(DAY, 2, [VCTPRO])  -- Sábado → +2 = Segunda
+            WHEN 6 THEN DATEADD(DAY, 1, [VCTPRO])  -- Domingo → +1 = Segunda
+            ELSE [VCTPRO]
+        END
+    ) PERSISTED;
+    PRINT 'Coluna DATA_AJUSTADA adicionada em contas_pagar_staging.';
+END
+ELSE
+BEGIN
+    PRINT 'Coluna DATA_AJUSTADA já existe em contas_pagar_staging.';
+END
+GO
+
+IF NOT EXISTS (SELECT * FROM sys.columns WHERE name = 'VALOR_CALCULADO' AND object_id = OBJECT_ID('dbo.contas_pagar_staging'))
+BEGIN
+    ALTER TABLE [dbo].[contas_pagar_staging] ADD [VALOR_CALCULADO] AS (
+        CASE
+            WHEN [VLRABE] > [VLRRAT] THEN [VLRRAT]
+            WHEN [VLRABE] = 0 THEN [VLRRAT]
+            ELSE [VLRABE]
+        END
+    ) PERSISTED;
+    PRINT 'Coluna VALOR_CALCULADO adicionada em contas_pagar_staging.';
+END
+ELSE
+BEGIN
+    PRINT 'Coluna VALOR_CALCULADO já existe em contas_pagar_staging.';
+END
+GO
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_contas_pagar_staging_data_ajustada' AND object_id = OBJECT_ID('dbo.contas_pagar_staging'))
+BEGIN
+    CREATE INDEX [IX_contas_pagar_staging_data_ajustada] ON [dbo].[contas_pagar_staging] ([DATA_AJUSTADA], [CODFIL])
+        INCLUDE ([VALOR_CALCULADO], [CTAFIN], [CODCCU], [SITTIT], [SEQMOV], [VLRABE]);
+    PRINT 'Índice IX_contas_pagar_staging_data_ajustada criado.';
+END
+ELSE
+BEGIN
+    PRINT 'Índice IX_contas_pagar_staging_data_ajustada já existe.';
+END
+GO
@@ -0,0 +1,77 @@
+-- ================================================
+-- Migration: 010_create_fato_diario
+-- Descrição: Cria os agregados diários fato_diario_pagar / fato_diario_receber,
+--            reconstruídos a cada sincronização (services/fato_diario_service.py)
+-- Data: 2026-10-18
+-- ================================================
+-- O dashboard só precisa de somas por dia, filial, conta financeira e centro de
+-- custo. Em vez de reagregar os títulos a cada requisição, as consultas leem
+-- estes agregados, que têm uma linha por
+-- (data_ajustada, codemp, codfil, ctafin, codccu, sittit).
+--
+-- fato_diario_pagar já contém apenas os títulos que passam nos filtros do BI
+-- (SITTIT <> 'CA', SEQMOV = 1, VLRABE >= 0, CTAFIN fora de 407-412 e 501).
+-- As colunas da chave aceitam NULL para manter o mesmo resultado das consultas
+-- sobre as tabelas de títulos (ex: títulos sem DATPPT).
+
+IF NOT EXISTS (SELECT * FROM sys.objects WHERE object_id = OBJECT_ID(N'[dbo].[fato_diario_pagar]') AND type in (N'U'))
+BEGIN
+    CREATE TABLE [dbo].[fato_diario_pagar] (
+        -- Chave do agregado
+        [data_ajustada] DATE NULL,
+        [codemp] INT NOT NULL,
+        [codfil] INT NOT NULL,
+        [ctafin] INT NULL,
+        [codccu] INT NULL,
+        [sittit] VARCHAR(2) NULL,
+
+        -- Valores somados
+        [valor_calculado] DECIMAL(18, 2) NOT NULL DEFAULT 0,
+        [vlrabe] DECIMAL(18, 2) NOT NULL DEFAULT 0,
+        [vlrrat] DECIMAL(18, 2) NOT NULL DEFAULT 0,
+        [qtd_titulos] INT NOT NULL DEFAULT 0,
+
+        [atualizado_em] DATETIME2 NOT NULL DEFAULT GETDATE()
+    );
+
+    CREATE CLUSTERED INDEX [IX_fato_diario_pagar_chave] ON [dbo].[fato_diario_pagar]
+        ([data_ajustada], [codemp], [codfil], [ctafin], [codccu], [sittit]);
+
+    PRINT 'Tabela fato_diario_pagar criada com sucesso!';
+END
+ELSE
+BEGIN
+    PRINT 'Tabela fato_diario_pagar já existe.';
+END
+GO
+
+IF NOT EXISTS (SELECT * FROM sys.objects WHERE object_id = OBJECT_ID(N'[dbo].[fato_diario_receber]') AND type in (N'U'))
+BEGIN
+    CREATE TABLE [dbo].[fato_diario_receber] (
+        -- Chave do agregado
+        [data_ajustada] DATE NULL,
+        [codemp] INT NOT NULL,
+        [codfil] INT NOT NULL,
+        [ctafin] INT NULL,
+        [codccu] INT NULL,
+        [sittit] VARCHAR(2) NULL,
+
+        -- Valores somados
+        [valor_calculado] DECIMAL(18, 2) NOT NULL DEFAULT 0,
+        [vlrabe] DECIMAL(18, 2) NOT NULL DEFAULT 0,
+        [vlrori] DECIMAL(18, 2) NOT NULL DEFAULT 0,
+        [qtd_titulos] INT NOT NULL DEFAULT 0,
+
+        [atualizado_em] DATETIME2 NOT NULL DEFAULT GETDATE()
+    );
+
+    CREATE CLUSTERED INDEX [IX_fato_diario_receber_chave] ON [dbo].[fato_diario_receber]
+        ([data_ajustada], [codemp], [codfil], [ctafin], [codccu], [sittit]);
+
+    PRINT 'Tabela fato_diario_receber criada com sucesso!';
+END
+ELSE
+BEGIN
+    PRINT 'Tabela fato_diario_receber já existe.';
+END
+GO
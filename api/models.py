@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Any, Dict, List, Optional
 from datetime import date, datetime
 from uuid import UUID
 
@@ -210,6 +210,27 @@ class SincronizacaoResponse(BaseModel):
     log_id: Optional[UUID] = None
 
 
+class JobSincronizacaoResponse(BaseModel):
+    """Job de sincronização em segundo plano e seu progresso"""
+    job_id: str
+    tipo: str
+    parametros: Dict[str, Any] = {}
+    status: str  # na_fila, em_andamento, sucesso, erro
+    fase: Optional[str] = None
+    etapas: Dict[str, Any] = {}
+    linhas_processadas: int = 0
+    linhas_estimadas: Optional[int] = None
+    percentual: Optional[float] = None
+    eta_segundos: Optional[int] = None
+    coalescidos: int = 0
+    criado_em: datetime
+    iniciado_em: Optional[datetime] = None
+    concluido_em: Optional[datetime] = None
+    duracao_ms: Optional[int] = None
+    resultado: Optional[Dict[str, Any]] = None
+    erro: Optional[str] = None
+
+
 class StatusSincronizacaoResponse(BaseModel):
     """Status da última sincronização"""
     ultima_sincronizacao: Optional[datetime] = None
@@ -218,3 +239,5 @@ class StatusSincronizacaoResponse(BaseModel):
     registros_inseridos: Optional[int] = None
     tempo_execucao_ms: Optional[int] = None
     mensagem_erro: Optional[str] = None
+    job: Optional[JobSincronizacaoResponse] = None  # Quando consultado com job_id
+    jobs_ativos: List[JobSincronizacaoResponse] = []
@@ -7,6 +7,7 @@ import pymssql
 
 from services.auth_service import AuthService
 from database import get_db_connection
+from executor import executar
 
 router = APIRouter(prefix="/api/auth", tags=["Autenticação"])
 
@@ -180,7 +181,7 @@ async def login(request: LoginRequest):
     """
     try:
         # Busca usuário
-        user = get_user_by_email(request.email)
+        user = await executar('auth', get_user_by_email, request.email)
 
         if not user:
             raise HTTPException(status_code=401, detail="Email ou senha incorretos")
@@ -190,7 +191,8 @@ async def login(request: LoginRequest):
             raise HTTPException(status_code=403, detail="Usuário inativo")
 
         # Verifica senha
-        if not AuthService.verify_password(request.password, user['password_hash']):
+        senha_valida = await executar('auth', AuthService.verify_password, request.password, user['password_hash'])
+        if not senha_valida:
             raise HTTPException(status_code=401, detail="Email ou senha incorretos")
 
         # Se 2FA não está habilitado, faz login direto
@@ -204,7 +206,7 @@ async def login(request: LoginRequest):
 
             access_token, refresh_token = AuthService.create_token_pair(user_data)
 
-            clear_2fa_data(str(user['id']))
+            await executar('auth', clear_2fa_data, str(user['id']))
 
             return LoginResponse(
                 requires_2fa=False,
@@ -226,7 +228,7 @@ async def login(request: LoginRequest):
         code = AuthService.generate_2fa_code()
         expires_at = AuthService.get_2fa_expiry()
 
-        update_user_2fa(str(user['id']), code, expires_at)
+        await executar('auth', update_user_2fa, str(user['id']), code, expires_at)
 
         # TODO: Enviar código via WhatsApp (integração futura)
         print(f"[DEBUG] Código 2FA para {user['email']}: {code}")
@@ -251,7 +253,7 @@ async def verify_2fa(request: Login2FARequest):
     """
     try:
         # Busca usuário
-        user = get_user_by_email(request.email)
+        user = await executar('auth', get_user_by_email, request.email)
 
         if not user:
             raise HTTPException(status_code=401, detail="Usuário não encontrado")
@@ -269,7 +271,7 @@ async def verify_2fa(request: Login2FARequest):
 
         # Verifica código
         if user['two_factor_code'] != request.code:
-            attempts = increment_2fa_attempts(str(user['id']))
+            attempts = await executar('auth', increment_2fa_attempts, str(user['id']))
             remaining = 5 - attempts
 
             if remaining <= 0:
@@ -294,7 +296,7 @@ async def verify_2fa(request: Login2FARequest):
         access_token, refresh_token = AuthService.create_token_pair(user_data)
 
         # Limpa dados 2FA
-        clear_2fa_data(str(user['id']))
+        await executar('auth', clear_2fa_data, str(user['id']))
 
         return TokenResponse(
             access_token=access_token,
@@ -360,7 +362,7 @@ async def get_current_user(authorization: Optional[str] = Header(None)):
             raise HTTPException(status_code=401, detail="Token inválido ou expirado")
 
         # Busca dados atualizados do usuário
-        user = get_user_by_email(payload.get("email"))
+        user = await executar('auth', get_user_by_email, payload.get("email"))
 
         if not user:
             raise HTTPException(status_code=404, detail="Usuário não encontrado")
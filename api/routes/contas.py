@@ -2,6 +2,7 @@ from fastapi import APIRouter, Query
 from typing import Optional
 from services.contas_receber_service import ContasReceberService
 from services.contas_pagar_service import ContasPagarService
+from executor import executar
 
 router = APIRouter(prefix="/api/contas", tags=["Contas"])
 
@@ -14,7 +15,7 @@ async def listar_contas_receber(
     """
     Lista todas as contas a receber com filtro de data opcional
     """
-    return ContasReceberService.buscar_contas(data_inicio, data_fim)
+    return await executar('local', ContasReceberService.buscar_contas, data_inicio, data_fim)
 
 
 @router.get("/pagar")
@@ -25,7 +26,7 @@ async def listar_contas_pagar(
     """
     Lista todas as contas a pagar com filtro de data opcional
     """
-    return ContasPagarService.buscar_contas(data_inicio, data_fim)
+    return await executar('local', ContasPagarService.buscar_contas, data_inicio, data_fim)
 
 
 @router.get("/receber/total")
@@ -36,7 +37,7 @@ async def total_contas_receber(
     """
     Retorna o total de contas a receber no período
     """
-    total = ContasReceberService.calcular_total_receitas(data_inicio, data_fim)
+    total = await executar('local', ContasReceberService.calcular_total_receitas, data_inicio, data_fim)
     return {"total": round(total, 2)}
 
 
@@ -48,5 +49,5 @@ async def total_contas_pagar(
     """
     Retorna o total de contas a pagar no período
     """
-    total = ContasPagarService.calcular_total_despesas(data_inicio, data_fim)
+    total = await executar('local', ContasPagarService.calcular_total_despesas, data_inicio, data_fim)
     return {"total": round(total, 2)}
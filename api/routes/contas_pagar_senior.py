@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Query, HTTPException
 from typing import Optional
 import traceback
+from executor import executar
 
 router = APIRouter(prefix="/api/contas-pagar-senior", tags=["Contas a Pagar - Senior"])
 
@@ -19,8 +20,10 @@ async def obter_resumo_por_dia_liquidado(
         from services.contas_pagar_senior_service import ContasPagarSeniorService
 
         filiais_list = filiais.split(',') if filiais else None
-        resultado = ContasPagarSeniorService.obter_resumo_por_dia_liquidado(periodo, filiais_list)
+        resultado = await executar('senior', ContasPagarSeniorService.obter_resumo_por_dia_liquidado, periodo, filiais_list)
         return resultado
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Erro em obter_resumo_por_dia_liquidado: {str(e)}")
         traceback.print_exc()
@@ -42,13 +45,15 @@ async def debug_total_local():
         FROM contas_pagar
         """
 
-        resultado = db.execute_query(query)
+        resultado = await executar('local', db.execute_query, query)
 
         return {
             'total_registros': resultado[0]['total'] if resultado else 0,
             'data_minima': resultado[0]['data_min'].strftime('%Y-%m-%d') if resultado and resultado[0]['data_min'] else None,
             'data_maxima': resultado[0]['data_max'].strftime('%Y-%m-%d') if resultado and resultado[0]['data_max'] else None
         }
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Erro em debug_total_local: {str(e)}")
         traceback.print_exc()
@@ -71,7 +76,7 @@ async def debug_dia_senior(
         periodo = data[:7]  # YYYY-MM
 
         filiais_list = filiais.split(',') if filiais else None
-        todas_contas = ContasPagarSeniorService.obter_contas_pagar_do_senior(periodo, filiais_list)
+        todas_contas = await executar('senior', ContasPagarSeniorService.obter_contas_pagar_do_senior, periodo, filiais_list)
 
         # Filtra contas que foram ajustadas para a data específica
         contas_do_dia = [
@@ -99,6 +104,8 @@ async def debug_dia_senior(
             'total_valor_cp': total,
             'contas': contas_do_dia[:10]  # Mostra apenas 10 primeiras
         }
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Erro em debug_dia_senior: {str(e)}")
         traceback.print_exc()
@@ -147,7 +154,7 @@ async def debug_dia_local(
         {filiais_filter}
         """
 
-        resultados = db.execute_query(query)
+        resultados = await executar('local', db.execute_query, query)
 
         total = sum(float(r.get('VALOR_CP', 0)) for r in resultados)
 
@@ -173,6 +180,8 @@ async def debug_dia_local(
             'total_valor_cp': total,
             'contas': contas_formatadas[:10]  # Mostra apenas 10 primeiras
         }
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Erro em debug_dia_local: {str(e)}")
         traceback.print_exc()
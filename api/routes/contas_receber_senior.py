@@ -2,6 +2,7 @@ from fastapi import APIRouter, Query, HTTPException
 from typing import Optional
 from services.contas_receber_senior_service import ContasReceberSeniorService
 import traceback
+from executor import executar
 
 router = APIRouter(prefix="/api/contas-receber-senior", tags=["Contas a Receber - Senior"])
 
@@ -17,8 +18,10 @@ async def obter_resumo_por_dia(
     """
     try:
         filiais_list = filiais.split(',') if filiais else None
-        resultado = ContasReceberSeniorService.obter_resumo_por_dia(periodo, filiais_list)
+        resultado = await executar('senior', ContasReceberSeniorService.obter_resumo_por_dia, periodo, filiais_list)
         return resultado
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Erro em obter_resumo_por_dia: {str(e)}")
         traceback.print_exc()
@@ -37,8 +40,10 @@ async def obter_resumo_por_dia_liquidado(
     """
     try:
         filiais_list = filiais.split(',') if filiais else None
-        resultado = ContasReceberSeniorService.obter_resumo_por_dia_liquidado(periodo, filiais_list)
+        resultado = await executar('senior', ContasReceberSeniorService.obter_resumo_por_dia_liquidado, periodo, filiais_list)
         return resultado
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Erro em obter_resumo_por_dia_liquidado: {str(e)}")
         traceback.print_exc()
@@ -56,8 +61,10 @@ async def obter_total_periodo(
     """
     try:
         filiais_list = filiais.split(',') if filiais else None
-        resultado = ContasReceberSeniorService.obter_total_periodo(periodo, filiais_list)
+        resultado = await executar('senior', ContasReceberSeniorService.obter_total_periodo, periodo, filiais_list)
         return resultado
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Erro em obter_total_periodo: {str(e)}")
         traceback.print_exc()
@@ -75,8 +82,10 @@ async def obter_contas_detalhado(
     """
     try:
         filiais_list = filiais.split(',') if filiais else None
-        resultado = ContasReceberSeniorService.obter_contas_receber_do_senior(periodo, filiais_list)
+        resultado = await executar('senior', ContasReceberSeniorService.obter_contas_receber_do_senior, periodo, filiais_list)
         return resultado
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Erro em obter_contas_detalhado: {str(e)}")
         traceback.print_exc()
@@ -96,7 +105,7 @@ async def debug_dia_especifico(
         periodo = data[:7]  # YYYY-MM
 
         filiais_list = filiais.split(',') if filiais else None
-        todas_contas = ContasReceberSeniorService.obter_contas_receber_do_senior(periodo, filiais_list)
+        todas_contas = await executar('senior', ContasReceberSeniorService.obter_contas_receber_do_senior, periodo, filiais_list)
 
         # Filtra contas que foram ajustadas para a data específica
         contas_do_dia = [
@@ -123,6 +132,8 @@ async def debug_dia_especifico(
             'total_valor_cr': total,
             'contas': contas_do_dia
         }
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Erro em debug_dia_especifico: {str(e)}")
         traceback.print_exc()
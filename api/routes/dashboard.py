@@ -1,7 +1,9 @@
 from fastapi import APIRouter, Query, HTTPException
 from typing import Optional
 from services.dashboard_service import DashboardService
+from services.projecao_service import PONDERACOES, MESES_PADRAO, PONDERACAO_PADRAO, FATOR_EXPONENCIAL_PADRAO
 import traceback
+from executor import executar
 
 router = APIRouter(prefix="/api/dashboard", tags=["Dashboard"])
 
@@ -16,8 +18,10 @@ async def obter_resumo(
     """
     try:
         filiais_list = filiais.split(',') if filiais else None
-        resultado = DashboardService.obter_resumo_financeiro(periodo, filiais_list)
+        resultado = await executar('local', DashboardService.obter_resumo_financeiro, periodo, filiais_list)
         return resultado
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Erro em obter_resumo: {str(e)}")
         traceback.print_exc()
@@ -35,8 +39,10 @@ async def obter_grafico_receitas_despesas(
     """
     try:
         filiais_list = filiais.split(',') if filiais else None
-        resultado = DashboardService.obter_dados_grafico_mensal(periodo, filiais_list)
+        resultado = await executar('local', DashboardService.obter_dados_grafico_mensal, periodo, filiais_list)
         return resultado
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Erro em obter_grafico_receitas_despesas: {str(e)}")
         traceback.print_exc()
@@ -52,8 +58,10 @@ async def obter_grafico_evolucao(
     Últimos 6 meses
     """
     try:
-        resultado = DashboardService.obter_dados_grafico_mensal(periodo)
+        resultado = await executar('local', DashboardService.obter_dados_grafico_mensal, periodo)
         return resultado
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Erro em obter_grafico_evolucao: {str(e)}")
         traceback.print_exc()
@@ -69,8 +77,10 @@ async def obter_transacoes(
     Retorna lista de transações consolidadas (receitas e despesas)
     """
     try:
-        resultado = DashboardService.obter_transacoes(periodo, tipo)
+        resultado = await executar('local', DashboardService.obter_transacoes, periodo, tipo)
         return resultado
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Erro em obter_transacoes: {str(e)}")
         traceback.print_exc()
@@ -88,8 +98,10 @@ async def obter_top_despesas(
     """
     try:
         filiais_list = filiais.split(',') if filiais else None
-        resultado = DashboardService.obter_top_despesas(periodo, limit, filiais_list)
+        resultado = await executar('local', DashboardService.obter_top_despesas, periodo, limit, filiais_list)
         return resultado
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Erro em obter_top_despesas: {str(e)}")
         traceback.print_exc()
@@ -105,8 +117,10 @@ async def obter_top_fornecedores(
     Retorna os maiores fornecedores por valor de despesa
     """
     try:
-        resultado = DashboardService.obter_top_fornecedores(periodo, limit)
+        resultado = await executar('local', DashboardService.obter_top_fornecedores, periodo, limit)
         return resultado
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Erro em obter_top_fornecedores: {str(e)}")
         traceback.print_exc()
@@ -124,8 +138,10 @@ async def obter_top_receitas(
     """
     try:
         filiais_list = filiais.split(',') if filiais else None
-        resultado = DashboardService.obter_top_receitas(periodo, limit, filiais_list)
+        resultado = await executar('local', DashboardService.obter_top_receitas, periodo, limit, filiais_list)
         return resultado
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Erro em obter_top_receitas: {str(e)}")
         traceback.print_exc()
@@ -141,8 +157,10 @@ async def obter_top_clientes(
     Retorna os maiores clientes por valor de receita
     """
     try:
-        resultado = DashboardService.obter_top_clientes(periodo, limit)
+        resultado = await executar('local', DashboardService.obter_top_clientes, periodo, limit)
         return resultado
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Erro em obter_top_clientes: {str(e)}")
         traceback.print_exc()
@@ -157,14 +175,44 @@ async def obter_despesas_por_centro_custo(
     Retorna despesas agrupadas por centro de custo
     """
     try:
-        resultado = DashboardService.obter_despesas_por_centro_custo(periodo)
+        resultado = await executar('local', DashboardService.obter_despesas_por_centro_custo, periodo)
         return resultado
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Erro em obter_despesas_por_centro_custo: {str(e)}")
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"Erro ao buscar despesas por centro de custo: {str(e)}")
 
 
+@router.get("/projecao-despesas")
+async def obter_projecao_despesas(
+    periodo: str = Query(default="mes-atual", description="Período"),
+    filiais: Optional[str] = Query(default=None, description="Códigos de filiais separados por vírgula"),
+    meses: int = Query(default=MESES_PADRAO, ge=1, le=24, description="Meses anteriores usados na média"),
+    ponderacao: str = Query(default=PONDERACAO_PADRAO, description="Ponderação da média: simples, ponderada ou exponencial"),
+    fator: float = Query(default=FATOR_EXPONENCIAL_PADRAO, gt=0, le=1, description="Fator da ponderação exponencial")
+):
+    """
+    Retorna a projeção de despesas do período (série diária, total e detalhe por conta financeira)
+    """
+    try:
+        if ponderacao not in PONDERACOES:
+            raise HTTPException(status_code=400, detail=f"Ponderação deve ser uma de: {', '.join(PONDERACOES)}")
+
+        filiais_list = filiais.split(',') if filiais else None
+        resultado = await executar(
+            'local', DashboardService.obter_projecao_despesas, periodo, filiais_list, meses, ponderacao, fator
+        )
+        return resultado
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Erro em obter_projecao_despesas: {str(e)}")
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"Erro ao buscar projeção de despesas: {str(e)}")
+
+
 @router.get("/fluxo-caixa")
 async def obter_fluxo_caixa(
     periodo: str = Query(default="mes-atual", description="Período"),
@@ -175,9 +223,34 @@ async def obter_fluxo_caixa(
     """
     try:
         filiais_list = filiais.split(',') if filiais else None
-        resultado = DashboardService.obter_fluxo_caixa_projetado(periodo, filiais_list)
+        resultado = await executar('local', DashboardService.obter_fluxo_caixa_projetado, periodo, filiais_list)
         return resultado
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Erro em obter_fluxo_caixa: {str(e)}")
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"Erro ao buscar fluxo de caixa: {str(e)}")
+
+
+@router.get("/overview")
+async def obter_overview(
+    periodo: str = Query(default="mes-atual", description="Período: mes-atual, mes-anterior, trimestre, ano ou YYYY-MM"),
+    filiais: Optional[str] = Query(default=None, description="Códigos de filiais separados por vírgula"),
+    limit: int = Query(default=10, description="Número de itens dos rankings")
+):
+    """
+    Retorna todos os widgets do dashboard numa única resposta
+    (resumo, gráfico, fluxo de caixa, rankings e centro de custo), com o tempo
+    de cada widget em tempos_ms
+    """
+    try:
+        filiais_list = filiais.split(',') if filiais else None
+        resultado = await DashboardService.obter_overview(periodo, filiais_list, limit)
+        return resultado
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Erro em obter_overview: {str(e)}")
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"Erro ao buscar visão geral: {str(e)}")
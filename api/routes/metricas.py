@@ -0,0 +1,57 @@
+"""
+Rotas de métricas operacionais da API
+Usadas para dimensionar pools e acompanhar a carga
+"""
+
+from fastapi import APIRouter
+from database import db, senior_db
+import executor
+from utils.cache import cache_consultas, cache_senior
+from utils.single_flight import single_flight_senior
+
+router = APIRouter(prefix="/api/metricas", tags=["Métricas"])
+
+
+@router.get("/pool-conexoes")
+async def obter_metricas_pool_conexoes():
+    """
+    Retorna estatísticas dos pools de conexão (local e Senior):
+    conexões em uso, ociosas, aguardando e tempos de espera no checkout.
+    """
+    return {
+        'local': db.pool.estatisticas(),
+        'senior': senior_db.pool.estatisticas()
+    }
+
+
+@router.get("/executores")
+async def obter_metricas_executores():
+    """
+    Retorna estatísticas dos pools de execução (local, senior, sincronizacao, auth):
+    tarefas em execução, tamanho da fila, rejeições por saturação e tempos de espera.
+    """
+    return executor.estatisticas()
+
+
+@router.get("/cache")
+async def obter_metricas_cache():
+    """
+    Retorna estatísticas dos caches:
+    - consultas: dashboard/banco local (hits, misses, expirações, descartes e
+      geração atual, incrementada a cada sincronização)
+    - senior: consultas diretas ao Senior (respostas frescas, antigas e atualizações em segundo plano)
+    """
+    return {
+        'consultas': cache_consultas.estatisticas(),
+        'senior': cache_senior.estatisticas()
+    }
+
+
+@router.get("/single-flight")
+async def obter_metricas_single_flight():
+    """
+    Retorna estatísticas do agrupamento de consultas ao Senior:
+    execuções, chamadas que esperaram por uma execução já em andamento
+    e quantas estão aguardando cada consulta agora.
+    """
+    return single_flight_senior.estatisticas()
@@ -6,6 +6,7 @@ Substitui as consultas diretas ao banco Senior
 from fastapi import APIRouter, HTTPException, Query
 from typing import List, Optional
 from database import db
+from executor import executar
 
 router = APIRouter(prefix="/api/projetado", tags=["Projetado"])
 
@@ -45,7 +46,7 @@ async def obter_contas_receber(
         query += " ORDER BY VCTPRO DESC"
         query += f" OFFSET 0 ROWS FETCH NEXT {limit} ROWS ONLY"
 
-        resultados = db.execute_query(query, tuple(params) if params else None)
+        resultados = await executar('local', db.execute_query, query, tuple(params) if params else None)
 
         return {
             "success": True,
@@ -53,6 +54,8 @@ async def obter_contas_receber(
             "dados": resultados
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro ao buscar contas a receber: {str(e)}")
 
@@ -92,7 +95,7 @@ async def obter_contas_pagar(
         query += " ORDER BY VCTPRO DESC"
         query += f" OFFSET 0 ROWS FETCH NEXT {limit} ROWS ONLY"
 
-        resultados = db.execute_query(query, tuple(params) if params else None)
+        resultados = await executar('local', db.execute_query, query, tuple(params) if params else None)
 
         return {
             "success": True,
@@ -100,6 +103,8 @@ async def obter_contas_pagar(
             "dados": resultados
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro ao buscar contas a pagar: {str(e)}")
 
@@ -138,8 +143,8 @@ async def obter_resumo(
             query_pagar += " WHERE CODEMP = %s"
             params = (codemp,)
 
-        resumo_receber = db.execute_single(query_receber, params)
-        resumo_pagar = db.execute_single(query_pagar, params)
+        resumo_receber = await executar('local', db.execute_single, query_receber, params)
+        resumo_pagar = await executar('local', db.execute_single, query_pagar, params)
 
         return {
             "success": True,
@@ -148,6 +153,8 @@ async def obter_resumo(
             "saldo_projetado": (resumo_receber.get('valor_aberto', 0) or 0) - (resumo_pagar.get('valor_aberto', 0) or 0)
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro ao buscar resumo: {str(e)}")
 
@@ -178,7 +185,7 @@ async def obter_resumo_por_dia(
         filiais_list = filiais.split(',') if filiais else None
 
         # Busca dados do banco local
-        dados = ContasReceberLocalService.obter_dados_diarios(data_inicio, data_fim, filiais_list)
+        dados = await executar('local', ContasReceberLocalService.obter_dados_diarios, data_inicio, data_fim, filiais_list)
 
         # Retorna no mesmo formato que o endpoint do Senior
         resultado = []
@@ -196,5 +203,7 @@ async def obter_resumo_por_dia(
 
         return resultado
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro ao buscar resumo por dia: {str(e)}")
@@ -8,6 +8,7 @@ from typing import List, Optional
 from pydantic import BaseModel
 from services.recebiveis_cartao_service import RecebiveisCartaoService
 import logging
+from executor import executar
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/recebiveis-cartao", tags=["Recebíveis Cartão"])
@@ -71,7 +72,7 @@ async def upload_calendarios(
             images_bytes.append(content)
 
         # Processar upload
-        resultado = RecebiveisCartaoService.processar_upload(images_bytes, status=status)
+        resultado = await executar('local', RecebiveisCartaoService.processar_upload, images_bytes, status=status)
 
         if not resultado["sucesso"]:
             return JSONResponse(
@@ -123,7 +124,9 @@ async def obter_recebiveis(
         if estabelecimentos:
             lista_estabelecimentos = [e.strip() for e in estabelecimentos.split(',') if e.strip()]
 
-        recebiveis = RecebiveisCartaoService.obter_recebiveis_por_periodo(
+        recebiveis = await executar(
+            'local',
+            RecebiveisCartaoService.obter_recebiveis_por_periodo,
             data_inicio,
             data_fim,
             lista_estabelecimentos,
@@ -150,9 +153,11 @@ async def obter_recebiveis_detalhados(mes_referencia: str):
         Lista de recebíveis com todos os campos
     """
     try:
-        recebiveis = RecebiveisCartaoService.obter_recebiveis_detalhados(mes_referencia)
+        recebiveis = await executar('local', RecebiveisCartaoService.obter_recebiveis_detalhados, mes_referencia)
         return recebiveis
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Erro em obter_recebiveis_detalhados: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -170,9 +175,11 @@ async def obter_estatisticas(mes_referencia: str):
         Estatísticas do mês
     """
     try:
-        estatisticas = RecebiveisCartaoService.obter_estatisticas_mes(mes_referencia)
+        estatisticas = await executar('local', RecebiveisCartaoService.obter_estatisticas_mes, mes_referencia)
         return estatisticas
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Erro em obter_estatisticas: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -194,7 +201,7 @@ async def limpar_dados_mes(
         Confirmação da exclusão
     """
     try:
-        count = RecebiveisCartaoService.limpar_dados_mes(mes_referencia, estabelecimento)
+        count = await executar('local', RecebiveisCartaoService.limpar_dados_mes, mes_referencia, estabelecimento)
 
         if estabelecimento:
             mensagem = f"Dados do estabelecimento {estabelecimento} do mês {mes_referencia} removidos"
@@ -206,6 +213,8 @@ async def limpar_dados_mes(
             "registros_removidos": count
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Erro em limpar_dados_mes: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -223,7 +232,9 @@ async def inserir_recebido_manual(data: RecebidoManualRequest):
         Confirmação da inserção/atualização
     """
     try:
-        RecebiveisCartaoService.upsert_recebivel(
+        await executar(
+            'local',
+            RecebiveisCartaoService.upsert_recebivel,
             data_recebimento=data.data_recebimento,
             valor=data.valor,
             estabelecimento=data.estabelecimento,
@@ -242,6 +253,8 @@ async def inserir_recebido_manual(data: RecebidoManualRequest):
             }
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Erro em inserir_recebido_manual: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -3,133 +3,139 @@ Rotas para sincronização de dados
 """
 
 from fastapi import APIRouter, HTTPException, Query
-from models import SincronizacaoResponse, StatusSincronizacaoResponse
-from services.sincronizacao_service import SincronizacaoService
+from typing import Optional
+from models import JobSincronizacaoResponse, StatusSincronizacaoResponse
+from services.sincronizacao_service import SincronizacaoService, MODOS_SINCRONIZACAO
+from services.sincronizacao_jobs import jobs
 from services.centro_custo_service import CentroCustoService
+from executor import executar
+from config import settings
 
 router = APIRouter(prefix="/api/sincronizacao", tags=["Sincronização"])
 
 
-@router.post("/contas-receber", response_model=SincronizacaoResponse)
+def _sincronizar_centro_custo() -> dict:
+    """Centro de custo no formato de resposta das demais sincronizações"""
+    resultado = CentroCustoService.sincronizar_centro_custo()
+    return {
+        'success': resultado['success'],
+        'tipo': 'centro_custo',
+        'registros_inseridos': resultado.get('registros_inseridos', 0),
+        'tempo_execucao_ms': 0,  # Pode adicionar controle de tempo se necessário
+        'mensagem': resultado.get('message', 'Erro ao sincronizar'),
+        'log_id': None
+    }
+
+
+@router.post("/contas-receber", response_model=JobSincronizacaoResponse, status_code=202)
 async def sincronizar_contas_receber(
     periodo: str = Query(..., description="Período no formato YYYY-MM (ex: 2025-11)")
 ):
     """
-    Sincroniza contas a receber de um período específico do banco Senior para o banco local.
+    Agenda a sincronização de contas a receber de um período específico do banco Senior para o banco local.
     Remove registros do período e reinsere os dados atualizados.
     Usa todas as filiais: 1001, 1002, 1003, 3001, 3002, 3003
-    """
-    import traceback
-    import logging
-
-    logger = logging.getLogger(__name__)
 
+    Retorna o job imediatamente; acompanhe em GET /api/sincronizacao/status?job_id=...
+    """
     try:
-        logger.info(f"[ROTA] Iniciando sincronização para período: {periodo}")
-        resultado = SincronizacaoService.sincronizar_contas_receber_periodo(periodo)
-        logger.info(f"[ROTA] Resultado: {resultado}")
-
-        if not resultado['success']:
-            logger.error(f"[ROTA] Sincronização falhou: {resultado.get('error')}")
-            raise HTTPException(status_code=500, detail=resultado.get('error', 'Erro desconhecido'))
-
-        return SincronizacaoResponse(**resultado)
+        job = jobs.submeter('contas_receber_periodo', SincronizacaoService.sincronizar_contas_receber_periodo, periodo, periodo=periodo)
+        return JobSincronizacaoResponse(**job.progresso())
 
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"[ROTA] ERRO CRÍTICO: {str(e)}")
-        logger.error(f"[ROTA] Stack trace: {traceback.format_exc()}")
-        raise HTTPException(status_code=500, detail=f"Erro ao sincronizar contas a receber: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Erro ao agendar sincronização de contas a receber: {str(e)}")
 
 
-@router.post("/contas-pagar", response_model=SincronizacaoResponse)
+@router.post("/contas-pagar", response_model=JobSincronizacaoResponse, status_code=202)
 async def sincronizar_contas_pagar(
     periodo: str = Query(..., description="Período no formato YYYY-MM (ex: 2025-11)")
 ):
     """
-    Sincroniza contas a pagar de um período específico do banco Senior para o banco local.
+    Agenda a sincronização de contas a pagar de um período específico do banco Senior para o banco local.
     Remove registros dos últimos 4 meses e reinsere os dados atualizados com projeção.
     Usa todas as filiais: 1001, 1002, 1003, 3001, 3002, 3003
-    """
-    import traceback
-    import logging
-
-    logger = logging.getLogger(__name__)
 
+    Retorna o job imediatamente; acompanhe em GET /api/sincronizacao/status?job_id=...
+    """
     try:
-        logger.info(f"[ROTA] Iniciando sincronização contas a pagar para período: {periodo}")
-        resultado = SincronizacaoService.sincronizar_contas_pagar_periodo(periodo)
-        logger.info(f"[ROTA] Resultado: {resultado}")
-
-        if not resultado['success']:
-            logger.error(f"[ROTA] Sincronização falhou: {resultado.get('mensagem')}")
-            raise HTTPException(status_code=500, detail=resultado.get('mensagem', 'Erro desconhecido'))
-
-        return SincronizacaoResponse(**resultado)
+        job = jobs.submeter('contas_pagar_periodo', SincronizacaoService.sincronizar_contas_pagar_periodo, periodo, periodo=periodo)
+        return JobSincronizacaoResponse(**job.progresso())
 
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"[ROTA] ERRO CRÍTICO: {str(e)}")
-        logger.error(f"[ROTA] Stack trace: {traceback.format_exc()}")
-        raise HTTPException(status_code=500, detail=f"Erro ao sincronizar contas a pagar: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Erro ao agendar sincronização de contas a pagar: {str(e)}")
 
 
-@router.post("/centro-custo")
+@router.post("/centro-custo", response_model=JobSincronizacaoResponse, status_code=202)
 async def sincronizar_centro_custo():
     """
-    Sincroniza apenas a tabela de Centro de Custo do banco Senior.
+    Agenda a sincronização da tabela de Centro de Custo do banco Senior.
     Remove todos os registros existentes e reinsere os dados atualizados.
     """
     try:
-        resultado = CentroCustoService.sincronizar_centro_custo()
-
-        if not resultado['success']:
-            raise HTTPException(status_code=500, detail=resultado.get('message', 'Erro ao sincronizar'))
-
-        return {
-            'success': resultado['success'],
-            'tipo': 'centro_custo',
-            'registros_inseridos': resultado['registros_inseridos'],
-            'tempo_execucao_ms': 0,  # Pode adicionar controle de tempo se necessário
-            'mensagem': resultado['message'],
-            'log_id': None
-        }
+        job = jobs.submeter('centro_custo', _sincronizar_centro_custo)
+        return JobSincronizacaoResponse(**job.progresso())
 
+    except HTTPException:
+        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Erro ao sincronizar centro de custo: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Erro ao agendar sincronização de centro de custo: {str(e)}")
 
 
-@router.post("/tudo", response_model=SincronizacaoResponse)
-async def sincronizar_tudo():
+@router.post("/tudo", response_model=JobSincronizacaoResponse, status_code=202)
+async def sincronizar_tudo(
+    modo: Optional[str] = Query(default=None, description="incremental (só o que mudou) ou completo (reparo, regrava tudo)")
+):
     """
-    Sincroniza todas as tabelas (contas a receber, contas a pagar, plano financeiro e centro de custo).
-    Remove todos os registros existentes e reinsere os dados atualizados.
+    Agenda a sincronização de todas as tabelas (contas a receber, contas a pagar, plano financeiro e centro de custo).
+    Contas a receber/pagar: no modo incremental grava só títulos novos, alterados ou removidos;
+    no modo completo regrava a tabela inteira.
+
+    Pedidos repetidos enquanto um job igual está na fila ou rodando retornam o mesmo job.
     """
     try:
-        resultado = SincronizacaoService.sincronizar_tudo()
+        if modo and modo not in MODOS_SINCRONIZACAO:
+            raise HTTPException(status_code=400, detail=f"Modo deve ser um de {MODOS_SINCRONIZACAO}")
 
-        if not resultado['success']:
-            raise HTTPException(status_code=500, detail=resultado['mensagem'])
-
-        return SincronizacaoResponse(**resultado)
+        job = jobs.submeter('tudo', SincronizacaoService.sincronizar_tudo, modo, modo=modo or settings.SYNC_MODO_PADRAO)
+        return JobSincronizacaoResponse(**job.progresso())
 
+    except HTTPException:
+        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Erro ao sincronizar dados: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Erro ao agendar sincronização: {str(e)}")
 
 
 @router.get("/status", response_model=StatusSincronizacaoResponse)
-async def obter_status_sincronizacao(tipo: str = None):
+async def obter_status_sincronizacao(
+    tipo: str = None,
+    job_id: Optional[str] = Query(default=None, description="Id do job retornado pelo POST de sincronização")
+):
     """
-    Obtém o status da última sincronização.
+    Obtém o status da última sincronização e o progresso dos jobs em andamento.
 
     - **tipo**: Tipo de sincronização ('contas_receber', 'contas_pagar', 'ambas').
                 Se não fornecido, retorna a última sincronização de qualquer tipo.
+    - **job_id**: Se fornecido, inclui em `job` a fase, linhas processadas e ETA do job.
     """
     try:
-        status = SincronizacaoService.obter_status_ultima_sincronizacao(tipo)
-        return StatusSincronizacaoResponse(**status)
+        job = None
+        if job_id:
+            job = jobs.obter(job_id)
+            if job is None:
+                raise HTTPException(status_code=404, detail=f"Job {job_id} não encontrado")
+
+        status = await executar('local', SincronizacaoService.obter_status_ultima_sincronizacao, tipo)
+        return StatusSincronizacaoResponse(
+            **status,
+            job=job.progresso() if job else None,
+            jobs_ativos=[ativo.progresso() for ativo in jobs.ativos()]
+        )
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro ao obter status: {str(e)}")
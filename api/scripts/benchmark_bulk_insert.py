@@ -0,0 +1,96 @@
+"""
+Benchmark das estratégias de inserção em massa (utils/bulk_insert.py)
+Compara linhas/s de 'executemany' (um INSERT por linha) e 'valores'
+(INSERT multi-linha) gravando numa tabela temporária com a estrutura de
+contas_receber. Nada é gravado nas tabelas reais.
+
+Uso (a partir de api/):
+    python -m scripts.benchmark_bulk_insert --linhas 20000
+"""
+
+import argparse
+import time
+import uuid
+from datetime import date, timedelta
+
+from database import db
+from services.sincronizacao_service import COLUNAS_CONTAS_RECEBER
+from utils.bulk_insert import BulkInsertWriter
+
+
+def gerar_linhas(qtd: int) -> list:
+    """Linhas sintéticas com os tipos das colunas de contas_receber"""
+    hoje = date.today()
+    linhas = []
+    for i in range(qtd):
+        valores = {
+            'id': str(uuid.uuid4()),
+            'CODEMP': 10,
+            'CODFIL': 1001 + (i % 3),
+            'CODCLI': i % 5000,
+            'NOMCLI': f'CLIENTE {i % 5000}',
+            'NUMTIT': f'T{i:09d}',
+            'SITTIT': 'AB',
+            'CODTPT': 'DUP',
+            'VLRABE': round(100 + (i % 1000) * 1.37, 2),
+            'VLRORI': round(100 + (i % 1000) * 1.37, 2),
+            'RECDEC': 1,
+            'VCTPRO': hoje + timedelta(days=i % 90),
+            'VCTORI': hoje + timedelta(days=i % 90),
+            'DATPPT': hoje + timedelta(days=i % 90),
+            'DATEMI': hoje,
+            'CODCCU': 100,
+            'CTAFIN': 200,
+        }
+        linhas.append(tuple(valores.get(coluna, 0) for coluna in COLUNAS_CONTAS_RECEBER))
+    return linhas
+
+
+def medir(estrategia: str, linhas: list, lote: int) -> dict:
+    """Grava as linhas numa tabela temporária e mede o tempo total"""
+    with db.get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT TOP 0 * INTO #benchmark_bulk FROM contas_receber")
+        writer = BulkInsertWriter(cursor, '#benchmark_bulk', COLUNAS_CONTAS_RECEBER, estrategia=estrategia)
+
+        inicio = time.perf_counter()
+        for i in range(0, len(linhas), lote):
+            writer.escrever(linhas[i:i + lote])
+        conn.commit()
+        duracao = time.perf_counter() - inicio
+
+        cursor.execute("DROP TABLE #benchmark_bulk")
+        conn.commit()
+        cursor.close()
+
+    return {
+        'estrategia': estrategia,
+        'linhas': len(linhas),
+        'envios': writer.envios,
+        'segundos': round(duracao, 2),
+        'linhas_por_segundo': round(len(linhas) / duracao, 1) if duracao > 0 else None
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de inserção em massa")
+    parser.add_argument('--linhas', type=int, default=20000, help="Quantidade de linhas sintéticas")
+    parser.add_argument('--lote', type=int, default=5000, help="Linhas por chamada a escrever()")
+    args = parser.parse_args()
+
+    linhas = gerar_linhas(args.linhas)
+    print("=" * 60)
+    print(f"BENCHMARK DE INSERÇÃO EM MASSA ({args.linhas} linhas, colunas de contas_receber)")
+    print("=" * 60)
+
+    resultados = [medir(estrategia, linhas, args.lote) for estrategia in ('executemany', 'valores')]
+    for r in resultados:
+        print(f"{r['estrategia']:<12} {r['segundos']:>8}s  {r['linhas_por_segundo']:>10} linhas/s  ({r['envios']} envios)")
+
+    base, novo = resultados
+    if base['segundos'] and novo['segundos']:
+        print(f"\nGanho: {base['segundos'] / novo['segundos']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Benchmark de reaproveitamento de plano nas consultas ao Senior
+Executa a contagem dos títulos a receber (mesmo FROM/WHERE de
+obter_contas_receber_do_senior) para vários períodos e combinações de filiais,
+de duas formas:
+- literal: datas e filiais no texto (como antes), um texto por combinação
+- parametrizada: texto constante via sp_executesql (utils/sql_parametrizado.py)
+
+Cada combinação roda --repeticoes vezes; a primeira chamada de um texto novo
+paga a compilação. Ao final, lê do plan cache (sys.dm_exec_cached_plans) a
+quantidade de planos, os usos e o tempo de compilação de cada forma - requer
+VIEW SERVER STATE; sem a permissão, mostra apenas os tempos. Apenas leitura.
+
+Uso (a partir de api/):
+    python -m scripts.benchmark_plano_senior --meses 6 --repeticoes 3
+"""
+
+import argparse
+import statistics
+import time
+import uuid
+from datetime import date
+
+from database import senior_db
+from services.contas_receber_senior_service import FILIAIS_PADRAO, FROM_WHERE_TITULOS, PARAMETROS_PERIODO
+from utils.periodos import fim_mes, meses_anteriores
+from utils.sql_parametrizado import ConsultaParametrizada, lista_sql, sql_lista
+
+# Combinações de filiais testadas em cada período
+COMBINACOES_FILIAIS = [FILIAIS_PADRAO, ['1001'], ['1001', '1002'], ['3001', '3002', '3003']]
+
+# Planos do benchmark no cache, por forma (o marcador identifica a execução)
+QUERY_PLANOS = """
+    WITH XMLNAMESPACES (DEFAULT 'http://schemas.microsoft.com/sqlserver/2004/07/showplan')
+    SELECT
+        cp.objtype,
+        COUNT(*) AS planos,
+        SUM(cp.usecounts) AS usos,
+        SUM(qp.query_plan.value('(//QueryPlan/@CompileTime)[1]', 'INT')) AS compilacao_ms
+    FROM sys.dm_exec_cached_plans cp
+    CROSS APPLY sys.dm_exec_sql_text(cp.plan_handle) st
+    CROSS APPLY sys.dm_exec_query_plan(cp.plan_handle) qp
+    WHERE st.text LIKE %s
+        AND st.text NOT LIKE '%%dm_exec_cached_plans%%'
+    GROUP BY cp.objtype
+"""
+
+
+def montar_sql(marcador: str) -> str:
+    return f"/* {marcador} */ SELECT COUNT(*) AS quantidade {FROM_WHERE_TITULOS}"
+
+
+def sql_literal(marcador: str, data_inicio: date, data_fim: date, filiais: list) -> str:
+    """Mesma consulta com os valores no texto, como as consultas montavam antes"""
+    filiais_str = ','.join(f"'{f}'" for f in filiais)
+    return (
+        montar_sql(marcador)
+        .replace(sql_lista('@filiais'), filiais_str)
+        .replace('@data_inicio', f"'{data_inicio.strftime('%Y%m%d')}'")
+        .replace('@data_fim', f"'{data_fim.strftime('%Y%m%d')}'")
+    )
+
+
+def medir(nome: str, combinacoes: list, executar, repeticoes: int) -> dict:
+    primeiras, demais = [], []
+    inicio_total = time.perf_counter()
+    for combinacao in combinacoes:
+        for i in range(repeticoes):
+            inicio = time.perf_counter()
+            executar(*combinacao)
+            (primeiras if i == 0 else demais).append((time.perf_counter() - inicio) * 1000)
+    return {
+        'nome': nome,
+        'primeira_ms': round(statistics.median(primeiras), 2),
+        'demais_ms': round(statistics.median(demais), 2) if demais else None,
+        'total_ms': round((time.perf_counter() - inicio_total) * 1000, 2)
+    }
+
+
+def planos_em_cache(marcador: str) -> list:
+    """Planos no cache com o marcador; None sem VIEW SERVER STATE"""
+    try:
+        return senior_db.execute_query(QUERY_PLANOS, (f"%{marcador}%",))
+    except Exception as e:
+        print(f"Plan cache indisponível ({str(e)})")
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de reaproveitamento de plano no Senior")
+    parser.add_argument('--periodo', default=date.today().strftime('%Y-%m'), help="Mês mais recente (YYYY-MM)")
+    parser.add_argument('--meses', type=int, default=6, help="Quantidade de meses (períodos distintos)")
+    parser.add_argument('--repeticoes', type=int, default=3, help="Execuções de cada combinação")
+    args = parser.parse_args()
+
+    ano, mes = map(int, args.periodo.split('-'))
+    atual = date(ano, mes, 1)
+    periodos = meses_anteriores(atual, args.meses - 1) + [(atual, fim_mes(atual))]
+    combinacoes = [(inicio, fim, filiais) for inicio, fim in periodos for filiais in COMBINACOES_FILIAIS]
+
+    # Marcadores novos a cada execução: nenhum plano de rodadas anteriores é reaproveitado
+    execucao = uuid.uuid4().hex[:8]
+    marcador_literal = f"benchmark_plano_senior {execucao} literal"
+    marcador_param = f"benchmark_plano_senior {execucao} parametrizada"
+    consulta = ConsultaParametrizada(montar_sql(marcador_param), PARAMETROS_PERIODO)
+
+    print("=" * 60)
+    print(f"BENCHMARK DE PLANOS NO SENIOR ({len(combinacoes)} combinações, {args.repeticoes} repetições)")
+    print("=" * 60)
+
+    resultados = [
+        medir(
+            'literal',
+            combinacoes,
+            lambda di, df, filiais: senior_db.execute_query(sql_literal(marcador_literal, di, df, filiais)),
+            args.repeticoes
+        ),
+        medir(
+            'parametrizada',
+            combinacoes,
+            lambda di, df, filiais: consulta.executar(
+                senior_db,
+                data_inicio=di.strftime('%Y%m%d'),
+                data_fim=df.strftime('%Y%m%d'),
+                filiais=lista_sql(filiais)
+            ),
+            args.repeticoes
+        )
+    ]
+
+    for r in resultados:
+        print(
+            f"{r['nome']:<14} 1ª chamada {r['primeira_ms']:>9}ms  demais {r['demais_ms']}ms  total {r['total_ms']:>10}ms"
+        )
+
+    print("\nPlan cache:")
+    for nome, marcador in (('literal', marcador_literal), ('parametrizada', marcador_param)):
+        planos = planos_em_cache(marcador)
+        if planos is None:
+            break
+        for p in planos:
+            print(
+                f"{nome:<14} {p['objtype']:<10} planos {p['planos']:>4}  usos {p['usos']:>5}  "
+                f"compilação {p['compilacao_ms'] or 0}ms"
+            )
+
+    literal, parametrizada = resultados
+    economia = literal['total_ms'] - parametrizada['total_ms']
+    print(f"\nparametrizada: {economia:.0f}ms a menos no total ({len(combinacoes)} textos literais x 1 plano)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Benchmark do motor de projeção (services/projecao_service.py)
+Compara o total projetado do mês calculado pela consulta SQL anterior (sete
+CTEs com FULL OUTER JOIN sobre fato_diario_pagar) com o motor vetorizado,
+alimentado pela consulta agrupada única ou pelo snapshot em memória, e
+confere se os totais batem. Apenas leitura.
+
+Uso (a partir de api/):
+    python -m scripts.benchmark_projecao --periodo 2026-10 --repeticoes 20
+"""
+
+import argparse
+import statistics
+import time
+from datetime import date
+
+from database import db
+from services.projecao_service import ProjecaoService
+from services.snapshot_analitico import snapshot_analitico
+from utils.periodos import fim_mes, meses_anteriores
+
+# Consulta usada antes do motor de projeção (calcular_total_despesas_projetado)
+QUERY_SQL_ANTERIOR = """
+    WITH contas_ajustadas AS (
+        -- Agregado diário (fato_diario_pagar), já com os filtros do BI
+        SELECT
+            data_ajustada AS DATA_AJUSTADA,
+            codfil AS CODFIL,
+            ctafin AS CTAFIN,
+            codccu AS CODCCU,
+            valor_calculado AS VALOR_CALCULADO
+        FROM fato_diario_pagar
+        WHERE 1=1{filtro_filiais}
+    ),
+    -- Dados dos 3 meses anteriores
+    mes_ant_1 AS (
+        SELECT CTAFIN, SUM(VALOR_CALCULADO) as total_mes
+        FROM contas_ajustadas
+        WHERE DATA_AJUSTADA BETWEEN %s AND %s
+        GROUP BY CTAFIN
+    ),
+    mes_ant_2 AS (
+        SELECT CTAFIN, SUM(VALOR_CALCULADO) as total_mes
+        FROM contas_ajustadas
+        WHERE DATA_AJUSTADA BETWEEN %s AND %s
+        GROUP BY CTAFIN
+    ),
+    mes_ant_3 AS (
+        SELECT CTAFIN, SUM(VALOR_CALCULADO) as total_mes
+        FROM contas_ajustadas
+        WHERE DATA_AJUSTADA BETWEEN %s AND %s
+        GROUP BY CTAFIN
+    ),
+    -- Calcula média dos 3 meses por CTAFIN
+    medias AS (
+        SELECT
+            COALESCE(m1.CTAFIN, m2.CTAFIN, m3.CTAFIN) as CTAFIN,
+            (COALESCE(m1.total_mes, 0) + COALESCE(m2.total_mes, 0) + COALESCE(m3.total_mes, 0)) / 3.0 as media
+        FROM mes_ant_1 m1
+        FULL OUTER JOIN mes_ant_2 m2 ON m1.CTAFIN = m2.CTAFIN
+        FULL OUTER JOIN mes_ant_3 m3 ON COALESCE(m1.CTAFIN, m2.CTAFIN) = m3.CTAFIN
+    ),
+    -- Total do mês vigente por CTAFIN
+    mes_vigente AS (
+        SELECT
+            CTAFIN,
+            SUM(VALOR_CALCULADO) as total_mes
+        FROM contas_ajustadas
+        WHERE DATA_AJUSTADA BETWEEN %s AND %s
+        GROUP BY CTAFIN
+    ),
+    -- Aplica regra: se valor lançado > média usa lançado, senão usa média
+    projecao AS (
+        SELECT
+            COALESCE(mv.CTAFIN, m.CTAFIN) as CTAFIN,
+            CASE
+                WHEN COALESCE(mv.total_mes, 0) > COALESCE(m.media, 0) THEN COALESCE(mv.total_mes, 0)
+                ELSE COALESCE(m.media, 0)
+            END as valor_final
+        FROM mes_vigente mv
+        FULL OUTER JOIN medias m ON mv.CTAFIN = m.CTAFIN
+        WHERE COALESCE(mv.total_mes, 0) > 0 OR COALESCE(m.media, 0) > 0
+    )
+    SELECT CAST(SUM(valor_final) AS DECIMAL(18,2)) as total_projetado
+    FROM projecao
+"""
+
+
+def total_sql_anterior(data_inicio: str, data_fim: str) -> float:
+    params = []
+    for inicio, fim in reversed(meses_anteriores(date.fromisoformat(data_inicio), 3)):  # mês anterior 1, 2 e 3
+        params.extend([inicio.strftime('%Y-%m-%d'), fim.strftime('%Y-%m-%d')])
+    params.extend([data_inicio, data_fim])
+
+    resultado = db.execute_query(QUERY_SQL_ANTERIOR.format(filtro_filiais=''), tuple(params))
+    total = resultado[0]['total_projetado'] if resultado and resultado[0]['total_projetado'] else 0
+    return max(float(total), 0)
+
+
+def medir(nome: str, func, repeticoes: int) -> dict:
+    tempos = []
+    total = None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        total = func()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return {
+        'nome': nome,
+        'total': round(total, 2),
+        'mediana_ms': round(statistics.median(tempos), 2),
+        'max_ms': round(max(tempos), 2)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da projeção de despesas")
+    parser.add_argument('--periodo', default=date.today().strftime('%Y-%m'), help="Mês vigente (YYYY-MM)")
+    parser.add_argument('--repeticoes', type=int, default=20, help="Execuções de cada variante")
+    args = parser.parse_args()
+
+    ano, mes = map(int, args.periodo.split('-'))
+    data_inicio = date(ano, mes, 1)
+    data_inicio, data_fim = data_inicio.strftime('%Y-%m-%d'), fim_mes(data_inicio).strftime('%Y-%m-%d')
+
+    print("=" * 60)
+    print(f"BENCHMARK DA PROJEÇÃO DE DESPESAS ({data_inicio} a {data_fim}, {args.repeticoes} repetições)")
+    print("=" * 60)
+
+    resultados = [medir('sql_anterior', lambda: total_sql_anterior(data_inicio, data_fim), args.repeticoes)]
+
+    # Motor alimentado pela consulta agrupada única
+    resultados.append(medir(
+        'motor_sql', lambda: ProjecaoService.projetar_local(data_inicio, data_fim, usar_snapshot=False)['total'], args.repeticoes
+    ))
+
+    # Motor alimentado pelo snapshot em memória (carregado antes da medição)
+    if snapshot_analitico.carregar():
+        resultados.append(medir(
+            'motor_snapshot', lambda: ProjecaoService.projetar_local(data_inicio, data_fim)['total'], args.repeticoes
+        ))
+
+    for r in resultados:
+        print(f"{r['nome']:<16} mediana {r['mediana_ms']:>9}ms  máx {r['max_ms']:>9}ms  total {r['total']}")
+
+    base = resultados[0]
+    for r in resultados[1:]:
+        diferenca = abs(r['total'] - base['total'])
+        ganho = base['mediana_ms'] / r['mediana_ms'] if r['mediana_ms'] else float('inf')
+        print(f"\n{r['nome']}: {ganho:.1f}x mais rápido; diferença no total: {diferenca:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark do rateio (E301RAT) nas consultas de contas a receber do Senior
+Executa a consulta detalhada dos títulos do período (a mesma de
+obter_contas_receber_do_senior, sem o cache) em cada modo de
+services/rateio_senior.py - subconsulta (forma anterior), outer_apply e
+hash_join - e confere se CODCCU/CTAFIN batem com as subconsultas. Apenas leitura.
+
+Uso (a partir de api/):
+    python -m scripts.benchmark_rateio_senior --periodo 2026-10 --repeticoes 5
+"""
+
+import argparse
+import statistics
+import time
+from datetime import date
+
+from database import senior_db
+from services.contas_receber_senior_service import (
+    COLUNAS_TITULOS, PARAMETROS_PERIODO, ContasReceberSeniorService, from_where_titulos
+)
+from services.rateio_senior import CHAVE_RATEIO, MODOS_RATEIO, consultar_titulos
+
+
+def medir(modo: str, parametros: dict, repeticoes: int) -> dict:
+    tempos = []
+    linhas = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        linhas = consultar_titulos(senior_db, COLUNAS_TITULOS, from_where_titulos, PARAMETROS_PERIODO, parametros, modo)
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return {
+        'nome': modo,
+        'linhas': linhas,
+        'mediana_ms': round(statistics.median(tempos), 2),
+        'max_ms': round(max(tempos), 2)
+    }
+
+
+def rateio_por_titulo(linhas: list) -> dict:
+    return {tuple(l.get(c) for c in CHAVE_RATEIO): (l.get('CODCCU'), l.get('CTAFIN')) for l in linhas}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do rateio E301RAT no Senior")
+    parser.add_argument('--periodo', default=date.today().strftime('%Y-%m'), help="Período (YYYY-MM)")
+    parser.add_argument('--repeticoes', type=int, default=5, help="Execuções de cada modo")
+    args = parser.parse_args()
+
+    parametros = ContasReceberSeniorService._parametros_titulos(args.periodo)
+
+    print("=" * 60)
+    print(f"BENCHMARK DO RATEIO E301RAT ({args.periodo}, {args.repeticoes} repetições)")
+    print("=" * 60)
+
+    resultados = [medir(modo, parametros, args.repeticoes) for modo in MODOS_RATEIO]
+
+    for r in resultados:
+        print(f"{r['nome']:<12} mediana {r['mediana_ms']:>9}ms  máx {r['max_ms']:>9}ms  linhas {len(r['linhas'])}")
+
+    base = resultados[0]
+    rateio_base = rateio_por_titulo(base['linhas'])
+    for r in resultados[1:]:
+        rateio = rateio_por_titulo(r['linhas'])
+        # Os três modos usam a mesma ORDEM_RATEIO: qualquer divergência é um erro
+        divergentes = sum(1 for chave, valor in rateio.items() if rateio_base.get(chave) != valor)
+        ganho = base['mediana_ms'] / r['mediana_ms'] if r['mediana_ms'] else float('inf')
+        print(f"\n{r['nome']}: {ganho:.1f}x mais rápido; títulos com rateio diferente: {divergentes}")
+
+
+if __name__ == "__main__":
+    main()
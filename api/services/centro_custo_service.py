@@ -1,5 +1,6 @@
 from typing import List, Dict
 from database import db, senior_db
+from utils.bulk_insert import BulkInsertWriter
 
 
 class CentroCustoService:
@@ -53,14 +54,10 @@ class CentroCustoService:
                 conn.commit()
                 cursor.close()
 
-            # Prepara query de inserção em lote
-            insert_query = """
-                INSERT INTO centro_custo (
-                    CODMPC, CTARED, CLACTA, DESCTA, ANASIN, NATCTA,
-                    NIVCTA, CODCCU, TIPCCU
-                )
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """
+            colunas = [
+                'CODMPC', 'CTARED', 'CLACTA', 'DESCTA', 'ANASIN', 'NATCTA',
+                'NIVCTA', 'CODCCU', 'TIPCCU'
+            ]
 
             # Prepara dados para inserção
             dados_para_inserir = []
@@ -81,7 +78,7 @@ class CentroCustoService:
             print(f"Inserindo {len(dados_para_inserir)} centros de custo...")
             with db.get_connection() as conn:
                 cursor = conn.cursor()
-                cursor.executemany(insert_query, dados_para_inserir)
+                BulkInsertWriter(cursor, 'centro_custo', colunas).escrever(dados_para_inserir)
                 conn.commit()
                 cursor.close()
 
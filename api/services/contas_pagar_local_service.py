@@ -1,11 +1,16 @@
 """
 Service para consultas de Contas a Pagar usando o banco LOCAL (sincronizado)
 Substitui as consultas complexas ao banco Senior por consultas simples ao banco local
+Totais e séries por dia, conta financeira e centro de custo leem o agregado
+fato_diario_pagar (reconstruído a cada sincronização, ver services/fato_diario_service.py)
+A projeção pela média dos meses anteriores fica em services/projecao_service.py
 """
 
-from datetime import date, datetime, timedelta
 from typing import Optional, List
 from database import db
+from services.projecao_service import ProjecaoService, MESES_PADRAO, PONDERACAO_PADRAO, FATOR_EXPONENCIAL_PADRAO
+from utils.cache import cache_consultas
+from utils.periodos import periodo_anterior
 
 
 class ContasPagarLocalService:
@@ -25,18 +30,8 @@ class ContasPagarLocalService:
                 CODTNS, DATMOV, CODFPG, CODTPT, SITTIT, OBSTCP,
                 VLRORI, DATEMI, ULTPGT, VCTPRO, VLRRAT, CTAFIN,
                 CODCCU, CTARED, VLRABE,
-                -- Calcula a data ajustada (move finais de semana para segunda-feira)
-                CASE
-                    WHEN DATEPART(WEEKDAY, VCTPRO) = 7 THEN DATEADD(DAY, 2, VCTPRO)  -- Sábado → +2 = Segunda
-                    WHEN DATEPART(WEEKDAY, VCTPRO) = 1 THEN DATEADD(DAY, 1, VCTPRO)  -- Domingo → +1 = Segunda
-                    ELSE VCTPRO
-                END as DATA_AJUSTADA,
-                -- Calcula o valor conforme regra do BI
-                CASE
-                    WHEN VLRABE > VLRRAT THEN VLRRAT
-                    WHEN VLRABE = 0 THEN VLRRAT
-                    ELSE VLRABE
-                END as VALOR_CALCULADO
+                DATA_AJUSTADA,  -- Coluna calculada persistida (dias úteis)
+                VALOR_CALCULADO  -- Coluna calculada persistida (regra do BI)
             FROM contas_pagar
             WHERE SITTIT <> 'CA'  -- Exclui cancelados
             AND SEQMOV = 1  -- Apenas sequência 1
@@ -92,6 +87,7 @@ class ContasPagarLocalService:
         return contas_processadas
 
     @staticmethod
+    @cache_consultas.memoizar
     def calcular_total_despesas(data_inicio: Optional[str] = None, data_fim: Optional[str] = None, filiais: Optional[List[str]] = None) -> float:
         """
         Calcula o total de despesas no período usando a tabela local
@@ -99,27 +95,14 @@ class ContasPagarLocalService:
         """
         query = """
         WITH contas_ajustadas AS (
+            -- Agregado diário (fato_diario_pagar), já com os filtros do BI
             SELECT
-                VLRABE,
-                VLRRAT,
-                CODFIL,
-                -- Calcula a data ajustada (move finais de semana para segunda-feira)
-                CASE
-                    WHEN DATEPART(WEEKDAY, VCTPRO) = 7 THEN DATEADD(DAY, 2, VCTPRO)  -- Sábado → +2 = Segunda
-                    WHEN DATEPART(WEEKDAY, VCTPRO) = 1 THEN DATEADD(DAY, 1, VCTPRO)  -- Domingo → +1 = Segunda
-                    ELSE VCTPRO
-                END as DATA_AJUSTADA,
-                -- Calcula o valor conforme regra do BI
-                CASE
-                    WHEN VLRABE > VLRRAT THEN VLRRAT
-                    WHEN VLRABE = 0 THEN VLRRAT
-                    ELSE VLRABE
-                END as VALOR_CALCULADO
-            FROM contas_pagar
-            WHERE SITTIT <> 'CA'  -- Exclui cancelados
-            AND SEQMOV = 1  -- Apenas sequência 1
-            AND VLRABE >= 0  -- Valor em aberto >= 0
-            AND CTAFIN NOT IN (407,408,409,410,411,412,501)  -- Exclui contas específicas
+                data_ajustada AS DATA_AJUSTADA,
+                codfil AS CODFIL,
+                ctafin AS CTAFIN,
+                codccu AS CODCCU,
+                valor_calculado AS VALOR_CALCULADO
+            FROM fato_diario_pagar
         )
         SELECT
             CAST(SUM(VALOR_CALCULADO) AS DECIMAL(18,2)) AS total_despesas
@@ -148,25 +131,12 @@ class ContasPagarLocalService:
 
     @staticmethod
     def calcular_total_periodo_anterior(data_inicio: str, data_fim: str, filiais: Optional[List[str]] = None) -> float:
-        """Calcula total do período anterior para comparação"""
-        # Converte strings para datas
-        inicio = datetime.strptime(data_inicio, '%Y-%m-%d')
-        fim = datetime.strptime(data_fim, '%Y-%m-%d')
-
-        # Calcula duração do período
-        duracao = (fim - inicio).days
-
-        # Calcula período anterior
-        inicio_anterior = inicio - timedelta(days=duracao + 1)
-        fim_anterior = inicio - timedelta(days=1)
-
-        return ContasPagarLocalService.calcular_total_despesas(
-            inicio_anterior.strftime('%Y-%m-%d'),
-            fim_anterior.strftime('%Y-%m-%d'),
-            filiais
-        )
+        """Calcula total do período anterior (mesma duração, imediatamente antes) para comparação"""
+        inicio_anterior, fim_anterior = periodo_anterior(data_inicio, data_fim)
+        return ContasPagarLocalService.calcular_total_despesas(inicio_anterior, fim_anterior, filiais)
 
     @staticmethod
+    @cache_consultas.memoizar
     def obter_dados_mensais(data_inicio: str, data_fim: str) -> List[dict]:
         """
         Obtém dados agrupados por mês para gráficos
@@ -174,26 +144,14 @@ class ContasPagarLocalService:
         """
         query = """
         WITH contas_ajustadas AS (
+            -- Agregado diário (fato_diario_pagar), já com os filtros do BI
             SELECT
-                VLRABE,
-                VLRRAT,
-                -- Calcula a data ajustada (move finais de semana para segunda-feira)
-                CASE
-                    WHEN DATEPART(WEEKDAY, VCTPRO) = 7 THEN DATEADD(DAY, 2, VCTPRO)  -- Sábado → +2 = Segunda
-                    WHEN DATEPART(WEEKDAY, VCTPRO) = 1 THEN DATEADD(DAY, 1, VCTPRO)  -- Domingo → +1 = Segunda
-                    ELSE VCTPRO
-                END as DATA_AJUSTADA,
-                -- Calcula o valor conforme regra do BI
-                CASE
-                    WHEN VLRABE > VLRRAT THEN VLRRAT
-                    WHEN VLRABE = 0 THEN VLRRAT
-                    ELSE VLRABE
-                END as VALOR_CALCULADO
-            FROM contas_pagar
-            WHERE SITTIT <> 'CA'  -- Exclui cancelados
-            AND SEQMOV = 1  -- Apenas sequência 1
-            AND VLRABE >= 0  -- Valor em aberto >= 0
-            AND CTAFIN NOT IN (407,408,409,410,411,412,501)  -- Exclui contas específicas
+                data_ajustada AS DATA_AJUSTADA,
+                codfil AS CODFIL,
+                ctafin AS CTAFIN,
+                codccu AS CODCCU,
+                valor_calculado AS VALOR_CALCULADO
+            FROM fato_diario_pagar
         )
         SELECT
             FORMAT(DATA_AJUSTADA, 'MMM', 'pt-BR') as mes,
@@ -209,6 +167,7 @@ class ContasPagarLocalService:
         return results if results else []
 
     @staticmethod
+    @cache_consultas.memoizar
     def obter_dados_diarios(data_inicio: str, data_fim: str, filiais: Optional[List[str]] = None) -> List[dict]:
         """
         Obtém dados agrupados por dia para gráficos
@@ -217,28 +176,14 @@ class ContasPagarLocalService:
         """
         query = """
         WITH contas_ajustadas AS (
+            -- Agregado diário (fato_diario_pagar), já com os filtros do BI
             SELECT
-                VCTPRO,
-                VLRABE,
-                VLRRAT,
-                CODFIL,
-                -- Calcula a data ajustada (move finais de semana para segunda-feira)
-                CASE
-                    WHEN DATEPART(WEEKDAY, VCTPRO) = 7 THEN DATEADD(DAY, 2, VCTPRO)  -- Sábado → +2 = Segunda
-                    WHEN DATEPART(WEEKDAY, VCTPRO) = 1 THEN DATEADD(DAY, 1, VCTPRO)  -- Domingo → +1 = Segunda
-                    ELSE VCTPRO
-                END as DATA_AJUSTADA,
-                -- Calcula o valor conforme regra do BI
-                CASE
-                    WHEN VLRABE > VLRRAT THEN VLRRAT
-                    WHEN VLRABE = 0 THEN VLRRAT
-                    ELSE VLRABE
-                END as VALOR_CALCULADO
-            FROM contas_pagar
-            WHERE SITTIT <> 'CA'  -- Exclui cancelados
-            AND SEQMOV = 1  -- Apenas sequência 1
-            AND VLRABE >= 0  -- Valor em aberto >= 0
-            AND CTAFIN NOT IN (407,408,409,410,411,412,501)  -- Exclui contas específicas
+                data_ajustada AS DATA_AJUSTADA,
+                codfil AS CODFIL,
+                ctafin AS CTAFIN,
+                codccu AS CODCCU,
+                valor_calculado AS VALOR_CALCULADO
+            FROM fato_diario_pagar
         )
         SELECT
             CONVERT(VARCHAR(10), DATA_AJUSTADA, 23) as data,
@@ -263,332 +208,42 @@ class ContasPagarLocalService:
         return results if results else []
 
     @staticmethod
-    def obter_dados_diarios_projetados(data_inicio: str, data_fim: str, filiais: Optional[List[str]] = None) -> List[dict]:
+    def obter_dados_diarios_projetados(
+        data_inicio: str,
+        data_fim: str,
+        filiais: Optional[List[str]] = None,
+        meses: int = MESES_PADRAO,
+        ponderacao: str = PONDERACAO_PADRAO,
+        fator: float = FATOR_EXPONENCIAL_PADRAO
+    ) -> List[dict]:
         """
-        Obtém dados agrupados por dia com projeção baseada em média dos últimos 3 meses
-        Lógica:
-        - Para cada CTAFIN, calcula média dos últimos 3 meses
+        Obtém dados agrupados por dia com projeção baseada em média dos meses anteriores
+        (padrão: média simples dos últimos 3 meses)
+        Lógica (ver services/projecao_service.py):
+        - Para cada CTAFIN, calcula média dos meses anteriores
         - Se valor do mês vigente > média: usa valor lançado
         - Se valor do mês vigente <= média OU = 0: usa média
-        - Quando usa média sem data, replica a data do último lançamento do mês anterior
-        """
-        from datetime import datetime, timedelta, date
-
-        # Converte strings para objetos date
-        inicio = datetime.strptime(data_inicio, '%Y-%m-%d').date()
-        fim = datetime.strptime(data_fim, '%Y-%m-%d').date()
-
-        # Calcula os 3 meses anteriores usando apenas datetime/timedelta
-        # Mês anterior 1
-        if inicio.month == 1:
-            mes_anterior_1_inicio = date(inicio.year - 1, 12, 1)
-            mes_anterior_1_fim = date(inicio.year - 1, 12, 31)
-        else:
-            mes_anterior_1_inicio = date(inicio.year, inicio.month - 1, 1)
-            mes_anterior_1_fim = inicio - timedelta(days=1)
-
-        # Mês anterior 2
-        if mes_anterior_1_inicio.month == 1:
-            mes_anterior_2_inicio = date(mes_anterior_1_inicio.year - 1, 12, 1)
-            mes_anterior_2_fim = date(mes_anterior_1_inicio.year - 1, 12, 31)
-        else:
-            mes_anterior_2_inicio = date(mes_anterior_1_inicio.year, mes_anterior_1_inicio.month - 1, 1)
-            mes_anterior_2_fim = mes_anterior_1_inicio - timedelta(days=1)
-
-        # Mês anterior 3
-        if mes_anterior_2_inicio.month == 1:
-            mes_anterior_3_inicio = date(mes_anterior_2_inicio.year - 1, 12, 1)
-            mes_anterior_3_fim = date(mes_anterior_2_inicio.year - 1, 12, 31)
-        else:
-            mes_anterior_3_inicio = date(mes_anterior_2_inicio.year, mes_anterior_2_inicio.month - 1, 1)
-            mes_anterior_3_fim = mes_anterior_2_inicio - timedelta(days=1)
-
-        # Prepara filtro de filiais se fornecido
-        filtro_filiais = ""
-        if filiais:
-            placeholders = ','.join(['%s'] * len(filiais))
-            filtro_filiais = f" AND CODFIL IN ({placeholders})"
-
-        # Query para buscar dados dos últimos 3 meses + mês vigente, agrupados por CTAFIN
-        query = f"""
-        WITH contas_ajustadas AS (
-            SELECT
-                CTAFIN,
-                VLRABE,
-                VLRRAT,
-                VCTPRO,
-                CODFIL,
-                CASE
-                    WHEN DATEPART(WEEKDAY, VCTPRO) = 7 THEN DATEADD(DAY, 2, VCTPRO)
-                    WHEN DATEPART(WEEKDAY, VCTPRO) = 1 THEN DATEADD(DAY, 1, VCTPRO)
-                    ELSE VCTPRO
-                END as DATA_AJUSTADA,
-                CASE
-                    WHEN VLRABE > VLRRAT THEN VLRRAT
-                    WHEN VLRABE = 0 THEN VLRRAT
-                    ELSE VLRABE
-                END as VALOR_CALCULADO
-            FROM contas_pagar
-            WHERE SITTIT <> 'CA'
-            AND SEQMOV = 1
-            AND VLRABE >= 0
-            AND CTAFIN NOT IN (407,408,409,410,411,412,501)
-            {filtro_filiais}
-        ),
-        -- Dados do mês anterior 1
-        mes_ant_1 AS (
-            SELECT
-                CTAFIN,
-                SUM(VALOR_CALCULADO) as total_mes,
-                MAX(DATA_AJUSTADA) as ultima_data
-            FROM contas_ajustadas
-            WHERE DATA_AJUSTADA BETWEEN %s AND %s
-            GROUP BY CTAFIN
-        ),
-        -- Dados do mês anterior 2
-        mes_ant_2 AS (
-            SELECT
-                CTAFIN,
-                SUM(VALOR_CALCULADO) as total_mes
-            FROM contas_ajustadas
-            WHERE DATA_AJUSTADA BETWEEN %s AND %s
-            GROUP BY CTAFIN
-        ),
-        -- Dados do mês anterior 3
-        mes_ant_3 AS (
-            SELECT
-                CTAFIN,
-                SUM(VALOR_CALCULADO) as total_mes
-            FROM contas_ajustadas
-            WHERE DATA_AJUSTADA BETWEEN %s AND %s
-            GROUP BY CTAFIN
-        ),
-        -- Calcula média dos 3 meses
-        medias AS (
-            SELECT
-                COALESCE(m1.CTAFIN, m2.CTAFIN, m3.CTAFIN) as CTAFIN,
-                (COALESCE(m1.total_mes, 0) + COALESCE(m2.total_mes, 0) + COALESCE(m3.total_mes, 0)) / 3.0 as media,
-                m1.ultima_data
-            FROM mes_ant_1 m1
-            FULL OUTER JOIN mes_ant_2 m2 ON m1.CTAFIN = m2.CTAFIN
-            FULL OUTER JOIN mes_ant_3 m3 ON COALESCE(m1.CTAFIN, m2.CTAFIN) = m3.CTAFIN
-        ),
-        -- Dados do mês vigente
-        mes_vigente AS (
-            SELECT
-                CTAFIN,
-                DATA_AJUSTADA,
-                SUM(VALOR_CALCULADO) as total_dia
-            FROM contas_ajustadas
-            WHERE DATA_AJUSTADA BETWEEN %s AND %s
-            GROUP BY CTAFIN, DATA_AJUSTADA
-        ),
-        -- Aplica regra de projeção
-        projecao AS (
-            SELECT
-                mv.CTAFIN,
-                mv.DATA_AJUSTADA,
-                mv.total_dia,
-                m.media,
-                m.ultima_data,
-                CASE
-                    -- Se valor lançado > média, usa valor lançado
-                    WHEN mv.total_dia > m.media THEN mv.DATA_AJUSTADA
-                    -- Se não, usa a data do último lançamento do mês anterior
-                    ELSE m.ultima_data
-                END as data_final,
-                CASE
-                    -- Se valor lançado > média, usa valor lançado
-                    WHEN mv.total_dia > m.media THEN mv.total_dia
-                    -- Se não, usa a média
-                    ELSE m.media
-                END as valor_final
-            FROM mes_vigente mv
-            LEFT JOIN medias m ON mv.CTAFIN = m.CTAFIN
-
-            UNION ALL
-
-            -- Adiciona CTAFINs que não têm lançamento no mês vigente (valor = 0)
-            -- mas têm média dos meses anteriores
-            SELECT
-                m.CTAFIN,
-                NULL as DATA_AJUSTADA,
-                0 as total_dia,
-                m.media,
-                m.ultima_data,
-                m.ultima_data as data_final,
-                m.media as valor_final
-            FROM medias m
-            WHERE m.CTAFIN NOT IN (SELECT CTAFIN FROM mes_vigente)
-            AND m.media > 0
-        )
-        SELECT
-            CONVERT(VARCHAR(10), data_final, 23) as data,
-            CAST(SUM(valor_final) AS DECIMAL(18,2)) AS total
-        FROM projecao
-        WHERE data_final IS NOT NULL
-        AND data_final BETWEEN %s AND %s
-        GROUP BY CONVERT(VARCHAR(10), data_final, 23)
-        ORDER BY CONVERT(VARCHAR(10), data_final, 23)
+        - Quando usa média, replica o dia do último lançamento dos meses anteriores
         """
-
-        # Monta os parâmetros na ordem correta
-        # Primeiro, se houver filiais (usadas na CTE contas_ajustadas)
-        params = []
-        if filiais:
-            params.extend(filiais)
-
-        # Depois os parâmetros de data na ordem que aparecem na query
-        params.extend([
-            mes_anterior_1_inicio.strftime('%Y-%m-%d'), mes_anterior_1_fim.strftime('%Y-%m-%d'),
-            mes_anterior_2_inicio.strftime('%Y-%m-%d'), mes_anterior_2_fim.strftime('%Y-%m-%d'),
-            mes_anterior_3_inicio.strftime('%Y-%m-%d'), mes_anterior_3_fim.strftime('%Y-%m-%d'),
-            data_inicio, data_fim,
-            data_inicio, data_fim
-        ])
-
-        results = db.execute_query(query, tuple(params))
-        return results if results else []
+        return ProjecaoService.projetar_local(data_inicio, data_fim, filiais, meses, ponderacao, fator)['diario']
 
     @staticmethod
-    def calcular_total_despesas_projetado(data_inicio: str, data_fim: str, filiais: Optional[List[str]] = None) -> float:
-        """
-        Calcula o total de despesas com projeção baseada em média dos últimos 3 meses por CTAFIN
-        Usa a mesma lógica do obter_dados_diarios_projetados mas retorna apenas o total
+    def calcular_total_despesas_projetado(
+        data_inicio: str,
+        data_fim: str,
+        filiais: Optional[List[str]] = None,
+        meses: int = MESES_PADRAO,
+        ponderacao: str = PONDERACAO_PADRAO,
+        fator: float = FATOR_EXPONENCIAL_PADRAO
+    ) -> float:
         """
-        from datetime import datetime, timedelta, date
-
-        # Converte strings para objetos date
-        inicio = datetime.strptime(data_inicio, '%Y-%m-%d').date()
-        fim = datetime.strptime(data_fim, '%Y-%m-%d').date()
-
-        # Calcula os 3 meses anteriores
-        # Mês anterior 1
-        if inicio.month == 1:
-            mes_anterior_1_inicio = date(inicio.year - 1, 12, 1)
-            mes_anterior_1_fim = date(inicio.year - 1, 12, 31)
-        else:
-            mes_anterior_1_inicio = date(inicio.year, inicio.month - 1, 1)
-            mes_anterior_1_fim = inicio - timedelta(days=1)
-
-        # Mês anterior 2
-        if mes_anterior_1_inicio.month == 1:
-            mes_anterior_2_inicio = date(mes_anterior_1_inicio.year - 1, 12, 1)
-            mes_anterior_2_fim = date(mes_anterior_1_inicio.year - 1, 12, 31)
-        else:
-            mes_anterior_2_inicio = date(mes_anterior_1_inicio.year, mes_anterior_1_inicio.month - 1, 1)
-            mes_anterior_2_fim = mes_anterior_1_inicio - timedelta(days=1)
-
-        # Mês anterior 3
-        if mes_anterior_2_inicio.month == 1:
-            mes_anterior_3_inicio = date(mes_anterior_2_inicio.year - 1, 12, 1)
-            mes_anterior_3_fim = date(mes_anterior_2_inicio.year - 1, 12, 31)
-        else:
-            mes_anterior_3_inicio = date(mes_anterior_2_inicio.year, mes_anterior_2_inicio.month - 1, 1)
-            mes_anterior_3_fim = mes_anterior_2_inicio - timedelta(days=1)
-
-        # Prepara filtro de filiais
-        filtro_filiais = ""
-        if filiais:
-            placeholders = ','.join(['%s'] * len(filiais))
-            filtro_filiais = f" AND CODFIL IN ({placeholders})"
-
-        # Query simplificada que retorna apenas o total
-        query = f"""
-        WITH contas_ajustadas AS (
-            SELECT
-                CTAFIN,
-                VLRABE,
-                VLRRAT,
-                VCTPRO,
-                CODFIL,
-                CASE
-                    WHEN DATEPART(WEEKDAY, VCTPRO) = 7 THEN DATEADD(DAY, 2, VCTPRO)
-                    WHEN DATEPART(WEEKDAY, VCTPRO) = 1 THEN DATEADD(DAY, 1, VCTPRO)
-                    ELSE VCTPRO
-                END as DATA_AJUSTADA,
-                CASE
-                    WHEN VLRABE > VLRRAT THEN VLRRAT
-                    WHEN VLRABE = 0 THEN VLRRAT
-                    ELSE VLRABE
-                END as VALOR_CALCULADO
-            FROM contas_pagar
-            WHERE SITTIT <> 'CA'
-            AND SEQMOV = 1
-            AND VLRABE >= 0
-            AND CTAFIN NOT IN (407,408,409,410,411,412,501)
-            {filtro_filiais}
-        ),
-        -- Dados dos 3 meses anteriores
-        mes_ant_1 AS (
-            SELECT CTAFIN, SUM(VALOR_CALCULADO) as total_mes
-            FROM contas_ajustadas
-            WHERE DATA_AJUSTADA BETWEEN %s AND %s
-            GROUP BY CTAFIN
-        ),
-        mes_ant_2 AS (
-            SELECT CTAFIN, SUM(VALOR_CALCULADO) as total_mes
-            FROM contas_ajustadas
-            WHERE DATA_AJUSTADA BETWEEN %s AND %s
-            GROUP BY CTAFIN
-        ),
-        mes_ant_3 AS (
-            SELECT CTAFIN, SUM(VALOR_CALCULADO) as total_mes
-            FROM contas_ajustadas
-            WHERE DATA_AJUSTADA BETWEEN %s AND %s
-            GROUP BY CTAFIN
-        ),
-        -- Calcula média dos 3 meses por CTAFIN
-        medias AS (
-            SELECT
-                COALESCE(m1.CTAFIN, m2.CTAFIN, m3.CTAFIN) as CTAFIN,
-                (COALESCE(m1.total_mes, 0) + COALESCE(m2.total_mes, 0) + COALESCE(m3.total_mes, 0)) / 3.0 as media
-            FROM mes_ant_1 m1
-            FULL OUTER JOIN mes_ant_2 m2 ON m1.CTAFIN = m2.CTAFIN
-            FULL OUTER JOIN mes_ant_3 m3 ON COALESCE(m1.CTAFIN, m2.CTAFIN) = m3.CTAFIN
-        ),
-        -- Total do mês vigente por CTAFIN
-        mes_vigente AS (
-            SELECT
-                CTAFIN,
-                SUM(VALOR_CALCULADO) as total_mes
-            FROM contas_ajustadas
-            WHERE DATA_AJUSTADA BETWEEN %s AND %s
-            GROUP BY CTAFIN
-        ),
-        -- Aplica regra: se valor lançado > média usa lançado, senão usa média
-        projecao AS (
-            SELECT
-                COALESCE(mv.CTAFIN, m.CTAFIN) as CTAFIN,
-                CASE
-                    WHEN COALESCE(mv.total_mes, 0) > COALESCE(m.media, 0) THEN COALESCE(mv.total_mes, 0)
-                    ELSE COALESCE(m.media, 0)
-                END as valor_final
-            FROM mes_vigente mv
-            FULL OUTER JOIN medias m ON mv.CTAFIN = m.CTAFIN
-            WHERE COALESCE(mv.total_mes, 0) > 0 OR COALESCE(m.media, 0) > 0
-        )
-        SELECT CAST(SUM(valor_final) AS DECIMAL(18,2)) as total_projetado
-        FROM projecao
+        Calcula o total de despesas com projeção baseada em média dos meses anteriores por CTAFIN
+        Mesma computação de obter_dados_diarios_projetados (o total é a soma da série diária)
         """
-
-        # Monta os parâmetros
-        params = []
-        if filiais:
-            params.extend(filiais)
-
-        params.extend([
-            mes_anterior_1_inicio.strftime('%Y-%m-%d'), mes_anterior_1_fim.strftime('%Y-%m-%d'),
-            mes_anterior_2_inicio.strftime('%Y-%m-%d'), mes_anterior_2_fim.strftime('%Y-%m-%d'),
-            mes_anterior_3_inicio.strftime('%Y-%m-%d'), mes_anterior_3_fim.strftime('%Y-%m-%d'),
-            data_inicio, data_fim
-        ])
-
-        results = db.execute_query(query, tuple(params))
-        total = results[0]['total_projetado'] if results and results[0]['total_projetado'] else 0
-        return max(total, 0)
+        return ProjecaoService.projetar_local(data_inicio, data_fim, filiais, meses, ponderacao, fator)['total']
 
     @staticmethod
+    @cache_consultas.memoizar
     def obter_top_despesas(data_inicio: str, data_fim: str, limit: int = 10, filiais: Optional[List[str]] = None) -> List[dict]:
         """
         Obtém as maiores despesas por conta reduzida (CTARED) no período
@@ -596,28 +251,14 @@ class ContasPagarLocalService:
         """
         query = """
         WITH contas_ajustadas AS (
+            -- Agregado diário (fato_diario_pagar), já com os filtros do BI
             SELECT
-                cp.CTAFIN,
-                cp.VLRABE,
-                cp.VLRRAT,
-                cp.CODFIL,
-                -- Calcula a data ajustada (move finais de semana para segunda-feira)
-                CASE
-                    WHEN DATEPART(WEEKDAY, cp.VCTPRO) = 7 THEN DATEADD(DAY, 2, cp.VCTPRO)
-                    WHEN DATEPART(WEEKDAY, cp.VCTPRO) = 1 THEN DATEADD(DAY, 1, cp.VCTPRO)
-                    ELSE cp.VCTPRO
-                END as DATA_AJUSTADA,
-                -- Calcula o valor conforme regra do BI
-                CASE
-                    WHEN cp.VLRABE > cp.VLRRAT THEN cp.VLRRAT
-                    WHEN cp.VLRABE = 0 THEN cp.VLRRAT
-                    ELSE cp.VLRABE
-                END as VALOR_CALCULADO
-            FROM contas_pagar cp
-            WHERE cp.SITTIT <> 'CA'  -- Exclui cancelados
-            AND cp.SEQMOV = 1  -- Apenas sequência 1
-            AND cp.VLRABE >= 0  -- Valor em aberto >= 0
-            AND cp.CTAFIN NOT IN (407,408,409,410,411,412,501)  -- Exclui contas específicas
+                data_ajustada AS DATA_AJUSTADA,
+                codfil AS CODFIL,
+                ctafin AS CTAFIN,
+                codccu AS CODCCU,
+                valor_calculado AS VALOR_CALCULADO
+            FROM fato_diario_pagar
         )
         SELECT TOP %s
             -- Formata CTAFIN com 4 dígitos + concatena com DESCTA
@@ -653,6 +294,7 @@ class ContasPagarLocalService:
         return results if results else []
 
     @staticmethod
+    @cache_consultas.memoizar
     def obter_top_fornecedores(data_inicio: str, data_fim: str, limit: int = 10) -> List[dict]:
         """
         Obtém os maiores fornecedores por valor de despesa no período
@@ -662,20 +304,8 @@ class ContasPagarLocalService:
             SELECT
                 CODFOR,
                 NOMFOR,
-                VLRABE,
-                VLRRAT,
-                -- Calcula a data ajustada (move finais de semana para segunda-feira)
-                CASE
-                    WHEN DATEPART(WEEKDAY, VCTPRO) = 7 THEN DATEADD(DAY, 2, VCTPRO)
-                    WHEN DATEPART(WEEKDAY, VCTPRO) = 1 THEN DATEADD(DAY, 1, VCTPRO)
-                    ELSE VCTPRO
-                END as DATA_AJUSTADA,
-                -- Calcula o valor conforme regra do BI
-                CASE
-                    WHEN VLRABE > VLRRAT THEN VLRRAT
-                    WHEN VLRABE = 0 THEN VLRRAT
-                    ELSE VLRABE
-                END as VALOR_CALCULADO
+                DATA_AJUSTADA,  -- Coluna calculada persistida (dias úteis)
+                VALOR_CALCULADO  -- Coluna calculada persistida (regra do BI)
             FROM contas_pagar
             WHERE SITTIT <> 'CA'
             AND SEQMOV = 1
@@ -695,33 +325,21 @@ class ContasPagarLocalService:
         return results if results else []
 
     @staticmethod
+    @cache_consultas.memoizar
     def obter_despesas_por_centro_custo(data_inicio: str, data_fim: str) -> List[dict]:
         """
         Obtém despesas agrupadas por centro de custo
         """
         query = """
         WITH contas_ajustadas AS (
+            -- Agregado diário (fato_diario_pagar), já com os filtros do BI
             SELECT
-                CODCCU,
-                VLRABE,
-                VLRRAT,
-                -- Calcula a data ajustada
-                CASE
-                    WHEN DATEPART(WEEKDAY, VCTPRO) = 7 THEN DATEADD(DAY, 2, VCTPRO)
-                    WHEN DATEPART(WEEKDAY, VCTPRO) = 1 THEN DATEADD(DAY, 1, VCTPRO)
-                    ELSE VCTPRO
-                END as DATA_AJUSTADA,
-                -- Calcula o valor conforme regra do BI
-                CASE
-                    WHEN VLRABE > VLRRAT THEN VLRRAT
-                    WHEN VLRABE = 0 THEN VLRRAT
-                    ELSE VLRABE
-                END as VALOR_CALCULADO
-            FROM contas_pagar
-            WHERE SITTIT <> 'CA'
-            AND SEQMOV = 1
-            AND VLRABE >= 0
-            AND CTAFIN NOT IN (407,408,409,410,411,412,501)
+                data_ajustada AS DATA_AJUSTADA,
+                codfil AS CODFIL,
+                ctafin AS CTAFIN,
+                codccu AS CODCCU,
+                valor_calculado AS VALOR_CALCULADO
+            FROM fato_diario_pagar
         )
         SELECT
             COALESCE(CAST(CODCCU AS VARCHAR), 'Sem Centro de Custo') as centro_custo,
@@ -1,8 +1,20 @@
 from database import senior_db
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from typing import Optional, List
 import calendar
-from dateutil.relativedelta import relativedelta
+import numpy as np
+from services.projecao_service import ProjecaoService, MESES_PADRAO, PONDERACAO_PADRAO, FATOR_EXPONENCIAL_PADRAO
+from services.snapshot_analitico import SEM_VALOR
+from utils.cache import cache_senior
+from utils.single_flight import single_flight_senior
+from utils.periodos import fim_mes, meses_anteriores
+from utils.sql_parametrizado import ConsultaParametrizada, lista_sql, sql_lista
+
+# Filiais consultadas quando nenhuma é informada (todas exceto 2002)
+FILIAIS_PADRAO = ['1001', '1002', '1003', '3001', '3002', '3003']
+
+# Parâmetros das consultas de títulos (ver utils/sql_parametrizado.py)
+PARAMETROS_PERIODO = {'@data_inicio': 'DATE', '@data_fim': 'DATE', '@filiais': 'VARCHAR(MAX)'}
 
 
 class ContasPagarSeniorService:
@@ -51,12 +63,24 @@ class ContasPagarSeniorService:
         # Mês vigente - até dia 28
         data_fim = datetime(ano, mes, 28)
 
-        # 3 meses atrás
-        data_inicio = datetime(ano, mes, 1) - relativedelta(months=3)
+        # Início do mais antigo dos 3 meses anteriores
+        (inicio_historico, _), *_ = meses_anteriores(date(ano, mes, 1), 3)
+        data_inicio = datetime.combine(inicio_historico, datetime.min.time())
 
         return data_inicio, data_fim
 
     @staticmethod
+    def _parametros_periodo(data_inicio: datetime, data_fim: datetime, filiais: Optional[List[str]] = None) -> dict:
+        """Valores de PARAMETROS_PERIODO (sem filiais, usa FILIAIS_PADRAO)"""
+        return {
+            'data_inicio': data_inicio.strftime('%Y%m%d'),
+            'data_fim': data_fim.strftime('%Y%m%d'),
+            'filiais': lista_sql(filiais if filiais else FILIAIS_PADRAO)
+        }
+
+    @staticmethod
+    @cache_senior.memoizar
+    @single_flight_senior.agrupar
     def obter_contas_pagar_do_senior(periodo: str, filiais: Optional[List[str]] = None) -> List[dict]:
         """
         Busca contas a pagar do Senior para o período especificado (4 meses)
@@ -65,20 +89,8 @@ class ContasPagarSeniorService:
             # Obtém período de 4 meses (vigente + 3 anteriores)
             data_inicio, data_fim = ContasPagarSeniorService.obter_periodo_4_meses(periodo)
 
-            # Formata datas para SQL
-            data_inicio_str = data_inicio.strftime('%Y%m%d')
-            data_fim_str = data_fim.strftime('%Y%m%d')
-
-            # Monta filtro de filiais
-            filiais_filter = ""
-            if filiais and len(filiais) > 0:
-                filiais_str = ','.join([f"'{f.strip()}'" for f in filiais])
-                filiais_filter = f"AND E501MCP.CODFIL IN ({filiais_str})"
-            else:
-                # Se não especificou filiais, usa as padrão (todas exceto 2002)
-                filiais_filter = "AND E501MCP.CODFIL IN ('1001','1002','1003','3001','3002','3003')"
-
-            # Query SQL
+            # Query SQL, na mesma ordem de QUERY_CONTAS_PAGAR (sincronizacao_service): a sincronização
+            # por período gera os ids a partir destas linhas e precisa numerar repetições igual
             query = f"""
             SELECT DISTINCT E501MCP.CODEMP,E501MCP.CODFIL,E501MCP.NUMTIT,E501MCP.CODFOR
             ,E095FOR.NOMFOR,E501MCP.SEQMOV,E501MCP.CODTNS,E501MCP.DATMOV,E501MCP.CODFPG
@@ -106,13 +118,16 @@ class ContasPagarSeniorService:
             AND E501TCP.VLRABE >= 0
             AND E001TNS.LISMOD = 'CPE'
             AND E501RAT.CTAFIN NOT IN (407,408,409,410,411,412,501)
-            AND E501MCP.VCTPRO >= '{data_inicio_str}'
-            AND E501MCP.VCTPRO <= '{data_fim_str}'
-            {filiais_filter}
+            AND E501MCP.VCTPRO >= @data_inicio
+            AND E501MCP.VCTPRO <= @data_fim
+            AND E501MCP.CODFIL IN ({sql_lista('@filiais')})
+            ORDER BY E501MCP.CODEMP, E501MCP.CODFIL, E501MCP.CODFOR, E501MCP.NUMTIT, E501TCP.CODTPT, E501MCP.SEQMOV,
+                E501RAT.CTAFIN, E501RAT.CODCCU, E501RAT.VLRRAT, E501RAT.CTARED
             """
 
-            # Executa query
-            resultados = senior_db.execute_query(query)
+            # Executa query (SQL constante, período e filiais como parâmetros)
+            parametros = ContasPagarSeniorService._parametros_periodo(data_inicio, data_fim, filiais)
+            resultados = ConsultaParametrizada(query, PARAMETROS_PERIODO).executar(senior_db, **parametros)
 
             # Processa resultados e aplica ajustes
             registros_processados = []
@@ -143,106 +158,65 @@ class ContasPagarSeniorService:
             raise Exception(f"Erro ao buscar contas a pagar do Senior: {str(e)}")
 
     @staticmethod
-    def aplicar_projecao_media(registros: List[dict], periodo_vigente: str) -> List[dict]:
+    def aplicar_projecao_media(
+        registros: List[dict],
+        periodo_vigente: str,
+        meses: int = MESES_PADRAO,
+        ponderacao: str = PONDERACAO_PADRAO,
+        fator: float = FATOR_EXPONENCIAL_PADRAO
+    ) -> List[dict]:
         """
-        Aplica lógica de projeção com média dos últimos 3 meses
-        IMPORTANTE: SEMPRE mantém os registros dos 3 meses anteriores intactos
-        Para o mês vigente:
-        - Se valor do mês vigente > média: usa valor lançado
-        - Se valor do mês vigente <= média ou = 0: adiciona registro projetado com a média
+        Aplica lógica de projeção com média dos meses anteriores (services/projecao_service.py)
+        (padrão: média simples dos últimos 3 meses)
+        IMPORTANTE: SEMPRE mantém os registros dos meses anteriores da janela intactos
+        Para o mês vigente, por CTAFIN:
+        - Se valor do mês vigente > média: usa os registros lançados
+        - Se valor do mês vigente <= média ou = 0: adiciona registro projetado com a média,
+          copiado do último registro da conta nos meses anteriores
         """
         ano_vigente, mes_vigente = map(int, periodo_vigente.split('-'))
-
-        # Calcula meses anteriores
-        mes1_anterior = (datetime(ano_vigente, mes_vigente, 1) - relativedelta(months=1)).strftime('%Y-%m')
-        mes2_anterior = (datetime(ano_vigente, mes_vigente, 1) - relativedelta(months=2)).strftime('%Y-%m')
-        mes3_anterior = (datetime(ano_vigente, mes_vigente, 1) - relativedelta(months=3)).strftime('%Y-%m')
-
-        # Separa registros por mês
-        registros_mes_anterior_1 = [r for r in registros if r.get('DATA_AJUSTADA') and r['DATA_AJUSTADA'].strftime('%Y-%m') == mes1_anterior]
-        registros_mes_anterior_2 = [r for r in registros if r.get('DATA_AJUSTADA') and r['DATA_AJUSTADA'].strftime('%Y-%m') == mes2_anterior]
-        registros_mes_anterior_3 = [r for r in registros if r.get('DATA_AJUSTADA') and r['DATA_AJUSTADA'].strftime('%Y-%m') == mes3_anterior]
-        registros_vigente = [r for r in registros if r.get('DATA_AJUSTADA') and r['DATA_AJUSTADA'].strftime('%Y-%m') == periodo_vigente]
-
-        # Agrupa registros do mês vigente por CTAFIN
-        vigente_por_ctafin = {}
-        for reg in registros_vigente:
-            ctafin = reg.get('CTAFIN')
-            if ctafin not in vigente_por_ctafin:
-                vigente_por_ctafin[ctafin] = []
-            vigente_por_ctafin[ctafin].append(reg)
-
-        # Agrupa registros dos 3 meses anteriores por CTAFIN
-        anterior_por_ctafin = {}
-        for reg in registros_mes_anterior_1 + registros_mes_anterior_2 + registros_mes_anterior_3:
-            ctafin = reg.get('CTAFIN')
-            if ctafin not in anterior_por_ctafin:
-                anterior_por_ctafin[ctafin] = {
-                    'mes1': [],
-                    'mes2': [],
-                    'mes3': []
-                }
-
-            ano_mes = reg['DATA_AJUSTADA'].strftime('%Y-%m')
-            if ano_mes == mes1_anterior:
-                anterior_por_ctafin[ctafin]['mes1'].append(reg)
-            elif ano_mes == mes2_anterior:
-                anterior_por_ctafin[ctafin]['mes2'].append(reg)
-            elif ano_mes == mes3_anterior:
-                anterior_por_ctafin[ctafin]['mes3'].append(reg)
-
-        # SEMPRE inclui TODOS os registros dos 3 meses anteriores
-        registros_finais = registros_mes_anterior_1 + registros_mes_anterior_2 + registros_mes_anterior_3
-
-        # Para o mês vigente, aplica a lógica de projeção POR CTAFIN
-        ctafins_processados = set()
-
-        for ctafin in set(list(vigente_por_ctafin.keys()) + list(anterior_por_ctafin.keys())):
-            regs_vigente = vigente_por_ctafin.get(ctafin, [])
-            total_vigente = sum(float(r['VALOR_CP']) for r in regs_vigente)
-
-            # Calcula média dos 3 meses anteriores para este CTAFIN
-            anterior = anterior_por_ctafin.get(ctafin, {'mes1': [], 'mes2': [], 'mes3': []})
-            total_mes1 = sum(float(r['VALOR_CP']) for r in anterior['mes1'])
-            total_mes2 = sum(float(r['VALOR_CP']) for r in anterior['mes2'])
-            total_mes3 = sum(float(r['VALOR_CP']) for r in anterior['mes3'])
-            media = (total_mes1 + total_mes2 + total_mes3) / 3.0
-
-            if total_vigente > media:
-                # Usa registros lançados
-                registros_finais.extend(regs_vigente)
-            elif media > 0:
-                # Usa média - cria registro projetado
-                # Pega última data do mês anterior para este CTAFIN
-                if anterior['mes1']:
-                    ultimo_reg = max(anterior['mes1'], key=lambda x: x.get('DATA_AJUSTADA', datetime.min))
-
-                    reg_projetado = ultimo_reg.copy()
-                    reg_projetado['VALOR_CP'] = media
-
-                    # Ajusta data para mês vigente
-                    data_anterior = ultimo_reg.get('DATA_AJUSTADA')
-                    if data_anterior:
-                        dia = data_anterior.day
-                        try:
-                            nova_data = datetime(ano_vigente, mes_vigente, dia)
-                        except ValueError:
-                            ultimo_dia = calendar.monthrange(ano_vigente, mes_vigente)[1]
-                            nova_data = datetime(ano_vigente, mes_vigente, ultimo_dia)
-
-                        reg_projetado['DATA_AJUSTADA'] = nova_data
-                        reg_projetado['DATA_AJUSTADA_STR'] = nova_data.strftime('%Y-%m-%d')
-                        reg_projetado['VCTPRO'] = nova_data
-
-                    registros_finais.append(reg_projetado)
-                elif regs_vigente:
-                    # Se não tem histórico mas tem vigente, usa vigente
-                    registros_finais.extend(regs_vigente)
-            elif regs_vigente:
-                # Se média é 0 mas tem registros vigentes, usa vigente
-                registros_finais.extend(regs_vigente)
-
-            ctafins_processados.add(ctafin)
+        inicio = date(ano_vigente, mes_vigente, 1)
+        fim = fim_mes(inicio)
+
+        com_data = [r for r in registros if r.get('DATA_AJUSTADA')]
+        if not com_data:
+            return []
+
+        ctafins = np.array([r['CTAFIN'] if r.get('CTAFIN') is not None else SEM_VALOR for r in com_data], dtype=np.int64)
+        dias = np.array([r['DATA_AJUSTADA'].toordinal() for r in com_data], dtype=np.int64)
+        valores = np.array([float(r.get('VALOR_CP') or 0) for r in com_data], dtype=np.float64)
+
+        projecao = ProjecaoService.projetar(
+            ctafins, dias, valores, inicio.strftime('%Y-%m-%d'), fim.strftime('%Y-%m-%d'), meses, ponderacao, fator
+        )
+        contas = {SEM_VALOR if c['ctafin'] is None else c['ctafin']: c for c in projecao['contas']}
+
+        inicio_historico = meses_anteriores(inicio, meses)[0][0].toordinal()
+        historico = (dias >= inicio_historico) & (dias < inicio.toordinal())
+        vigente = (dias >= inicio.toordinal()) & (dias <= fim.toordinal())
+
+        # SEMPRE inclui TODOS os registros dos meses anteriores da janela
+        registros_finais = [com_data[i] for i in np.flatnonzero(historico)]
+
+        # Mês vigente: registros lançados das contas que ficam com o valor lançado
+        usa_vigente = np.array([not contas.get(c, {'usa_media': True})['usa_media'] for c in ctafins.tolist()])
+        registros_finais.extend(com_data[i] for i in np.flatnonzero(vigente & usa_vigente))
+
+        # Contas que ficam com a média: copia o último registro da conta no histórico
+        ultimo_por_ctafin = {}
+        for i in np.flatnonzero(historico)[np.argsort(dias[historico], kind='stable')]:
+            ultimo_por_ctafin[int(ctafins[i])] = com_data[i]
+
+        for ctafin, conta in contas.items():
+            if not conta['usa_media']:
+                continue
+            reg_projetado = ultimo_por_ctafin[ctafin].copy()
+            nova_data = datetime.strptime(conta['data'], '%Y-%m-%d')
+            reg_projetado['VALOR_CP'] = conta['media']
+            reg_projetado['DATA_AJUSTADA'] = nova_data
+            reg_projetado['DATA_AJUSTADA_STR'] = conta['data']
+            reg_projetado['VCTPRO'] = nova_data
+            registros_finais.append(reg_projetado)
 
         return registros_finais
 
@@ -297,6 +271,8 @@ class ContasPagarSeniorService:
             raise Exception(f"Erro ao obter resumo liquidado por dia: {str(e)}")
 
     @staticmethod
+    @cache_senior.memoizar
+    @single_flight_senior.agrupar
     def obter_contas_pagar_liquidadas_do_senior(periodo: str, filiais: Optional[List[str]] = None) -> List[dict]:
         """
         Busca contas a pagar LIQUIDADAS do Senior para o período especificado
@@ -310,19 +286,6 @@ class ContasPagarSeniorService:
             data_inicio = datetime(ano, mes, 1)
             data_fim = datetime(ano, mes, ultimo_dia_mes)
 
-            # Formata datas para SQL
-            data_inicio_str = data_inicio.strftime('%Y%m%d')
-            data_fim_str = data_fim.strftime('%Y%m%d')
-
-            # Monta filtro de filiais
-            filiais_filter = ""
-            if filiais and len(filiais) > 0:
-                filiais_str = ','.join([f"'{f.strip()}'" for f in filiais])
-                filiais_filter = f"AND E501MCP.CODFIL IN ({filiais_str})"
-            else:
-                # Se não especificou filiais, usa as padrão (todas exceto 2002)
-                filiais_filter = "AND E501MCP.CODFIL IN ('1001','1002','1003','3001','3002','3003')"
-
             # Query SQL - APENAS TÍTULOS LIQUIDADOS (SITTIT = 'LQ')
             # Filtra por ULTPGT (data de último pagamento) ao invés de VCTPRO
             query = f"""
@@ -352,14 +315,15 @@ class ContasPagarSeniorService:
             AND E501TCP.VLRABE >= 0
             AND E001TNS.LISMOD = 'CPE'
             AND E501RAT.CTAFIN NOT IN (407,408,409,410,411,412,501)
-            AND E501TCP.ULTPGT >= '{data_inicio_str}'
-            AND E501TCP.ULTPGT <= '{data_fim_str}'
+            AND E501TCP.ULTPGT >= @data_inicio
+            AND E501TCP.ULTPGT <= @data_fim
             AND YEAR(E501TCP.ULTPGT) != 1900
-            {filiais_filter}
+            AND E501MCP.CODFIL IN ({sql_lista('@filiais')})
             """
 
-            # Executa query
-            resultados = senior_db.execute_query(query)
+            # Executa query (SQL constante, período e filiais como parâmetros)
+            parametros = ContasPagarSeniorService._parametros_periodo(data_inicio, data_fim, filiais)
+            resultados = ConsultaParametrizada(query, PARAMETROS_PERIODO).executar(senior_db, **parametros)
 
             # Processa resultados SEM ajustes de data ou valor
             registros_processados = []
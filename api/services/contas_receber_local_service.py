@@ -1,12 +1,15 @@
 """
 Service para consultas de Contas a Receber usando o banco LOCAL (sincronizado)
 Substitui as consultas complexas ao banco Senior por consultas simples ao banco local
+Totais e séries por dia, conta financeira e centro de custo leem o agregado
+fato_diario_receber (reconstruído a cada sincronização, ver services/fato_diario_service.py)
 """
 
-from datetime import date, datetime, timedelta
+from datetime import datetime
 from typing import Optional, List
 from database import db
-from utils.calculos import calcular_valor_receber
+from utils.cache import cache_consultas
+from utils.periodos import meses_anteriores, periodo_anterior
 
 
 class ContasReceberLocalService:
@@ -25,24 +28,15 @@ class ContasReceberLocalService:
                 NUMTIT, SITTIT, CODTPT, VLRABE, VLRORI, RECDEC,
                 VCTPRO, VCTORI, DATPPT, DATEMI, DESTNS, CODCCU,
                 CTAFIN, ULTPGT,
-                -- Calcula a data ajustada (move finais de semana para terça-feira)
-                CASE
-                    WHEN DATEPART(WEEKDAY, DATPPT) = 6 THEN DATEADD(DAY, 3, DATPPT)  -- Sexta → +3 = Segunda
-                    WHEN DATEPART(WEEKDAY, DATPPT) = 7 THEN DATEADD(DAY, 3, DATPPT)  -- Sábado → +3 = Terça
-                    WHEN DATEPART(WEEKDAY, DATPPT) = 1 THEN DATEADD(DAY, 2, DATPPT)  -- Domingo → +2 = Terça
-                    WHEN DATEPART(WEEKDAY, DATPPT) = 2 THEN DATEADD(DAY, 1, DATPPT)  -- Segunda → +1 = Terça
-                    WHEN DATEPART(WEEKDAY, DATPPT) = 3 THEN DATEADD(DAY, 1, DATPPT)  -- Terça → +1 = Quarta
-                    WHEN DATEPART(WEEKDAY, DATPPT) = 4 THEN DATEADD(DAY, 1, DATPPT)  -- Quarta → +1 = Quinta
-                    WHEN DATEPART(WEEKDAY, DATPPT) = 5 THEN DATEADD(DAY, 1, DATPPT)  -- Quinta → +1 = Sexta
-                    ELSE DATPPT
-                END as DATA_AJUSTADA
+                DATA_AJUSTADA,  -- Coluna calculada persistida (dias úteis)
+                VALOR_CALCULADO  -- Coluna calculada persistida (receita/despesa)
             FROM contas_receber
         )
         SELECT
             CODEMP, CODFIL, CODCLI, NOMCLI, CIDCLI, BAICLI, TIPCLI,
             NUMTIT, SITTIT, CODTPT, VLRABE, VLRORI, RECDEC,
             VCTPRO, VCTORI, DATPPT, DATEMI, DESTNS, CODCCU,
-            CTAFIN, ULTPGT
+            CTAFIN, ULTPGT, VALOR_CALCULADO
         FROM contas_ajustadas
         WHERE 1=1
         """
@@ -61,15 +55,9 @@ class ContasReceberLocalService:
 
         results = db.execute_query(query, tuple(params) if params else None)
 
-        # Processa resultados aplicando cálculos
+        # Processa resultados
         contas_processadas = []
         for row in results:
-            valor_calculado = calcular_valor_receber(
-                row.get('VLRABE', 0),
-                row.get('RECDEC', 0),
-                row.get('VLRORI', 0)
-            )
-
             conta = {
                 'codemp': row.get('CODEMP'),
                 'codfil': row.get('CODFIL'),
@@ -92,13 +80,14 @@ class ContasReceberLocalService:
                 'codccu': row.get('CODCCU'),
                 'ctafin': row.get('CTAFIN'),
                 'ultpgt': row.get('ULTPGT'),
-                'valor_calculado': valor_calculado
+                'valor_calculado': row.get('VALOR_CALCULADO', 0)  # Regra receita/despesa (coluna calculada)
             }
             contas_processadas.append(conta)
 
         return contas_processadas
 
     @staticmethod
+    @cache_consultas.memoizar
     def calcular_total_receitas(data_inicio: Optional[str] = None, data_fim: Optional[str] = None, filiais: Optional[List[str]] = None) -> float:
         """
         Calcula o total de receitas no período usando a tabela local
@@ -106,33 +95,17 @@ class ContasReceberLocalService:
         """
         query = """
         WITH contas_ajustadas AS (
+            -- Agregado diário (fato_diario_receber)
             SELECT
-                VLRABE,
-                VLRORI,
-                RECDEC,
-                CODFIL,
-                -- Calcula a data ajustada (move finais de semana para terça-feira)
-                CASE
-                    WHEN DATEPART(WEEKDAY, DATPPT) = 6 THEN DATEADD(DAY, 3, DATPPT)  -- Sexta → +3 = Segunda
-                    WHEN DATEPART(WEEKDAY, DATPPT) = 7 THEN DATEADD(DAY, 3, DATPPT)  -- Sábado → +3 = Terça
-                    WHEN DATEPART(WEEKDAY, DATPPT) = 1 THEN DATEADD(DAY, 2, DATPPT)  -- Domingo → +2 = Terça
-                    WHEN DATEPART(WEEKDAY, DATPPT) = 2 THEN DATEADD(DAY, 1, DATPPT)  -- Segunda → +1 = Terça
-                    WHEN DATEPART(WEEKDAY, DATPPT) = 3 THEN DATEADD(DAY, 1, DATPPT)  -- Terça → +1 = Quarta
-                    WHEN DATEPART(WEEKDAY, DATPPT) = 4 THEN DATEADD(DAY, 1, DATPPT)  -- Quarta → +1 = Quinta
-                    WHEN DATEPART(WEEKDAY, DATPPT) = 5 THEN DATEADD(DAY, 1, DATPPT)  -- Quinta → +1 = Sexta
-                    ELSE DATPPT
-                END as DATA_AJUSTADA
-            FROM contas_receber
+                data_ajustada AS DATA_AJUSTADA,
+                codfil AS CODFIL,
+                ctafin AS CTAFIN,
+                codccu AS CODCCU,
+                valor_calculado AS VALOR_CALCULADO
+            FROM fato_diario_receber
         )
         SELECT
-            CAST(SUM(
-                CASE
-                    WHEN VLRABE != 0 AND RECDEC = 2 THEN -VLRABE
-                    WHEN VLRABE = 0 AND RECDEC = 2 THEN -VLRORI
-                    WHEN VLRABE != 0 AND RECDEC = 1 THEN VLRABE
-                    ELSE VLRORI
-                END
-            ) AS DECIMAL(18,2)) AS total_receitas
+            CAST(SUM(VALOR_CALCULADO) AS DECIMAL(18,2)) AS total_receitas
         FROM contas_ajustadas
         WHERE 1=1
         """
@@ -158,25 +131,12 @@ class ContasReceberLocalService:
 
     @staticmethod
     def calcular_total_periodo_anterior(data_inicio: str, data_fim: str, filiais: Optional[List[str]] = None) -> float:
-        """Calcula total do período anterior para comparação"""
-        # Converte strings para datas
-        inicio = datetime.strptime(data_inicio, '%Y-%m-%d')
-        fim = datetime.strptime(data_fim, '%Y-%m-%d')
-
-        # Calcula duração do período
-        duracao = (fim - inicio).days
-
-        # Calcula período anterior
-        inicio_anterior = inicio - timedelta(days=duracao + 1)
-        fim_anterior = inicio - timedelta(days=1)
-
-        return ContasReceberLocalService.calcular_total_receitas(
-            inicio_anterior.strftime('%Y-%m-%d'),
-            fim_anterior.strftime('%Y-%m-%d'),
-            filiais
-        )
+        """Calcula total do período anterior (mesma duração, imediatamente antes) para comparação"""
+        inicio_anterior, fim_anterior = periodo_anterior(data_inicio, data_fim)
+        return ContasReceberLocalService.calcular_total_receitas(inicio_anterior, fim_anterior, filiais)
 
     @staticmethod
+    @cache_consultas.memoizar
     def obter_dados_mensais(data_inicio: str, data_fim: str) -> List[dict]:
         """
         Obtém dados agrupados por mês para gráficos
@@ -184,34 +144,19 @@ class ContasReceberLocalService:
         """
         query = """
         WITH contas_ajustadas AS (
+            -- Agregado diário (fato_diario_receber)
             SELECT
-                VLRABE,
-                VLRORI,
-                RECDEC,
-                -- Calcula a data ajustada (move finais de semana para terça-feira)
-                CASE
-                    WHEN DATEPART(WEEKDAY, DATPPT) = 6 THEN DATEADD(DAY, 3, DATPPT)  -- Sexta → +3 = Segunda
-                    WHEN DATEPART(WEEKDAY, DATPPT) = 7 THEN DATEADD(DAY, 3, DATPPT)  -- Sábado → +3 = Terça
-                    WHEN DATEPART(WEEKDAY, DATPPT) = 1 THEN DATEADD(DAY, 2, DATPPT)  -- Domingo → +2 = Terça
-                    WHEN DATEPART(WEEKDAY, DATPPT) = 2 THEN DATEADD(DAY, 1, DATPPT)  -- Segunda → +1 = Terça
-                    WHEN DATEPART(WEEKDAY, DATPPT) = 3 THEN DATEADD(DAY, 1, DATPPT)  -- Terça → +1 = Quarta
-                    WHEN DATEPART(WEEKDAY, DATPPT) = 4 THEN DATEADD(DAY, 1, DATPPT)  -- Quarta → +1 = Quinta
-                    WHEN DATEPART(WEEKDAY, DATPPT) = 5 THEN DATEADD(DAY, 1, DATPPT)  -- Quinta → +1 = Sexta
-                    ELSE DATPPT
-                END as DATA_AJUSTADA
-            FROM contas_receber
+                data_ajustada AS DATA_AJUSTADA,
+                codfil AS CODFIL,
+                ctafin AS CTAFIN,
+                codccu AS CODCCU,
+                valor_calculado AS VALOR_CALCULADO
+            FROM fato_diario_receber
         )
         SELECT
             FORMAT(DATA_AJUSTADA, 'MMM', 'pt-BR') as mes,
             MONTH(DATA_AJUSTADA) as mes_numero,
-            CAST(SUM(
-                CASE
-                    WHEN VLRABE != 0 AND RECDEC = 2 THEN -VLRABE
-                    WHEN VLRABE = 0 AND RECDEC = 2 THEN -VLRORI
-                    WHEN VLRABE != 0 AND RECDEC = 1 THEN VLRABE
-                    ELSE VLRORI
-                END
-            ) AS DECIMAL(18,2)) AS total
+            CAST(SUM(VALOR_CALCULADO) AS DECIMAL(18,2)) AS total
         FROM contas_ajustadas
         WHERE DATA_AJUSTADA BETWEEN %s AND %s
         GROUP BY FORMAT(DATA_AJUSTADA, 'MMM', 'pt-BR'), MONTH(DATA_AJUSTADA)
@@ -222,6 +167,7 @@ class ContasReceberLocalService:
         return results if results else []
 
     @staticmethod
+    @cache_consultas.memoizar
     def obter_dados_diarios(data_inicio: str, data_fim: str, filiais: Optional[List[str]] = None) -> List[dict]:
         """
         Obtém dados agrupados por dia para gráficos
@@ -230,35 +176,18 @@ class ContasReceberLocalService:
         """
         query = """
         WITH contas_ajustadas AS (
+            -- Agregado diário (fato_diario_receber)
             SELECT
-                DATPPT,
-                VLRABE,
-                VLRORI,
-                RECDEC,
-                CODFIL,
-                -- Calcula a data ajustada (move finais de semana para terça-feira)
-                CASE
-                    WHEN DATEPART(WEEKDAY, DATPPT) = 6 THEN DATEADD(DAY, 3, DATPPT)  -- Sexta → +3 = Segunda
-                    WHEN DATEPART(WEEKDAY, DATPPT) = 7 THEN DATEADD(DAY, 3, DATPPT)  -- Sábado → +3 = Terça
-                    WHEN DATEPART(WEEKDAY, DATPPT) = 1 THEN DATEADD(DAY, 2, DATPPT)  -- Domingo → +2 = Terça
-                    WHEN DATEPART(WEEKDAY, DATPPT) = 2 THEN DATEADD(DAY, 1, DATPPT)  -- Segunda → +1 = Terça
-                    WHEN DATEPART(WEEKDAY, DATPPT) = 3 THEN DATEADD(DAY, 1, DATPPT)  -- Terça → +1 = Quarta
-                    WHEN DATEPART(WEEKDAY, DATPPT) = 4 THEN DATEADD(DAY, 1, DATPPT)  -- Quarta → +1 = Quinta
-                    WHEN DATEPART(WEEKDAY, DATPPT) = 5 THEN DATEADD(DAY, 1, DATPPT)  -- Quinta → +1 = Sexta
-                    ELSE DATPPT
-                END as DATA_AJUSTADA
-            FROM contas_receber
+                data_ajustada AS DATA_AJUSTADA,
+                codfil AS CODFIL,
+                ctafin AS CTAFIN,
+                codccu AS CODCCU,
+                valor_calculado AS VALOR_CALCULADO
+            FROM fato_diario_receber
         )
         SELECT
             CONVERT(VARCHAR(10), DATA_AJUSTADA, 23) as data,
-            CAST(SUM(
-                CASE
-                    WHEN VLRABE != 0 AND RECDEC = 2 THEN -VLRABE
-                    WHEN VLRABE = 0 AND RECDEC = 2 THEN -VLRORI
-                    WHEN VLRABE != 0 AND RECDEC = 1 THEN VLRABE
-                    ELSE VLRORI
-                END
-            ) AS DECIMAL(18,2)) AS total
+            CAST(SUM(VALOR_CALCULADO) AS DECIMAL(18,2)) AS total
         FROM contas_ajustadas
         WHERE DATA_AJUSTADA BETWEEN %s AND %s
         """
@@ -279,6 +208,7 @@ class ContasReceberLocalService:
         return results if results else []
 
     @staticmethod
+    @cache_consultas.memoizar
     def obter_dados_diarios_projetados(data_inicio: str, data_fim: str) -> List[dict]:
         """
         Obtém dados agrupados por dia com projeção baseada em média dos últimos 3 meses
@@ -288,63 +218,27 @@ class ContasReceberLocalService:
         - Se valor do mês vigente <= média OU = 0: usa média
         - Quando usa média sem data, replica a data do último lançamento do mês anterior
         """
-        from datetime import datetime, timedelta, date
-
         # Converte strings para objetos date
         inicio = datetime.strptime(data_inicio, '%Y-%m-%d').date()
-        fim = datetime.strptime(data_fim, '%Y-%m-%d').date()
-
-        # Calcula os 3 meses anteriores usando apenas datetime/timedelta
-        # Mês anterior 1
-        if inicio.month == 1:
-            mes_anterior_1_inicio = date(inicio.year - 1, 12, 1)
-            mes_anterior_1_fim = date(inicio.year - 1, 12, 31)
-        else:
-            mes_anterior_1_inicio = date(inicio.year, inicio.month - 1, 1)
-            mes_anterior_1_fim = inicio - timedelta(days=1)
-
-        # Mês anterior 2
-        if mes_anterior_1_inicio.month == 1:
-            mes_anterior_2_inicio = date(mes_anterior_1_inicio.year - 1, 12, 1)
-            mes_anterior_2_fim = date(mes_anterior_1_inicio.year - 1, 12, 31)
-        else:
-            mes_anterior_2_inicio = date(mes_anterior_1_inicio.year, mes_anterior_1_inicio.month - 1, 1)
-            mes_anterior_2_fim = mes_anterior_1_inicio - timedelta(days=1)
-
-        # Mês anterior 3
-        if mes_anterior_2_inicio.month == 1:
-            mes_anterior_3_inicio = date(mes_anterior_2_inicio.year - 1, 12, 1)
-            mes_anterior_3_fim = date(mes_anterior_2_inicio.year - 1, 12, 31)
-        else:
-            mes_anterior_3_inicio = date(mes_anterior_2_inicio.year, mes_anterior_2_inicio.month - 1, 1)
-            mes_anterior_3_fim = mes_anterior_2_inicio - timedelta(days=1)
+
+        # Os 3 meses anteriores (do mais antigo para o mais recente)
+        (
+            (mes_anterior_3_inicio, mes_anterior_3_fim),
+            (mes_anterior_2_inicio, mes_anterior_2_fim),
+            (mes_anterior_1_inicio, mes_anterior_1_fim),
+        ) = meses_anteriores(inicio, 3)
 
         # Query para buscar dados dos últimos 3 meses + mês vigente, agrupados por CTAFIN
         query = """
         WITH contas_ajustadas AS (
+            -- Agregado diário (fato_diario_receber)
             SELECT
-                CTAFIN,
-                VLRABE,
-                VLRORI,
-                RECDEC,
-                DATPPT,
-                CASE
-                    WHEN DATEPART(WEEKDAY, DATPPT) = 6 THEN DATEADD(DAY, 3, DATPPT)
-                    WHEN DATEPART(WEEKDAY, DATPPT) = 7 THEN DATEADD(DAY, 3, DATPPT)
-                    WHEN DATEPART(WEEKDAY, DATPPT) = 1 THEN DATEADD(DAY, 2, DATPPT)
-                    WHEN DATEPART(WEEKDAY, DATPPT) = 2 THEN DATEADD(DAY, 1, DATPPT)
-                    WHEN DATEPART(WEEKDAY, DATPPT) = 3 THEN DATEADD(DAY, 1, DATPPT)
-                    WHEN DATEPART(WEEKDAY, DATPPT) = 4 THEN DATEADD(DAY, 1, DATPPT)
-                    WHEN DATEPART(WEEKDAY, DATPPT) = 5 THEN DATEADD(DAY, 1, DATPPT)
-                    ELSE DATPPT
-                END as DATA_AJUSTADA,
-                CASE
-                    WHEN VLRABE != 0 AND RECDEC = 2 THEN -VLRABE
-                    WHEN VLRABE = 0 AND RECDEC = 2 THEN -VLRORI
-                    WHEN VLRABE != 0 AND RECDEC = 1 THEN VLRABE
-                    ELSE VLRORI
-                END as VALOR_CALCULADO
-            FROM contas_receber
+                data_ajustada AS DATA_AJUSTADA,
+                codfil AS CODFIL,
+                ctafin AS CTAFIN,
+                codccu AS CODCCU,
+                valor_calculado AS VALOR_CALCULADO
+            FROM fato_diario_receber
         ),
         -- Dados do mês anterior 1
         mes_ant_1 AS (
@@ -453,6 +347,7 @@ class ContasReceberLocalService:
         return results if results else []
 
     @staticmethod
+    @cache_consultas.memoizar
     def obter_top_receitas(data_inicio: str, data_fim: str, limit: int = 10, filiais: Optional[List[str]] = None) -> List[dict]:
         """
         Obtém as maiores receitas por conta reduzida (CTAFIN) no período
@@ -460,31 +355,14 @@ class ContasReceberLocalService:
         """
         query = """
         WITH contas_ajustadas AS (
+            -- Agregado diário (fato_diario_receber)
             SELECT
-                cr.CTAFIN,
-                cr.VLRABE,
-                cr.VLRORI,
-                cr.RECDEC,
-                cr.CODFIL,
-                -- Calcula a data ajustada (move finais de semana para dias úteis)
-                CASE
-                    WHEN DATEPART(WEEKDAY, cr.DATPPT) = 6 THEN DATEADD(DAY, 3, cr.DATPPT)
-                    WHEN DATEPART(WEEKDAY, cr.DATPPT) = 7 THEN DATEADD(DAY, 3, cr.DATPPT)
-                    WHEN DATEPART(WEEKDAY, cr.DATPPT) = 1 THEN DATEADD(DAY, 2, cr.DATPPT)
-                    WHEN DATEPART(WEEKDAY, cr.DATPPT) = 2 THEN DATEADD(DAY, 1, cr.DATPPT)
-                    WHEN DATEPART(WEEKDAY, cr.DATPPT) = 3 THEN DATEADD(DAY, 1, cr.DATPPT)
-                    WHEN DATEPART(WEEKDAY, cr.DATPPT) = 4 THEN DATEADD(DAY, 1, cr.DATPPT)
-                    WHEN DATEPART(WEEKDAY, cr.DATPPT) = 5 THEN DATEADD(DAY, 1, cr.DATPPT)
-                    ELSE cr.DATPPT
-                END as DATA_AJUSTADA,
-                -- Calcula o valor conforme regra de receita/despesa
-                CASE
-                    WHEN cr.VLRABE != 0 AND cr.RECDEC = 2 THEN -cr.VLRABE
-                    WHEN cr.VLRABE = 0 AND cr.RECDEC = 2 THEN -cr.VLRORI
-                    WHEN cr.VLRABE != 0 AND cr.RECDEC = 1 THEN cr.VLRABE
-                    ELSE cr.VLRORI
-                END as VALOR_CALCULADO
-            FROM contas_receber cr
+                data_ajustada AS DATA_AJUSTADA,
+                codfil AS CODFIL,
+                ctafin AS CTAFIN,
+                codccu AS CODCCU,
+                valor_calculado AS VALOR_CALCULADO
+            FROM fato_diario_receber
         )
         SELECT TOP %s
             -- Formata CTARED com 4 dígitos + concatena com DESCTA
@@ -520,6 +398,7 @@ class ContasReceberLocalService:
         return results if results else []
 
     @staticmethod
+    @cache_consultas.memoizar
     def obter_top_clientes(data_inicio: str, data_fim: str, limit: int = 10) -> List[dict]:
         """
         Obtém os maiores clientes por valor de receita no período
@@ -529,27 +408,8 @@ class ContasReceberLocalService:
             SELECT
                 CODCLI,
                 NOMCLI,
-                VLRABE,
-                VLRORI,
-                RECDEC,
-                -- Calcula a data ajustada
-                CASE
-                    WHEN DATEPART(WEEKDAY, DATPPT) = 6 THEN DATEADD(DAY, 3, DATPPT)
-                    WHEN DATEPART(WEEKDAY, DATPPT) = 7 THEN DATEADD(DAY, 3, DATPPT)
-                    WHEN DATEPART(WEEKDAY, DATPPT) = 1 THEN DATEADD(DAY, 2, DATPPT)
-                    WHEN DATEPART(WEEKDAY, DATPPT) = 2 THEN DATEADD(DAY, 1, DATPPT)
-                    WHEN DATEPART(WEEKDAY, DATPPT) = 3 THEN DATEADD(DAY, 1, DATPPT)
-                    WHEN DATEPART(WEEKDAY, DATPPT) = 4 THEN DATEADD(DAY, 1, DATPPT)
-                    WHEN DATEPART(WEEKDAY, DATPPT) = 5 THEN DATEADD(DAY, 1, DATPPT)
-                    ELSE DATPPT
-                END as DATA_AJUSTADA,
-                -- Calcula o valor
-                CASE
-                    WHEN VLRABE != 0 AND RECDEC = 2 THEN -VLRABE
-                    WHEN VLRABE = 0 AND RECDEC = 2 THEN -VLRORI
-                    WHEN VLRABE != 0 AND RECDEC = 1 THEN VLRABE
-                    ELSE VLRORI
-                END as VALOR_CALCULADO
+                DATA_AJUSTADA,  -- Coluna calculada persistida (dias úteis)
+                VALOR_CALCULADO  -- Coluna calculada persistida (receita/despesa)
             FROM contas_receber
         )
         SELECT TOP %s
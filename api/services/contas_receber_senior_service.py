@@ -2,6 +2,123 @@ from database import senior_db
 from datetime import datetime, timedelta
 from typing import Optional, List
 import calendar
+from utils.cache import cache_senior
+from utils.single_flight import single_flight_senior
+from utils.sql_parametrizado import ConsultaParametrizada, lista_sql, sql_lista
+from services.rateio_senior import consultar_titulos
+
+# Mesmas regras de ajustar_dia_semana e calcular_valor_cr, calculadas no Senior para as
+# consultas agregadas (ver migrations/009_add_colunas_calculadas.sql).
+# DATEDIFF(DAY, 0, data) % 7 não depende de SET DATEFIRST: 0 = segunda ... 6 = domingo
+SQL_DATA_AJUSTADA = """
+    CASE DATEDIFF(DAY, 0, E301TCR.DATPPT) % 7
+        WHEN 4 THEN DATEADD(DAY, 3, CAST(E301TCR.DATPPT AS DATE))  -- Sexta -> +3
+        WHEN 5 THEN DATEADD(DAY, 3, CAST(E301TCR.DATPPT AS DATE))  -- Sábado -> +3
+        WHEN 6 THEN DATEADD(DAY, 2, CAST(E301TCR.DATPPT AS DATE))  -- Domingo -> +2
+        ELSE DATEADD(DAY, 1, CAST(E301TCR.DATPPT AS DATE))         -- Segunda a quinta -> +1
+    END
+"""
+
+# RECDEC nulo ou 0 conta como 1, como em obter_contas_receber_do_senior
+SQL_VALOR_CR = """
+    CASE
+        WHEN ISNULL(E301TCR.VLRABE, 0) <> 0 AND COALESCE(NULLIF(E001TNS.RECDEC, 0), 1) = 2 THEN -E301TCR.VLRABE
+        WHEN ISNULL(E301TCR.VLRABE, 0) = 0 AND COALESCE(NULLIF(E001TNS.RECDEC, 0), 1) = 2 THEN -ISNULL(E301TCR.VLRORI, 0)
+        WHEN ISNULL(E301TCR.VLRABE, 0) <> 0 AND COALESCE(NULLIF(E001TNS.RECDEC, 0), 1) = 1 THEN E301TCR.VLRABE
+        ELSE ISNULL(E301TCR.VLRORI, 0)
+    END
+"""
+
+# Filiais consultadas quando nenhuma é informada (todas exceto 2002)
+FILIAIS_PADRAO = ['1001', '1002', '1003', '3001', '3002', '3003']
+
+# Parâmetros das consultas de títulos (ver utils/sql_parametrizado.py)
+PARAMETROS_PERIODO = {'@data_inicio': 'DATE', '@data_fim': 'DATE', '@filiais': 'VARCHAR(MAX)'}
+
+# Colunas dos títulos nas consultas detalhadas (CODCCU/CTAFIN vêm do rateio, ver services/rateio_senior.py)
+COLUNAS_TITULOS = """E301TCR.CODEMP, E301TCR.CODFIL, E301TCR.CODCLI, E085CLI.NOMCLI,
+                E085CLI.CIDCLI, E085CLI.BAICLI, E085CLI.TIPCLI, E301TCR.DATEMI,
+                E301TCR.NUMTIT, E301TCR.SITTIT, E301TCR.CODTPT, E301TCR.VLRABE, E301TCR.VLRORI,
+                E001TNS.RECDEC, E301TCR.VCTPRO, E301TCR.VCTORI, E301TCR.PERMUL, E301TCR.TOLMUL,
+                E301TCR.DATPPT, E002TPT.RECSOM, E070FIL.RECVJM, E070FIL.RECVMM, E070FIL.RECVDM,
+                E301TCR.PERDSC, E301TCR.VLRDSC, E301TCR.TOLJRS, E301TCR.TIPJRS, E301TCR.PERJRS,
+                E301TCR.JRSDIA, E301TCR.CODTNS, E001TNS.DESTNS, E301TCR.OBSTCR, E301TCR.CODREP,
+                E301TCR.NUMCTR, E301TCR.CODSNF, E301TCR.NUMNFV, E301TCR.CODFPG, E085CLI.USU_UNICLI,
+                CASE WHEN YEAR(E301TCR.ULTPGT) = 1900 THEN ''
+                    ELSE CONVERT(VARCHAR(10), E301TCR.ULTPGT, 103)
+                END AS ULTPGT"""
+
+
+def from_where_titulos(juncao_rateio: str = '') -> str:
+    """Títulos em aberto/liquidados com DATPPT no período, comum à consulta detalhada e às agregadas"""
+    return f"""
+    FROM E301TCR{juncao_rateio}, E085CLI, E085HCL, E039POR, E001TNS, E002TPT, E070FIL, E070EMP
+    WHERE E085HCL.CODCLI = E301TCR.CODCLI
+        AND E085HCL.CODEMP = E301TCR.CODEMP
+        AND E085HCL.CODFIL = E301TCR.CODFIL
+        AND E301TCR.CODEMP IN (10,20,30)
+        AND E301TCR.SITTIT IN ('AB','LQ')
+        AND E301TCR.CODEMP = E001TNS.CODEMP
+        AND E301TCR.CODTNS = E001TNS.CODTNS
+        AND E301TCR.CODEMP = E039POR.CODEMP
+        AND E301TCR.CODPOR = E039POR.CODPOR
+        AND E301TCR.CODEMP = E070EMP.CODEMP
+        AND E301TCR.CODEMP = E070FIL.CODEMP
+        AND E301TCR.CODFIL = E070FIL.CODFIL
+        AND E301TCR.CODCLI = E085CLI.CODCLI
+        AND E085HCL.CODCLI = E301TCR.CODCLI
+        AND E085HCL.CODEMP = E301TCR.CODEMP
+        AND E085HCL.CODFIL = E301TCR.CODFIL
+        AND E301TCR.CODTPT = E002TPT.CODTPT
+        AND E301TCR.VLRABE >= 0
+        AND E001TNS.CODEMP = E301TCR.CODEMP
+        AND E001TNS.CODTNS = E301TCR.CODTNS
+        AND E001TNS.LISMOD = 'CRE'
+        AND E301TCR.VCTORI >= '20250101'
+        AND E301TCR.CODTPT NOT IN ('MCM', 'MCR', 'MEM', 'MER', 'SUB')
+        AND E301TCR.CODCLI NOT IN (250,251,304,445,446,448,72473,74207)
+        AND E301TCR.DATPPT >= @data_inicio
+        AND E301TCR.DATPPT <= @data_fim
+        AND E301TCR.CODFIL IN ({sql_lista('@filiais')})
+"""
+
+
+def from_where_liquidados(juncao_rateio: str = '') -> str:
+    """Títulos liquidados com ULTPGT (data do último pagamento) no período"""
+    return f"""
+    FROM E301TCR{juncao_rateio}, E085CLI, E085HCL, E039POR, E001TNS, E002TPT, E070FIL, E070EMP
+    WHERE E085HCL.CODCLI = E301TCR.CODCLI
+        AND E085HCL.CODEMP = E301TCR.CODEMP
+        AND E085HCL.CODFIL = E301TCR.CODFIL
+        AND E301TCR.CODEMP IN (10,20,30)
+        AND E301TCR.SITTIT = 'LQ'
+        AND E301TCR.CODEMP = E001TNS.CODEMP
+        AND E301TCR.CODTNS = E001TNS.CODTNS
+        AND E301TCR.CODEMP = E039POR.CODEMP
+        AND E301TCR.CODPOR = E039POR.CODPOR
+        AND E301TCR.CODEMP = E070EMP.CODEMP
+        AND E301TCR.CODEMP = E070FIL.CODEMP
+        AND E301TCR.CODFIL = E070FIL.CODFIL
+        AND E301TCR.CODCLI = E085CLI.CODCLI
+        AND E085HCL.CODCLI = E301TCR.CODCLI
+        AND E085HCL.CODEMP = E301TCR.CODEMP
+        AND E085HCL.CODFIL = E301TCR.CODFIL
+        AND E301TCR.CODTPT = E002TPT.CODTPT
+        AND E301TCR.VLRABE >= 0
+        AND E001TNS.CODEMP = E301TCR.CODEMP
+        AND E001TNS.CODTNS = E301TCR.CODTNS
+        AND E001TNS.LISMOD = 'CRE'
+        AND E301TCR.VCTORI >= '20250101'
+        AND E301TCR.CODTPT NOT IN ('MCM', 'MCR', 'MEM', 'MER', 'SUB')
+        AND E301TCR.CODCLI NOT IN (250,251,304,445,446,448,72473,74207)
+        AND E301TCR.ULTPGT >= @data_inicio
+        AND E301TCR.ULTPGT <= @data_fim
+        AND YEAR(E301TCR.ULTPGT) != 1900
+        AND E301TCR.CODFIL IN ({sql_lista('@filiais')})
+"""
+
+
+FROM_WHERE_TITULOS = from_where_titulos()
 
 
 class ContasReceberSeniorService:
@@ -90,85 +207,32 @@ class ContasReceberSeniorService:
         return data_inicial, ultimo_dia
 
     @staticmethod
+    def _parametros_periodo(data_inicio: datetime, data_fim: datetime, filiais: Optional[List[str]] = None) -> dict:
+        """Valores de PARAMETROS_PERIODO (sem filiais, usa FILIAIS_PADRAO)"""
+        return {
+            'data_inicio': data_inicio.strftime('%Y%m%d'),
+            'data_fim': data_fim.strftime('%Y%m%d'),
+            'filiais': lista_sql(filiais if filiais else FILIAIS_PADRAO)
+        }
+
+    @staticmethod
+    def _parametros_titulos(periodo: str, filiais: Optional[List[str]] = None) -> dict:
+        """Parâmetros de FROM_WHERE_TITULOS: janela de DATPPT de obter_primeiro_ultimo_dia_mes"""
+        data_inicio, data_fim = ContasReceberSeniorService.obter_primeiro_ultimo_dia_mes(periodo)
+        return ContasReceberSeniorService._parametros_periodo(data_inicio, data_fim, filiais)
+
+    @staticmethod
+    @cache_senior.memoizar
+    @single_flight_senior.agrupar
     def obter_contas_receber_do_senior(periodo: str, filiais: Optional[List[str]] = None) -> List[dict]:
         """
         Busca contas a receber do Senior para o período especificado
         """
         try:
-            # Obtém primeiro e último dia do mês
-            data_inicio, data_fim = ContasReceberSeniorService.obter_primeiro_ultimo_dia_mes(periodo)
-
-            # Formata datas para SQL
-            data_inicio_str = data_inicio.strftime('%Y%m%d')
-            data_fim_str = data_fim.strftime('%Y%m%d')
-
-            # Monta filtro de filiais
-            filiais_filter = ""
-            if filiais and len(filiais) > 0:
-                # Remove espaços e converte para string
-                filiais_str = ','.join([f"'{f.strip()}'" for f in filiais])
-                filiais_filter = f"AND E301TCR.CODFIL IN ({filiais_str})"
-            else:
-                # Se não especificou filiais, usa as padrão (todas exceto 2002)
-                filiais_filter = "AND E301TCR.CODFIL IN ('1001','1002','1003','3001','3002','3003')"
-
-            # Query SQL
-            query = f"""
-            SELECT E301TCR.CODEMP, E301TCR.CODFIL, E301TCR.CODCLI, E085CLI.NOMCLI,
-                E085CLI.CIDCLI, E085CLI.BAICLI, E085CLI.TIPCLI, E301TCR.DATEMI,
-                E301TCR.NUMTIT, E301TCR.SITTIT, E301TCR.CODTPT, E301TCR.VLRABE, E301TCR.VLRORI,
-                E001TNS.RECDEC, E301TCR.VCTPRO, E301TCR.VCTORI, E301TCR.PERMUL, E301TCR.TOLMUL,
-                E301TCR.DATPPT, E002TPT.RECSOM, E070FIL.RECVJM, E070FIL.RECVMM, E070FIL.RECVDM,
-                E301TCR.PERDSC, E301TCR.VLRDSC, E301TCR.TOLJRS, E301TCR.TIPJRS, E301TCR.PERJRS,
-                E301TCR.JRSDIA, E301TCR.CODTNS, E001TNS.DESTNS, E301TCR.OBSTCR, E301TCR.CODREP,
-                E301TCR.NUMCTR, E301TCR.CODSNF, E301TCR.NUMNFV, E301TCR.CODFPG, E085CLI.USU_UNICLI,
-                CASE WHEN YEAR(E301TCR.ULTPGT) = 1900 THEN ''
-                    ELSE CONVERT(VARCHAR(10), E301TCR.ULTPGT, 103)
-                END AS ULTPGT,
-                ISNULL((SELECT TOP 1 E301RAT.CODCCU FROM E301RAT
-                         WHERE E301RAT.CODEMP = E301TCR.CODEMP
-                            AND E301RAT.CODFIL = E301TCR.CODFIL
-                            AND E301RAT.NUMTIT = E301TCR.NUMTIT
-                            AND E301RAT.CODTPT = E301TCR.CODTPT
-                          ), 0) AS CODCCU,
-                ISNULL((SELECT TOP 1 E301RAT.CTAFIN FROM E301RAT
-                         WHERE E301RAT.CODEMP = E301TCR.CODEMP
-                            AND E301RAT.CODFIL = E301TCR.CODFIL
-                            AND E301RAT.NUMTIT = E301TCR.NUMTIT
-                            AND E301RAT.CODTPT = E301TCR.CODTPT
-                          ), 0) AS CTAFIN
-            FROM E301TCR, E085CLI, E085HCL, E039POR, E001TNS, E002TPT, E070FIL, E070EMP
-            WHERE E085HCL.CODCLI = E301TCR.CODCLI
-                AND E085HCL.CODEMP = E301TCR.CODEMP
-                AND E085HCL.CODFIL = E301TCR.CODFIL
-                AND E301TCR.CODEMP IN (10,20,30)
-                AND E301TCR.SITTIT IN ('AB','LQ')
-                AND E301TCR.CODEMP = E001TNS.CODEMP
-                AND E301TCR.CODTNS = E001TNS.CODTNS
-                AND E301TCR.CODEMP = E039POR.CODEMP
-                AND E301TCR.CODPOR = E039POR.CODPOR
-                AND E301TCR.CODEMP = E070EMP.CODEMP
-                AND E301TCR.CODEMP = E070FIL.CODEMP
-                AND E301TCR.CODFIL = E070FIL.CODFIL
-                AND E301TCR.CODCLI = E085CLI.CODCLI
-                AND E085HCL.CODCLI = E301TCR.CODCLI
-                AND E085HCL.CODEMP = E301TCR.CODEMP
-                AND E085HCL.CODFIL = E301TCR.CODFIL
-                AND E301TCR.CODTPT = E002TPT.CODTPT
-                AND E301TCR.VLRABE >= 0
-                AND E001TNS.CODEMP = E301TCR.CODEMP
-                AND E001TNS.CODTNS = E301TCR.CODTNS
-                AND E001TNS.LISMOD = 'CRE'
-                AND E301TCR.VCTORI >= '20250101'
-                AND E301TCR.CODTPT NOT IN ('MCM', 'MCR', 'MEM', 'MER', 'SUB')
-                AND E301TCR.CODCLI NOT IN (250,251,304,445,446,448,72473,74207)
-                AND E301TCR.DATPPT >= '{data_inicio_str}'
-                AND E301TCR.DATPPT <= '{data_fim_str}'
-                {filiais_filter}
-            """
-
-            # Executa query
-            resultados = senior_db.execute_query(query)
+            # Títulos do período (SQL constante, período e filiais como parâmetros), com o rateio
+            # resolvido conforme settings.SENIOR_RATEIO_MODO
+            parametros = ContasReceberSeniorService._parametros_titulos(periodo, filiais)
+            resultados = consultar_titulos(senior_db, COLUNAS_TITULOS, from_where_titulos, PARAMETROS_PERIODO, parametros)
 
             # Processa resultados e aplica ajustes
             registros_processados = []
@@ -202,47 +266,41 @@ class ContasReceberSeniorService:
             raise Exception(f"Erro ao buscar contas a receber do Senior: {str(e)}")
 
     @staticmethod
+    @cache_senior.memoizar
+    @single_flight_senior.agrupar
     def obter_resumo_por_dia(periodo: str, filiais: Optional[List[str]] = None) -> List[dict]:
         """
         Retorna resumo de contas a receber agrupado por dia
         Filtra apenas datas ajustadas que sejam dias úteis do mês solicitado
+        A data ajustada, o VALOR_CR e o agrupamento são calculados no Senior:
+        volta uma linha por dia em vez de todos os títulos detalhados
         """
         try:
-            # Busca contas do Senior
-            contas = ContasReceberSeniorService.obter_contas_receber_do_senior(periodo, filiais)
-
-            # Agrupa por data ajustada
-            resumo_por_dia = {}
-            for conta in contas:
-                data_str = conta.get('DATA_AJUSTADA_STR')
-                if not data_str:
-                    continue
-
-                # Filtra apenas datas ajustadas que pertencem ao período solicitado
-                # e que sejam dias úteis (segunda a sexta)
-                ano_mes_data = data_str[:7]  # YYYY-MM
-                if ano_mes_data != periodo:
-                    continue
-
-                # Verifica se é dia útil (segunda a sexta)
-                data_obj = conta.get('DATA_AJUSTADA')
-                if data_obj and data_obj.weekday() > 4:  # 5=sábado, 6=domingo
-                    continue
-
-                if data_str not in resumo_por_dia:
-                    resumo_por_dia[data_str] = {
-                        'data': data_str,
-                        'total': 0,
-                        'quantidade': 0
-                    }
+            query = f"""
+            WITH titulos AS (
+                SELECT
+                    {SQL_DATA_AJUSTADA} AS DATA_AJUSTADA,
+                    {SQL_VALOR_CR} AS VALOR_CR
+                {FROM_WHERE_TITULOS}
+            )
+            SELECT
+                CONVERT(VARCHAR(10), DATA_AJUSTADA, 23) AS data,
+                SUM(VALOR_CR) AS total,
+                COUNT(*) AS quantidade
+            FROM titulos
+            WHERE DATA_AJUSTADA BETWEEN @mes_inicio AND @mes_fim  -- Apenas o mês solicitado
+                AND DATEDIFF(DAY, 0, DATA_AJUSTADA) % 7 < 5  -- Apenas dias úteis (segunda a sexta)
+            GROUP BY DATA_AJUSTADA
+            ORDER BY DATA_AJUSTADA
+            """
 
-                resumo_por_dia[data_str]['total'] += conta.get('VALOR_CR', 0)
-                resumo_por_dia[data_str]['quantidade'] += 1
+            ano, mes = map(int, periodo.split('-'))
+            parametros = ContasReceberSeniorService._parametros_titulos(periodo, filiais)
+            parametros['mes_inicio'] = datetime(ano, mes, 1).strftime('%Y%m%d')
+            parametros['mes_fim'] = datetime(ano, mes, calendar.monthrange(ano, mes)[1]).strftime('%Y%m%d')
 
-            # Converte para lista e ordena por data
-            resultado = sorted(resumo_por_dia.values(), key=lambda x: x['data'])
-
-            return resultado
+            consulta = ConsultaParametrizada(query, {**PARAMETROS_PERIODO, '@mes_inicio': 'DATE', '@mes_fim': 'DATE'})
+            return consulta.executar(senior_db, **parametros)
 
         except Exception as e:
             print(f"Erro ao obter resumo por dia: {str(e)}")
@@ -299,6 +357,8 @@ class ContasReceberSeniorService:
             raise Exception(f"Erro ao obter resumo liquidado por dia: {str(e)}")
 
     @staticmethod
+    @cache_senior.memoizar
+    @single_flight_senior.agrupar
     def obter_contas_receber_liquidadas_do_senior(periodo: str, filiais: Optional[List[str]] = None) -> List[dict]:
         """
         Busca contas a receber LIQUIDADAS do Senior para o período especificado
@@ -312,77 +372,10 @@ class ContasReceberSeniorService:
             data_inicio = datetime(ano, mes, 1)
             data_fim = datetime(ano, mes, ultimo_dia_mes)
 
-            # Formata datas para SQL
-            data_inicio_str = data_inicio.strftime('%Y%m%d')
-            data_fim_str = data_fim.strftime('%Y%m%d')
-
-            # Monta filtro de filiais
-            filiais_filter = ""
-            if filiais and len(filiais) > 0:
-                filiais_str = ','.join([f"'{f.strip()}'" for f in filiais])
-                filiais_filter = f"AND E301TCR.CODFIL IN ({filiais_str})"
-            else:
-                filiais_filter = "AND E301TCR.CODFIL IN ('1001','1002','1003','3001','3002','3003')"
-
-            # Query SQL - APENAS TÍTULOS LIQUIDADOS (SITTIT = 'LQ')
+            # APENAS TÍTULOS LIQUIDADOS (SITTIT = 'LQ')
             # Filtra por ULTPGT (data de último pagamento) ao invés de DATPPT
-            query = f"""
-            SELECT E301TCR.CODEMP, E301TCR.CODFIL, E301TCR.CODCLI, E085CLI.NOMCLI,
-                E085CLI.CIDCLI, E085CLI.BAICLI, E085CLI.TIPCLI, E301TCR.DATEMI,
-                E301TCR.NUMTIT, E301TCR.SITTIT, E301TCR.CODTPT, E301TCR.VLRABE, E301TCR.VLRORI,
-                E001TNS.RECDEC, E301TCR.VCTPRO, E301TCR.VCTORI, E301TCR.PERMUL, E301TCR.TOLMUL,
-                E301TCR.DATPPT, E002TPT.RECSOM, E070FIL.RECVJM, E070FIL.RECVMM, E070FIL.RECVDM,
-                E301TCR.PERDSC, E301TCR.VLRDSC, E301TCR.TOLJRS, E301TCR.TIPJRS, E301TCR.PERJRS,
-                E301TCR.JRSDIA, E301TCR.CODTNS, E001TNS.DESTNS, E301TCR.OBSTCR, E301TCR.CODREP,
-                E301TCR.NUMCTR, E301TCR.CODSNF, E301TCR.NUMNFV, E301TCR.CODFPG, E085CLI.USU_UNICLI,
-                CASE WHEN YEAR(E301TCR.ULTPGT) = 1900 THEN ''
-                    ELSE CONVERT(VARCHAR(10), E301TCR.ULTPGT, 103)
-                END AS ULTPGT,
-                ISNULL((SELECT TOP 1 E301RAT.CODCCU FROM E301RAT
-                         WHERE E301RAT.CODEMP = E301TCR.CODEMP
-                            AND E301RAT.CODFIL = E301TCR.CODFIL
-                            AND E301RAT.NUMTIT = E301TCR.NUMTIT
-                            AND E301RAT.CODTPT = E301TCR.CODTPT
-                          ), 0) AS CODCCU,
-                ISNULL((SELECT TOP 1 E301RAT.CTAFIN FROM E301RAT
-                         WHERE E301RAT.CODEMP = E301TCR.CODEMP
-                            AND E301RAT.CODFIL = E301TCR.CODFIL
-                            AND E301RAT.NUMTIT = E301TCR.NUMTIT
-                            AND E301RAT.CODTPT = E301TCR.CODTPT
-                          ), 0) AS CTAFIN
-            FROM E301TCR, E085CLI, E085HCL, E039POR, E001TNS, E002TPT, E070FIL, E070EMP
-            WHERE E085HCL.CODCLI = E301TCR.CODCLI
-                AND E085HCL.CODEMP = E301TCR.CODEMP
-                AND E085HCL.CODFIL = E301TCR.CODFIL
-                AND E301TCR.CODEMP IN (10,20,30)
-                AND E301TCR.SITTIT = 'LQ'
-                AND E301TCR.CODEMP = E001TNS.CODEMP
-                AND E301TCR.CODTNS = E001TNS.CODTNS
-                AND E301TCR.CODEMP = E039POR.CODEMP
-                AND E301TCR.CODPOR = E039POR.CODPOR
-                AND E301TCR.CODEMP = E070EMP.CODEMP
-                AND E301TCR.CODEMP = E070FIL.CODEMP
-                AND E301TCR.CODFIL = E070FIL.CODFIL
-                AND E301TCR.CODCLI = E085CLI.CODCLI
-                AND E085HCL.CODCLI = E301TCR.CODCLI
-                AND E085HCL.CODEMP = E301TCR.CODEMP
-                AND E085HCL.CODFIL = E301TCR.CODFIL
-                AND E301TCR.CODTPT = E002TPT.CODTPT
-                AND E301TCR.VLRABE >= 0
-                AND E001TNS.CODEMP = E301TCR.CODEMP
-                AND E001TNS.CODTNS = E301TCR.CODTNS
-                AND E001TNS.LISMOD = 'CRE'
-                AND E301TCR.VCTORI >= '20250101'
-                AND E301TCR.CODTPT NOT IN ('MCM', 'MCR', 'MEM', 'MER', 'SUB')
-                AND E301TCR.CODCLI NOT IN (250,251,304,445,446,448,72473,74207)
-                AND E301TCR.ULTPGT >= '{data_inicio_str}'
-                AND E301TCR.ULTPGT <= '{data_fim_str}'
-                AND YEAR(E301TCR.ULTPGT) != 1900
-                {filiais_filter}
-            """
-
-            # Executa query
-            resultados = senior_db.execute_query(query)
+            parametros = ContasReceberSeniorService._parametros_periodo(data_inicio, data_fim, filiais)
+            resultados = consultar_titulos(senior_db, COLUNAS_TITULOS, from_where_liquidados, PARAMETROS_PERIODO, parametros)
 
             # Processa resultados SEM ajustes de data ou valor
             registros_processados = []
@@ -418,19 +411,28 @@ class ContasReceberSeniorService:
             raise Exception(f"Erro ao buscar contas liquidadas do Senior: {str(e)}")
 
     @staticmethod
+    @cache_senior.memoizar
+    @single_flight_senior.agrupar
     def obter_total_periodo(periodo: str, filiais: Optional[List[str]] = None) -> dict:
         """
         Retorna o total de contas a receber para o período
+        (todos os títulos da consulta detalhada, somados no Senior)
         """
         try:
-            contas = ContasReceberSeniorService.obter_contas_receber_do_senior(periodo, filiais)
+            query = f"""
+            SELECT
+                ISNULL(SUM({SQL_VALOR_CR}), 0) AS total,
+                COUNT(*) AS quantidade
+            {FROM_WHERE_TITULOS}
+            """
 
-            total = sum(conta.get('VALOR_CR', 0) for conta in contas)
-            quantidade = len(contas)
+            parametros = ContasReceberSeniorService._parametros_titulos(periodo, filiais)
+            resultado = ConsultaParametrizada(query, PARAMETROS_PERIODO).executar(senior_db, **parametros)
+            linha = resultado[0] if resultado else {}
 
             return {
-                'total': total,
-                'quantidade': quantidade,
+                'total': linha.get('total') or 0,
+                'quantidade': linha.get('quantidade') or 0,
                 'periodo': periodo
             }
 
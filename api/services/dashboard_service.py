@@ -1,14 +1,39 @@
+import asyncio
+import time
 from datetime import date, datetime, timedelta
-from typing import List, Dict
+from typing import Any, Callable, List, Dict
 from services.contas_receber_local_service import ContasReceberLocalService
 from services.contas_pagar_local_service import ContasPagarLocalService
+from services.snapshot_analitico import snapshot_analitico
+from services.projecao_service import ProjecaoService, MESES_PADRAO, PONDERACAO_PADRAO, FATOR_EXPONENCIAL_PADRAO
 from utils.calculos import calcular_percentual_mudanca
+from utils.cache import cache_consultas
+from utils.periodos import periodo_anterior
+from database import db
+from executor import executar
 import pytz
 from config import settings
 
 
+def _medir(func: Callable, *args) -> tuple[Any, float]:
+    """Executa func e devolve (resultado, tempo em ms) - roda dentro do pool, sem contar a espera na fila"""
+    inicio = time.perf_counter()
+    resultado = func(*args)
+    return resultado, round((time.perf_counter() - inicio) * 1000, 2)
+
+
+def _medir_em_sequencia(*consultas: tuple) -> List[tuple[Any, float]]:
+    """Executa as consultas (func, *args) uma após a outra numa só tarefa do pool: [(resultado, tempo em ms), ...]"""
+    return [_medir(*consulta) for consulta in consultas]
+
+
 class DashboardService:
-    """Service para operações do Dashboard"""
+    """
+    Service para operações do Dashboard
+    Totais, séries diárias e rankings são respondidos pelo snapshot em memória
+    (services/snapshot_analitico.py) quando ele está carregado; senão, pelas
+    consultas dos services locais.
+    """
 
     @staticmethod
     def get_timezone():
@@ -87,6 +112,13 @@ class DashboardService:
 
         return (inicio.strftime('%Y-%m-%d'), fim.strftime('%Y-%m-%d'))
 
+    @staticmethod
+    def usa_projecao_despesas(data_inicio: str) -> bool:
+        """Despesas do resumo usam projeção quando o período começa no mês atual ou depois"""
+        inicio = datetime.strptime(data_inicio, '%Y-%m-%d').date()
+        hoje = datetime.now(DashboardService.get_timezone()).date()
+        return inicio >= date(hoje.year, hoje.month, 1)
+
     @staticmethod
     def obter_resumo_financeiro(periodo: str = "mes-atual", filiais: List[str] = None) -> Dict:
         """Obtém resumo financeiro consolidado"""
@@ -94,31 +126,28 @@ class DashboardService:
         # Converte período em datas
         data_inicio, data_fim = DashboardService.obter_periodo_datas(periodo)
 
-        # Converte strings para objetos date
-        inicio = datetime.strptime(data_inicio, '%Y-%m-%d').date()
+        # Totais do período e do período anterior (receitas e despesas) de uma vez
+        totais = DashboardService._obter_totais_resumo(data_inicio, data_fim, filiais)
 
-        # Obtém data atual
-        tz = DashboardService.get_timezone()
-        hoje = datetime.now(tz).date()
-        mes_atual_inicio = date(hoje.year, hoje.month, 1)
-
-        # Define se usa projeção para despesas (mês atual ou futuro)
-        usar_projecao_despesas = inicio >= mes_atual_inicio
+        # Despesas: usa projeção com média dos últimos 3 meses se for mês atual ou futuro
+        despesas_projetadas = None
+        if DashboardService.usa_projecao_despesas(data_inicio):
+            despesas_projetadas = ContasPagarLocalService.calcular_total_despesas_projetado(data_inicio, data_fim, filiais)
 
-        # Busca totais do período atual
-        receitas_total = ContasReceberLocalService.calcular_total_receitas(data_inicio, data_fim, filiais)
+        return DashboardService.montar_resumo(data_inicio, data_fim, totais, despesas_projetadas)
 
-        # Despesas: usa projeção com média dos últimos 3 meses se for mês atual ou futuro
-        if usar_projecao_despesas:
-            despesas_total = ContasPagarLocalService.calcular_total_despesas_projetado(data_inicio, data_fim, filiais)
-        else:
-            despesas_total = ContasPagarLocalService.calcular_total_despesas(data_inicio, data_fim, filiais)
+    @staticmethod
+    def montar_resumo(data_inicio: str, data_fim: str, totais: Dict[str, float], despesas_projetadas: float = None) -> Dict:
+        """
+        Monta o resumo a partir dos totais de _obter_totais_resumo
+        despesas_projetadas, quando informado, substitui as despesas do período
+        """
+        receitas_total = totais['receitas_atual']
+        receitas_anterior = totais['receitas_anterior']
+        despesas_anterior = totais['despesas_anterior']
+        despesas_total = totais['despesas_atual'] if despesas_projetadas is None else despesas_projetadas
 
         saldo_atual = receitas_total - despesas_total
-
-        # Busca totais do período anterior para comparação
-        receitas_anterior = ContasReceberLocalService.calcular_total_periodo_anterior(data_inicio, data_fim, filiais)
-        despesas_anterior = ContasPagarLocalService.calcular_total_periodo_anterior(data_inicio, data_fim, filiais)
         saldo_anterior = receitas_anterior - despesas_anterior
 
         # Calcula percentuais de mudança
@@ -138,6 +167,85 @@ class DashboardService:
             'percentual_mudanca_despesa': round(percentual_despesa, 1)
         }
 
+    @staticmethod
+    @cache_consultas.memoizar
+    def _obter_totais_resumo(data_inicio: str, data_fim: str, filiais: List[str] = None) -> Dict[str, float]:
+        """
+        Totais de receitas e despesas do período e do período anterior (mesma duração)
+        Usa o snapshot em memória; sem ele, uma única consulta com agregação condicional
+        sobre os dois agregados diários, lidos uma vez no intervalo que cobre os dois períodos
+
+        Returns:
+            {'receitas_atual', 'despesas_atual', 'receitas_anterior', 'despesas_anterior'}
+        """
+        inicio_anterior, fim_anterior = periodo_anterior(data_inicio, data_fim)
+
+        snapshot = snapshot_analitico.obter()
+        if snapshot:
+            return {
+                'receitas_atual': snapshot.total('contas_receber', data_inicio, data_fim, filiais),
+                'despesas_atual': snapshot.total('contas_pagar', data_inicio, data_fim, filiais),
+                'receitas_anterior': snapshot.total('contas_receber', inicio_anterior, fim_anterior, filiais),
+                'despesas_anterior': snapshot.total('contas_pagar', inicio_anterior, fim_anterior, filiais)
+            }
+
+        filtro_filiais = ""
+        params_filiais = []
+        if filiais:
+            filtro_filiais = f" AND codfil IN ({','.join(['%s'] * len(filiais))})"
+            params_filiais = list(filiais)
+
+        query = f"""
+        WITH lancamentos AS (
+            SELECT 'R' AS tipo, data_ajustada, valor_calculado
+            FROM fato_diario_receber
+            WHERE data_ajustada BETWEEN %s AND %s{filtro_filiais}
+
+            UNION ALL
+
+            SELECT 'D' AS tipo, data_ajustada, valor_calculado
+            FROM fato_diario_pagar
+            WHERE data_ajustada BETWEEN %s AND %s{filtro_filiais}
+        )
+        SELECT
+            CAST(SUM(CASE WHEN tipo = 'R' AND data_ajustada BETWEEN %s AND %s THEN valor_calculado END) AS DECIMAL(18,2)) AS receitas_atual,
+            CAST(SUM(CASE WHEN tipo = 'D' AND data_ajustada BETWEEN %s AND %s THEN valor_calculado END) AS DECIMAL(18,2)) AS despesas_atual,
+            CAST(SUM(CASE WHEN tipo = 'R' AND data_ajustada BETWEEN %s AND %s THEN valor_calculado END) AS DECIMAL(18,2)) AS receitas_anterior,
+            CAST(SUM(CASE WHEN tipo = 'D' AND data_ajustada BETWEEN %s AND %s THEN valor_calculado END) AS DECIMAL(18,2)) AS despesas_anterior
+        FROM lancamentos
+        """
+
+        # O período anterior termina no dia anterior ao início: os dois formam um intervalo contínuo
+        params = (
+            [inicio_anterior, data_fim] + params_filiais
+            + [inicio_anterior, data_fim] + params_filiais
+            + [data_inicio, data_fim, data_inicio, data_fim]
+            + [inicio_anterior, fim_anterior, inicio_anterior, fim_anterior]
+        )
+
+        results = db.execute_query(query, tuple(params))
+        linha = results[0] if results else {}
+
+        # Mesmo tratamento dos totais dos services locais: NULL -> 0 e nunca negativo
+        return {coluna: max(float(linha.get(coluna) or 0), 0) for coluna in (
+            'receitas_atual', 'despesas_atual', 'receitas_anterior', 'despesas_anterior'
+        )}
+
+    @staticmethod
+    @cache_consultas.memoizar
+    def _obter_dados_diarios(data_inicio: str, data_fim: str, filiais: List[str] = None) -> tuple[List[Dict], List[Dict]]:
+        """Totais diários de receitas e despesas (snapshot em memória ou banco local)"""
+        snapshot = snapshot_analitico.obter()
+        if snapshot:
+            return (
+                snapshot.dados_diarios('contas_receber', data_inicio, data_fim, filiais),
+                snapshot.dados_diarios('contas_pagar', data_inicio, data_fim, filiais)
+            )
+        return (
+            ContasReceberLocalService.obter_dados_diarios(data_inicio, data_fim, filiais),
+            ContasPagarLocalService.obter_dados_diarios(data_inicio, data_fim, filiais)
+        )
+
     @staticmethod
     def obter_dados_grafico_mensal(periodo: str = "mes-atual", filiais: List[str] = None) -> List[Dict]:
         """
@@ -148,24 +256,19 @@ class DashboardService:
         # Converte período em datas
         data_inicio, data_fim = DashboardService.obter_periodo_datas(periodo)
 
-        # Converte strings para objetos date
-        inicio = datetime.strptime(data_inicio, '%Y-%m-%d').date()
-        fim = datetime.strptime(data_fim, '%Y-%m-%d').date()
-
-        # Obtém data atual
-        tz = DashboardService.get_timezone()
-        hoje = datetime.now(tz).date()
-        mes_atual_inicio = date(hoje.year, hoje.month, 1)
-
         # IMPORTANTE: Sempre usa dados reais, sem projeção
         # A projeção foi removida porque estava descartando dados reais
         # Se precisar de projeção no futuro, deve ser implementada em um endpoint separado
 
-        # Contas a Receber: dados reais
-        receitas_diarias = ContasReceberLocalService.obter_dados_diarios(data_inicio, data_fim, filiais)
+        # Contas a Receber e a Pagar: dados reais (sem projeção)
+        receitas_diarias, despesas_diarias = DashboardService._obter_dados_diarios(data_inicio, data_fim, filiais)
+        return DashboardService.montar_grafico_diario(data_inicio, data_fim, receitas_diarias, despesas_diarias)
 
-        # Contas a Pagar: dados reais (sem projeção)
-        despesas_diarias = ContasPagarLocalService.obter_dados_diarios(data_inicio, data_fim, filiais)
+    @staticmethod
+    def montar_grafico_diario(data_inicio: str, data_fim: str, receitas_diarias: List[Dict], despesas_diarias: List[Dict]) -> List[Dict]:
+        """Monta o gráfico de receitas x despesas (um item por dia do período) a partir dos totais diários"""
+        inicio = datetime.strptime(data_inicio, '%Y-%m-%d').date()
+        fim = datetime.strptime(data_fim, '%Y-%m-%d').date()
 
         # Converte para dicionário para fácil acesso (chave: data)
         receitas_dict = {r['data']: r['total'] for r in receitas_diarias}
@@ -260,6 +363,14 @@ class DashboardService:
         Obtém as maiores despesas por conta reduzida (CTARED) usando plano_financeiro
         """
         data_inicio, data_fim = DashboardService.obter_periodo_datas(periodo)
+        return DashboardService._top_despesas(data_inicio, data_fim, limit, filiais)
+
+    @staticmethod
+    @cache_consultas.memoizar
+    def _top_despesas(data_inicio: str, data_fim: str, limit: int = 10, filiais: List[str] = None) -> List[Dict]:
+        snapshot = snapshot_analitico.obter()
+        if snapshot:
+            return snapshot.top_contas('contas_pagar', data_inicio, data_fim, limit, filiais)
         return ContasPagarLocalService.obter_top_despesas(data_inicio, data_fim, limit, filiais)
 
     @staticmethod
@@ -268,6 +379,14 @@ class DashboardService:
         Obtém os maiores fornecedores por valor de despesa
         """
         data_inicio, data_fim = DashboardService.obter_periodo_datas(periodo)
+        return DashboardService._top_fornecedores(data_inicio, data_fim, limit)
+
+    @staticmethod
+    @cache_consultas.memoizar
+    def _top_fornecedores(data_inicio: str, data_fim: str, limit: int = 10) -> List[Dict]:
+        snapshot = snapshot_analitico.obter()
+        if snapshot:
+            return snapshot.top_entidades('contas_pagar', data_inicio, data_fim, limit)
         return ContasPagarLocalService.obter_top_fornecedores(data_inicio, data_fim, limit)
 
     @staticmethod
@@ -276,6 +395,14 @@ class DashboardService:
         Obtém as maiores receitas por conta reduzida (CTAFIN) usando plano_financeiro
         """
         data_inicio, data_fim = DashboardService.obter_periodo_datas(periodo)
+        return DashboardService._top_receitas(data_inicio, data_fim, limit, filiais)
+
+    @staticmethod
+    @cache_consultas.memoizar
+    def _top_receitas(data_inicio: str, data_fim: str, limit: int = 10, filiais: List[str] = None) -> List[Dict]:
+        snapshot = snapshot_analitico.obter()
+        if snapshot:
+            return snapshot.top_contas('contas_receber', data_inicio, data_fim, limit, filiais)
         return ContasReceberLocalService.obter_top_receitas(data_inicio, data_fim, limit, filiais)
 
     @staticmethod
@@ -284,6 +411,14 @@ class DashboardService:
         Obtém os maiores clientes por valor de receita
         """
         data_inicio, data_fim = DashboardService.obter_periodo_datas(periodo)
+        return DashboardService._top_clientes(data_inicio, data_fim, limit)
+
+    @staticmethod
+    @cache_consultas.memoizar
+    def _top_clientes(data_inicio: str, data_fim: str, limit: int = 10) -> List[Dict]:
+        snapshot = snapshot_analitico.obter()
+        if snapshot:
+            return snapshot.top_entidades('contas_receber', data_inicio, data_fim, limit)
         return ContasReceberLocalService.obter_top_clientes(data_inicio, data_fim, limit)
 
     @staticmethod
@@ -292,8 +427,31 @@ class DashboardService:
         Obtém despesas agrupadas por centro de custo
         """
         data_inicio, data_fim = DashboardService.obter_periodo_datas(periodo)
+        return DashboardService._despesas_por_centro_custo(data_inicio, data_fim)
+
+    @staticmethod
+    @cache_consultas.memoizar
+    def _despesas_por_centro_custo(data_inicio: str, data_fim: str) -> List[Dict]:
+        snapshot = snapshot_analitico.obter()
+        if snapshot:
+            return snapshot.despesas_por_centro_custo(data_inicio, data_fim)
         return ContasPagarLocalService.obter_despesas_por_centro_custo(data_inicio, data_fim)
 
+    @staticmethod
+    def obter_projecao_despesas(
+        periodo: str = "mes-atual",
+        filiais: List[str] = None,
+        meses: int = MESES_PADRAO,
+        ponderacao: str = PONDERACAO_PADRAO,
+        fator: float = FATOR_EXPONENCIAL_PADRAO
+    ) -> Dict:
+        """
+        Obtém a projeção de despesas do período: série diária, total e detalhe por conta
+        A média usa a janela (meses) e a ponderação informadas
+        """
+        data_inicio, data_fim = DashboardService.obter_periodo_datas(periodo)
+        return ProjecaoService.projetar_local(data_inicio, data_fim, filiais, meses, ponderacao, fator)
+
     @staticmethod
     def obter_fluxo_caixa_projetado(periodo: str = "mes-atual", filiais: List[str] = None) -> List[Dict]:
         """
@@ -302,9 +460,12 @@ class DashboardService:
         data_inicio, data_fim = DashboardService.obter_periodo_datas(periodo)
 
         # Obtém dados diários
-        receitas_diarias = ContasReceberLocalService.obter_dados_diarios(data_inicio, data_fim, filiais)
-        despesas_diarias = ContasPagarLocalService.obter_dados_diarios(data_inicio, data_fim, filiais)
+        receitas_diarias, despesas_diarias = DashboardService._obter_dados_diarios(data_inicio, data_fim, filiais)
+        return DashboardService.montar_fluxo_caixa(data_inicio, data_fim, receitas_diarias, despesas_diarias)
 
+    @staticmethod
+    def montar_fluxo_caixa(data_inicio: str, data_fim: str, receitas_diarias: List[Dict], despesas_diarias: List[Dict]) -> List[Dict]:
+        """Monta o fluxo de caixa (saldo acumulado dia a dia) a partir dos totais diários"""
         # Converte para dicionário para fácil acesso
         receitas_dict = {r['data']: r['total'] for r in receitas_diarias}
         despesas_dict = {d['data']: d['total'] for d in despesas_diarias}
@@ -339,3 +500,88 @@ class DashboardService:
             data_atual += timedelta(days=1)
 
         return dados
+
+    @staticmethod
+    async def obter_overview(periodo: str = "mes-atual", filiais: List[str] = None, limit: int = 10) -> Dict:
+        """
+        Todos os widgets do dashboard numa resposta (/api/dashboard/overview)
+
+        O período é resolvido uma vez. As consultas independentes (totais diários,
+        totais do resumo, rankings, centro de custo e, para mês atual/futuro, a
+        projeção de despesas) rodam no pool 'local': em paralelo quando vão ao
+        banco; com o snapshot carregado, as leituras em memória vão juntas numa só
+        tarefa. Resumo, gráfico e fluxo de caixa são montados a partir desses
+        resultados, sem nova consulta.
+        Os rankings de fornecedores/clientes e o centro de custo não filtram por
+        filial, como nos endpoints individuais.
+
+        Returns:
+            {'periodo_inicio', 'periodo_fim', 'widgets': {...}, 'tempos_ms': {...}, 'tempo_total_ms'}
+        """
+        inicio = time.perf_counter()
+        data_inicio, data_fim = DashboardService.obter_periodo_datas(periodo)
+        usar_projecao = DashboardService.usa_projecao_despesas(data_inicio)
+
+        consultas = {
+            'dados_diarios': (DashboardService._obter_dados_diarios, data_inicio, data_fim, filiais),
+            'totais': (DashboardService._obter_totais_resumo, data_inicio, data_fim, filiais),
+            'top_despesas': (DashboardService._top_despesas, data_inicio, data_fim, limit, filiais),
+            'top_receitas': (DashboardService._top_receitas, data_inicio, data_fim, limit, filiais),
+            'top_fornecedores': (DashboardService._top_fornecedores, data_inicio, data_fim, limit),
+            'top_clientes': (DashboardService._top_clientes, data_inicio, data_fim, limit),
+            'despesas_por_centro_custo': (DashboardService._despesas_por_centro_custo, data_inicio, data_fim),
+        }
+        if usar_projecao:
+            consultas['projecao_despesas'] = (ProjecaoService.projetar_local, data_inicio, data_fim, filiais)
+
+        # Com o snapshot carregado as consultas levam poucos ms: uma tarefa para todas (mais uma
+        # para a projeção) em vez de 7-8, para que cargas simultâneas do overview não encham a
+        # fila do pool 'local' (EXECUTOR_LOCAL_MAX_FILA) e virem 503. Sem o snapshot, cada
+        # consulta vai ao banco e roda em paralelo.
+        if snapshot_analitico.obter():
+            em_memoria = [nome for nome in consultas if nome != 'projecao_despesas']
+            lotes = [em_memoria] + [[nome] for nome in consultas if nome not in em_memoria]
+        else:
+            lotes = [[nome] for nome in consultas]
+
+        # Uma falha em qualquer consulta derruba a resposta inteira, como nos endpoints individuais
+        resultados = await asyncio.gather(*(
+            executar('local', _medir_em_sequencia, *(consultas[nome] for nome in lote)) for lote in lotes
+        ))
+
+        dados = {}
+        tempos_ms = {}
+        for lote, resultados_lote in zip(lotes, resultados):
+            for nome, (resultado, tempo_ms) in zip(lote, resultados_lote):
+                dados[nome] = resultado
+                tempos_ms[nome] = tempo_ms
+
+        receitas_diarias, despesas_diarias = dados.pop('dados_diarios')
+        totais = dados.pop('totais')
+        projecao = dados.get('projecao_despesas')
+
+        # Widgets derivados dos resultados compartilhados
+        derivados = {
+            'resumo': (
+                DashboardService.montar_resumo, data_inicio, data_fim, totais,
+                projecao['total'] if projecao else None
+            ),
+            'grafico_receitas_despesas': (
+                DashboardService.montar_grafico_diario, data_inicio, data_fim, receitas_diarias, despesas_diarias
+            ),
+            'fluxo_caixa': (
+                DashboardService.montar_fluxo_caixa, data_inicio, data_fim, receitas_diarias, despesas_diarias
+            ),
+        }
+        widgets = {}
+        for nome, (func, *args) in derivados.items():
+            widgets[nome], tempos_ms[nome] = _medir(func, *args)
+        widgets.update(dados)
+
+        return {
+            'periodo_inicio': data_inicio,
+            'periodo_fim': data_fim,
+            'widgets': widgets,
+            'tempos_ms': tempos_ms,
+            'tempo_total_ms': round((time.perf_counter() - inicio) * 1000, 2)
+        }
@@ -0,0 +1,92 @@
+"""
+Agregados diários (fato_diario_pagar / fato_diario_receber)
+Reconstruídos a partir de contas_pagar / contas_receber ao final de cada
+sincronização; os services locais do dashboard consultam estes agregados em
+vez de reagregar os títulos a cada requisição.
+"""
+
+import logging
+from datetime import datetime
+from typing import Any, Dict
+
+from database import db
+
+logger = logging.getLogger(__name__)
+
+# Filtros do BI para contas a pagar, aplicados uma vez na construção do agregado
+FILTROS_BI_PAGAR = """
+    SITTIT <> 'CA'  -- Exclui cancelados
+    AND SEQMOV = 1  -- Apenas sequência 1
+    AND VLRABE >= 0  -- Valor em aberto >= 0
+    AND CTAFIN NOT IN (407,408,409,410,411,412,501)  -- Exclui contas específicas
+"""
+
+QUERY_FATO_PAGAR = f"""
+    INSERT INTO fato_diario_pagar
+        (data_ajustada, codemp, codfil, ctafin, codccu, sittit,
+         valor_calculado, vlrabe, vlrrat, qtd_titulos, atualizado_em)
+    SELECT
+        DATA_AJUSTADA, CODEMP, CODFIL, CTAFIN, CODCCU, SITTIT,
+        ISNULL(SUM(VALOR_CALCULADO), 0), ISNULL(SUM(VLRABE), 0), ISNULL(SUM(VLRRAT), 0), COUNT(*), GETDATE()
+    FROM contas_pagar
+    WHERE {FILTROS_BI_PAGAR}
+    GROUP BY DATA_AJUSTADA, CODEMP, CODFIL, CTAFIN, CODCCU, SITTIT
+"""
+
+QUERY_FATO_RECEBER = """
+    INSERT INTO fato_diario_receber
+        (data_ajustada, codemp, codfil, ctafin, codccu, sittit,
+         valor_calculado, vlrabe, vlrori, qtd_titulos, atualizado_em)
+    SELECT
+        DATA_AJUSTADA, CODEMP, CODFIL, CTAFIN, CODCCU, SITTIT,
+        ISNULL(SUM(VALOR_CALCULADO), 0), ISNULL(SUM(VLRABE), 0), ISNULL(SUM(VLRORI), 0), COUNT(*), GETDATE()
+    FROM contas_receber
+    GROUP BY DATA_AJUSTADA, CODEMP, CODFIL, CTAFIN, CODCCU, SITTIT
+"""
+
+AGREGADOS = {
+    'contas_pagar': ('fato_diario_pagar', QUERY_FATO_PAGAR),
+    'contas_receber': ('fato_diario_receber', QUERY_FATO_RECEBER),
+}
+
+
+class FatoDiarioService:
+    """Reconstrução dos agregados diários usados pelo dashboard"""
+
+    @staticmethod
+    def reconstruir(tabela: str) -> Dict[str, Any]:
+        """
+        Reconstrói o agregado diário de contas_pagar ou contas_receber
+        Apaga e regrava na mesma transação: quem lê o agregado vê a versão
+        anterior ou a nova, nunca uma tabela vazia.
+
+        Returns:
+            {'tabela', 'linhas', 'tempo_ms'}
+        """
+        fato, query = AGREGADOS[tabela]
+        inicio = datetime.now()
+
+        with db.get_connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(f"DELETE FROM {fato}")
+                cursor.execute(query)
+                linhas = cursor.rowcount
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cursor.close()
+
+        tempo_ms = int((datetime.now() - inicio).total_seconds() * 1000)
+        logger.info(f"[{fato}] Agregado reconstruído: {linhas} linhas em {tempo_ms}ms")
+        return {'tabela': fato, 'linhas': linhas, 'tempo_ms': tempo_ms}
+
+    @staticmethod
+    def reconstruir_pagar() -> Dict[str, Any]:
+        return FatoDiarioService.reconstruir('contas_pagar')
+
+    @staticmethod
+    def reconstruir_receber() -> Dict[str, Any]:
+        return FatoDiarioService.reconstruir('contas_receber')
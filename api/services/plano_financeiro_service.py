@@ -3,6 +3,7 @@ Service para sincronização da tabela plano_financeiro
 """
 
 from database import db, senior_db
+from utils.bulk_insert import BulkInsertWriter
 import uuid
 import logging
 
@@ -83,28 +84,16 @@ class PlanoFinanceiroService:
                     row.get('TIPCCU')
                 ))
 
-            # Query de inserção
-            insert_query = """
-            INSERT INTO plano_financeiro (
-                id, CODMPC, CTARED, MSKGCC, DEFGRU, CLACTA, NIVCTA, DESCTA,
-                ANASIN, NATCTA, MODCTB, CTACTB, CODCCU, TIPCCU
-            ) VALUES (
-                %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-            )
-            """
-
-            # Insere em batches
-            logger.info(f"Inserindo {qtd_registros} registros em massa (batches)...")
-            batch_size = 5000
-            total_inseridos = 0
+            # Insere em massa (INSERT multi-linha, ver utils/bulk_insert.py)
+            logger.info(f"Inserindo {qtd_registros} registros em massa...")
+            colunas = [
+                'id', 'CODMPC', 'CTARED', 'MSKGCC', 'DEFGRU', 'CLACTA', 'NIVCTA', 'DESCTA',
+                'ANASIN', 'NATCTA', 'MODCTB', 'CTACTB', 'CODCCU', 'TIPCCU'
+            ]
 
             with db.get_connection() as conn:
                 cursor = conn.cursor()
-                for i in range(0, len(dados_inserir), batch_size):
-                    batch = dados_inserir[i:i + batch_size]
-                    cursor.executemany(insert_query, batch)
-                    total_inseridos += len(batch)
-                    logger.info(f"Inseridos {total_inseridos}/{qtd_registros} registros...")
+                total_inseridos = BulkInsertWriter(cursor, 'plano_financeiro', colunas).escrever(dados_inserir)
                 conn.commit()
 
             logger.info(f"Total de {total_inseridos} registros inseridos com sucesso.")
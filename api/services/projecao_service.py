@@ -0,0 +1,346 @@
+"""
+Motor de projeção de despesas (média dos meses anteriores por CTAFIN)
+Usado pelo dashboard (banco local / snapshot em memória) e pelas rotas do Senior.
+
+Regra, por conta financeira (CTAFIN):
+- média = média dos `meses` meses completos anteriores ao período vigente,
+  simples, ponderada (pesos 1..n, o mês mais recente pesa mais) ou
+  exponencial (o mês k meses antes do mais recente pesa fator^k)
+- se o total lançado no período vigente > média (e > 0): usa os lançamentos do período
+- senão, se média > 0: usa a média, lançada no mesmo dia do mês do último
+  lançamento da conta na janela (limitado ao período vigente)
+- senão a conta fica fora da projeção
+
+Os totais por filial x conta x mês ficam numa matriz com somas acumuladas
+(MatrizMensal): qualquer janela é avaliada pela diferença de duas somas
+acumuladas, em O(contas), sem reler o histórico. A matriz do snapshot é
+refeita quando o snapshot de contas_pagar é recarregado (após cada
+sincronização) e reaproveitada enquanto ele não muda. A série diária e o
+total saem da mesma computação.
+"""
+
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from database import db
+from services.snapshot_analitico import SEM_VALOR, snapshot_analitico
+from utils.cache import cache_consultas
+from utils.periodos import fim_mes, indice_mes, inicio_mes, mes_do_indice
+
+# Padrões da projeção
+MESES_PADRAO = 3
+PONDERACAO_PADRAO = 'simples'
+FATOR_EXPONENCIAL_PADRAO = 0.5
+
+PONDERACOES = ('simples', 'ponderada', 'exponencial')
+
+# Índice de mês (utils.periodos.indice_mes) de 1970-01 e ordinal de 1970-01-01,
+# para converter datas ordinais em meses com datetime64
+_MES_EPOCA = indice_mes(date(1970, 1, 1))
+_ORDINAL_EPOCA = date(1970, 1, 1).toordinal()
+
+
+def _meses_dos_dias(dias: np.ndarray) -> np.ndarray:
+    """Ordinais (date.toordinal) -> índices de mês (utils.periodos.indice_mes)"""
+    return (dias - _ORDINAL_EPOCA).astype('datetime64[D]').astype('datetime64[M]').astype(np.int64) + _MES_EPOCA
+
+
+def _dias_do_mes(dias: np.ndarray) -> np.ndarray:
+    """Dia do mês (0 = dia 1) de cada ordinal"""
+    datas = (dias - _ORDINAL_EPOCA).astype('datetime64[D]')
+    return (datas - datas.astype('datetime64[M]').astype('datetime64[D]')).astype(np.int64)
+
+
+def validar_parametros(meses: int, ponderacao: str, fator: float):
+    """Levanta ValueError se os parâmetros da projeção forem inválidos"""
+    if meses < 1:
+        raise ValueError("A janela da projeção deve ter pelo menos 1 mês")
+    if ponderacao not in PONDERACOES:
+        raise ValueError(f"Ponderação inválida: '{ponderacao}' (use {', '.join(PONDERACOES)})")
+    if ponderacao == 'exponencial' and not 0 < fator <= 1:
+        raise ValueError("O fator da ponderação exponencial deve estar entre 0 (exclusivo) e 1")
+
+
+class MatrizMensal:
+    """
+    Totais por filial x conta x mês com somas acumuladas ao longo dos meses
+
+    soma[f, c, m] = total dos meses [0, m); soma_ponderada usa a posição do mês
+    como peso (para a média ponderada); ultimo_dia[f, c, m] = maior data com
+    lançamento nos meses [0, m). A soma de qualquer janela [a, b) é
+    soma[..., b] - soma[..., a].
+    """
+
+    def __init__(self, codfil: np.ndarray, ctafin: np.ndarray, dias: np.ndarray, valores: np.ndarray):
+        dias = np.asarray(dias, dtype=np.int64)
+        self.filiais, filial = np.unique(codfil, return_inverse=True)
+        self.contas, conta = np.unique(ctafin, return_inverse=True)
+
+        meses = _meses_dos_dias(dias) if len(dias) else np.zeros(0, dtype=np.int64)
+        self.mes0 = int(meses.min()) if len(meses) else 0
+        self.qtd_meses = int(meses.max()) - self.mes0 + 1 if len(meses) else 0
+
+        forma = (len(self.filiais), len(self.contas), self.qtd_meses)
+        celula = (filial * forma[1] + conta) * forma[2] + (meses - self.mes0)
+        tamanho = forma[0] * forma[1] * forma[2]
+
+        self.totais = np.bincount(celula, weights=valores, minlength=tamanho).reshape(forma)
+        posicao = np.arange(self.qtd_meses, dtype=np.float64)
+
+        zeros = np.zeros(forma[:2] + (1,))
+        self.soma = np.concatenate([zeros, np.cumsum(self.totais, axis=2)], axis=2)
+        self.soma_ponderada = np.concatenate([zeros, np.cumsum(self.totais * posicao, axis=2)], axis=2)
+
+        ultimo = np.full(tamanho, -1, dtype=np.int64)
+        np.maximum.at(ultimo, celula, dias)
+        ultimo = np.maximum.accumulate(ultimo.reshape(forma), axis=2)
+        self.ultimo_dia = np.concatenate([np.full(forma[:2] + (1,), -1, dtype=np.int64), ultimo], axis=2)
+
+        self._exponencial: Dict[float, Optional[np.ndarray]] = {}
+
+    def _indices_filiais(self, filiais: Optional[List[str]]):
+        if not filiais:
+            return slice(None)
+        return np.flatnonzero(np.isin(self.filiais, np.array([int(f) for f in filiais], dtype=self.filiais.dtype)))
+
+    def _soma_exponencial(self, fator: float) -> Optional[np.ndarray]:
+        """Soma acumulada de totais * fator^-m (criada uma vez por fator); None se estourar o float"""
+        if fator not in self._exponencial:
+            with np.errstate(over='ignore', invalid='ignore'):
+                escala = np.power(fator, -np.arange(self.qtd_meses, dtype=np.float64))
+                acumulada = np.cumsum(self.totais * escala, axis=2)
+            zeros = np.zeros(acumulada.shape[:2] + (1,))
+            self._exponencial[fator] = np.concatenate([zeros, acumulada], axis=2) if np.isfinite(acumulada).all() else None
+        return self._exponencial[fator]
+
+    def media(
+        self,
+        mes_vigente: int,
+        meses: int = MESES_PADRAO,
+        ponderacao: str = PONDERACAO_PADRAO,
+        fator: float = FATOR_EXPONENCIAL_PADRAO,
+        filiais: Optional[List[str]] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Média por conta dos `meses` meses anteriores a mes_vigente (utils.periodos.indice_mes)
+
+        Returns:
+            (media, ultimo_dia): arrays alinhados a self.contas; ultimo_dia é o
+            ordinal do último lançamento da conta na janela (-1 se não houver)
+        """
+        # Janela [a, b) em posições da matriz (meses fora do histórico contam como zero)
+        a = mes_vigente - meses - self.mes0
+        b = mes_vigente - self.mes0
+        a_lim, b_lim = min(max(a, 0), self.qtd_meses), min(max(b, 0), self.qtd_meses)
+        f = self._indices_filiais(filiais)
+
+        def janela(acumulada: np.ndarray) -> np.ndarray:
+            return (acumulada[f, :, b_lim] - acumulada[f, :, a_lim]).sum(axis=0)
+
+        if ponderacao == 'simples':
+            media = janela(self.soma) / meses
+        elif ponderacao == 'ponderada':
+            # Pesos 1..meses: soma de (m - a + 1) * x_m
+            media = (janela(self.soma_ponderada) - (a - 1) * janela(self.soma)) / (meses * (meses + 1) / 2)
+        else:
+            pesos = np.power(fator, np.arange(meses - 1, -1, -1, dtype=np.float64))
+            acumulada = self._soma_exponencial(fator)
+            if acumulada is not None:
+                # soma de fator^(b-1-m) * x_m = fator^(b-1) * soma de x_m * fator^-m
+                media = janela(acumulada) * fator ** (b - 1) / pesos.sum()
+            else:
+                # Fator pequeno demais para a escala acumulada: soma direta na janela
+                totais = np.zeros((len(self.contas), meses))
+                totais[:, a_lim - a:b_lim - a] = self.totais[f, :, a_lim:b_lim].sum(axis=0)
+                media = totais @ pesos / pesos.sum()
+
+        # Último lançamento até o fim da janela, se cair dentro dela
+        ultimo = self.ultimo_dia[f, :, b_lim].max(axis=0, initial=-1)
+        inicio_janela = mes_do_indice(mes_vigente - meses).toordinal()
+        ultimo = np.where(ultimo >= inicio_janela, ultimo, -1)
+        return media, ultimo
+
+
+class ProjecaoService:
+    """Projeção vetorizada das despesas do período vigente"""
+
+    @staticmethod
+    def inicio_historico(data_inicio: str, meses: int = MESES_PADRAO) -> str:
+        """Primeiro dia da janela de histórico da projeção ('YYYY-MM-DD')"""
+        inicio = datetime.strptime(data_inicio, '%Y-%m-%d').date()
+        return mes_do_indice(indice_mes(inicio) - meses).strftime('%Y-%m-%d')
+
+    @staticmethod
+    def _aplicar_regra(
+        matriz: MatrizMensal,
+        vig_ctafin: np.ndarray,
+        vig_dias: np.ndarray,
+        vig_valores: np.ndarray,
+        data_inicio: str,
+        data_fim: str,
+        meses: int,
+        ponderacao: str,
+        fator: float,
+        filiais: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """Compara média x lançado por conta e monta série diária, total e detalhes"""
+        inicio = datetime.strptime(data_inicio, '%Y-%m-%d').date()
+        ordinal_inicio = inicio.toordinal()
+        ordinal_fim = datetime.strptime(data_fim, '%Y-%m-%d').date().toordinal()
+        parametros = {'meses': meses, 'ponderacao': ponderacao, 'fator': fator if ponderacao == 'exponencial' else None}
+
+        contas = matriz.contas
+        if len(contas) == 0:
+            return {'total': 0, 'diario': [], 'contas': [], 'parametros': parametros}
+
+        media, ultimo = matriz.media(indice_mes(inicio), meses, ponderacao, fator, filiais)
+
+        # Total lançado no período vigente por conta
+        vig_dias = np.asarray(vig_dias, dtype=np.int64)
+        vig_valores = np.asarray(vig_valores, dtype=np.float64)
+        conta = np.searchsorted(contas, vig_ctafin)
+        vigente = np.bincount(conta, weights=vig_valores, minlength=len(contas))
+
+        usa_vigente = (vigente > media) & (vigente > 0)
+        usa_media = ~usa_vigente & (media > 0) & (ultimo >= 0)
+        valor = np.where(usa_vigente, vigente, np.where(usa_media, media, 0.0))
+
+        # Média lançada no mesmo dia do mês do último lançamento, limitada a [inicio, fim]
+        data_media = np.minimum(inicio_mes(inicio).toordinal() + _dias_do_mes(np.maximum(ultimo, 0)), fim_mes(inicio).toordinal())
+        data_media = np.clip(data_media, ordinal_inicio, ordinal_fim)
+
+        # Série diária: lançamentos das contas que usam o vigente + médias nas datas âncora
+        dias_periodo = ordinal_fim - ordinal_inicio + 1
+        lancamentos = usa_vigente[conta]
+        deslocamentos = np.concatenate([vig_dias[lancamentos] - ordinal_inicio, data_media[usa_media] - ordinal_inicio])
+        pesos = np.concatenate([vig_valores[lancamentos], media[usa_media]])
+        totais_dia = np.bincount(deslocamentos, weights=pesos, minlength=dias_periodo)
+        presentes = np.bincount(deslocamentos, minlength=dias_periodo) > 0
+
+        diario = [
+            {'data': date.fromordinal(ordinal_inicio + int(d)).strftime('%Y-%m-%d'), 'total': round(float(totais_dia[d]), 2)}
+            for d in np.flatnonzero(presentes)
+        ]
+
+        projetadas = usa_vigente | usa_media
+        detalhes = [
+            {
+                'ctafin': None if c == SEM_VALOR else int(c),
+                'media': round(float(m), 2),
+                'vigente': round(float(v), 2),
+                'valor': round(float(p), 2),
+                'usa_media': bool(u),
+                'data': date.fromordinal(int(d)).strftime('%Y-%m-%d') if u else None
+            }
+            for c, m, v, p, u, d in zip(
+                contas[projetadas], media[projetadas], vigente[projetadas],
+                valor[projetadas], usa_media[projetadas], data_media[projetadas]
+            )
+        ]
+
+        return {
+            'total': max(round(float(valor.sum()), 2), 0),
+            'diario': diario,
+            'contas': detalhes,
+            'parametros': parametros
+        }
+
+    @staticmethod
+    def projetar(
+        ctafin: np.ndarray,
+        dias: np.ndarray,
+        valores: np.ndarray,
+        data_inicio: str,
+        data_fim: str,
+        meses: int = MESES_PADRAO,
+        ponderacao: str = PONDERACAO_PADRAO,
+        fator: float = FATOR_EXPONENCIAL_PADRAO
+    ) -> Dict[str, Any]:
+        """
+        Aplica a projeção sobre lançamentos em colunas (histórico + período vigente)
+
+        Args:
+            ctafin: conta financeira de cada lançamento (NULL -> SEM_VALOR)
+            dias: data ajustada de cada lançamento, como date.toordinal()
+            valores: valor de cada lançamento
+            data_inicio / data_fim: período vigente ('YYYY-MM-DD')
+            meses / ponderacao / fator: janela e ponderação da média
+
+        Returns:
+            {'total', 'diario': [{'data', 'total'}], 'contas': [{'ctafin', 'media',
+             'vigente', 'valor', 'usa_media', 'data'}], 'parametros'}
+        """
+        validar_parametros(meses, ponderacao, fator)
+        ctafin = np.asarray(ctafin, dtype=np.int64)
+        dias = np.asarray(dias, dtype=np.int64)
+        valores = np.asarray(valores, dtype=np.float64)
+
+        ordinal_inicio = datetime.strptime(data_inicio, '%Y-%m-%d').date().toordinal()
+        ordinal_fim = datetime.strptime(data_fim, '%Y-%m-%d').date().toordinal()
+        vigente = (dias >= ordinal_inicio) & (dias <= ordinal_fim)
+
+        matriz = MatrizMensal(np.zeros(len(dias), dtype=np.int64), ctafin, dias, valores)
+        return ProjecaoService._aplicar_regra(
+            matriz, ctafin[vigente], dias[vigente], valores[vigente],
+            data_inicio, data_fim, meses, ponderacao, fator
+        )
+
+    @staticmethod
+    @cache_consultas.memoizar
+    def projetar_local(
+        data_inicio: str,
+        data_fim: str,
+        filiais: Optional[List[str]] = None,
+        meses: int = MESES_PADRAO,
+        ponderacao: str = PONDERACAO_PADRAO,
+        fator: float = FATOR_EXPONENCIAL_PADRAO,
+        usar_snapshot: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Projeção sobre o banco local: usa a matriz mensal do snapshot em memória
+        quando disponível, senão uma única consulta agrupada por CTAFIN e dia em
+        fato_diario_pagar
+        """
+        validar_parametros(meses, ponderacao, fator)
+
+        snapshot = snapshot_analitico.obter() if usar_snapshot else None
+        if snapshot:
+            pagar = snapshot.pagar
+            matriz = pagar.derivado(
+                'matriz_mensal', lambda: MatrizMensal(pagar.codfil, pagar.ctafin, pagar.dias, pagar.valores)
+            )
+            ctafin, dias, valores = pagar.colunas(data_inicio, data_fim, filiais, 'ctafin', 'dias', 'valores')
+            return ProjecaoService._aplicar_regra(
+                matriz, ctafin, dias, valores, data_inicio, data_fim, meses, ponderacao, fator, filiais
+            )
+
+        query = """
+        SELECT
+            ISNULL(ctafin, %s) AS ctafin,
+            data_ajustada,
+            SUM(valor_calculado) AS total
+        FROM fato_diario_pagar
+        WHERE data_ajustada BETWEEN %s AND %s
+        """
+        params = [SEM_VALOR, ProjecaoService.inicio_historico(data_inicio, meses), data_fim]
+
+        if filiais:
+            placeholders = ','.join(['%s'] * len(filiais))
+            query += f" AND codfil IN ({placeholders})"
+            params.extend(filiais)
+
+        query += " GROUP BY ctafin, data_ajustada"
+
+        linhas = db.execute_query(query, tuple(params)) or []
+        return ProjecaoService.projetar(
+            np.array([r['ctafin'] for r in linhas], dtype=np.int64),
+            np.array([r['data_ajustada'].toordinal() for r in linhas], dtype=np.int64),
+            np.array([float(r['total'] or 0) for r in linhas], dtype=np.float64),
+            data_inicio,
+            data_fim,
+            meses,
+            ponderacao,
+            fator
+        )
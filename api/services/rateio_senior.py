@@ -0,0 +1,148 @@
+"""
+Rateio dos títulos a receber do Senior (E301RAT): CODCCU e CTAFIN
+Cada título leva o centro de custo e a conta financeira da primeira linha de
+rateio com a mesma (CODEMP, CODFIL, NUMTIT, CODTPT), na ordem de ORDEM_RATEIO.
+A forma original são duas subconsultas TOP 1 correlacionadas, ou seja, duas
+buscas em E301RAT por título.
+
+A ordem é a mesma nos três modos e fixa a linha escolhida quando o título tem
+mais de um rateio: sem ela o servidor devolve qualquer linha, o CODCCU/CTAFIN
+muda entre execuções e, com ele, o HASH_LINHA (a sincronização incremental
+acusaria atualizações que não existiram).
+
+Modos (settings.SENIOR_RATEIO_MODO):
+- subconsulta: as duas subconsultas correlacionadas (forma original)
+- outer_apply: um OUTER APPLY com TOP 1 por título, que traz as duas colunas numa busca só
+- hash_join: a consulta dos títulos não toca E301RAT; as linhas de rateio dos
+  títulos da mesma janela vêm numa segunda consulta (semi-join, uma passada em
+  E301RAT), viram um dicionário pela chave e são juntadas em Python
+
+Uso (quem monta a consulta expõe o FROM/WHERE como função da junção):
+    colunas, juncao = sql_rateio(modo)
+    query = f"SELECT ...{colunas} {from_where(juncao)}"
+    ...
+    if modo == 'hash_join':
+        mapa = MapaRateio(conexao.execute_query(sql_linhas_rateio(from_where(''))))
+        linhas = [mapa.aplicar(linha) for linha in linhas]
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from config import settings
+from utils.sql_parametrizado import ConsultaParametrizada
+
+MODOS_RATEIO = ('subconsulta', 'outer_apply', 'hash_join')
+
+# Chave do título em E301TCR / E301RAT
+CHAVE_RATEIO = ('CODEMP', 'CODFIL', 'NUMTIT', 'CODTPT')
+
+# Primeira linha de rateio de cada título (NULL primeiro, como o ORDER BY do SQL Server)
+ORDEM_RATEIO = "E301RAT.CODCCU, E301RAT.CTAFIN"
+
+_CONDICAO_TITULO = " AND ".join(f"E301RAT.{coluna} = E301TCR.{coluna}" for coluna in CHAVE_RATEIO)
+
+
+def validar_modo(modo: Optional[str] = None) -> str:
+    modo = modo or settings.SENIOR_RATEIO_MODO
+    if modo not in MODOS_RATEIO:
+        raise ValueError(f"Modo de rateio inválido: {modo}. Use um de: {', '.join(MODOS_RATEIO)}")
+    return modo
+
+
+def sql_rateio(modo: Optional[str] = None) -> Tuple[str, str]:
+    """
+    Trechos da consulta dos títulos para o modo informado:
+    (colunas CODCCU/CTAFIN a acrescentar ao SELECT, junção a colocar logo após E301TCR no FROM)
+    No modo hash_join os dois vêm vazios: as colunas são preenchidas por MapaRateio.
+    """
+    modo = validar_modo(modo)
+    if modo == 'subconsulta':
+        colunas = f""",
+                ISNULL((SELECT TOP 1 E301RAT.CODCCU FROM E301RAT WHERE {_CONDICAO_TITULO} ORDER BY {ORDEM_RATEIO}), 0) AS CODCCU,
+                ISNULL((SELECT TOP 1 E301RAT.CTAFIN FROM E301RAT WHERE {_CONDICAO_TITULO} ORDER BY {ORDEM_RATEIO}), 0) AS CTAFIN"""
+        return colunas, ''
+    if modo == 'outer_apply':
+        colunas = """,
+                ISNULL(RAT.CODCCU, 0) AS CODCCU,
+                ISNULL(RAT.CTAFIN, 0) AS CTAFIN"""
+        juncao = f"""
+            OUTER APPLY (
+                SELECT TOP 1 E301RAT.CODCCU, E301RAT.CTAFIN FROM E301RAT WHERE {_CONDICAO_TITULO} ORDER BY {ORDEM_RATEIO}
+            ) AS RAT"""
+        return colunas, juncao
+    return '', ''
+
+
+def sql_linhas_rateio(from_where: str) -> str:
+    """
+    Linhas de E301RAT dos títulos que passam pelo FROM/WHERE informado (modo hash_join),
+    na ordem de ORDEM_RATEIO dentro de cada título: MapaRateio fica com a primeira
+    """
+    return f"""
+        SELECT E301RAT.CODEMP, E301RAT.CODFIL, E301RAT.NUMTIT, E301RAT.CODTPT, E301RAT.CODCCU, E301RAT.CTAFIN
+        FROM E301RAT
+        WHERE EXISTS (
+            SELECT 1
+            {from_where}
+                AND {_CONDICAO_TITULO}
+        )
+        ORDER BY E301RAT.CODEMP, E301RAT.CODFIL, E301RAT.NUMTIT, E301RAT.CODTPT, {ORDEM_RATEIO}
+    """
+
+
+class MapaRateio:
+    """
+    (CODEMP, CODFIL, NUMTIT, CODTPT) -> (CODCCU, CTAFIN) da primeira linha de rateio
+    de cada título (as linhas chegam ordenadas por sql_linhas_rateio)
+    """
+
+    def __init__(self, linhas: Iterable[Dict[str, Any]]):
+        self._mapa: Dict[tuple, Tuple[Any, Any]] = {}
+        for linha in linhas:
+            codccu, ctafin = linha.get('CODCCU'), linha.get('CTAFIN')
+            self._mapa.setdefault(
+                tuple(linha.get(coluna) for coluna in CHAVE_RATEIO),
+                (0 if codccu is None else codccu, 0 if ctafin is None else ctafin)
+            )
+
+    def __len__(self) -> int:
+        return len(self._mapa)
+
+    def aplicar(self, registro: Dict[str, Any]) -> Dict[str, Any]:
+        """Preenche CODCCU e CTAFIN do registro (0 sem rateio, como o ISNULL das subconsultas)"""
+        registro['CODCCU'], registro['CTAFIN'] = self._mapa.get(
+            tuple(registro.get(coluna) for coluna in CHAVE_RATEIO), (0, 0)
+        )
+        return registro
+
+
+def consultar_titulos(
+    conexao,
+    colunas: str,
+    from_where: Callable[[str], str],
+    parametros: Dict[str, str],
+    valores: Dict[str, Any],
+    modo: Optional[str] = None
+) -> List[dict]:
+    """
+    Executa "SELECT {colunas} + CODCCU/CTAFIN {from_where}" como consulta parametrizada
+    (utils/sql_parametrizado.py), resolvendo o rateio conforme o modo
+
+    Args:
+        conexao: banco (senior_db)
+        colunas: lista do SELECT sem CODCCU/CTAFIN
+        from_where: FROM/WHERE dos títulos em função da junção do rateio
+        parametros / valores: declaração e valores da ConsultaParametrizada
+    """
+    modo = validar_modo(modo)
+    colunas_rateio, juncao = sql_rateio(modo)
+    consulta = ConsultaParametrizada(f"SELECT {colunas}{colunas_rateio}\n{from_where(juncao)}", parametros)
+    linhas = consulta.executar(conexao, **valores)
+
+    if modo == 'hash_join' and linhas:
+        mapa = MapaRateio(
+            ConsultaParametrizada(sql_linhas_rateio(from_where('')), parametros).executar(conexao, **valores)
+        )
+        linhas = [mapa.aplicar(linha) for linha in linhas]
+
+    return linhas
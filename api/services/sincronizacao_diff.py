@@ -0,0 +1,96 @@
+"""
+Detecção de mudanças da sincronização incremental
+Compara o HASH_LINHA de cada linha vinda do Senior com o que já está no banco
+local (hash join em memória pelo id derivado da chave natural) e separa as
+linhas em inserir / atualizar / inalteradas; o que sobra do lado local são as
+linhas removidas no Senior. Só o que mudou é gravado.
+"""
+
+import logging
+import uuid
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class DiffLinhas:
+    """
+    Hash join em memória entre o lado local (id -> HASH_LINHA) e as linhas do Senior
+
+    Uso:
+        diff = DiffLinhas.carregar_local(cursor, 'contas_receber')
+        for lote in lotes:
+            gravar(diff.filtrar(lote))   # apenas novas ou alteradas
+        ids_removidos = diff.removidos()
+    """
+
+    def __init__(self, tabela: str, hashes_locais: Dict[bytes, Optional[bytes]]):
+        self.tabela = tabela
+        # id (16 bytes) -> HASH_LINHA; as entradas são removidas conforme aparecem no Senior
+        self._locais = hashes_locais
+        self.total_local = len(hashes_locais)
+        self.inseridos = 0
+        self.atualizados = 0
+        self.inalterados = 0
+
+    @classmethod
+    def carregar_local(cls, cursor, tabela: str) -> 'DiffLinhas':
+        """Lê id e HASH_LINHA de todas as linhas da tabela local"""
+        cursor.execute(f"SELECT id, HASH_LINHA FROM {tabela}")
+        hashes = {}
+        while True:
+            lote = cursor.fetchmany(20000)
+            if not lote:
+                break
+            for row in lote:
+                hashes[cls._chave(row['id'])] = row['HASH_LINHA']
+        logger.info(f"[{tabela}] {len(hashes)} linhas locais carregadas para comparação")
+        return cls(tabela, hashes)
+
+    @staticmethod
+    def _chave(valor) -> bytes:
+        """id (UUID, str ou bytes) em 16 bytes, para ocupar pouca memória"""
+        if isinstance(valor, uuid.UUID):
+            return valor.bytes
+        if isinstance(valor, bytes) and len(valor) == 16:
+            return valor
+        return uuid.UUID(str(valor)).bytes
+
+    def filtrar(self, linhas: List[tuple]) -> List[tuple]:
+        """
+        Recebe tuplas (id, ..., HASH_LINHA) e devolve apenas as novas ou alteradas
+        """
+        alteradas = []
+        for linha in linhas:
+            chave = self._chave(linha[0])
+            if chave not in self._locais:
+                self.inseridos += 1
+                alteradas.append(linha)
+                continue
+
+            hash_local = self._locais.pop(chave)
+            if hash_local != linha[-1]:
+                self.atualizados += 1
+                alteradas.append(linha)
+            else:
+                self.inalterados += 1
+        return alteradas
+
+    def removidos(self) -> List[str]:
+        """Ids locais que não vieram do Senior (chamar após filtrar todas as linhas)"""
+        return [str(uuid.UUID(bytes=chave)) for chave in self._locais]
+
+    def resumo(self) -> Dict[str, float]:
+        """Quantas linhas de fato mudaram nesta execução"""
+        removidos = len(self._locais)
+        lidas = self.inseridos + self.atualizados + self.inalterados
+        alteradas = self.inseridos + self.atualizados + removidos
+        return {
+            'linhas_locais': self.total_local,
+            'linhas_senior': lidas,
+            'inseridos': self.inseridos,
+            'atualizados': self.atualizados,
+            'removidos': removidos,
+            'inalterados': self.inalterados,
+            'percentual_alterado': round(alteradas * 100 / max(lidas, self.total_local, 1), 2)
+        }
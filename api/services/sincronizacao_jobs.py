@@ -0,0 +1,200 @@
+"""
+Jobs de sincronização em segundo plano
+A rota de sincronização só agenda o job e devolve o id; a carga roda no pool
+'sincronizacao' do executor. O progresso (fase, linhas processadas, ETA) é
+reportado pelos services via reportar_progresso() e consultado em
+GET /api/sincronizacao/status?job_id=... Pedidos repetidos do mesmo tipo
+(e mesmos parâmetros) enquanto um job está na fila ou rodando são coalescidos
+no job existente.
+"""
+
+import contextvars
+import logging
+import threading
+import traceback
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+import executor
+
+logger = logging.getLogger(__name__)
+
+# Jobs concluídos mantidos em memória para consulta do status
+MAX_JOBS_CONCLUIDOS = 50
+
+# Job da thread atual (propagado para as etapas paralelas pelo orquestrador)
+_job_atual: contextvars.ContextVar[Optional['JobSincronizacao']] = contextvars.ContextVar('job_sincronizacao', default=None)
+
+
+class JobSincronizacao:
+    """Estado e progresso de uma sincronização agendada"""
+
+    def __init__(self, tipo: str, parametros: Dict[str, Any]):
+        self.id = str(uuid.uuid4())
+        self.tipo = tipo
+        self.parametros = parametros
+        self.status = 'na_fila'  # na_fila -> em_andamento -> sucesso | erro
+        self.criado_em = datetime.now()
+        self.iniciado_em: Optional[datetime] = None
+        self.concluido_em: Optional[datetime] = None
+        self.coalescidos = 0  # Pedidos repetidos atendidos por este job
+        self.resultado: Optional[Dict[str, Any]] = None
+        self.erro: Optional[str] = None
+
+        # Progresso por etapa (sincronizar_tudo roda várias ao mesmo tempo)
+        self._lock = threading.Lock()
+        self._etapas: Dict[str, Dict[str, Any]] = {}
+
+    @property
+    def chave(self) -> str:
+        return JobSincronizacao.montar_chave(self.tipo, self.parametros)
+
+    @staticmethod
+    def montar_chave(tipo: str, parametros: Dict[str, Any]) -> str:
+        valores = '|'.join(f"{k}={parametros[k]}" for k in sorted(parametros) if parametros[k] is not None)
+        return f"{tipo}|{valores}"
+
+    @property
+    def ativo(self) -> bool:
+        return self.status in ('na_fila', 'em_andamento')
+
+    def atualizar_etapa(self, etapa: str, fase: str = None, linhas: int = None, total: int = None):
+        with self._lock:
+            progresso = self._etapas.setdefault(etapa, {'fase': None, 'linhas': 0, 'total': None})
+            if fase is not None:
+                progresso['fase'] = fase
+            if linhas is not None:
+                progresso['linhas'] = linhas
+            if total is not None:
+                progresso['total'] = total
+
+    def progresso(self) -> Dict[str, Any]:
+        """Fase atual, linhas processadas, percentual e ETA (pela vazão até agora)"""
+        with self._lock:
+            etapas = {nome: dict(p) for nome, p in self._etapas.items()}
+
+        linhas = sum(p['linhas'] for p in etapas.values())
+        totais = [p['total'] for p in etapas.values() if p['total']]
+        total = sum(totais) if totais else None
+        fases = [f"{nome}: {p['fase']}" for nome, p in etapas.items() if p['fase'] not in (None, 'concluida')]
+
+        percentual = None
+        eta_segundos = None
+        if total:
+            percentual = round(min(linhas, total) * 100 / total, 1)
+            if self.status == 'em_andamento' and linhas > 0 and self.iniciado_em:
+                decorrido = (datetime.now() - self.iniciado_em).total_seconds()
+                eta_segundos = int(max(total - linhas, 0) * decorrido / linhas)
+
+        fim = self.concluido_em or datetime.now()
+        return {
+            'job_id': self.id,
+            'tipo': self.tipo,
+            'parametros': self.parametros,
+            'status': self.status,
+            'fase': '; '.join(fases) if fases else (None if self.ativo else self.status),
+            'etapas': etapas,
+            'linhas_processadas': linhas,
+            'linhas_estimadas': total,
+            'percentual': percentual,
+            'eta_segundos': eta_segundos,
+            'coalescidos': self.coalescidos,
+            'criado_em': self.criado_em,
+            'iniciado_em': self.iniciado_em,
+            'concluido_em': self.concluido_em,
+            'duracao_ms': int((fim - self.iniciado_em).total_seconds() * 1000) if self.iniciado_em else None,
+            'resultado': self.resultado,
+            'erro': self.erro
+        }
+
+
+class GerenciadorJobs:
+    """Agenda jobs no pool 'sincronizacao' e guarda o estado para consulta"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._jobs: 'OrderedDict[str, JobSincronizacao]' = OrderedDict()
+        self._ativos: Dict[str, JobSincronizacao] = {}  # chave -> job na fila ou rodando
+
+    def submeter(self, tipo: str, func: Callable[..., Dict[str, Any]], *args, **parametros) -> JobSincronizacao:
+        """
+        Agenda func(*args) como job do tipo informado e retorna o job.
+        Se já existe um job ativo com o mesmo tipo e parâmetros, retorna esse job.
+        Levanta ExecutorSaturadoError (503) se a fila do pool estiver cheia.
+        """
+        chave = JobSincronizacao.montar_chave(tipo, parametros)
+        with self._lock:
+            existente = self._ativos.get(chave)
+            if existente is not None and existente.ativo:
+                existente.coalescidos += 1
+                logger.info(f"[jobs] Pedido de '{chave}' coalescido no job {existente.id}")
+                return existente
+
+            job = JobSincronizacao(tipo, parametros)
+            executor.pools['sincronizacao'].submeter(self._rodar, job, func, *args)
+            self._ativos[chave] = job
+            self._jobs[job.id] = job
+            self._limpar_concluidos()
+
+        logger.info(f"[jobs] Job {job.id} ({chave}) agendado")
+        return job
+
+    def _rodar(self, job: JobSincronizacao, func: Callable, *args):
+        """Executa o job na thread do pool, tornando-o o job atual para reportar_progresso"""
+        token = _job_atual.set(job)
+        job.status = 'em_andamento'
+        job.iniciado_em = datetime.now()
+        try:
+            resultado = func(*args)
+            job.resultado = resultado
+            if resultado.get('success', False):
+                job.status = 'sucesso'
+            else:
+                job.status = 'erro'
+                job.erro = resultado.get('mensagem') or resultado.get('error') or resultado.get('message')
+        except Exception as e:
+            logger.error(f"[jobs] ✗ ERRO no job {job.id}: {str(e)}")
+            logger.error(traceback.format_exc())
+            job.status = 'erro'
+            job.erro = str(e)
+        finally:
+            job.concluido_em = datetime.now()
+            _job_atual.reset(token)
+            with self._lock:
+                if self._ativos.get(job.chave) is job:
+                    del self._ativos[job.chave]
+
+    def _limpar_concluidos(self):
+        """Mantém no máximo MAX_JOBS_CONCLUIDOS jobs concluídos (os mais antigos saem primeiro)"""
+        concluidos = [job_id for job_id, job in self._jobs.items() if not job.ativo]
+        for job_id in concluidos[:max(0, len(concluidos) - MAX_JOBS_CONCLUIDOS)]:
+            del self._jobs[job_id]
+
+    def obter(self, job_id: str) -> Optional[JobSincronizacao]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def ativos(self) -> List[JobSincronizacao]:
+        with self._lock:
+            return [job for job in self._jobs.values() if job.ativo]
+
+
+def reportar_progresso(etapa: str, fase: str = None, linhas: int = None, total: int = None):
+    """
+    Atualiza o progresso do job em execução na thread atual
+    (sem efeito quando a sincronização não roda como job, ex: scripts)
+
+    Args:
+        etapa: tabela/etapa que está reportando (ex: 'contas_receber')
+        fase: descrição curta da fase (ex: 'lendo_senior', 'aplicando')
+        linhas: linhas processadas até agora nesta etapa
+        total: total estimado de linhas da etapa (usado no ETA)
+    """
+    job = _job_atual.get()
+    if job is not None:
+        job.atualizar_etapa(etapa, fase, linhas, total)
+
+
+jobs = GerenciadorJobs()
@@ -0,0 +1,133 @@
+"""
+Orquestrador das etapas da sincronização
+Cada etapa declara de quais outras depende; etapas sem dependência pendente
+rodam em paralelo (até max_paralelismo ao mesmo tempo). Se uma etapa falha,
+as que dependem dela são ignoradas e as independentes seguem normalmente.
+"""
+
+import contextvars
+import logging
+import traceback
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+
+class EtapaSincronizacao:
+    """
+    Uma etapa do orquestrador
+
+    Args:
+        nome: identificador da etapa (ex: 'contas_receber')
+        executar: função sem argumentos que devolve o dict de resultado do serviço
+        depende_de: nomes das etapas que precisam terminar com sucesso antes desta
+    """
+
+    def __init__(self, nome: str, executar: Callable[[], Dict[str, Any]], depende_de: Sequence[str] = ()):
+        self.nome = nome
+        self.executar = executar
+        self.depende_de = tuple(depende_de)
+
+
+class OrquestradorSincronizacao:
+    """
+    Executa as etapas respeitando as dependências
+
+    Uso:
+        resultados = OrquestradorSincronizacao([
+            EtapaSincronizacao('plano_financeiro', PlanoFinanceiroService.sincronizar),
+            EtapaSincronizacao('contas_receber', lambda: ..., depende_de=['plano_financeiro']),
+        ], max_paralelismo=2).executar()
+    """
+
+    def __init__(
+        self,
+        etapas: List[EtapaSincronizacao],
+        max_paralelismo: int = 2,
+        ao_mudar_etapa: Optional[Callable[[str, str], None]] = None
+    ):
+        self.etapas = {etapa.nome: etapa for etapa in etapas}
+        self.max_paralelismo = max(1, max_paralelismo)
+        # Chamado com (nome, status) quando uma etapa começa ou termina (ex: progresso do job)
+        self._ao_mudar_etapa = ao_mudar_etapa or (lambda nome, status: None)
+
+        for etapa in etapas:
+            for dependencia in etapa.depende_de:
+                if dependencia not in self.etapas:
+                    raise ValueError(f"Etapa '{etapa.nome}' depende de etapa inexistente: '{dependencia}'")
+
+    def _rodar(self, etapa: EtapaSincronizacao) -> Dict[str, Any]:
+        """Executa uma etapa e registra resultado, horários e duração"""
+        inicio = datetime.now()
+        logger.info(f"[orquestrador] Iniciando etapa '{etapa.nome}'...")
+        self._ao_mudar_etapa(etapa.nome, 'em_andamento')
+        registro = {'inicio': inicio.isoformat()}
+        try:
+            resultado = etapa.executar()
+            registro['resultado'] = resultado
+            registro['status'] = 'sucesso' if resultado.get('success', False) else 'erro'
+        except Exception as e:
+            logger.error(f"[orquestrador] ✗ ERRO na etapa '{etapa.nome}': {str(e)}")
+            logger.error(traceback.format_exc())
+            registro['resultado'] = None
+            registro['status'] = 'erro'
+            registro['erro'] = str(e)
+
+        fim = datetime.now()
+        registro['fim'] = fim.isoformat()
+        registro['duracao_ms'] = int((fim - inicio).total_seconds() * 1000)
+        logger.info(f"[orquestrador] Etapa '{etapa.nome}' terminou ({registro['status']}) em {registro['duracao_ms']}ms")
+        self._ao_mudar_etapa(etapa.nome, 'concluida' if registro['status'] == 'sucesso' else 'erro')
+        return registro
+
+    def executar(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Executa todas as etapas e retorna {nome: registro}, onde registro tem
+        status ('sucesso', 'erro' ou 'ignorada'), resultado, inicio, fim e duracao_ms
+        """
+        registros: Dict[str, Dict[str, Any]] = {}
+        pendentes = dict(self.etapas)
+        em_execucao = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_paralelismo, thread_name_prefix="sync-etapa") as pool:
+            while pendentes or em_execucao:
+                # Ignora etapas cuja dependência falhou (ou foi ignorada)
+                for nome, etapa in list(pendentes.items()):
+                    falhas = [d for d in etapa.depende_de if d in registros and registros[d]['status'] != 'sucesso']
+                    if falhas:
+                        logger.warning(f"[orquestrador] Etapa '{nome}' ignorada: dependência com falha ({', '.join(falhas)})")
+                        registros[nome] = {
+                            'status': 'ignorada',
+                            'resultado': None,
+                            'erro': f"Dependência com falha: {', '.join(falhas)}",
+                            'duracao_ms': 0
+                        }
+                        del pendentes[nome]
+                        self._ao_mudar_etapa(nome, 'ignorada')
+
+                # Dispara as etapas prontas (o pool limita quantas rodam ao mesmo tempo)
+                for nome, etapa in list(pendentes.items()):
+                    if all(registros.get(d, {}).get('status') == 'sucesso' for d in etapa.depende_de):
+                        # Cada etapa herda o contexto de quem chamou (ex: job de sincronização atual)
+                        contexto = contextvars.copy_context()
+                        em_execucao[pool.submit(contexto.run, self._rodar, etapa)] = nome
+                        del pendentes[nome]
+
+                if not em_execucao:
+                    # Nada rodando e nada pronto: só restaram etapas em ciclo
+                    for nome in pendentes:
+                        registros[nome] = {
+                            'status': 'ignorada',
+                            'resultado': None,
+                            'erro': 'Dependência circular',
+                            'duracao_ms': 0
+                        }
+                    break
+
+                concluidas, _ = wait(em_execucao, return_when=FIRST_COMPLETED)
+                for futuro in concluidas:
+                    registros[em_execucao.pop(futuro)] = futuro.result()
+
+        return registros
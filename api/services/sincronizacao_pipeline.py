@@ -0,0 +1,151 @@
+"""
+Pipeline de sincronização Senior -> banco local
+Uma thread leitora busca lotes do Senior e os transforma em tuplas de INSERT,
+colocando-os numa fila limitada; a thread chamadora consome a fila e grava.
+Leitura e escrita se sobrepõem, e a memória fica limitada a tamanho_fila lotes.
+"""
+
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List
+
+logger = logging.getLogger(__name__)
+
+# Marca de fim de leitura colocada na fila pela thread leitora
+_FIM = object()
+
+
+class PipelineSincronizacao:
+    """
+    Executa uma carga em três estágios: ler -> transformar -> escrever
+
+    Args:
+        ler: função que devolve um iterável de lotes (ex: senior_db.iter_query)
+        transformar: converte uma linha do Senior na tupla de INSERT
+        escrever: grava um lote de tuplas; recebe (linhas, primeiro_lote)
+        tamanho_fila: máximo de lotes lidos aguardando escrita
+    """
+
+    def __init__(
+        self,
+        nome: str,
+        ler: Callable[[], Iterable[List[Dict[str, Any]]]],
+        transformar: Callable[[Dict[str, Any]], tuple],
+        escrever: Callable[[List[tuple], bool], None],
+        tamanho_fila: int = 4
+    ):
+        self.nome = nome
+        self._ler = ler
+        self._transformar = transformar
+        self._escrever = escrever
+        self._fila = queue.Queue(maxsize=max(1, tamanho_fila))
+        self._parar = threading.Event()
+        self._erro_leitura = None
+
+        # Linhas e tempo ocupado de cada estágio
+        self._linhas = {'leitura': 0, 'transformacao': 0, 'escrita': 0}
+        self._tempo = {'leitura': 0.0, 'transformacao': 0.0, 'escrita': 0.0}
+        self._lotes = 0
+        self._espera_fila_cheia = 0.0
+        self._espera_fila_vazia = 0.0
+
+    def _enfileirar(self, item) -> bool:
+        """Coloca item na fila, desistindo se a escrita tiver falhado"""
+        inicio = time.monotonic()
+        try:
+            while not self._parar.is_set():
+                try:
+                    self._fila.put(item, timeout=0.5)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        finally:
+            self._espera_fila_cheia += time.monotonic() - inicio
+
+    def _leitor(self):
+        """Thread leitora: busca lotes do Senior, transforma e enfileira"""
+        lotes = None
+        try:
+            lotes = iter(self._ler())
+            while not self._parar.is_set():
+                inicio = time.monotonic()
+                lote = next(lotes, None)
+                self._tempo['leitura'] += time.monotonic() - inicio
+                if lote is None:
+                    break
+                self._linhas['leitura'] += len(lote)
+
+                inicio = time.monotonic()
+                linhas = [self._transformar(row) for row in lote]
+                self._tempo['transformacao'] += time.monotonic() - inicio
+                self._linhas['transformacao'] += len(linhas)
+
+                if not self._enfileirar(linhas):
+                    break
+        except Exception as e:
+            self._erro_leitura = e
+        finally:
+            # Fecha o gerador para devolver (ou descartar) a conexão do Senior
+            if lotes is not None and hasattr(lotes, 'close'):
+                lotes.close()
+            self._enfileirar(_FIM)
+
+    def executar(self) -> Dict[str, Any]:
+        """Executa o pipeline e retorna as estatísticas por estágio"""
+        inicio = time.monotonic()
+        leitor = threading.Thread(target=self._leitor, name=f"sync-leitor-{self.nome}", daemon=True)
+        leitor.start()
+
+        try:
+            while True:
+                espera = time.monotonic()
+                linhas = self._fila.get()
+                self._espera_fila_vazia += time.monotonic() - espera
+                if linhas is _FIM:
+                    break
+
+                inicio_escrita = time.monotonic()
+                self._escrever(linhas, self._lotes == 0)
+                self._tempo['escrita'] += time.monotonic() - inicio_escrita
+                self._linhas['escrita'] += len(linhas)
+                self._lotes += 1
+                logger.info(f"[{self.nome}] Gravadas {self._linhas['escrita']} linhas...")
+        finally:
+            # Em caso de falha na escrita, libera o leitor e esvazia a fila
+            self._parar.set()
+            while leitor.is_alive():
+                try:
+                    self._fila.get(timeout=0.5)
+                except queue.Empty:
+                    pass
+            leitor.join()
+
+        if self._erro_leitura is not None:
+            raise self._erro_leitura
+
+        return self.estatisticas(time.monotonic() - inicio)
+
+    def estatisticas(self, duracao_total: float) -> Dict[str, Any]:
+        """Linhas, tempo ocupado e vazão (linhas/s) de cada estágio"""
+        estagios = {}
+        for estagio, linhas in self._linhas.items():
+            tempo = self._tempo[estagio]
+            estagios[estagio] = {
+                'linhas': linhas,
+                'tempo_ms': int(tempo * 1000),
+                'linhas_por_segundo': round(linhas / tempo, 1) if tempo > 0 else None
+            }
+
+        total = self._linhas['escrita']
+        return {
+            'pipeline': self.nome,
+            'lotes': self._lotes,
+            'estagios': estagios,
+            'espera_fila_cheia_ms': int(self._espera_fila_cheia * 1000),  # Leitor esperando o escritor
+            'espera_fila_vazia_ms': int(self._espera_fila_vazia * 1000),  # Escritor esperando o leitor
+            'duracao_ms': int(duracao_total * 1000),
+            'linhas_por_segundo': round(total / duracao_total, 1) if duracao_total > 0 else None
+        }
@@ -3,15 +3,27 @@ Serviço de Sincronização
 Responsável por sincronizar dados do banco Senior para o banco local
 """
 
+import json
 import logging
-from datetime import datetime
-from typing import Dict, Any
+from datetime import date, datetime, timedelta
+from typing import Dict, Any, Optional
 import traceback
 import uuid
 
 from database import db, senior_db
+from services.sincronizacao_pipeline import PipelineSincronizacao
+from services.sincronizacao_diff import DiffLinhas
+from services.sincronizacao_orquestrador import EtapaSincronizacao, OrquestradorSincronizacao
+from services.sincronizacao_jobs import reportar_progresso
+from utils.bulk_insert import BulkInsertWriter
+from utils.chaves_naturais import MontadorLinhas
+from config import settings
 from services.plano_financeiro_service import PlanoFinanceiroService
 from services.centro_custo_service import CentroCustoService
+from services.fato_diario_service import FatoDiarioService
+from services.snapshot_analitico import snapshot_analitico
+from services.rateio_senior import MapaRateio, sql_linhas_rateio, sql_rateio, validar_modo as validar_modo_rateio
+from utils.cache import cache_consultas
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
@@ -22,7 +34,8 @@ logger = logging.getLogger(__name__)
 # QUERIES SQL DO SISTEMA SENIOR
 # ================================================
 
-QUERY_CONTAS_RECEBER = """
+# CODCCU/CTAFIN (rateio E301RAT) entram conforme settings.SENIOR_RATEIO_MODO (ver services/rateio_senior.py)
+SELECT_CONTAS_RECEBER = """
 SELECT E301TCR.CODEMP,E301TCR.CODFIL,E301TCR.CODCLI ,E085CLI.NOMCLI,
 E085CLI.CIDCLI, E085CLI.BAICLI, E085CLI.TIPCLI, E301TCR.DATEMI
 ,E301TCR.NUMTIT,E301TCR.SITTIT,E301TCR.CODTPT,E301TCR.VLRABE,E301TCR.VLRORI
@@ -33,20 +46,10 @@ E085CLI.CIDCLI, E085CLI.BAICLI, E085CLI.TIPCLI, E301TCR.DATEMI
 ,E301TCR.NUMCTR,E301TCR.CODSNF,E301TCR.NUMNFV,E301TCR.CODFPG,E085CLI.USU_UNICLI
 ,CASE WHEN YEAR(E301TCR.ULTPGT) = 1900 THEN ''
 ELSE CONVERT(VARCHAR(10), E301TCR.ULTPGT, 103)
-END AS ULTPGT
-,ISNULL((SELECT TOP 1 E301RAT.CODCCU FROM E301RAT
-                 WHERE E301RAT.CODEMP = E301TCR.CODEMP
-                        AND E301RAT.CODFIL = E301TCR.CODFIL
-                        AND E301RAT.NUMTIT = E301TCR.NUMTIT
-                        AND E301RAT.CODTPT = E301TCR.CODTPT
-                      ), 0) AS CODCCU
-,ISNULL((SELECT TOP 1 E301RAT.CTAFIN FROM E301RAT
-                 WHERE E301RAT.CODEMP = E301TCR.CODEMP
-                        AND E301RAT.CODFIL = E301TCR.CODFIL
-                        AND E301RAT.NUMTIT = E301TCR.NUMTIT
-                        AND E301RAT.CODTPT = E301TCR.CODTPT
-                      ), 0) AS CTAFIN
-FROM E301TCR,E085CLI,E085HCL,E039POR,E001TNS,E002TPT,E070FIL,E070EMP
+END AS ULTPGT"""
+
+FROM_WHERE_CONTAS_RECEBER = """
+FROM E301TCR{juncao_rateio},E085CLI,E085HCL,E039POR,E001TNS,E002TPT,E070FIL,E070EMP
 WHERE E085HCL.CODCLI = E301TCR.CODCLI
 AND E085HCL.CODEMP = E301TCR.CODEMP
 AND E085HCL.CODFIL = E301TCR.CODFIL
@@ -71,6 +74,20 @@ AND E001TNS.LISMOD = 'CRE'
 AND E301TCR.VCTORI >= '20250101'
 """
 
+
+def from_where_contas_receber(juncao_rateio: str = '') -> str:
+    """FROM/WHERE da leitura de contas a receber; juncao_rateio entra logo após E301TCR"""
+    return FROM_WHERE_CONTAS_RECEBER.format(juncao_rateio=juncao_rateio)
+
+
+def query_contas_receber(modo_rateio: str = None) -> str:
+    """Leitura completa de contas a receber no Senior (no modo hash_join, sem CODCCU/CTAFIN)"""
+    colunas, juncao = sql_rateio(modo_rateio)
+    return f"{SELECT_CONTAS_RECEBER}{colunas}\n{from_where_contas_receber(juncao)}"
+
+
+# Ordenada pela chave natural + VLRRAT/CTARED (únicas colunas que variam entre rateios da mesma
+# chave): linhas repetidas recebem sempre o mesmo número de ocorrência em GeradorIds
 QUERY_CONTAS_PAGAR = """
 SELECT DISTINCT E501MCP.CODEMP,E501MCP.CODFIL,E501MCP.NUMTIT,E501MCP.CODFOR
 ,E095FOR.NOMFOR,E501MCP.SEQMOV,E501MCP.CODTNS,E501MCP.DATMOV,E501MCP.CODFPG
@@ -99,8 +116,56 @@ AND E501TCP.VLRABE >= 0
 AND 0 = 0
 AND E001TNS.LISMOD = 'CPE'
 AND E501RAT.CTAFIN NOT IN (407,408,409,410,411,412,501)
+ORDER BY E501MCP.CODEMP,E501MCP.CODFIL,E501MCP.CODFOR,E501MCP.NUMTIT,E501TCP.CODTPT,E501MCP.SEQMOV
+,E501RAT.CTAFIN,E501RAT.CODCCU,E501RAT.VLRRAT,E501RAT.CTARED
 """
 
+# ================================================
+# COLUNAS DAS TABELAS LOCAIS (sincronização completa/incremental)
+# ================================================
+# id (derivado da chave natural) + colunas de dados + HASH_LINHA
+
+COLUNAS_CONTAS_RECEBER = [
+    'id', 'CODEMP', 'CODFIL', 'CODCLI', 'NOMCLI', 'CIDCLI', 'BAICLI', 'TIPCLI', 'DATEMI',
+    'NUMTIT', 'SITTIT', 'CODTPT', 'VLRABE', 'VLRORI', 'RECDEC', 'VCTPRO', 'VCTORI',
+    'PERMUL', 'TOLMUL', 'DATPPT', 'RECSOM', 'RECVJM', 'RECVMM', 'RECVDM', 'PERDSC',
+    'VLRDSC', 'TOLJRS', 'TIPJRS', 'PERJRS', 'JRSDIA', 'CODTNS', 'DESTNS', 'OBSTCR',
+    'CODREP', 'NUMCTR', 'CODSNF', 'NUMNFV', 'CODFPG', 'USU_UNICLI', 'ULTPGT',
+    'CODCCU', 'CTAFIN', 'HASH_LINHA'
+]
+
+COLUNAS_CONTAS_PAGAR = [
+    'id', 'CODEMP', 'CODFIL', 'NUMTIT', 'CODFOR', 'NOMFOR', 'SEQMOV', 'CODTNS',
+    'DATMOV', 'CODFPG', 'CODTPT', 'SITTIT', 'OBSTCP', 'VLRORI', 'DATEMI',
+    'ULTPGT', 'VCTPRO', 'VLRRAT', 'CTAFIN', 'CODCCU', 'CTARED', 'VLRABE', 'HASH_LINHA'
+]
+
+MODOS_SINCRONIZACAO = ('incremental', 'completo')
+
+# Linhas lidas do Senior (e gravadas na staging) por lote
+SYNC_BATCH_SIZE = 5000
+# Tentativas de reconstruir o agregado diário depois que a tabela detalhada já foi gravada
+TENTATIVAS_FATO_DIARIO = 2
+
+# Lotes lidos aguardando escrita no pipeline (limita a memória a ~SYNC_FILA_LOTES * SYNC_BATCH_SIZE linhas)
+SYNC_FILA_LOTES = 4
+
+
+def _to_int(value):
+    """Converte valores para int (trata strings não-numéricas como 0)"""
+    if value is None:
+        return 0
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str):
+        if value.strip().isdigit():
+            return int(value)
+        return 0
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        return 0
+
 
 class SincronizacaoService:
     """Serviço para sincronização de dados entre Senior e banco local"""
@@ -136,7 +201,8 @@ class SincronizacaoService:
         registros_inseridos: int = 0,
         tempo_execucao_ms: int = 0,
         mensagem_erro: str = None,
-        stack_trace: str = None
+        stack_trace: str = None,
+        observacoes: str = None
     ):
         """Atualiza o log de sincronização"""
         query = """
@@ -146,7 +212,8 @@ class SincronizacaoService:
                 registros_inseridos = %s,
                 tempo_execucao_ms = %s,
                 mensagem_erro = %s,
-                stack_trace = %s
+                stack_trace = %s,
+                observacoes = %s
             WHERE id = %s
         """
 
@@ -159,33 +226,320 @@ class SincronizacaoService:
                 tempo_execucao_ms,
                 mensagem_erro,
                 stack_trace,
+                observacoes,
                 log_id
             ))
             conn.commit()
             cursor.close()
 
     @staticmethod
-    def sincronizar_contas_receber() -> Dict[str, Any]:
+    def _valores_contas_receber(row: Dict[str, Any]) -> tuple:
+        """Valores das colunas de dados de COLUNAS_CONTAS_RECEBER (sem id e HASH_LINHA) a partir de uma linha do Senior"""
+        return (
+            row.get('CODEMP'),
+            row.get('CODFIL'),
+            row.get('CODCLI'),
+            row.get('NOMCLI'),
+            row.get('CIDCLI'),
+            row.get('BAICLI'),
+            row.get('TIPCLI'),
+            row.get('DATEMI'),
+            row.get('NUMTIT'),
+            row.get('SITTIT'),
+            row.get('CODTPT'),
+            row.get('VLRABE'),
+            row.get('VLRORI'),
+            _to_int(row.get('RECDEC')),
+            row.get('VCTPRO'),
+            row.get('VCTORI'),
+            row.get('PERMUL'),
+            row.get('TOLMUL'),
+            row.get('DATPPT'),
+            _to_int(row.get('RECSOM')),
+            _to_int(row.get('RECVJM')),
+            _to_int(row.get('RECVMM')),
+            _to_int(row.get('RECVDM')),
+            row.get('PERDSC'),
+            row.get('VLRDSC'),
+            row.get('TOLJRS'),
+            row.get('TIPJRS'),
+            row.get('PERJRS'),
+            row.get('JRSDIA'),
+            row.get('CODTNS'),
+            row.get('DESTNS'),
+            row.get('OBSTCR'),
+            row.get('CODREP'),
+            row.get('NUMCTR'),
+            row.get('CODSNF'),
+            row.get('NUMNFV'),
+            row.get('CODFPG'),
+            row.get('USU_UNICLI'),
+            row.get('ULTPGT'),
+            _to_int(row.get('CODCCU')),
+            _to_int(row.get('CTAFIN'))
+        )
+
+    @staticmethod
+    def _valores_contas_pagar(row: Dict[str, Any]) -> tuple:
+        """Valores das colunas de dados de COLUNAS_CONTAS_PAGAR (sem id e HASH_LINHA) a partir de uma linha do Senior"""
+        return (
+            row.get('CODEMP'),
+            row.get('CODFIL'),
+            row.get('NUMTIT'),
+            row.get('CODFOR'),
+            row.get('NOMFOR'),
+            row.get('SEQMOV'),
+            row.get('CODTNS'),
+            row.get('DATMOV'),
+            row.get('CODFPG'),
+            row.get('CODTPT'),
+            row.get('SITTIT'),
+            row.get('OBSTCP'),
+            row.get('VLRORI'),
+            row.get('DATEMI'),
+            row.get('ULTPGT'),
+            row.get('VCTPRO'),
+            row.get('VLRRAT'),
+            row.get('CTAFIN'),
+            row.get('CODCCU'),
+            row.get('CTARED'),
+            row.get('VLRABE')
+        )
+
+    @staticmethod
+    def _validar_modo(modo: str = None) -> str:
+        """Valida o modo da sincronização completa/incremental"""
+        modo = modo or settings.SYNC_MODO_PADRAO
+        if modo not in MODOS_SINCRONIZACAO:
+            raise ValueError(f"Modo de sincronização inválido: {modo}. Use um de {MODOS_SINCRONIZACAO}")
+        return modo
+
+    @staticmethod
+    def _mensagem_sucesso(qtd_registros: int, estatisticas: Dict[str, Any]) -> str:
+        alteracoes = estatisticas.get('alteracoes')
+        if not alteracoes:
+            return f'Sincronização concluída com sucesso! {qtd_registros} registros inseridos.'
+        return (
+            f"Sincronização incremental concluída! {qtd_registros} registros lidos: "
+            f"{alteracoes['inseridos']} inseridos, {alteracoes['atualizados']} atualizados, "
+            f"{alteracoes['removidos']} removidos, {alteracoes['inalterados']} inalterados."
+        )
+
+    @staticmethod
+    def _reconstruir_fato_diario(tabela: str) -> Dict[str, Any]:
+        """
+        Reconstrói fato_diario_* depois que {tabela} foi gravada, com nova tentativa em caso de falha.
+        Não levanta exceção: se todas as tentativas falharem, a tabela detalhada já tem os dados
+        novos e o agregado (totais do dashboard) ficou com os anteriores; o retorno marca
+        'desatualizado' para o log e a resposta da sincronização.
+
+        Returns:
+            {'tabela', 'linhas', 'tempo_ms'} ou {'tabela', 'desatualizado': True, 'erro'}
+        """
+        erro = None
+        for tentativa in range(1, TENTATIVAS_FATO_DIARIO + 1):
+            try:
+                return FatoDiarioService.reconstruir(tabela)
+            except Exception as e:
+                erro = str(e)
+                logger.error(
+                    f"[{tabela}] Falha ao reconstruir o agregado diário "
+                    f"(tentativa {tentativa}/{TENTATIVAS_FATO_DIARIO}): {erro}"
+                )
+
+        logger.error(f"[{tabela}] AGREGADO DIÁRIO DESATUALIZADO: o dashboard mostra os totais anteriores até a próxima sincronização")
+        return {'tabela': tabela, 'desatualizado': True, 'erro': erro}
+
+    @staticmethod
+    def _aviso_fato_diario(fato_diario: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        """Mensagem para o log/resposta quando o agregado diário ficou desatualizado (None se não ficou)"""
+        if not fato_diario or not fato_diario.get('desatualizado'):
+            return None
+        return f"Agregado diário ({fato_diario['tabela']}) desatualizado: {fato_diario['erro']}"
+
+    @staticmethod
+    def _carregar_tabela(
+        tabela: str,
+        query_senior: str,
+        valores,
+        colunas: list,
+        modo: str
+    ) -> Dict[str, Any]:
+        """
+        Carrega {tabela}_staging com o resultado do Senior e aplica na tabela final
+
+        1. Limpa {tabela}_staging (restos de uma carga anterior que falhou)
+        2. Pipeline Senior -> staging, com commit a cada lote e TABLOCK
+           (ninguém lê a staging, então não há disputa de locks com o dashboard).
+           Cada linha recebe id derivado da chave natural e HASH_LINHA.
+        3. Aplica na tabela final conforme o modo:
+           - completo: TRUNCATE + ALTER TABLE staging SWITCH TO tabela na mesma transação
+             (só metadados; modo de reparo, regrava tudo)
+           - incremental: diff por HASH_LINHA (services/sincronizacao_diff.py); só linhas
+             novas ou alteradas vão para a staging e são aplicadas com MERGE, e as que
+             sumiram do Senior são removidas
+           Se nenhuma linha vier do Senior, a tabela final fica intacta.
+        4. Reconstrói o agregado diário (fato_diario_*) se a tabela mudou
+
+        Returns:
+            Estatísticas do pipeline (ver PipelineSincronizacao.estatisticas) + alterações aplicadas
+        """
+        staging = f"{tabela}_staging"
+
+        # Se a tabela final mudou (commit da aplicação), o cache de consultas é invalidado
+        # mesmo que algo depois falhe: senão ele (e o ETag) continuariam servindo o dado anterior
+        publicada = False
+        try:
+            with db.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(f"TRUNCATE TABLE {staging}")
+                conn.commit()
+
+                # Total estimado para o ETA do job: linhas atuais da tabela (metadados, sem varrer)
+                cursor.execute("""
+                    SELECT SUM(rows) AS linhas FROM sys.partitions
+                    WHERE object_id = OBJECT_ID(%s) AND index_id IN (0, 1)
+                """, (tabela,))
+                total_estimado = (cursor.fetchone() or {}).get('linhas')
+                reportar_progresso(tabela, fase='lendo_senior', linhas=0, total=total_estimado)
+
+                # Incremental: hash join em memória contra o que já está no banco local,
+                # para que só linhas novas ou alteradas cheguem à staging
+                diff = DiffLinhas.carregar_local(cursor, tabela) if modo == 'incremental' else None
+
+                writer = BulkInsertWriter(cursor, staging, colunas, tablock=True)
+
+                processadas = [0]
+
+                def escrever(linhas, primeiro_lote):
+                    processadas[0] += len(linhas)
+                    reportar_progresso(tabela, linhas=processadas[0])
+                    if diff is not None:
+                        linhas = diff.filtrar(linhas)
+                    if linhas:
+                        writer.escrever(linhas)
+                        conn.commit()
+
+                estatisticas = PipelineSincronizacao(
+                    tabela,
+                    ler=lambda: senior_db.iter_query(query_senior, batch_size=SYNC_BATCH_SIZE),
+                    transformar=MontadorLinhas(tabela, valores),
+                    escrever=escrever,
+                    tamanho_fila=SYNC_FILA_LOTES
+                ).executar()
+                estatisticas['insercao'] = {
+                    'estrategia': writer.estrategia,
+                    'envios': writer.envios,
+                    'linhas_gravadas': writer.linhas_gravadas
+                }
+                estatisticas['modo'] = modo
+
+                if estatisticas['estagios']['leitura']['linhas'] > 0:
+                    reportar_progresso(tabela, fase='aplicando', total=processadas[0])
+                    inicio_aplicacao = datetime.now()
+                    if modo == 'completo':
+                        logger.info(f"Publicando {staging} em {tabela} (SWITCH)...")
+                        cursor.execute(f"TRUNCATE TABLE {tabela}")
+                        cursor.execute(f"ALTER TABLE {staging} SWITCH TO {tabela}")
+                    else:
+                        ids_removidos = diff.removidos()
+                        estatisticas['alteracoes'] = diff.resumo()
+                        logger.info(f"[{tabela}] Diferenças: {estatisticas['alteracoes']}")
+                        SincronizacaoService._aplicar_diferencas(cursor, tabela, colunas, ids_removidos)
+                    conn.commit()
+                    alteracoes = estatisticas.get('alteracoes')
+                    publicada = alteracoes is None or alteracoes['inseridos'] + alteracoes['atualizados'] + alteracoes['removidos'] > 0
+                    estatisticas['aplicacao_ms'] = int((datetime.now() - inicio_aplicacao).total_seconds() * 1000)
+
+                cursor.close()
+
+            # Agregado diário e snapshot em memória do dashboard (só quando algo mudou na tabela)
+            if publicada:
+                reportar_progresso(tabela, fase='agregando')
+                estatisticas['fato_diario'] = SincronizacaoService._reconstruir_fato_diario(tabela)
+                estatisticas['snapshot'] = snapshot_analitico.reconstruir(tabela)
+        finally:
+            if publicada:
+                estatisticas['cache_geracao'] = cache_consultas.nova_geracao()
+
+        return estatisticas
+
+    @staticmethod
+    def _aplicar_diferencas(cursor, tabela: str, colunas: list, ids_removidos: list):
+        """
+        Aplica na tabela final o resultado do diff (chamar dentro da transação):
+        - {tabela}_staging contém só as linhas novas ou alteradas -> MERGE pelo id
+        - ids_removidos (não vieram do Senior) -> DELETE via tabela temporária
+        """
+        dados = [c for c in colunas if c != 'id']
+        atribuicoes = ',\n                '.join(f"t.{c} = s.{c}" for c in dados)
+        lista = ', '.join(colunas)
+        origem = ', '.join(f"s.{c}" for c in colunas)
+
+        cursor.execute(f"""
+            MERGE {tabela} AS t
+            USING {tabela}_staging AS s
+                ON t.id = s.id
+            WHEN MATCHED THEN UPDATE SET
+                {atribuicoes},
+                t.updated_at = GETDATE()
+            WHEN NOT MATCHED BY TARGET THEN
+                INSERT ({lista}) VALUES ({origem});
+        """)
+
+        if ids_removidos:
+            cursor.execute("CREATE TABLE #ids_removidos (id UNIQUEIDENTIFIER NOT NULL PRIMARY KEY)")
+            BulkInsertWriter(cursor, '#ids_removidos', ['id']).escrever([(i,) for i in ids_removidos])
+            cursor.execute(f"""
+                DELETE t
+                FROM {tabela} t
+                INNER JOIN #ids_removidos r ON r.id = t.id
+            """)
+            cursor.execute("DROP TABLE #ids_removidos")
+
+    @staticmethod
+    def sincronizar_contas_receber(modo: str = None) -> Dict[str, Any]:
         """
         Sincroniza contas a receber do Senior para o banco local
-        Estratégia: Limpa tabela e reinsere todos os registros
+        Estratégia: Carrega todos os registros na staging e aplica na tabela
+
+        Args:
+            modo: 'incremental' (grava só o que mudou) ou 'completo' (reparo, regrava tudo).
+                  Padrão: settings.SYNC_MODO_PADRAO
         """
+        modo = SincronizacaoService._validar_modo(modo)
         inicio = datetime.now()
         log_id = SincronizacaoService.criar_log_sincronizacao('contas_receber')
 
         try:
             logger.info("Iniciando sincronização de Contas a Receber...")
 
-            # 1. Buscar dados do Senior
-            logger.info("Buscando dados do banco Senior...")
-            dados_senior = senior_db.execute_query(QUERY_CONTAS_RECEBER)
-            qtd_registros = len(dados_senior)
-            logger.info(f"Encontrados {qtd_registros} registros no Senior")
+            # 1. Rateio (CODCCU/CTAFIN): no modo hash_join as linhas de E301RAT vêm numa consulta
+            #    só, antes dos títulos, e são juntadas em memória pela chave do título
+            modo_rateio = validar_modo_rateio()
+            valores = SincronizacaoService._valores_contas_receber
+            mapa_rateio = None
+            if modo_rateio == 'hash_join':
+                logger.info("Buscando rateio (E301RAT) do banco Senior...")
+                mapa_rateio = MapaRateio(senior_db.execute_query(sql_linhas_rateio(from_where_contas_receber())))
+                logger.info(f"Rateio de {len(mapa_rateio)} títulos carregado")
+                valores = lambda row: SincronizacaoService._valores_contas_receber(mapa_rateio.aplicar(row))
+
+            # 2. Carrega contas_receber_staging a partir do Senior e aplica conforme o modo
+            logger.info("Buscando dados do banco Senior em lotes...")
+            estatisticas = SincronizacaoService._carregar_tabela(
+                'contas_receber', query_contas_receber(modo_rateio), valores, COLUNAS_CONTAS_RECEBER, modo
+            )
+            estatisticas['rateio'] = {'modo': modo_rateio, 'titulos': len(mapa_rateio) if mapa_rateio is not None else None}
+
+            qtd_registros = estatisticas['estagios']['leitura']['linhas']
+            observacoes = json.dumps(estatisticas)
+            logger.info(f"Vazão por estágio: {observacoes}")
 
             if qtd_registros == 0:
                 tempo_ms = int((datetime.now() - inicio).total_seconds() * 1000)
                 SincronizacaoService.atualizar_log_sincronizacao(
-                    log_id, 'sucesso', 0, tempo_ms
+                    log_id, 'sucesso', 0, tempo_ms, observacoes=observacoes
                 )
                 return {
                     'success': True,
@@ -195,125 +549,25 @@ class SincronizacaoService:
                     'log_id': log_id
                 }
 
-            # 2. Limpar tabela local
-            logger.info("Limpando tabela contas_receber...")
-            with db.get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute("TRUNCATE TABLE contas_receber")
-                conn.commit()
-                cursor.close()
-
-            # 3. Preparar dados para inserção em massa
-            logger.info(f"Preparando {qtd_registros} registros para inserção em massa...")
-            insert_query = """
-                INSERT INTO contas_receber (
-                    id, CODEMP, CODFIL, CODCLI, NOMCLI, CIDCLI, BAICLI, TIPCLI, DATEMI,
-                    NUMTIT, SITTIT, CODTPT, VLRABE, VLRORI, RECDEC, VCTPRO, VCTORI,
-                    PERMUL, TOLMUL, DATPPT, RECSOM, RECVJM, RECVMM, RECVDM, PERDSC,
-                    VLRDSC, TOLJRS, TIPJRS, PERJRS, JRSDIA, CODTNS, DESTNS, OBSTCR,
-                    CODREP, NUMCTR, CODSNF, NUMNFV, CODFPG, USU_UNICLI, ULTPGT,
-                    CODCCU, CTAFIN
-                ) VALUES (
-                    %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
-                    %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
-                    %s, %s, %s, %s, %s, %s, %s, %s
-                )
-            """
-
-            # Função para converter valores para int (trata strings não-numéricas como 0)
-            def to_int(value):
-                if value is None:
-                    return 0
-                if isinstance(value, int):
-                    return value
-                if isinstance(value, str):
-                    if value.strip().isdigit():
-                        return int(value)
-                    return 0
-                try:
-                    return int(value)
-                except (ValueError, TypeError):
-                    return 0
-
-            # Preparar lista de tuplas para executemany
-            dados_inserir = []
-            for row in dados_senior:
-                dados_inserir.append((
-                    str(uuid.uuid4()),
-                    row.get('CODEMP'),
-                    row.get('CODFIL'),
-                    row.get('CODCLI'),
-                    row.get('NOMCLI'),
-                    row.get('CIDCLI'),
-                    row.get('BAICLI'),
-                    row.get('TIPCLI'),
-                    row.get('DATEMI'),
-                    row.get('NUMTIT'),
-                    row.get('SITTIT'),
-                    row.get('CODTPT'),
-                    row.get('VLRABE'),
-                    row.get('VLRORI'),
-                    to_int(row.get('RECDEC')),
-                    row.get('VCTPRO'),
-                    row.get('VCTORI'),
-                    row.get('PERMUL'),
-                    row.get('TOLMUL'),
-                    row.get('DATPPT'),
-                    to_int(row.get('RECSOM')),
-                    to_int(row.get('RECVJM')),
-                    to_int(row.get('RECVMM')),
-                    to_int(row.get('RECVDM')),
-                    row.get('PERDSC'),
-                    row.get('VLRDSC'),
-                    row.get('TOLJRS'),
-                    row.get('TIPJRS'),
-                    row.get('PERJRS'),
-                    row.get('JRSDIA'),
-                    row.get('CODTNS'),
-                    row.get('DESTNS'),
-                    row.get('OBSTCR'),
-                    row.get('CODREP'),
-                    row.get('NUMCTR'),
-                    row.get('CODSNF'),
-                    row.get('NUMNFV'),
-                    row.get('CODFPG'),
-                    row.get('USU_UNICLI'),
-                    row.get('ULTPGT'),
-                    to_int(row.get('CODCCU')),
-                    to_int(row.get('CTAFIN'))
-                ))
-
-            # 4. Inserir dados em massa com executemany (batches de 5000)
-            logger.info(f"Inserindo {qtd_registros} registros em massa (batches)...")
-            batch_size = 5000
-            total_inseridos = 0
-
-            with db.get_connection() as conn:
-                cursor = conn.cursor()
-
-                for i in range(0, len(dados_inserir), batch_size):
-                    batch = dados_inserir[i:i + batch_size]
-                    cursor.executemany(insert_query, batch)
-                    total_inseridos += len(batch)
-                    logger.info(f"Inseridos {total_inseridos}/{qtd_registros} registros...")
-
-                conn.commit()
-                cursor.close()
-                logger.info(f"Total de {total_inseridos} registros inseridos com sucesso.")
+            logger.info(f"Total de {qtd_registros} registros sincronizados ({modo}).")
 
             tempo_ms = int((datetime.now() - inicio).total_seconds() * 1000)
             logger.info(f"Sincronização concluída em {tempo_ms}ms")
 
-            # Atualizar log com sucesso
+            # Atualizar log com sucesso (com aviso se o agregado diário não foi reconstruído)
+            aviso = SincronizacaoService._aviso_fato_diario(estatisticas.get('fato_diario'))
             SincronizacaoService.atualizar_log_sincronizacao(
-                log_id, 'sucesso', qtd_registros, tempo_ms
+                log_id, 'sucesso', qtd_registros, tempo_ms, mensagem_erro=aviso, observacoes=observacoes
             )
 
+            mensagem = SincronizacaoService._mensagem_sucesso(qtd_registros, estatisticas)
             return {
                 'success': True,
                 'registros_inseridos': qtd_registros,
                 'tempo_execucao_ms': tempo_ms,
-                'mensagem': f'Sincronização concluída com sucesso! {qtd_registros} registros inseridos.',
+                'mensagem': f"{mensagem} {aviso}" if aviso else mensagem,
+                'alteracoes': estatisticas.get('alteracoes'),
+                'agregado_desatualizado': aviso is not None,
                 'log_id': log_id
             }
 
@@ -338,27 +592,37 @@ class SincronizacaoService:
             }
 
     @staticmethod
-    def sincronizar_contas_pagar() -> Dict[str, Any]:
+    def sincronizar_contas_pagar(modo: str = None) -> Dict[str, Any]:
         """
         Sincroniza contas a pagar do Senior para o banco local
-        Estratégia: Limpa tabela e reinsere todos os registros
+        Estratégia: Carrega todos os registros na staging e aplica na tabela
+
+        Args:
+            modo: 'incremental' (grava só o que mudou) ou 'completo' (reparo, regrava tudo).
+                  Padrão: settings.SYNC_MODO_PADRAO
         """
+        modo = SincronizacaoService._validar_modo(modo)
         inicio = datetime.now()
         log_id = SincronizacaoService.criar_log_sincronizacao('contas_pagar')
 
         try:
             logger.info("Iniciando sincronização de Contas a Pagar...")
 
-            # 1. Buscar dados do Senior
-            logger.info("Buscando dados do banco Senior...")
-            dados_senior = senior_db.execute_query(QUERY_CONTAS_PAGAR)
-            qtd_registros = len(dados_senior)
-            logger.info(f"Encontrados {qtd_registros} registros no Senior")
+            # 1. Carrega contas_pagar_staging a partir do Senior e aplica conforme o modo
+            # (TODOS os registros, sem filtrar duplicatas)
+            logger.info("Buscando dados do banco Senior em lotes...")
+            estatisticas = SincronizacaoService._carregar_tabela(
+                'contas_pagar', QUERY_CONTAS_PAGAR, SincronizacaoService._valores_contas_pagar, COLUNAS_CONTAS_PAGAR, modo
+            )
+
+            qtd_registros = estatisticas['estagios']['leitura']['linhas']
+            observacoes = json.dumps(estatisticas)
+            logger.info(f"Vazão por estágio: {observacoes}")
 
             if qtd_registros == 0:
                 tempo_ms = int((datetime.now() - inicio).total_seconds() * 1000)
                 SincronizacaoService.atualizar_log_sincronizacao(
-                    log_id, 'sucesso', 0, tempo_ms
+                    log_id, 'sucesso', 0, tempo_ms, observacoes=observacoes
                 )
                 return {
                     'success': True,
@@ -368,86 +632,25 @@ class SincronizacaoService:
                     'log_id': log_id
                 }
 
-            # 2. Limpar tabela local
-            logger.info("Limpando tabela contas_pagar...")
-            with db.get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute("TRUNCATE TABLE contas_pagar")
-                conn.commit()
-                cursor.close()
-
-            # 3. Preparar dados para inserção em massa (TODOS os registros, sem filtrar duplicatas)
-            logger.info(f"Preparando {qtd_registros} registros para inserção em massa...")
-            insert_query = """
-                INSERT INTO contas_pagar (
-                    id, CODEMP, CODFIL, NUMTIT, CODFOR, NOMFOR, SEQMOV, CODTNS,
-                    DATMOV, CODFPG, CODTPT, SITTIT, OBSTCP, VLRORI, DATEMI,
-                    ULTPGT, VCTPRO, VLRRAT, CTAFIN, CODCCU, CTARED, VLRABE
-                ) VALUES (
-                    %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
-                    %s, %s, %s, %s, %s, %s, %s
-                )
-            """
-
-            # Preparar lista de tuplas para executemany
-            dados_inserir = []
-            for row in dados_senior:
-                dados_inserir.append((
-                    str(uuid.uuid4()),
-                    row.get('CODEMP'),
-                    row.get('CODFIL'),
-                    row.get('NUMTIT'),
-                    row.get('CODFOR'),
-                    row.get('NOMFOR'),
-                    row.get('SEQMOV'),
-                    row.get('CODTNS'),
-                    row.get('DATMOV'),
-                    row.get('CODFPG'),
-                    row.get('CODTPT'),
-                    row.get('SITTIT'),
-                    row.get('OBSTCP'),
-                    row.get('VLRORI'),
-                    row.get('DATEMI'),
-                    row.get('ULTPGT'),
-                    row.get('VCTPRO'),
-                    row.get('VLRRAT'),
-                    row.get('CTAFIN'),
-                    row.get('CODCCU'),
-                    row.get('CTARED'),
-                    row.get('VLRABE')
-                ))
-
-            # 4. Inserir dados em massa com executemany (batches de 5000)
-            logger.info(f"Inserindo {qtd_registros} registros em massa (batches)...")
-            batch_size = 5000
-            total_inseridos = 0
-
-            with db.get_connection() as conn:
-                cursor = conn.cursor()
-
-                for i in range(0, len(dados_inserir), batch_size):
-                    batch = dados_inserir[i:i + batch_size]
-                    cursor.executemany(insert_query, batch)
-                    total_inseridos += len(batch)
-                    logger.info(f"Inseridos {total_inseridos}/{qtd_registros} registros...")
-
-                conn.commit()
-                cursor.close()
-                logger.info(f"Total de {total_inseridos} registros inseridos com sucesso.")
+            logger.info(f"Total de {qtd_registros} registros sincronizados ({modo}).")
 
             tempo_ms = int((datetime.now() - inicio).total_seconds() * 1000)
             logger.info(f"Sincronização concluída em {tempo_ms}ms")
 
-            # Atualizar log com sucesso
+            # Atualizar log com sucesso (com aviso se o agregado diário não foi reconstruído)
+            aviso = SincronizacaoService._aviso_fato_diario(estatisticas.get('fato_diario'))
             SincronizacaoService.atualizar_log_sincronizacao(
-                log_id, 'sucesso', qtd_registros, tempo_ms
+                log_id, 'sucesso', qtd_registros, tempo_ms, mensagem_erro=aviso, observacoes=observacoes
             )
 
+            mensagem = SincronizacaoService._mensagem_sucesso(qtd_registros, estatisticas)
             return {
                 'success': True,
                 'registros_inseridos': qtd_registros,
                 'tempo_execucao_ms': tempo_ms,
-                'mensagem': f'Sincronização concluída com sucesso! {qtd_registros} registros inseridos.',
+                'mensagem': f"{mensagem} {aviso}" if aviso else mensagem,
+                'alteracoes': estatisticas.get('alteracoes'),
+                'agregado_desatualizado': aviso is not None,
                 'log_id': log_id
             }
 
@@ -472,86 +675,87 @@ class SincronizacaoService:
             }
 
     @staticmethod
-    def sincronizar_tudo() -> Dict[str, Any]:
-        """Sincroniza todas as tabelas (contas a receber, contas a pagar, plano financeiro e centro de custo)"""
+    def sincronizar_tudo(modo: str = None) -> Dict[str, Any]:
+        """
+        Sincroniza todas as tabelas (contas a receber, contas a pagar, plano financeiro e centro de custo)
+        As etapas independentes rodam em paralelo (até settings.SYNC_MAX_PARALELISMO);
+        resultado e duração de cada uma ficam nas observações do log pai.
+
+        Args:
+            modo: modo de contas a receber/pagar ('incremental' ou 'completo')
+        """
+        modo = SincronizacaoService._validar_modo(modo)
         inicio = datetime.now()
         log_id = SincronizacaoService.criar_log_sincronizacao('ambas')
 
         try:
             logger.info("=" * 80)
-            logger.info("Iniciando sincronização completa...")
+            logger.info(f"Iniciando sincronização completa (até {settings.SYNC_MAX_PARALELISMO} etapas em paralelo)...")
             logger.info("=" * 80)
 
-            # Sincronizar dados gerais (primeiro, pois as outras dependem deles)
-
-            # 1. Sincronizar plano financeiro
-            logger.info("PASSO 1/4: Sincronizando Plano Financeiro...")
-            try:
-                resultado_plano = PlanoFinanceiroService.sincronizar()
-                logger.info(f"✓ Plano Financeiro: {resultado_plano.get('mensagem', 'OK')}")
-            except Exception as e:
-                logger.error(f"✗ ERRO no Plano Financeiro: {str(e)}")
-                logger.error(traceback.format_exc())
-                raise Exception(f"Falha na sincronização do Plano Financeiro: {str(e)}")
-
-            # 2. Sincronizar centro de custo
-            logger.info("PASSO 2/4: Sincronizando Centro de Custo...")
-            try:
-                resultado_centro_custo = CentroCustoService.sincronizar_centro_custo()
-                logger.info(f"✓ Centro de Custo: {resultado_centro_custo.get('message', 'OK')}")
-            except Exception as e:
-                logger.error(f"✗ ERRO no Centro de Custo: {str(e)}")
-                logger.error(traceback.format_exc())
-                raise Exception(f"Falha na sincronização do Centro de Custo: {str(e)}")
-
-            # 3. Sincronizar contas a receber
-            logger.info("PASSO 3/4: Sincronizando Contas a Receber...")
-            try:
-                resultado_receber = SincronizacaoService.sincronizar_contas_receber()
-                logger.info(f"✓ Contas a Receber: {resultado_receber.get('mensagem', 'OK')}")
-            except Exception as e:
-                logger.error(f"✗ ERRO no Contas a Receber: {str(e)}")
-                logger.error(traceback.format_exc())
-                raise Exception(f"Falha na sincronização de Contas a Receber: {str(e)}")
-
-            # 4. Sincronizar contas a pagar
-            logger.info("PASSO 4/4: Sincronizando Contas a Pagar...")
-            try:
-                resultado_pagar = SincronizacaoService.sincronizar_contas_pagar()
-                logger.info(f"✓ Contas a Pagar: {resultado_pagar.get('mensagem', 'OK')}")
-            except Exception as e:
-                logger.error(f"✗ ERRO no Contas a Pagar: {str(e)}")
-                logger.error(traceback.format_exc())
-                raise Exception(f"Falha na sincronização de Contas a Pagar: {str(e)}")
-
-            # Verificar se todas tiveram sucesso
-            success = (resultado_plano.get('success', False) and
-                      resultado_centro_custo.get('success', False) and
-                      resultado_receber.get('success', False) and
-                      resultado_pagar.get('success', False))
-
-            total_registros = (resultado_plano.get('registros_sincronizados', 0) +
-                             resultado_centro_custo.get('registros_inseridos', 0) +
-                             resultado_receber.get('registros_inseridos', 0) +
-                             resultado_pagar.get('registros_inseridos', 0))
+            # Contas a receber/pagar leem tabelas diferentes do Senior e rodam em paralelo, mas
+            # dependem do plano financeiro: ao final elas reconstroem o snapshot do dashboard,
+            # que lê plano_financeiro (a sincronização do plano faz TRUNCATE + carga)
+            registros = OrquestradorSincronizacao([
+                EtapaSincronizacao('plano_financeiro', PlanoFinanceiroService.sincronizar),
+                EtapaSincronizacao('centro_custo', CentroCustoService.sincronizar_centro_custo),
+                EtapaSincronizacao(
+                    'contas_receber', lambda: SincronizacaoService.sincronizar_contas_receber(modo),
+                    depende_de=['plano_financeiro']
+                ),
+                EtapaSincronizacao(
+                    'contas_pagar', lambda: SincronizacaoService.sincronizar_contas_pagar(modo),
+                    depende_de=['plano_financeiro']
+                ),
+            ], max_paralelismo=settings.SYNC_MAX_PARALELISMO,
+               ao_mudar_etapa=lambda nome, status: reportar_progresso(nome, fase=status)).executar()
+
+            # Plano financeiro também entra nas consultas do dashboard (rankings por conta)
+            cache_consultas.nova_geracao()
+
+            resultados = {nome: registro['resultado'] or {} for nome, registro in registros.items()}
+            success = all(registro['status'] == 'sucesso' for registro in registros.values())
+
+            total_registros = (resultados['plano_financeiro'].get('registros_sincronizados', 0) +
+                             resultados['centro_custo'].get('registros_inseridos', 0) +
+                             resultados['contas_receber'].get('registros_inseridos', 0) +
+                             resultados['contas_pagar'].get('registros_inseridos', 0))
 
             tempo_ms = int((datetime.now() - inicio).total_seconds() * 1000)
 
+            # Resumo por etapa gravado no log pai (os detalhes de cada tabela ficam no log da própria etapa)
+            observacoes = json.dumps({
+                'max_paralelismo': settings.SYNC_MAX_PARALELISMO,
+                'soma_etapas_ms': sum(registro['duracao_ms'] for registro in registros.values()),
+                'etapas': {
+                    nome: {
+                        'status': registro['status'],
+                        'inicio': registro.get('inicio'),
+                        'fim': registro.get('fim'),
+                        'duracao_ms': registro['duracao_ms'],
+                        'log_id': resultados[nome].get('log_id'),
+                        'erro': registro.get('erro') or resultados[nome].get('mensagem') if registro['status'] != 'sucesso' else None
+                    }
+                    for nome, registro in registros.items()
+                }
+            })
+
             if success:
                 mensagem = f'Sincronização completa concluída! Total de {total_registros} registros inseridos.'
                 logger.info("=" * 80)
                 logger.info(f"✓ SUCESSO: {mensagem}")
                 logger.info("=" * 80)
                 SincronizacaoService.atualizar_log_sincronizacao(
-                    log_id, 'sucesso', total_registros, tempo_ms
+                    log_id, 'sucesso', total_registros, tempo_ms, observacoes=observacoes
                 )
             else:
-                mensagem = 'Sincronização completa com erros. Verifique os logs individuais.'
+                falhas = [nome for nome, registro in registros.items() if registro['status'] != 'sucesso']
+                mensagem = f"Sincronização completa com erros ({', '.join(falhas)}). Verifique os logs individuais."
                 logger.warning("=" * 80)
                 logger.warning(f"⚠ AVISO: {mensagem}")
                 logger.warning("=" * 80)
                 SincronizacaoService.atualizar_log_sincronizacao(
-                    log_id, 'erro', total_registros, tempo_ms, mensagem
+                    log_id, 'erro', total_registros, tempo_ms, mensagem, observacoes=observacoes
                 )
 
             return {
@@ -561,10 +765,12 @@ class SincronizacaoService:
                 'mensagem': mensagem,
                 'log_id': log_id,
                 'detalhes': {
-                    'plano_financeiro': resultado_plano,
-                    'centro_custo': resultado_centro_custo,
-                    'contas_receber': resultado_receber,
-                    'contas_pagar': resultado_pagar
+                    nome: registro['resultado'] or {'success': False, 'mensagem': registro.get('erro')}
+                    for nome, registro in registros.items()
+                },
+                'etapas': {
+                    nome: {'status': registro['status'], 'duracao_ms': registro['duracao_ms']}
+                    for nome, registro in registros.items()
                 }
             }
 
@@ -590,6 +796,58 @@ class SincronizacaoService:
                 'stack_trace': stack
             }
 
+    @staticmethod
+    def _inserir_registros_periodo(tabela: str, colunas: list, registros: list, valores) -> Dict[str, Any]:
+        """
+        Insere os registros do Senior em {tabela} (sincronização por período)
+        As linhas são montadas por MontadorLinhas, como na sincronização completa/incremental
+        (mesmas colunas, id da chave natural e HASH_LINHA), então a próxima incremental
+        não as vê como alteradas. Lotes multi-linha via BulkInsertWriter, uma ida ao
+        servidor por lote; um lote com erro é desfeito e dividido até isolar os registros
+        recusados, que são pulados como no antigo loop linha a linha.
+
+        Args:
+            colunas: COLUNAS_CONTAS_* (id + dados + HASH_LINHA)
+            valores: SincronizacaoService._valores_contas_*
+
+        Returns:
+            {'inseridos', 'erros': [(registro, exceção)], 'envios', 'lotes_divididos'}
+        """
+        montar = MontadorLinhas(tabela, valores)
+        agora = datetime.now()
+        linhas, origem, erros = [], [], []
+        for registro in registros:
+            try:
+                linhas.append(montar(registro) + (agora, agora))
+                origem.append(registro)
+            except Exception as e:
+                erros.append((registro, e))
+
+        inseridos = 0
+        with db.get_connection() as conn:
+            cursor = conn.cursor()
+            writer = BulkInsertWriter(cursor, tabela, [*colunas, 'created_at', 'updated_at'])
+
+            for inicio in range(0, len(linhas), writer.linhas_por_envio):
+                lote = linhas[inicio:inicio + writer.linhas_por_envio]
+                inseridos += writer.escrever_isolando_erros(
+                    lote, lambda indice, erro: erros.append((origem[inicio + indice], erro))
+                )
+                reportar_progresso(tabela, linhas=inseridos)
+
+            conn.commit()
+            cursor.close()
+
+        if writer.lotes_divididos:
+            logger.warning(f"[{tabela}] {writer.lotes_divididos} lotes divididos para isolar {len(erros)} registros com erro")
+
+        return {
+            'inseridos': inseridos,
+            'erros': erros,
+            'envios': writer.envios,
+            'lotes_divididos': writer.lotes_divididos
+        }
+
     @staticmethod
     def sincronizar_contas_receber_periodo(periodo: str) -> Dict[str, Any]:
         """
@@ -616,8 +874,10 @@ class SincronizacaoService:
 
             # 1. Buscar dados do Senior usando a nova API
             logger.info("Buscando dados do banco Senior...")
+            reportar_progresso('contas_receber', fase='lendo_senior')
             try:
-                dados_senior = ContasReceberSeniorService.obter_contas_receber_do_senior(periodo, filiais)
+                # Direto no Senior, sem o cache das rotas: a sincronização precisa do dado atual
+                dados_senior = ContasReceberSeniorService.obter_contas_receber_do_senior.sem_cache(periodo, filiais)
                 qtd_registros = len(dados_senior)
                 logger.info(f"Encontrados {qtd_registros} registros no Senior")
             except Exception as e:
@@ -640,29 +900,32 @@ class SincronizacaoService:
 
             # 2. Deletar registros do banco local baseado na DATA_AJUSTADA do período
             logger.info(f"Deletando registros do período {periodo}...")
+            reportar_progresso('contas_receber', fase='removendo_periodo')
+            # Exatamente os títulos buscados no Senior (DATPPT na janela de obter_primeiro_ultimo_dia_mes),
+            # para que nenhum id reinserido colida com uma cópia antiga. A faixa de DATA_AJUSTADA
+            # (DATPPT + 1 a 3 dias) usa o índice IX_contas_receber_data_ajustada; DATPPT deixa exata.
+            inicio_datppt, fim_datppt = ContasReceberSeniorService.obter_primeiro_ultimo_dia_mes(periodo)
+            fim_datppt += timedelta(days=1)  # exclusive
+            parametros_delete = (
+                (inicio_datppt + timedelta(days=1)).strftime('%Y-%m-%d'),
+                (fim_datppt + timedelta(days=3)).strftime('%Y-%m-%d'),
+                inicio_datppt.strftime('%Y-%m-%d'),
+                fim_datppt.strftime('%Y-%m-%d')
+            )
             delete_query = """
             DELETE FROM contas_receber
-            WHERE CONVERT(VARCHAR(7),
-                CASE
-                    WHEN DATEPART(WEEKDAY, DATPPT) = 6 THEN DATEADD(DAY, 3, DATPPT)  -- Sexta → +3
-                    WHEN DATEPART(WEEKDAY, DATPPT) = 7 THEN DATEADD(DAY, 3, DATPPT)  -- Sábado → +3
-                    WHEN DATEPART(WEEKDAY, DATPPT) = 1 THEN DATEADD(DAY, 2, DATPPT)  -- Domingo → +2
-                    WHEN DATEPART(WEEKDAY, DATPPT) = 2 THEN DATEADD(DAY, 1, DATPPT)  -- Segunda → +1
-                    WHEN DATEPART(WEEKDAY, DATPPT) = 3 THEN DATEADD(DAY, 1, DATPPT)  -- Terça → +1
-                    WHEN DATEPART(WEEKDAY, DATPPT) = 4 THEN DATEADD(DAY, 1, DATPPT)  -- Quarta → +1
-                    WHEN DATEPART(WEEKDAY, DATPPT) = 5 THEN DATEADD(DAY, 1, DATPPT)  -- Quinta → +1
-                    ELSE DATPPT
-                END, 23) = %s
+            WHERE DATA_AJUSTADA >= %s AND DATA_AJUSTADA < %s
+            AND DATPPT >= %s AND DATPPT < %s
             AND CODFIL IN ('1001', '1002', '1003', '3001', '3002', '3003')
             """
 
             try:
                 logger.info(f"Query DELETE: {delete_query}")
-                logger.info(f"Parâmetro: {periodo}")
+                logger.info(f"Parâmetros: {parametros_delete}")
 
                 with db.get_connection() as conn:
                     cursor = conn.cursor()
-                    cursor.execute(delete_query, (periodo,))
+                    cursor.execute(delete_query, parametros_delete)
                     registros_deletados = cursor.rowcount
                     conn.commit()
                     cursor.close()
@@ -675,80 +938,37 @@ class SincronizacaoService:
 
             # 3. Inserir novos registros
             logger.info("Inserindo novos registros...")
-            insert_query = """
-                INSERT INTO contas_receber (
-                    id, CODEMP, CODFIL, CODCLI, NOMCLI, CIDCLI, BAICLI, TIPCLI,
-                    NUMTIT, SITTIT, CODTPT, VLRABE, VLRORI, RECDEC, VCTPRO, VCTORI,
-                    DATPPT, DATEMI, CODTNS, DESTNS, CODCCU, CTAFIN, USU_UNICLI, ULTPGT,
-                    created_at, updated_at
-                ) VALUES (
-                    %s, %s, %s, %s, %s, %s, %s, %s,
-                    %s, %s, %s, %s, %s, %s, %s, %s,
-                    %s, %s, %s, %s, %s, %s, %s, %s,
-                    %s, %s
-                )
-            """
-
-            registros_inseridos = 0
-            with db.get_connection() as conn:
-                cursor = conn.cursor()
-
-                for registro in dados_senior:
-                    try:
-                        # Gera ID único
-                        registro_id = str(uuid.uuid4())
-                        now = datetime.now()
-
-                        cursor.execute(insert_query, (
-                            registro_id,
-                            registro.get('CODEMP'),
-                            registro.get('CODFIL'),
-                            registro.get('CODCLI'),
-                            registro.get('NOMCLI'),
-                            registro.get('CIDCLI'),
-                            registro.get('BAICLI'),
-                            registro.get('TIPCLI'),
-                            registro.get('NUMTIT'),
-                            registro.get('SITTIT'),
-                            registro.get('CODTPT'),
-                            registro.get('VLRABE'),
-                            registro.get('VLRORI'),
-                            registro.get('RECDEC'),
-                            registro.get('VCTPRO'),
-                            registro.get('VCTORI'),
-                            registro.get('DATPPT'),
-                            registro.get('DATEMI'),
-                            registro.get('CODTNS'),
-                            registro.get('DESTNS'),
-                            registro.get('CODCCU'),
-                            registro.get('CTAFIN'),
-                            registro.get('USU_UNICLI'),
-                            registro.get('ULTPGT'),
-                            now,
-                            now
-                        ))
-                        registros_inseridos += 1
-                    except Exception as e:
-                        logger.error(f"Erro ao inserir registro {registro.get('NUMTIT')}: {str(e)}")
-                        continue
-
-                conn.commit()
-                cursor.close()
+            reportar_progresso('contas_receber', fase='gravando', linhas=0, total=qtd_registros)
+            insercao = SincronizacaoService._inserir_registros_periodo(
+                'contas_receber', COLUNAS_CONTAS_RECEBER, dados_senior, SincronizacaoService._valores_contas_receber
+            )
+            registros_inseridos = insercao['inseridos']
+            for registro, erro in insercao['erros']:
+                logger.error(f"Erro ao inserir registro {registro.get('NUMTIT')}: {str(erro)}")
 
             logger.info(f"Inseridos {registros_inseridos} registros no banco local")
 
-            # Finalizar
+            # 4. Reconstruir o agregado diário e o snapshot em memória do dashboard
+            reportar_progresso('contas_receber', fase='agregando')
+            fato_diario = SincronizacaoService._reconstruir_fato_diario('contas_receber')
+            snapshot_analitico.reconstruir('contas_receber')
+            cache_consultas.nova_geracao()
+
+            # Finalizar (com aviso se o agregado diário não foi reconstruído)
             tempo_ms = int((datetime.now() - inicio).total_seconds() * 1000)
+            aviso = SincronizacaoService._aviso_fato_diario(fato_diario)
             SincronizacaoService.atualizar_log_sincronizacao(
-                log_id, 'sucesso', registros_inseridos, tempo_ms
+                log_id, 'sucesso', registros_inseridos, tempo_ms, mensagem_erro=aviso
             )
 
+            mensagem = f'Sincronização concluída para {periodo}. {registros_inseridos} registros inseridos, {registros_deletados} deletados.'
             return {
                 'success': True,
                 'tipo': 'contas_receber',
                 'registros_inseridos': registros_inseridos,
                 'tempo_execucao_ms': tempo_ms,
-                'mensagem': f'Sincronização concluída para {periodo}. {registros_inseridos} registros inseridos, {registros_deletados} deletados.',
+                'mensagem': f"{mensagem} {aviso}" if aviso else mensagem,
+                'agregado_desatualizado': aviso is not None,
                 'log_id': log_id
             }
 
@@ -760,6 +980,9 @@ class SincronizacaoService:
             logger.error(f"Erro ao sincronizar: {erro_msg}")
             logger.error(stack)
 
+            # A exclusão do período pode ter sido gravada antes do erro
+            cache_consultas.nova_geracao()
+
             SincronizacaoService.atualizar_log_sincronizacao(
                 log_id, 'erro', 0, tempo_ms, erro_msg, stack
             )
@@ -800,8 +1023,10 @@ class SincronizacaoService:
 
             # 1. Buscar dados do Senior usando a nova API (4 meses)
             logger.info("Buscando dados do banco Senior...")
+            reportar_progresso('contas_pagar', fase='lendo_senior')
             try:
-                dados_senior = ContasPagarSeniorService.obter_contas_pagar_do_senior(periodo, filiais)
+                # Direto no Senior, sem o cache das rotas: a sincronização precisa do dado atual
+                dados_senior = ContasPagarSeniorService.obter_contas_pagar_do_senior.sem_cache(periodo, filiais)
                 qtd_registros = len(dados_senior)
                 logger.info(f"Encontrados {qtd_registros} registros no Senior")
 
@@ -827,38 +1052,33 @@ class SincronizacaoService:
 
             # 2. Deletar registros do banco local dos 4 meses baseado na DATA_AJUSTADA
             logger.info(f"Deletando registros dos últimos 4 meses...")
+            reportar_progresso('contas_pagar', fase='removendo_periodo')
 
-            # Calcula os 4 meses que serão deletados
-            from dateutil.relativedelta import relativedelta
-            ano, mes = map(int, periodo.split('-'))
-            data_inicio_delete = datetime(ano, mes, 1) - relativedelta(months=3)
-            data_fim_delete = datetime(ano, mes, 28)  # Até dia 28 do mês vigente
+            # Exatamente os títulos buscados no Senior (VCTPRO na janela de obter_periodo_4_meses),
+            # para que nenhum id reinserido colida com uma cópia antiga. A faixa de DATA_AJUSTADA
+            # (coluna persistida, índice IX_contas_pagar_data_ajustada) é derivada dela: o ajuste só
+            # avança a data (sábado +2, domingo +1); VCTPRO deixa a exclusão exata.
+            data_inicio_delete, data_fim_vctpro = ContasPagarSeniorService.obter_periodo_4_meses(periodo)
+            data_fim_vctpro += timedelta(days=1)  # exclusive
+            data_fim_delete = data_fim_vctpro + timedelta(days=2)  # exclusive
 
             delete_query = """
             DELETE FROM contas_pagar
-            WHERE CONVERT(VARCHAR(10),
-                CASE
-                    WHEN DATEPART(WEEKDAY, VCTPRO) = 6 THEN DATEADD(DAY, 2, VCTPRO)  -- Sábado → +2
-                    WHEN DATEPART(WEEKDAY, VCTPRO) = 7 THEN DATEADD(DAY, 1, VCTPRO)  -- Domingo → +1
-                    ELSE VCTPRO
-                END, 23) >= %s
-            AND CONVERT(VARCHAR(10),
-                CASE
-                    WHEN DATEPART(WEEKDAY, VCTPRO) = 6 THEN DATEADD(DAY, 2, VCTPRO)
-                    WHEN DATEPART(WEEKDAY, VCTPRO) = 7 THEN DATEADD(DAY, 1, VCTPRO)
-                    ELSE VCTPRO
-                END, 23) <= %s
+            WHERE DATA_AJUSTADA >= %s AND DATA_AJUSTADA < %s
+            AND VCTPRO >= %s AND VCTPRO < %s
             AND CODFIL IN ('1001', '1002', '1003', '3001', '3002', '3003')
             """
 
             try:
-                logger.info(f"Deletando de {data_inicio_delete.strftime('%Y-%m-%d')} até {data_fim_delete.strftime('%Y-%m-%d')}")
+                logger.info(f"Deletando de {data_inicio_delete.strftime('%Y-%m-%d')} até {data_fim_vctpro.strftime('%Y-%m-%d')} (VCTPRO, exclusive)")
 
                 with db.get_connection() as conn:
                     cursor = conn.cursor()
                     cursor.execute(delete_query, (
                         data_inicio_delete.strftime('%Y-%m-%d'),
-                        data_fim_delete.strftime('%Y-%m-%d')
+                        data_fim_delete.strftime('%Y-%m-%d'),
+                        data_inicio_delete.strftime('%Y-%m-%d'),
+                        data_fim_vctpro.strftime('%Y-%m-%d')
                     ))
                     registros_deletados = cursor.rowcount
                     conn.commit()
@@ -872,70 +1092,18 @@ class SincronizacaoService:
 
             # 3. Inserir novos registros
             logger.info("Inserindo novos registros...")
-            insert_query = """
-                INSERT INTO contas_pagar (
-                    id, CODEMP, CODFIL, CODFOR, NOMFOR, NUMTIT, SEQMOV,
-                    CODTNS, DATMOV, CODFPG, CODTPT, SITTIT, OBSTCP,
-                    VLRORI, DATEMI, ULTPGT, VCTPRO, VLRRAT, CTAFIN,
-                    CODCCU, CTARED, VLRABE, created_at, updated_at
-                ) VALUES (
-                    %s, %s, %s, %s, %s, %s, %s,
-                    %s, %s, %s, %s, %s, %s,
-                    %s, %s, %s, %s, %s, %s,
-                    %s, %s, %s, %s, %s
-                )
-            """
-
-            registros_inseridos = 0
-            registros_com_erro = 0
+            reportar_progresso('contas_pagar', fase='gravando', linhas=0, total=qtd_registros)
+            insercao = SincronizacaoService._inserir_registros_periodo(
+                'contas_pagar', COLUNAS_CONTAS_PAGAR, dados_senior, SincronizacaoService._valores_contas_pagar
+            )
+            registros_inseridos = insercao['inseridos']
+            registros_com_erro = len(insercao['erros'])
             erros_detalhados = []
-
-            with db.get_connection() as conn:
-                cursor = conn.cursor()
-
-                for registro in dados_senior:
-                    try:
-                        # Gera ID único
-                        registro_id = str(uuid.uuid4())
-                        now = datetime.now()
-
-                        cursor.execute(insert_query, (
-                            registro_id,
-                            registro.get('CODEMP'),
-                            registro.get('CODFIL'),
-                            registro.get('CODFOR'),
-                            registro.get('NOMFOR'),
-                            registro.get('NUMTIT'),
-                            registro.get('SEQMOV'),
-                            registro.get('CODTNS'),
-                            registro.get('DATMOV'),
-                            registro.get('CODFPG'),
-                            registro.get('CODTPT'),
-                            registro.get('SITTIT'),
-                            registro.get('OBSTCP'),
-                            registro.get('VLRORI'),
-                            registro.get('DATEMI'),
-                            registro.get('ULTPGT'),
-                            registro.get('VCTPRO'),
-                            registro.get('VLRRAT'),
-                            registro.get('CTAFIN'),
-                            registro.get('CODCCU'),
-                            registro.get('CTARED'),
-                            registro.get('VLRABE'),
-                            now,
-                            now
-                        ))
-                        registros_inseridos += 1
-                    except Exception as e:
-                        registros_com_erro += 1
-                        erro_msg = f"Erro ao inserir registro {registro.get('NUMTIT')} (SEQMOV: {registro.get('SEQMOV')}): {str(e)}"
-                        logger.error(erro_msg)
-                        if len(erros_detalhados) < 10:  # Guarda apenas os 10 primeiros erros para não lotar o log
-                            erros_detalhados.append(erro_msg)
-                        continue
-
-                conn.commit()
-                cursor.close()
+            for registro, erro in insercao['erros']:
+                erro_msg = f"Erro ao inserir registro {registro.get('NUMTIT')} (SEQMOV: {registro.get('SEQMOV')}): {str(erro)}"
+                logger.error(erro_msg)
+                if len(erros_detalhados) < 10:  # Guarda apenas os 10 primeiros erros para não lotar o log
+                    erros_detalhados.append(erro_msg)
 
             logger.info(f"Inseridos {registros_inseridos} registros no banco local")
             logger.info(f"Total de registros com erro: {registros_com_erro}")
@@ -944,18 +1112,27 @@ class SincronizacaoService:
                 for erro in erros_detalhados:
                     logger.error(f"  - {erro}")
 
-            # Finalizar
+            # 4. Reconstruir o agregado diário e o snapshot em memória do dashboard
+            reportar_progresso('contas_pagar', fase='agregando')
+            fato_diario = SincronizacaoService._reconstruir_fato_diario('contas_pagar')
+            snapshot_analitico.reconstruir('contas_pagar')
+            cache_consultas.nova_geracao()
+
+            # Finalizar (com aviso se o agregado diário não foi reconstruído)
             tempo_ms = int((datetime.now() - inicio).total_seconds() * 1000)
+            aviso = SincronizacaoService._aviso_fato_diario(fato_diario)
             SincronizacaoService.atualizar_log_sincronizacao(
-                log_id, 'sucesso', registros_inseridos, tempo_ms
+                log_id, 'sucesso', registros_inseridos, tempo_ms, mensagem_erro=aviso
             )
 
+            mensagem = f'Sincronização concluída para {periodo}. {registros_inseridos} registros inseridos, {registros_deletados} deletados.'
             return {
                 'success': True,
                 'tipo': 'contas_pagar',
                 'registros_inseridos': registros_inseridos,
                 'tempo_execucao_ms': tempo_ms,
-                'mensagem': f'Sincronização concluída para {periodo}. {registros_inseridos} registros inseridos, {registros_deletados} deletados.',
+                'mensagem': f"{mensagem} {aviso}" if aviso else mensagem,
+                'agregado_desatualizado': aviso is not None,
                 'log_id': log_id
             }
 
@@ -967,6 +1144,9 @@ class SincronizacaoService:
             logger.error(f"Erro ao sincronizar: {erro_msg}")
             logger.error(stack)
 
+            # A exclusão do período pode ter sido gravada antes do erro
+            cache_consultas.nova_geracao()
+
             SincronizacaoService.atualizar_log_sincronizacao(
                 log_id, 'erro', 0, tempo_ms, erro_msg, stack
             )
@@ -0,0 +1,420 @@
+"""
+Snapshot analítico em memória para o dashboard
+Após cada sincronização, os títulos de contas_pagar (já com os filtros do BI) e
+contas_receber são carregados em colunas NumPy (data ajustada, valor, filial,
+conta financeira, centro de custo e fornecedor/cliente), ordenadas por data.
+Totais, séries diárias e rankings do dashboard passam a ser respondidos com
+fatias por data + máscaras e bincount, sem ida ao banco.
+
+O snapshot é imutável: cada reconstrução monta um objeto novo e troca a
+referência de uma vez, então quem está lendo vê a versão anterior ou a nova,
+nunca uma mistura. Se o snapshot não estiver disponível (desativado, ainda não
+carregado ou falha na carga) o dashboard usa as consultas SQL de sempre.
+"""
+
+import logging
+import threading
+import time
+import traceback
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+import executor
+from config import settings
+from database import db
+from services.fato_diario_service import FILTROS_BI_PAGAR
+from utils.periodos import periodo_anterior
+
+logger = logging.getLogger(__name__)
+
+# Valor usado no lugar de NULL em CTAFIN / CODCCU
+SEM_VALOR = -1
+
+# Após uma falha na carga, espera este tempo antes de tentar de novo
+ESPERA_APOS_FALHA_SEGUNDOS = 60
+
+QUERY_SNAPSHOT_PAGAR = f"""
+    SELECT DATA_AJUSTADA, CODFIL, CTAFIN, CODCCU, CODFOR AS ENTIDADE, NOMFOR AS NOME, VALOR_CALCULADO
+    FROM contas_pagar
+    WHERE DATA_AJUSTADA IS NOT NULL
+    AND {FILTROS_BI_PAGAR}
+"""
+
+QUERY_SNAPSHOT_RECEBER = """
+    SELECT DATA_AJUSTADA, CODFIL, CTAFIN, CODCCU, CODCLI AS ENTIDADE, NOMCLI AS NOME, VALOR_CALCULADO
+    FROM contas_receber
+    WHERE DATA_AJUSTADA IS NOT NULL
+"""
+
+QUERIES_SNAPSHOT = {
+    'contas_pagar': QUERY_SNAPSHOT_PAGAR,
+    'contas_receber': QUERY_SNAPSHOT_RECEBER,
+}
+
+
+def _ordinal(data: str) -> int:
+    """'YYYY-MM-DD' -> dia ordinal (mesma base de date.toordinal)"""
+    return date.fromisoformat(data).toordinal()
+
+
+class TitulosColunares:
+    """
+    Títulos de uma tabela em colunas NumPy, ordenados por data ajustada
+
+    Colunas (mesmo tamanho): dias (ordinal da DATA_AJUSTADA), valores, codfil,
+    ctafin, codccu e entidade (índice em nomes, um por par código/nome de
+    fornecedor ou cliente, como no GROUP BY das consultas SQL)
+    """
+
+    def __init__(self, tabela: str, dias, valores, codfil, ctafin, codccu, entidade, nomes: List[str]):
+        ordem = np.argsort(dias, kind='stable')
+        self.tabela = tabela
+        self.dias = dias[ordem]
+        self.valores = valores[ordem]
+        self.codfil = codfil[ordem]
+        self.ctafin = ctafin[ordem]
+        self.codccu = codccu[ordem]
+        self.entidade = entidade[ordem]
+        self.nomes = nomes
+
+        # Estruturas calculadas a partir das colunas (ex: matriz mensal da projeção)
+        self._derivados: Dict[str, Any] = {}
+        self._derivados_lock = threading.Lock()
+
+    @classmethod
+    def carregar(cls, tabela: str) -> 'TitulosColunares':
+        """Lê os títulos da tabela local em lotes e monta as colunas"""
+        dias, valores, codfil, ctafin, codccu, entidade = [], [], [], [], [], []
+        indices_entidade: Dict[Tuple[Any, Any], int] = {}
+        nomes: List[str] = []
+
+        for lote in db.iter_query(QUERIES_SNAPSHOT[tabela], batch_size=20000):
+            for row in lote:
+                chave = (row['ENTIDADE'], row['NOME'])
+                indice = indices_entidade.get(chave)
+                if indice is None:
+                    indice = indices_entidade[chave] = len(nomes)
+                    nomes.append(row['NOME'])
+
+                dias.append(row['DATA_AJUSTADA'].toordinal())
+                valores.append(float(row['VALOR_CALCULADO'] or 0))
+                codfil.append(row['CODFIL'])
+                ctafin.append(row['CTAFIN'] if row['CTAFIN'] is not None else SEM_VALOR)
+                codccu.append(row['CODCCU'] if row['CODCCU'] is not None else SEM_VALOR)
+                entidade.append(indice)
+
+        return cls(
+            tabela,
+            np.array(dias, dtype=np.int32),
+            np.array(valores, dtype=np.float64),
+            np.array(codfil, dtype=np.int32),
+            np.array(ctafin, dtype=np.int32),
+            np.array(codccu, dtype=np.int32),
+            np.array(entidade, dtype=np.int32),
+            nomes
+        )
+
+    def __len__(self) -> int:
+        return len(self.dias)
+
+    @property
+    def bytes(self) -> int:
+        return sum(c.nbytes for c in (self.dias, self.valores, self.codfil, self.ctafin, self.codccu, self.entidade))
+
+    def _selecionar(self, data_inicio: str, data_fim: Optional[str], filiais: Optional[List[str]]):
+        """
+        Fatia do período (busca binária nas datas ordenadas) + máscara de filiais
+        Retorna (fatia, máscara ou None)
+        """
+        esquerda = np.searchsorted(self.dias, _ordinal(data_inicio), side='left')
+        direita = np.searchsorted(self.dias, _ordinal(data_fim), side='right') if data_fim else len(self.dias)
+        fatia = slice(esquerda, max(esquerda, direita))
+
+        mascara = None
+        if filiais:
+            mascara = np.isin(self.codfil[fatia], np.array([int(f) for f in filiais], dtype=np.int32))
+        return fatia, mascara
+
+    def _coluna(self, nome: str, fatia: slice, mascara):
+        coluna = getattr(self, nome)[fatia]
+        return coluna if mascara is None else coluna[mascara]
+
+    def derivado(self, nome: str, construir: Callable[[], Any]) -> Any:
+        """
+        Estrutura derivada das colunas, criada no primeiro uso e reaproveitada
+        até este snapshot ser substituído pela próxima sincronização
+        """
+        with self._derivados_lock:
+            if nome not in self._derivados:
+                self._derivados[nome] = construir()
+            return self._derivados[nome]
+
+    def colunas(self, data_inicio: str, data_fim: str, filiais: Optional[List[str]], *nomes: str) -> List[np.ndarray]:
+        """Colunas pedidas (ex: 'ctafin', 'dias', 'valores') restritas ao período e às filiais"""
+        fatia, mascara = self._selecionar(data_inicio, data_fim, filiais)
+        return [self._coluna(nome, fatia, mascara) for nome in nomes]
+
+    def total(self, data_inicio: str, data_fim: Optional[str] = None, filiais: Optional[List[str]] = None) -> float:
+        """SUM(VALOR_CALCULADO) no período"""
+        fatia, mascara = self._selecionar(data_inicio, data_fim, filiais)
+        return float(self._coluna('valores', fatia, mascara).sum())
+
+    def por_dia(self, data_inicio: str, data_fim: str, filiais: Optional[List[str]] = None) -> List[dict]:
+        """Totais por dia com lançamento, no formato de obter_dados_diarios: [{'data', 'total'}]"""
+        fatia, mascara = self._selecionar(data_inicio, data_fim, filiais)
+        dias = self._coluna('dias', fatia, mascara)
+        if len(dias) == 0:
+            return []
+
+        primeiro = int(dias[0])
+        deslocamentos = dias - primeiro
+        totais = np.bincount(deslocamentos, weights=self._coluna('valores', fatia, mascara))
+        presentes = np.bincount(deslocamentos) > 0
+
+        inicio = date.fromordinal(primeiro)
+        return [
+            {'data': (inicio + timedelta(days=int(d))).strftime('%Y-%m-%d'), 'total': round(float(totais[d]), 2)}
+            for d in np.flatnonzero(presentes)
+        ]
+
+    def somar_por(
+        self, coluna: str, data_inicio: str, data_fim: str, filiais: Optional[List[str]] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        GROUP BY coluna no período; retorna (chaves, totais) ordenados do maior total para o menor
+        """
+        fatia, mascara = self._selecionar(data_inicio, data_fim, filiais)
+        chaves, inverso = np.unique(self._coluna(coluna, fatia, mascara), return_inverse=True)
+        totais = np.bincount(inverso, weights=self._coluna('valores', fatia, mascara), minlength=len(chaves))
+        ordem = np.argsort(-totais, kind='stable')
+        return chaves[ordem], totais[ordem]
+
+
+class SnapshotAnalitico:
+    """
+    Versão imutável do snapshot: títulos a pagar e a receber + plano financeiro
+    Os métodos devolvem os mesmos formatos dos services locais
+    (ContasPagarLocalService / ContasReceberLocalService)
+    """
+
+    def __init__(
+        self,
+        pagar: TitulosColunares,
+        receber: TitulosColunares,
+        plano: Dict[int, List[Tuple[str, Any, str]]],
+        carregado_em: Dict[str, datetime]
+    ):
+        self.pagar = pagar
+        self.receber = receber
+        # CTARED (int) -> [(DESCTA, NIVCTA, NATCTA)] (CTARED se repete entre modelos do plano)
+        self.plano = plano
+        self.carregado_em = carregado_em
+
+    def titulos(self, tabela: str) -> TitulosColunares:
+        return self.pagar if tabela == 'contas_pagar' else self.receber
+
+    def total(self, tabela: str, data_inicio: str, data_fim: Optional[str] = None, filiais: Optional[List[str]] = None) -> float:
+        """Equivalente a calcular_total_despesas / calcular_total_receitas"""
+        return max(round(self.titulos(tabela).total(data_inicio, data_fim, filiais), 2), 0)
+
+    def total_periodo_anterior(self, tabela: str, data_inicio: str, data_fim: str, filiais: Optional[List[str]] = None) -> float:
+        """Equivalente a calcular_total_periodo_anterior (período de mesma duração imediatamente antes)"""
+        inicio_anterior, fim_anterior = periodo_anterior(data_inicio, data_fim)
+        return self.total(tabela, inicio_anterior, fim_anterior, filiais)
+
+    def dados_diarios(self, tabela: str, data_inicio: str, data_fim: str, filiais: Optional[List[str]] = None) -> List[dict]:
+        """Equivalente a obter_dados_diarios"""
+        return self.titulos(tabela).por_dia(data_inicio, data_fim, filiais)
+
+    def top_contas(self, tabela: str, data_inicio: str, data_fim: str, limit: int = 10, filiais: Optional[List[str]] = None) -> List[dict]:
+        """
+        Equivalente a obter_top_despesas / obter_top_receitas: soma por CTAFIN,
+        apenas contas nível 6 do plano financeiro com a natureza da tabela
+        """
+        natureza = 'D' if tabela == 'contas_pagar' else 'C'
+        chaves, totais = self.titulos(tabela).somar_por('ctafin', data_inicio, data_fim, filiais)
+
+        resultado = []
+        for ctafin, total in zip(chaves.tolist(), totais.tolist()):
+            for descta, nivcta, natcta in self.plano.get(ctafin, ()):
+                if natcta != natureza or nivcta != 6:
+                    continue
+                resultado.append({
+                    'nome': f"{ctafin:04d} - {descta}" if descta is not None else None,
+                    'total': round(total, 2),
+                    'nivel': nivcta,
+                    'recdep': 'RECEITA' if natcta == 'C' else 'DESPESA'
+                })
+            if len(resultado) >= limit:
+                break
+        return resultado[:limit]
+
+    def top_entidades(self, tabela: str, data_inicio: str, data_fim: str, limit: int = 10) -> List[dict]:
+        """Equivalente a obter_top_fornecedores / obter_top_clientes"""
+        titulos = self.titulos(tabela)
+        chaves, totais = titulos.somar_por('entidade', data_inicio, data_fim)
+        return [
+            {'nome': titulos.nomes[indice], 'total': round(total, 2)}
+            for indice, total in zip(chaves[:limit].tolist(), totais[:limit].tolist())
+        ]
+
+    def despesas_por_centro_custo(self, data_inicio: str, data_fim: str) -> List[dict]:
+        """Equivalente a obter_despesas_por_centro_custo"""
+        chaves, totais = self.pagar.somar_por('codccu', data_inicio, data_fim)
+        return [
+            {
+                'centro_custo': str(codccu) if codccu != SEM_VALOR else 'Sem Centro de Custo',
+                'total': round(total, 2)
+            }
+            for codccu, total in zip(chaves.tolist(), totais.tolist())
+        ]
+
+
+class GerenciadorSnapshot:
+    """
+    Mantém o snapshot atual e o reconstrói após as sincronizações
+
+    Uso:
+        snapshot = snapshot_analitico.obter()  # None -> usar as consultas SQL (a carga fica agendada)
+        snapshot_analitico.reconstruir('contas_pagar')  # chamado pela sincronização
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()  # Protege a troca do snapshot
+        self._carga_lock = threading.Lock()  # Uma carga agendada por vez
+        self._reconstrucao_lock = threading.Lock()  # Serializa reconstruir()
+        self._atual: Optional[SnapshotAnalitico] = None
+        self._proxima_tentativa = 0.0
+
+    def obter(self) -> Optional[SnapshotAnalitico]:
+        """
+        Snapshot atual, sem bloquear. Se ainda não houver um, agenda a carga em
+        segundo plano e retorna None: a requisição usa as consultas SQL.
+        """
+        if not settings.SNAPSHOT_ANALITICO_ATIVO:
+            return None
+
+        atual = self._atual
+        if atual is None:
+            self.agendar_carga()
+        return atual
+
+    def agendar_carga(self) -> bool:
+        """
+        Agenda a carga do snapshot no pool 'local', se nenhuma estiver em andamento
+        e não houver espera após falha. Retorna se a carga foi agendada.
+        """
+        if not settings.SNAPSHOT_ANALITICO_ATIVO or time.monotonic() < self._proxima_tentativa:
+            return False
+        if not self._carga_lock.acquire(blocking=False):
+            return False
+        try:
+            executor.pools['local'].submeter(self._carregar_agendada)
+        except Exception as e:
+            # Pool saturado ou encerrado: a próxima requisição tenta de novo
+            self._carga_lock.release()
+            logger.warning(f"[snapshot] Carga não agendada: {str(e)}")
+            return False
+        return True
+
+    def carregar(self) -> Optional[SnapshotAnalitico]:
+        """Carrega o snapshot na thread atual, se ainda não houver um (scripts de benchmark)"""
+        if not settings.SNAPSHOT_ANALITICO_ATIVO:
+            return None
+        with self._carga_lock:
+            if self._atual is None:
+                self.reconstruir()
+        return self._atual
+
+    def _carregar_agendada(self):
+        """Executada no pool: o lock foi adquirido por agendar_carga"""
+        try:
+            if self._atual is None:
+                self.reconstruir()
+        finally:
+            self._carga_lock.release()
+
+    def reconstruir(self, tabela: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Recarrega os títulos da tabela informada (ou das duas) e o plano financeiro,
+        e troca o snapshot atual pelo novo. Não levanta exceção: em caso de erro o
+        snapshot é descartado (o dashboard volta às consultas SQL) e o erro é retornado.
+
+        Returns:
+            {'linhas', 'bytes', 'tempo_ms'} ou {'erro'}
+        """
+        if not settings.SNAPSHOT_ANALITICO_ATIVO:
+            return {'desativado': True}
+
+        # Uma reconstrução por vez. Sem snapshot, cada chamada carrega as duas tabelas:
+        # em paralelo (etapas de receber e pagar), a última a trocar podia publicar uma
+        # cópia da outra tabela lida antes de a sincronização dela terminar. Em série, a
+        # segunda encontra o snapshot montado pela primeira e recarrega só a sua tabela.
+        with self._reconstrucao_lock:
+            return self._reconstruir(tabela)
+
+    def _reconstruir(self, tabela: Optional[str]) -> Dict[str, Any]:
+        inicio = datetime.now()
+        try:
+            atual = self._atual
+            tabelas = [tabela] if tabela and atual is not None else list(QUERIES_SNAPSHOT)
+            carregados = {t: TitulosColunares.carregar(t) for t in tabelas}
+            plano = GerenciadorSnapshot._carregar_plano()
+        except Exception as e:
+            logger.error(f"[snapshot] ✗ ERRO ao carregar snapshot analítico: {str(e)}")
+            logger.error(traceback.format_exc())
+            self.invalidar()
+            self._proxima_tentativa = time.monotonic() + ESPERA_APOS_FALHA_SEGUNDOS
+            return {'erro': str(e)}
+
+        with self._lock:
+            # Relê o atual dentro do lock: outra sincronização pode ter trocado a outra tabela
+            atual = self._atual
+            carregado_em = dict(atual.carregado_em) if atual is not None else {}
+            carregado_em.update({t: inicio for t in carregados})
+            novo = SnapshotAnalitico(
+                pagar=carregados['contas_pagar'] if 'contas_pagar' in carregados else atual.pagar,
+                receber=carregados['contas_receber'] if 'contas_receber' in carregados else atual.receber,
+                plano=plano,
+                carregado_em=carregado_em
+            )
+            self._atual = novo
+
+        tempo_ms = int((datetime.now() - inicio).total_seconds() * 1000)
+        linhas = sum(len(t) for t in carregados.values())
+        tamanho = sum(t.bytes for t in carregados.values())
+        logger.info(f"[snapshot] {', '.join(carregados)} carregado(s): {linhas} títulos, {tamanho // 1024} KB em {tempo_ms}ms")
+        return {'linhas': linhas, 'bytes': tamanho, 'tempo_ms': tempo_ms}
+
+    @staticmethod
+    def _carregar_plano() -> Dict[int, List[Tuple[str, Any, str]]]:
+        """CTARED numérico -> [(DESCTA, NIVCTA, NATCTA)] (mesmo join das consultas: CAST(CTARED AS INT))"""
+        plano: Dict[int, List[Tuple[str, Any, str]]] = {}
+        for row in db.execute_query("SELECT CTARED, DESCTA, NIVCTA, NATCTA FROM plano_financeiro"):
+            ctared = str(row['CTARED']).strip()
+            if ctared.lstrip('-').isdigit():
+                plano.setdefault(int(ctared), []).append((row['DESCTA'], row['NIVCTA'], row['NATCTA']))
+        return plano
+
+    def invalidar(self):
+        with self._lock:
+            self._atual = None
+
+    def status(self) -> Dict[str, Any]:
+        """Tamanho e horário de carga do snapshot atual (para diagnóstico)"""
+        atual = self._atual
+        if atual is None:
+            return {'ativo': settings.SNAPSHOT_ANALITICO_ATIVO, 'carregado': False}
+        return {
+            'ativo': settings.SNAPSHOT_ANALITICO_ATIVO,
+            'carregado': True,
+            'titulos_pagar': len(atual.pagar),
+            'titulos_receber': len(atual.receber),
+            'bytes': atual.pagar.bytes + atual.receber.bytes,
+            'carregado_em': {t: d.isoformat() for t, d in atual.carregado_em.items()}
+        }
+
+
+snapshot_analitico = GerenciadorSnapshot()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Script de teste para validar o BulkInsertWriter (utils/bulk_insert.py)
+Usa o CursorFalso (apoio_testes.py), que simula os savepoints do SQL Server: não precisa de banco.
+"""
+from apoio_testes import RECUSADO, CursorFalso
+from utils.bulk_insert import BulkInsertWriter
+
+
+def _linhas(quantidade: int, colunas: int) -> list:
+    return [tuple(f"{i}-{c}" for c in range(colunas)) for i in range(quantidade)]
+
+
+def test_linhas_por_comando_respeita_2100_parametros():
+    """Testa o tamanho dos comandos: min(1000, 2100 // colunas) linhas, ao menos uma"""
+    print("=" * 60)
+    print("TESTE: LIMITE DE PARÂMETROS POR COMANDO")
+    print("=" * 60)
+
+    casos = [(1, 1000), (2, 1000), (3, 700), (7, 300), (22, 95), (2100, 1), (3000, 1)]
+    for colunas, esperado in casos:
+        writer = BulkInsertWriter(CursorFalso(colunas=colunas), 't', [f"c{i}" for i in range(colunas)], estrategia='valores')
+        assert writer.linhas_por_comando == esperado, (colunas, writer.linhas_por_comando)
+        assert writer.linhas_por_envio >= writer.linhas_por_comando
+        print(f"[OK] {colunas} colunas -> {esperado} linhas por comando")
+
+
+def test_envio_com_varios_comandos():
+    """Testa o empacotamento: vários INSERTs multi-linha no mesmo envio, sem perder linhas"""
+    print("\n" + "=" * 60)
+    print("TESTE: VÁRIOS COMANDOS POR ENVIO")
+    print("=" * 60)
+
+    colunas = 7  # 300 linhas por comando
+    cursor = CursorFalso(colunas=colunas)
+    writer = BulkInsertWriter(cursor, 't', [f"c{i}" for i in range(colunas)], estrategia='valores', linhas_por_envio=700)
+    linhas = _linhas(1500, colunas)
+
+    assert writer.escrever(linhas) == 1500
+    assert cursor.gravadas == linhas
+
+    # 1500 linhas em envios de 700: 700 (300 + 300 + 100), 700 (idem), 100
+    envios = cursor.inserts()
+    assert writer.envios == len(envios) == 3
+    assert [sql.count(';\n') + 1 for sql, _ in envios] == [3, 3, 1]
+    assert [len(parametros) // colunas for _, parametros in envios] == [700, 700, 100]
+    for sql, _ in envios:
+        for comando in sql.split(';\n'):
+            assert comando.startswith("INSERT INTO t (c0, c1, c2, c3, c4, c5, c6) VALUES ")
+            assert comando.count('(%s') <= writer.linhas_por_comando
+    print(f"[OK] 1500 linhas em {writer.envios} envios")
+
+
+def test_executemany():
+    """Testa a estratégia antiga: um INSERT por linha"""
+    cursor = CursorFalso(colunas=2)
+    writer = BulkInsertWriter(cursor, 't', ['a', 'b'], estrategia='executemany')
+    linhas = _linhas(5, 2)
+
+    assert writer.escrever(linhas) == 5
+    assert cursor.gravadas == linhas
+    assert writer.envios == 5
+    assert cursor.comandos == [("INSERT INTO t (a, b) VALUES (%s, %s)", linhas)]
+    print("\n[OK] executemany: um INSERT por linha")
+
+
+def test_isolamento_reporta_indices_exatos():
+    """Testa a divisão dos lotes com erro: só as linhas inválidas ficam de fora, com o índice certo"""
+    print("\n" + "=" * 60)
+    print("TESTE: ISOLAMENTO DE LINHAS COM ERRO")
+    print("=" * 60)
+
+    colunas = 3
+    cursor = CursorFalso(colunas=colunas)
+    writer = BulkInsertWriter(cursor, 't', ['a', 'b', 'c'], estrategia='valores', linhas_por_envio=700)
+    linhas = _linhas(1000, colunas)
+    invalidos = {0, 5, 699, 700, 999}
+    for i in invalidos:
+        linhas[i] = (f"{i}-0", RECUSADO, f"{i}-2")
+
+    falhas = []
+    gravadas = writer.escrever_isolando_erros(linhas, lambda indice, erro: falhas.append((indice, erro)))
+
+    assert sorted(indice for indice, _ in falhas) == sorted(invalidos)
+    assert all(isinstance(erro, ValueError) for _, erro in falhas)
+    assert gravadas == len(linhas) - len(invalidos)
+    assert cursor.gravadas == [linha for i, linha in enumerate(linhas) if i not in invalidos]
+    assert writer.lotes_divididos > 0
+    print(f"[OK] {len(falhas)} linhas recusadas {sorted(invalidos)}, {gravadas} gravadas")
+    print(f"  Envios: {writer.envios}, lotes divididos: {writer.lotes_divididos}")
+
+
+def test_isolamento_sem_erros():
+    """Testa o caminho sem erros: um savepoint por lote e nenhuma divisão"""
+    cursor = CursorFalso(colunas=2)
+    writer = BulkInsertWriter(cursor, 't', ['a', 'b'], estrategia='valores', linhas_por_envio=1000)
+    linhas = _linhas(2500, 2)
+
+    assert writer.escrever_isolando_erros(linhas, lambda indice, erro: None) == 2500
+    assert cursor.gravadas == linhas
+    assert writer.lotes_divididos == 0
+    savepoints = [sql for sql, _ in cursor.comandos if sql.startswith('SAVE TRANSACTION')]
+    assert len(savepoints) == 3
+    print("\n[OK] sem erros: 3 lotes, nenhuma divisão")
+
+
+if __name__ == "__main__":
+    test_linhas_por_comando_respeita_2100_parametros()
+    test_envio_com_varios_comandos()
+    test_executemany()
+    test_isolamento_reporta_indices_exatos()
+    test_isolamento_sem_erros()
+    print("=" * 60)
+    print("TESTES CONCLUÍDOS!")
+    print("=" * 60)
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Script de teste para validar o cache de resultados do banco local (utils/cache.py)
+O relógio do módulo é trocado por um relógio manual para testar o TTL sem esperar.
+"""
+import utils.cache as cache_modulo
+from apoio_testes import com_relogio, consulta_contada
+from utils.cache import CacheResultados, normalizar_argumento
+
+
+@com_relogio(cache_modulo)
+def test_hit_ttl_e_geracao(relogio):
+    """Testa acerto, expiração por TTL e invalidação por nova_geracao()"""
+    print("=" * 60)
+    print("TESTE: TTL E GERAÇÃO")
+    print("=" * 60)
+
+    cache = CacheResultados('teste', 10, 60)
+    consultar, chamadas = consulta_contada(cache.memoizar)
+
+    assert consultar('2025-01-01', '2025-01-31') == '2025-01-01#1'
+    assert consultar('2025-01-01', '2025-01-31') == '2025-01-01#1'
+    assert len(chamadas) == 1
+    print("[OK] segunda chamada sai do cache")
+
+    relogio.avancar(60)
+    assert consultar('2025-01-01', '2025-01-31') == '2025-01-01#2'
+    print("[OK] entrada expirada pelo TTL")
+
+    cache.nova_geracao()
+    assert consultar('2025-01-01', '2025-01-31') == '2025-01-01#3'
+    assert consultar('2025-01-01', '2025-01-31') == '2025-01-01#3'
+
+    estatisticas = cache.estatisticas()
+    assert (estatisticas['hits'], estatisticas['misses']) == (2, 3)
+    assert estatisticas['geracao'] == 1 and estatisticas['invalidacoes'] == 1
+    assert estatisticas['expiradas'] == 1
+    print("[OK] nova geração invalida as entradas")
+
+
+@com_relogio(cache_modulo)
+def test_resultado_calculado_durante_sincronizacao(relogio):
+    """Testa o descarte de um resultado calculado enquanto a geração mudou"""
+    cache = CacheResultados('teste', 10, 60)
+    chamadas = []
+
+    @cache.memoizar
+    def consultar(periodo):
+        chamadas.append(periodo)
+        if len(chamadas) == 1:
+            cache.nova_geracao()  # Sincronização termina no meio do cálculo
+        return len(chamadas)
+
+    assert consultar('2025-01') == 1
+    assert cache.estatisticas()['itens'] == 0
+    assert consultar('2025-01') == 2
+    assert consultar('2025-01') == 2
+    print("\n[OK] resultado de geração anterior não é guardado")
+
+
+@com_relogio(cache_modulo)
+def test_descarte_lru(relogio):
+    """Testa o limite de itens: sai a entrada usada há mais tempo"""
+    cache = CacheResultados('teste', 2, 60)
+    consultar, chamadas = consulta_contada(cache.memoizar)
+
+    consultar('a', 'a')
+    consultar('b', 'b')
+    consultar('a', 'a')  # 'a' passa a ser a mais recente
+    consultar('c', 'c')  # descarta 'b'
+    assert len(chamadas) == 3
+
+    consultar('a', 'a')
+    assert len(chamadas) == 3
+    consultar('b', 'b')
+    assert len(chamadas) == 4
+    assert cache.estatisticas()['descartadas'] == 2
+    print("\n[OK] LRU descarta a menos usada")
+
+
+@com_relogio(cache_modulo)
+def test_chave_normalizada(relogio):
+    """Testa a chave: ordem das filiais, lista vazia == None, nomeados x posicionais"""
+    print("\n" + "=" * 60)
+    print("TESTE: NORMALIZAÇÃO DA CHAVE")
+    print("=" * 60)
+
+    assert normalizar_argumento(['1002', 1001]) == normalizar_argumento([1001, '1002']) == ('1001', '1002')
+    assert normalizar_argumento([]) is None and normalizar_argumento(()) is None
+    assert normalizar_argumento(' 2025-01-01 ') == '2025-01-01'
+
+    cache = CacheResultados('teste', 10, 60)
+    consultar, chamadas = consulta_contada(cache.memoizar)
+    consultar('2025-01-01', '2025-01-31', ['1002', '1001'])
+    consultar('2025-01-01', '2025-01-31', filiais=['1001', ' 1002'])
+    consultar(data_fim='2025-01-31', data_inicio='2025-01-01', filiais={1001, 1002})
+    assert len(chamadas) == 1
+    print("[OK] filiais em qualquer ordem usam a mesma entrada")
+
+    consultar('2025-01-01', '2025-01-31')
+    consultar('2025-01-01', '2025-01-31', [])
+    consultar('2025-01-01', '2025-01-31', None)
+    assert len(chamadas) == 2
+    print("[OK] lista vazia equivale a sem filtro")
+
+
+def test_cache_desativado():
+    """Testa o cache desativado: sempre executa a função"""
+    cache = CacheResultados('teste', 10, 60, ativo=False)
+    chamadas = []
+
+    @cache.memoizar
+    def consultar(periodo):
+        chamadas.append(periodo)
+        return periodo
+
+    consultar('2025-01')
+    consultar('2025-01')
+    assert len(chamadas) == 2 and cache.estatisticas()['itens'] == 0
+    print("\n[OK] cache desativado não guarda nada")
+
+
+if __name__ == "__main__":
+    test_hit_ttl_e_geracao()
+    test_resultado_calculado_durante_sincronizacao()
+    test_descarte_lru()
+    test_chave_normalizada()
+    test_cache_desativado()
+    print("=" * 60)
+    print("TESTES CONCLUÍDOS!")
+    print("=" * 60)
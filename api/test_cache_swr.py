@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Script de teste para validar o cache stale-while-revalidate das consultas ao
+Senior (CacheSWR em utils/cache.py). O relógio e o pool de execução são
+trocados por versões manuais: as atualizações em segundo plano só rodam quando
+o teste manda.
+"""
+import utils.cache as cache_modulo
+from apoio_testes import PoolFalso, com_relogio, consulta_contada
+from utils.cache import CacheSWR
+
+
+def _com_relogio_e_pool(teste):
+    """com_relogio + executor.pools de utils.cache trocado por um PoolFalso no pool 'senior'"""
+    @com_relogio(cache_modulo)
+    def executar(relogio):
+        pools_originais = cache_modulo.executor.pools
+        pool = PoolFalso()
+        cache_modulo.executor.pools = {'senior': pool}
+        try:
+            teste(relogio, pool)
+        finally:
+            cache_modulo.executor.pools = pools_originais
+    executar.__name__ = teste.__name__
+    executar.__doc__ = teste.__doc__
+    return executar
+
+
+def _cache_swr():
+    """CacheSWR com 10s de frescor e 60s de tolerância"""
+    return CacheSWR('teste', 10, fresco_segundos=10, max_stale_segundos=60)
+
+
+@_com_relogio_e_pool
+def test_fresco_antigo_e_miss(relogio, pool):
+    """Testa as três faixas de idade: fresco, antigo (atualiza em segundo plano) e vencido"""
+    print("=" * 60)
+    print("TESTE: FRESCO / ANTIGO / MISS")
+    print("=" * 60)
+
+    cache = _cache_swr()
+    consultar, chamadas = consulta_contada(cache.memoizar)
+
+    assert consultar('2025-01') == '2025-01#1'
+    relogio.avancar(10)
+    assert consultar('2025-01') == '2025-01#1' and not pool.pendentes
+    print("[OK] dentro do frescor: sai do cache, sem atualização")
+
+    relogio.avancar(1)
+    assert consultar('2025-01') == '2025-01#1'
+    assert len(pool.pendentes) == 1 and len(chamadas) == 1
+    pool.executar()
+    assert len(chamadas) == 2
+    assert consultar('2025-01') == '2025-01#2'
+    print("[OK] antigo: valor anterior na hora, atualização em segundo plano")
+
+    relogio.avancar(61)
+    assert consultar('2025-01') == '2025-01#3'
+    assert not pool.pendentes
+    print("[OK] além da tolerância: consulta na hora")
+
+    estatisticas = cache.estatisticas()
+    assert (estatisticas['hits_frescos'], estatisticas['hits_antigos'], estatisticas['misses']) == (2, 1, 2)
+    assert estatisticas['atualizacoes'] == 1 and estatisticas['atualizando'] == 0
+
+
+@_com_relogio_e_pool
+def test_uma_atualizacao_por_chave(relogio, pool):
+    """Testa que leituras antigas repetidas agendam uma única atualização por chave"""
+    cache = _cache_swr()
+    consultar, chamadas = consulta_contada(cache.memoizar)
+
+    consultar('2025-01')
+    consultar('2025-02')
+    relogio.avancar(30)
+    for _ in range(5):
+        consultar('2025-01')
+        consultar('2025-02')
+
+    assert len(pool.pendentes) == 2
+    assert cache.estatisticas()['atualizando'] == 2
+    pool.executar()
+    assert sorted(c[0] for c in chamadas) == ['2025-01', '2025-01', '2025-02', '2025-02']
+    assert cache.estatisticas()['atualizando'] == 0
+    print("\n[OK] uma atualização por chave, mesmo com várias leituras antigas")
+
+
+@_com_relogio_e_pool
+def test_espera_apos_falha(relogio, pool):
+    """Testa a falha na atualização: mantém o valor antigo e espera o frescor para tentar de novo"""
+    print("\n" + "=" * 60)
+    print("TESTE: FALHA NA ATUALIZAÇÃO")
+    print("=" * 60)
+
+    falhando = [False]
+    cache = _cache_swr()
+    consultar, chamadas = consulta_contada(cache.memoizar, falhar=lambda: falhando[0])
+
+    consultar('2025-01')
+    falhando[0] = True
+    relogio.avancar(20)
+    assert consultar('2025-01') == '2025-01#1'
+    pool.executar()
+    assert cache.estatisticas()['falhas_atualizacao'] == 1
+    print("[OK] falha registrada, valor antigo mantido")
+
+    relogio.avancar(5)
+    assert consultar('2025-01') == '2025-01#1'
+    assert not pool.pendentes
+    print("[OK] dentro da espera: não agenda outra atualização")
+
+    falhando[0] = False
+    relogio.avancar(10)
+    assert consultar('2025-01') == '2025-01#1'
+    assert len(pool.pendentes) == 1
+    pool.executar()
+    assert consultar('2025-01') == '2025-01#3'
+    print("[OK] após a espera: nova tentativa atualiza o valor")
+
+
+@_com_relogio_e_pool
+def test_pool_saturado(relogio, pool):
+    """Testa o pool saturado: serve o valor antigo e tenta agendar na próxima leitura"""
+    cache = _cache_swr()
+    consultar, chamadas = consulta_contada(cache.memoizar)
+
+    consultar('2025-01')
+    relogio.avancar(20)
+    pool.saturado = True
+    assert consultar('2025-01') == '2025-01#1'
+    assert cache.estatisticas()['atualizando'] == 0
+
+    pool.saturado = False
+    consultar('2025-01')
+    assert len(pool.pendentes) == 1
+    print("\n[OK] pool saturado: nova tentativa na leitura seguinte")
+
+
+@_com_relogio_e_pool
+def test_sem_cache(relogio, pool):
+    """Testa wrapper.sem_cache: sempre consulta e não mexe no cache"""
+    cache = _cache_swr()
+    consultar, chamadas = consulta_contada(cache.memoizar)
+
+    consultar('2025-01')
+    assert consultar.sem_cache('2025-01') == '2025-01#2'
+    assert consultar('2025-01') == '2025-01#1'
+    print("\n[OK] sem_cache ignora o cache")
+
+
+if __name__ == "__main__":
+    test_fresco_antigo_e_miss()
+    test_uma_atualizacao_por_chave()
+    test_espera_apos_falha()
+    test_pool_saturado()
+    test_sem_cache()
+    print("=" * 60)
+    print("TESTES CONCLUÍDOS!")
+    print("=" * 60)
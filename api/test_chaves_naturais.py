@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Script de teste para validar os ids determinísticos da sincronização (utils/chaves_naturais.py)
+Confere também as chaves naturais contra os índices das migrations e a ordem
+da consulta de contas a pagar. Não precisa de banco.
+"""
+import os
+import re
+
+from services.sincronizacao_service import QUERY_CONTAS_PAGAR
+from utils.chaves_naturais import CHAVES_NATURAIS, GeradorIds, hash_linha
+
+MIGRATIONS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations')
+
+
+def _colunas_do_indice(arquivo: str, indice: str) -> tuple:
+    """Colunas de CREATE [UNIQUE] INDEX [indice] ... (col, ...) na migration"""
+    with open(os.path.join(MIGRATIONS, arquivo), encoding='utf-8') as f:
+        sql = f.read()
+    encontrado = re.search(rf"CREATE (?:UNIQUE )?INDEX \[{indice}\] ON [^(]+\(([^)]+)\)", sql)
+    assert encontrado, f"{indice} não encontrado em {arquivo}"
+    return tuple(coluna.strip(' []\n') for coluna in encontrado.group(1).split(','))
+
+
+def _rateio(numtit, ctafin, codccu, vlrrat, codfil=1001):
+    return {
+        'CODEMP': 1, 'CODFIL': codfil, 'CODFOR': 500, 'NUMTIT': numtit, 'CODTPT': 'DP',
+        'SEQMOV': 1, 'CTAFIN': ctafin, 'CODCCU': codccu, 'VLRRAT': vlrrat
+    }
+
+
+# Título 'A' com dois rateios na mesma conta e centro de custo (repetição) e um em outra conta
+LINHAS = [
+    _rateio('A', 301, '10', 50.0),
+    _rateio('A', 301, '10', 70.0),
+    _rateio('A', 302, '10', 30.0),
+    _rateio('B', 301, '10', 10.0),
+]
+
+
+def _ids(tabela, linhas):
+    gerador = GeradorIds(tabela)
+    return [gerador.id_para(linha) for linha in linhas]
+
+
+def test_repeticoes_estaveis_e_distintas():
+    """Testa que repetições da chave recebem ids distintos, iguais em duas execuções na mesma ordem"""
+    print("=" * 60)
+    print("TESTE: IDS DAS REPETIÇÕES")
+    print("=" * 60)
+
+    primeira = _ids('contas_pagar', LINHAS)
+    segunda = _ids('contas_pagar', LINHAS)
+    assert primeira == segunda
+    assert len(set(primeira)) == len(LINHAS)
+    print("[OK] 4 linhas, 4 ids, iguais nas duas execuções")
+
+    # Uma linha nova no fim não muda os ids das anteriores
+    com_nova = _ids('contas_pagar', LINHAS + [_rateio('A', 301, '10', 90.0)])
+    assert com_nova[:4] == primeira and com_nova[4] not in primeira
+    print("[OK] terceira repetição recebe um id novo sem mexer nas demais")
+
+    # A ocorrência depende da ordem: por isso QUERY_CONTAS_PAGAR desempata pelo valor do rateio
+    trocadas = _ids('contas_pagar', [LINHAS[1], LINHAS[0]] + LINHAS[2:])
+    assert trocadas[:2] == primeira[:2] and trocadas[2:] == primeira[2:]
+    print("[OK] o id segue a posição da repetição (ordem da consulta)")
+
+
+def test_chave_normalizada():
+    """Testa que 1001 e ' 1001' geram o mesmo id, e que a tabela entra no id"""
+    texto = [dict(linha, CODFIL=f" {linha['CODFIL']}", CTAFIN=str(linha['CTAFIN'])) for linha in LINHAS]
+    assert _ids('contas_pagar', texto) == _ids('contas_pagar', LINHAS)
+
+    outra_filial = _ids('contas_pagar', [_rateio('A', 301, '10', 50.0, codfil=1002)])
+    assert outra_filial[0] not in _ids('contas_pagar', LINHAS)
+
+    receber = {'CODEMP': 1, 'CODFIL': 1001, 'NUMTIT': 'A', 'CODTPT': 'DP', 'CODCLI': 500}
+    assert _ids('contas_receber', [receber]) != _ids('contas_pagar', [receber])
+    print("\n[OK] valores normalizados; filial e tabela mudam o id")
+
+
+def test_hash_linha():
+    """Testa a impressão digital: NULL difere de vazio, número e texto iguais coincidem"""
+    assert hash_linha([1001, 'A', 10.5]) == hash_linha(['1001', ' A ', '10.5'])
+    assert hash_linha([None, 'A']) != hash_linha(['', 'A'])
+    assert hash_linha(['A', 'B']) != hash_linha(['B', 'A'])
+    assert len(hash_linha(['A'])) == 16
+    print("\n[OK] hash estável, sensível a NULL e à ordem")
+
+
+def test_chaves_conforme_indices():
+    """Testa as chaves naturais contra os índices das migrations e o ORDER BY de QUERY_CONTAS_PAGAR"""
+    print("\n" + "=" * 60)
+    print("TESTE: CHAVES x MIGRATIONS")
+    print("=" * 60)
+
+    unico = _colunas_do_indice('001_create_contas_receber.sql', 'IX_contas_receber_unique')
+    assert CHAVES_NATURAIS['contas_receber'] == unico == ('CODEMP', 'CODFIL', 'NUMTIT', 'CODTPT', 'CODCLI')
+    print("[OK] contas_receber: chave = IX_contas_receber_unique (com CODCLI)")
+
+    # contas_pagar não tem índice único (removido na 004): uma linha por rateio
+    composto = _colunas_do_indice('004_fix_contas_pagar_index.sql', 'IX_contas_pagar_composite')
+    chave = CHAVES_NATURAIS['contas_pagar']
+    assert set(chave) - set(composto) == {'CTAFIN', 'CODCCU'} and set(composto) <= set(chave)
+    print("[OK] contas_pagar: colunas de IX_contas_pagar_composite + CTAFIN/CODCCU do rateio")
+
+    ordem = QUERY_CONTAS_PAGAR.split('ORDER BY')[1].replace('\n', '')
+    colunas_ordem = tuple(coluna.strip().split('.')[-1] for coluna in ordem.split(','))
+    assert colunas_ordem[:len(chave)] == chave
+    assert colunas_ordem[len(chave):] == ('VLRRAT', 'CTARED')
+    print("[OK] QUERY_CONTAS_PAGAR ordena pela chave e desempata as repetições")
+
+
+if __name__ == "__main__":
+    test_repeticoes_estaveis_e_distintas()
+    test_chave_normalizada()
+    test_hash_linha()
+    test_chaves_conforme_indices()
+    print("=" * 60)
+    print("TESTES CONCLUÍDOS!")
+    print("=" * 60)
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Script de teste para validar o resumo e o overview do dashboard (services/dashboard_service.py)
+O db do service é trocado por um BancoFalso e o snapshot em memória fica
+indisponível, para exercitar a consulta de totais no banco local sem banco;
+o overview roda sobre um snapshot falso, no pool 'local' do executor.
+"""
+import asyncio
+
+import services.dashboard_service as dashboard_modulo
+from apoio_testes import BancoFalso
+from services.dashboard_service import DashboardService
+from utils.cache import cache_consultas
+
+
+class _SemSnapshot:
+    """snapshot_analitico ainda não carregado"""
+
+    @staticmethod
+    def obter():
+        return None
+
+
+def _totais_no_banco(linhas, data_inicio, data_fim, filiais=None):
+    """Executa _obter_totais_resumo sem snapshot e com o BancoFalso; retorna (totais, banco)"""
+    banco = BancoFalso(linhas)
+    db_original, snapshot_original = dashboard_modulo.db, dashboard_modulo.snapshot_analitico
+    dashboard_modulo.db, dashboard_modulo.snapshot_analitico = banco, _SemSnapshot()
+    cache_consultas.nova_geracao()  # Nenhum resultado de outro teste
+    try:
+        return DashboardService._obter_totais_resumo(data_inicio, data_fim, filiais), banco
+    finally:
+        dashboard_modulo.db, dashboard_modulo.snapshot_analitico = db_original, snapshot_original
+
+
+def test_parametros_dos_totais():
+    """Testa que os 8 parâmetros de data e as filiais (duas vezes) caem nos placeholders certos"""
+    print("=" * 60)
+    print("TESTE: PARÂMETROS DA CONSULTA DE TOTAIS")
+    print("=" * 60)
+
+    _, banco = _totais_no_banco([], '2025-03-01', '2025-03-31', ['1001', '1002'])
+    query, params, enviado = banco.chamadas[0]
+
+    # Período anterior de mesma duração: 2025-01-29 a 2025-02-28
+    assert params == (
+        '2025-01-29', '2025-03-31', '1001', '1002',
+        '2025-01-29', '2025-03-31', '1001', '1002',
+        '2025-03-01', '2025-03-31', '2025-03-01', '2025-03-31',
+        '2025-01-29', '2025-02-28', '2025-01-29', '2025-02-28',
+    )
+    assert query.count('%s') == len(params)
+    print("[OK] 8 datas + 2 filiais x 2 = 12 parâmetros, um por placeholder")
+
+    intervalo = "data_ajustada BETWEEN '2025-01-29' AND '2025-03-31' AND codfil IN ('1001','1002')"
+    assert enviado.count(intervalo) == 2
+    for tipo, coluna, inicio, fim in (
+        ('R', 'receitas_atual', '2025-03-01', '2025-03-31'),
+        ('D', 'despesas_atual', '2025-03-01', '2025-03-31'),
+        ('R', 'receitas_anterior', '2025-01-29', '2025-02-28'),
+        ('D', 'despesas_anterior', '2025-01-29', '2025-02-28'),
+    ):
+        assert (
+            f"WHEN tipo = '{tipo}' AND data_ajustada BETWEEN '{inicio}' AND '{fim}' "
+            f"THEN valor_calculado END) AS DECIMAL(18,2)) AS {coluna}"
+        ) in enviado, coluna
+    print("[OK] cada coluna soma o seu período; os dois agregados leem o intervalo completo")
+
+    _, banco = _totais_no_banco([], '2025-03-01', '2025-03-31')
+    query, params, enviado = banco.chamadas[0]
+    assert len(params) == 12 == query.count('%s') and 'codfil' not in query
+    print("[OK] sem filiais: 12 datas, sem filtro de filial")
+
+
+def test_totais_nunca_negativos():
+    """Testa o tratamento por coluna: NULL -> 0 e negativo -> 0, sem afetar as demais"""
+    linha = {'receitas_atual': 1500.5, 'despesas_atual': None, 'receitas_anterior': -20, 'despesas_anterior': 300}
+    totais, _ = _totais_no_banco([linha], '2025-03-01', '2025-03-31')
+    assert totais == {
+        'receitas_atual': 1500.5, 'despesas_atual': 0, 'receitas_anterior': 0, 'despesas_anterior': 300.0
+    }
+
+    totais, _ = _totais_no_banco([], '2025-03-01', '2025-03-31')
+    assert set(totais.values()) == {0}
+    print("\n[OK] NULL e negativos viram 0 em cada coluna; sem linha, tudo 0")
+
+
+def test_montar_resumo():
+    """Testa saldo e percentuais do resumo, com e sem despesas projetadas"""
+    print("\n" + "=" * 60)
+    print("TESTE: MONTAGEM DO RESUMO")
+    print("=" * 60)
+
+    totais = {'receitas_atual': 1200.0, 'despesas_atual': 500.0, 'receitas_anterior': 1000.0, 'despesas_anterior': 800.0}
+
+    resumo = DashboardService.montar_resumo('2025-03-01', '2025-03-31', totais)
+    assert resumo == {
+        'saldo_atual': 700.0,
+        'receitas_total': 1200.0,
+        'despesas_total': 500.0,
+        'saldo_mes': 700.0,
+        'periodo_inicio': '2025-03-01',
+        'periodo_fim': '2025-03-31',
+        'percentual_mudanca_saldo': 250.0,
+        'percentual_mudanca_receita': 20.0,
+        'percentual_mudanca_despesa': -37.5
+    }
+    print("[OK] sem projeção: despesas do período")
+
+    resumo = DashboardService.montar_resumo('2025-03-01', '2025-03-31', totais, despesas_projetadas=1000.0)
+    assert (resumo['despesas_total'], resumo['saldo_atual'], resumo['saldo_mes']) == (1000.0, 200.0, 200.0)
+    assert resumo['percentual_mudanca_despesa'] == 25.0
+    assert resumo['percentual_mudanca_saldo'] == 0.0
+    assert resumo['percentual_mudanca_receita'] == 20.0
+    print("[OK] com projeção: despesas projetadas substituem as do período")
+
+    zerado = dict.fromkeys(totais, 0.0)
+    resumo = DashboardService.montar_resumo('2025-03-01', '2025-03-31', zerado, despesas_projetadas=0.0)
+    assert resumo['percentual_mudanca_despesa'] == 0.0 and resumo['saldo_atual'] == 0.0
+    print("[OK] período anterior zerado: percentuais 0")
+
+
+class _SnapshotFalso:
+    """Snapshot carregado com valores fixos; falhar = nome do método que levanta erro"""
+
+    def __init__(self, falhar: str = None):
+        self.falhar = falhar
+
+    def _verificar(self, metodo):
+        if metodo == self.falhar:
+            raise RuntimeError(f"{metodo} falhou")
+
+    def obter(self):
+        return self
+
+    def total(self, tabela, data_inicio, data_fim, filiais=None):
+        self._verificar('total')
+        atual = data_inicio.endswith('-01')  # Em 2020-03, o período anterior começa em 2020-01-30
+        return {'contas_receber': 1000.0, 'contas_pagar': 400.0}[tabela] * (1 if atual else 0.5)
+
+    def dados_diarios(self, tabela, data_inicio, data_fim, filiais=None):
+        self._verificar('dados_diarios')
+        total = {'contas_receber': 100.0, 'contas_pagar': 30.0}[tabela]
+        return [{'data': data_inicio, 'total': total}]
+
+    def top_contas(self, tabela, data_inicio, data_fim, limit, filiais=None):
+        self._verificar('top_contas')
+        return [{'tabela': tabela, 'limit': limit, 'filiais': filiais}]
+
+    def top_entidades(self, tabela, data_inicio, data_fim, limit):
+        self._verificar('top_entidades')
+        return [{'tabela': tabela, 'limit': limit}]
+
+    def despesas_por_centro_custo(self, data_inicio, data_fim):
+        self._verificar('despesas_por_centro_custo')
+        return [{'centro_custo': 'ADM', 'total': 400.0}]
+
+
+class _ProjecaoFalsa:
+    """ProjecaoService com projetar_local fixo (ou falhando)"""
+
+    falhar = False
+
+    @staticmethod
+    def projetar_local(data_inicio, data_fim, filiais=None):
+        if _ProjecaoFalsa.falhar:
+            raise ConnectionError("banco local indisponível")
+        return {'total': 900.0, 'filiais': filiais}
+
+
+def _overview(periodo, snapshot, filiais=None, falhar_projecao=False):
+    """Executa obter_overview com o snapshot e a projeção falsos; retorna (resultado, tarefas no pool)"""
+    tarefas = []
+    executar_original = dashboard_modulo.executar
+
+    async def executar_contando(pool, func, *args):
+        tarefas.append((pool, len(args)))
+        return await executar_original(pool, func, *args)
+
+    originais = dashboard_modulo.snapshot_analitico, dashboard_modulo.ProjecaoService
+    dashboard_modulo.snapshot_analitico, dashboard_modulo.ProjecaoService = snapshot, _ProjecaoFalsa
+    dashboard_modulo.executar = executar_contando
+    _ProjecaoFalsa.falhar = falhar_projecao
+    cache_consultas.nova_geracao()
+    try:
+        return asyncio.run(DashboardService.obter_overview(periodo, filiais, 5)), tarefas
+    finally:
+        dashboard_modulo.snapshot_analitico, dashboard_modulo.ProjecaoService = originais
+        dashboard_modulo.executar = executar_original
+        _ProjecaoFalsa.falhar = False
+
+
+def test_overview_widgets():
+    """Testa a composição do overview: widgets consultados e derivados, tempos e período"""
+    print("\n" + "=" * 60)
+    print("TESTE: OVERVIEW")
+    print("=" * 60)
+
+    resultado, _ = _overview('2020-03', _SnapshotFalso(), filiais=['1001'])
+    widgets = resultado['widgets']
+    assert (resultado['periodo_inicio'], resultado['periodo_fim']) == ('2020-03-01', '2020-03-31')
+    assert set(widgets) == {
+        'resumo', 'grafico_receitas_despesas', 'fluxo_caixa', 'top_despesas', 'top_receitas',
+        'top_fornecedores', 'top_clientes', 'despesas_por_centro_custo'
+    }
+    assert set(resultado['tempos_ms']) == set(widgets) | {'dados_diarios', 'totais'}
+    print("[OK] 8 widgets, com o tempo de cada consulta e montagem")
+
+    # Resumo: 2020-03 é passado, sem projeção (despesas do período)
+    assert widgets['resumo']['receitas_total'] == 1000.0 and widgets['resumo']['despesas_total'] == 400.0
+    assert widgets['resumo']['percentual_mudanca_receita'] == 100.0
+    assert len(widgets['grafico_receitas_despesas']) == len(widgets['fluxo_caixa']) == 31
+    assert widgets['grafico_receitas_despesas'][0]['saldo'] == 70.0
+    assert widgets['fluxo_caixa'][-1]['saldo'] == 70.0
+    print("[OK] resumo, gráfico e fluxo de caixa montados dos resultados compartilhados")
+
+    assert widgets['top_despesas'] == [{'tabela': 'contas_pagar', 'limit': 5, 'filiais': ['1001']}]
+    assert widgets['top_receitas'] == [{'tabela': 'contas_receber', 'limit': 5, 'filiais': ['1001']}]
+    assert widgets['top_clientes'] == [{'tabela': 'contas_receber', 'limit': 5}]
+    assert widgets['top_fornecedores'] == [{'tabela': 'contas_pagar', 'limit': 5}]
+    print("[OK] rankings com o limite; filiais só nos rankings por conta")
+
+
+def test_overview_com_projecao_e_tarefas_no_pool():
+    """Testa a projeção no resumo e as tarefas no pool 'local' com o snapshot carregado"""
+    resultado, tarefas = _overview('2020-03', _SnapshotFalso())
+    assert tarefas == [('local', 7)]
+    print("\n[OK] snapshot carregado: as 7 consultas numa só tarefa do pool 'local'")
+
+    resultado, tarefas = _overview('2999-01', _SnapshotFalso(), filiais=['1001'])
+    assert tarefas == [('local', 7), ('local', 1)]
+    widgets = resultado['widgets']
+    assert widgets['projecao_despesas'] == {'total': 900.0, 'filiais': ['1001']}
+    assert widgets['resumo']['despesas_total'] == 900.0 and widgets['resumo']['saldo_atual'] == 100.0
+    print("[OK] mês futuro: projeção numa segunda tarefa, usada nas despesas do resumo")
+
+
+def test_overview_falha_propagada():
+    """Testa que a falha de qualquer consulta derruba o overview inteiro"""
+    for snapshot, falhar_projecao, erro in (
+        (_SnapshotFalso(falhar='top_contas'), False, RuntimeError),
+        (_SnapshotFalso(falhar='total'), False, RuntimeError),
+        (_SnapshotFalso(), True, ConnectionError),
+    ):
+        try:
+            _overview('2999-01', snapshot, falhar_projecao=falhar_projecao)
+            raise AssertionError("falha não propagada")
+        except erro:
+            pass
+    print("\n[OK] falha no snapshot ou na projeção propaga")
+
+
+if __name__ == "__main__":
+    test_parametros_dos_totais()
+    test_totais_nunca_negativos()
+    test_montar_resumo()
+    test_overview_widgets()
+    test_overview_com_projecao_e_tarefas_no_pool()
+    test_overview_falha_propagada()
+    print("=" * 60)
+    print("TESTES CONCLUÍDOS!")
+    print("=" * 60)
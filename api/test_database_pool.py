@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Script de teste para validar o pool de conexões (database.py)
+As conexões são ConexaoFalsa (apoio_testes.py) e o relógio do módulo é manual,
+para testar ociosidade, tempo de vida e ping sem esperar. Não precisa de banco.
+"""
+import threading
+import time
+
+import database
+from apoio_testes import ConexaoFalsa, com_relogio
+from database import ConnectionPool, PoolTimeoutError
+
+
+def _pool(min_size=0, max_size=3, timeout=1.0, max_idle=60, max_lifetime=3600, ping_apos_ociosidade=30):
+    """Pool com uma fábrica falsa; retorna (pool, conexoes criadas)"""
+    conexoes = []
+
+    def conectar():
+        conexoes.append(ConexaoFalsa())
+        return conexoes[-1]
+
+    pool = ConnectionPool(
+        'teste', conectar, min_size, max_size, timeout, max_idle, max_lifetime, ping_apos_ociosidade
+    )
+    return pool, conexoes
+
+
+@com_relogio(database)
+def test_checkout_e_devolucao(relogio):
+    """Testa o empréstimo, a devolução (com rollback) e o reaproveitamento da conexão"""
+    print("=" * 60)
+    print("TESTE: CHECKOUT E DEVOLUÇÃO")
+    print("=" * 60)
+
+    pool, conexoes = _pool()
+    conn = pool.obter()
+    assert pool.estatisticas()['em_uso'] == 1 and pool.estatisticas()['abertas'] == 1
+    conn.cursor().execute("SELECT 1")
+
+    conn.close()
+    assert conexoes[0].rollbacks == 1 and not conexoes[0].fechada
+    try:
+        conn.cursor()
+        raise AssertionError("conexão devolvida continuou utilizável")
+    except database.pymssql.InterfaceError:
+        pass
+    conn.close()  # Segunda devolução não faz nada
+
+    outra = pool.obter()
+    outra.close()
+    estatisticas = pool.estatisticas()
+    assert len(conexoes) == 1
+    assert (estatisticas['checkouts'], estatisticas['conexoes_criadas'], estatisticas['ociosas']) == (2, 1, 1)
+    assert estatisticas['em_uso'] == 0
+    print("[OK] conexão devolvida e reaproveitada")
+
+
+@com_relogio(database)
+def test_rollback_com_falha_descarta(relogio):
+    """Testa a devolução de uma conexão caída: é fechada em vez de voltar ao pool"""
+    pool, conexoes = _pool()
+    conn = pool.obter()
+    conexoes[0].viva = False
+    conn.close()
+
+    assert conexoes[0].fechada
+    assert pool.estatisticas()['abertas'] == 0 and pool.estatisticas()['conexoes_descartadas'] == 1
+    print("\n[OK] conexão com rollback falho descartada")
+
+
+@com_relogio(database)
+def test_falha_ao_conectar_libera_a_vaga(relogio):
+    """Testa que uma falha da fábrica não consome uma vaga do pool"""
+    tentativas = []
+
+    def conectar():
+        tentativas.append(1)
+        if len(tentativas) == 1:
+            raise OSError("servidor indisponível")
+        return ConexaoFalsa()
+
+    pool = ConnectionPool('teste', conectar, 0, 1, 1.0, 60, 3600, 30)
+    try:
+        pool.obter()
+        raise AssertionError("falha ao conectar não propagada")
+    except OSError:
+        pass
+    assert pool.estatisticas()['abertas'] == 0 and pool.estatisticas()['em_uso'] == 0
+    pool.obter().close()
+    print("\n[OK] falha ao conectar libera a vaga")
+
+
+def test_timeout_e_espera():
+    """Testa PoolTimeoutError com o pool esgotado e a entrega a quem espera quando uma conexão volta"""
+    print("\n" + "=" * 60)
+    print("TESTE: POOL ESGOTADO")
+    print("=" * 60)
+
+    pool, conexoes = _pool(max_size=1, timeout=0.05)
+    conn = pool.obter()
+    inicio = time.monotonic()
+    try:
+        pool.obter()
+        raise AssertionError("pool esgotado entregou conexão")
+    except PoolTimeoutError:
+        pass
+    assert time.monotonic() - inicio >= 0.05
+    assert pool.estatisticas()['timeouts'] == 1
+    print("[OK] PoolTimeoutError após o timeout")
+
+    pool.timeout = 5
+    recebida = []
+    esperando = threading.Thread(target=lambda: recebida.append(pool.obter()))
+    esperando.start()
+    limite = time.monotonic() + 5
+    while pool.estatisticas()['aguardando'] == 0:
+        assert time.monotonic() < limite
+        time.sleep(0.005)
+    conn.close()
+    esperando.join(5)
+
+    assert len(recebida) == 1 and len(conexoes) == 1
+    assert pool.estatisticas()['em_uso'] == 1 and pool.estatisticas()['abertas'] == 1
+    recebida[0].close()
+    print("[OK] conexão devolvida vai para quem estava esperando")
+
+
+@com_relogio(database)
+def test_ociosas_expiram_preservando_min_size(relogio):
+    """Testa o fechamento das ociosas além de max_idle, mantendo min_size abertas"""
+    print("\n" + "=" * 60)
+    print("TESTE: OCIOSIDADE E TEMPO DE VIDA")
+    print("=" * 60)
+
+    pool, conexoes = _pool(min_size=1, max_size=3, max_idle=60, ping_apos_ociosidade=1000)
+    emprestadas = [pool.obter() for _ in range(3)]
+    for conn in emprestadas:
+        conn.close()
+
+    relogio.avancar(61)
+    conn = pool.obter()
+    assert [c.fechada for c in conexoes] == [True, True, False]
+    assert conn._fisica.conn is conexoes[2]
+    conn.close()
+    assert pool.estatisticas()['abertas'] == 1 and pool.estatisticas()['conexoes_descartadas'] == 2
+    print("[OK] 2 ociosas fechadas, min_size preservado")
+
+
+@com_relogio(database)
+def test_tempo_de_vida(relogio):
+    """Testa a reciclagem das conexões mais antigas que max_lifetime, ociosas ou em uso"""
+    pool, conexoes = _pool(max_lifetime=300, max_idle=1000, ping_apos_ociosidade=1000)
+
+    pool.obter().close()
+    relogio.avancar(301)
+    conn = pool.obter()
+    assert conexoes[0].fechada and conn._fisica.conn is conexoes[1]
+
+    # Vence enquanto emprestada: é fechada na devolução
+    relogio.avancar(301)
+    conn.close()
+    assert conexoes[1].fechada
+    assert pool.estatisticas()['abertas'] == 0 and pool.estatisticas()['conexoes_descartadas'] == 2
+    print("\n[OK] conexões vencidas recicladas")
+
+
+@com_relogio(database)
+def test_ping_apos_ociosidade(relogio):
+    """Testa o SELECT 1 só após ping_apos_ociosidade, e o descarte da conexão que não responde"""
+    pool, conexoes = _pool(ping_apos_ociosidade=30, max_idle=1000)
+
+    pool.obter().close()
+    relogio.avancar(10)
+    pool.obter().close()
+    assert conexoes[0].cursores == []
+    print("\n[OK] sem ping antes de ping_apos_ociosidade")
+
+    relogio.avancar(31)
+    conn = pool.obter()
+    assert [sql for sql, _ in conexoes[0].cursores[0].comandos] == ["SELECT 1"]
+    conn.close()
+    print("[OK] ping após a ociosidade")
+
+    conexoes[0].viva = False
+    relogio.avancar(31)
+    conn = pool.obter()
+    assert conexoes[0].fechada and conn._fisica.conn is conexoes[1]
+    conn.close()
+    assert pool.estatisticas()['conexoes_descartadas'] == 1
+    print("[OK] conexão sem resposta descartada e substituída")
+
+
+def test_iter_query_descarta_conexao_abandonada():
+    """Testa iter_query: lotes em sequência; gerador abandonado descarta a conexão, completo a devolve"""
+    print("\n" + "=" * 60)
+    print("TESTE: ITER_QUERY")
+    print("=" * 60)
+
+    conexoes = []
+
+    def connect(**kwargs):
+        conexoes.append(ConexaoFalsa([{'n': i} for i in range(25)]))
+        return conexoes[-1]
+
+    original = database.pymssql.connect
+    database.pymssql.connect = connect
+    try:
+        banco = database.DatabaseConnection()
+
+        lotes = list(banco.iter_query("SELECT n FROM t", batch_size=10))
+        assert [len(lote) for lote in lotes] == [10, 10, 5]
+        assert not conexoes[0].fechada and banco.pool.estatisticas()['ociosas'] == 1
+        print("[OK] gerador consumido até o fim devolve a conexão")
+
+        gerador = banco.iter_query("SELECT n FROM t", batch_size=10)
+        assert len(next(gerador)) == 10
+        gerador.close()
+        assert conexoes[0].fechada
+        estatisticas = banco.pool.estatisticas()
+        assert (estatisticas['abertas'], estatisticas['em_uso'], estatisticas['conexoes_descartadas']) == (0, 0, 1)
+        print("[OK] gerador abandonado descarta a conexão")
+    finally:
+        database.pymssql.connect = original
+
+
+if __name__ == "__main__":
+    test_checkout_e_devolucao()
+    test_rollback_com_falha_descarta()
+    test_falha_ao_conectar_libera_a_vaga()
+    test_timeout_e_espera()
+    test_ociosas_expiram_preservando_min_size()
+    test_tempo_de_vida()
+    test_ping_apos_ociosidade()
+    test_iter_query_descarta_conexao_abandonada()
+    print("=" * 60)
+    print("TESTES CONCLUÍDOS!")
+    print("=" * 60)
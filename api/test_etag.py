@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Script de teste para validar o ETag / GET condicional (utils/etag.py)
+Monta uma aplicação Starlette mínima com o ETagMiddleware e rotas falsas que
+contam as execuções; as requisições são enviadas direto pela interface ASGI.
+"""
+import asyncio
+from datetime import datetime
+
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+import utils.etag as etag_modulo
+from utils.cache import cache_consultas
+from utils.etag import ETagMiddleware
+
+
+class _Aplicacao:
+    """Aplicação com o middleware; `execucoes` conta as chamadas às rotas"""
+
+    def __init__(self):
+        self.execucoes = 0
+
+        async def resumo(request):
+            self.execucoes += 1
+            return JSONResponse({'execucao': self.execucoes})
+
+        async def erro(request):
+            self.execucoes += 1
+            return JSONResponse({'detail': 'falhou'}, status_code=500)
+
+        self.app = Starlette(
+            routes=[
+                Route('/api/dashboard/resumo', resumo, methods=['GET', 'POST']),
+                Route('/api/dashboard/erro', erro),
+                Route('/api/projetado/mensal', resumo),
+                Route('/api/sincronizacao/status', resumo),
+            ],
+            middleware=[Middleware(ETagMiddleware)]
+        )
+
+    def requisitar(self, caminho: str, query: str = '', metodo: str = 'GET', headers: dict = None):
+        """Envia a requisição pela interface ASGI; retorna (status, headers, corpo)"""
+        return asyncio.run(self._requisitar(caminho, query, metodo, headers or {}))
+
+    async def _requisitar(self, caminho, query, metodo, headers):
+        escopo = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+            'method': metodo, 'scheme': 'http', 'path': caminho, 'raw_path': caminho.encode(),
+            'query_string': query.encode(), 'root_path': '',
+            'headers': [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+            'client': ('127.0.0.1', 1234), 'server': ('testserver', 80),
+        }
+        enviado = []
+        mensagens = []
+
+        async def receive():
+            # O corpo vai uma única vez; depois a conexão fica aberta até o fim da resposta
+            if not enviado:
+                enviado.append(True)
+                return {'type': 'http.request', 'body': b'', 'more_body': False}
+            await asyncio.Future()
+
+        async def send(mensagem):
+            mensagens.append(mensagem)
+
+        await self.app(escopo, receive, send)
+        inicio = next(m for m in mensagens if m['type'] == 'http.response.start')
+        corpo = b''.join(m.get('body', b'') for m in mensagens if m['type'] == 'http.response.body')
+        return inicio['status'], {k.decode(): v.decode() for k, v in inicio['headers']}, corpo
+
+
+class _DataFalsa:
+    """Substitui o datetime de utils.etag: now() devolve o dia informado"""
+
+    def __init__(self, dia: datetime):
+        self.dia = dia
+
+    def now(self, tz=None):
+        return self.dia
+
+
+def test_304_com_if_none_match():
+    """Testa o 304 sem corpo e sem executar a rota quando If-None-Match bate"""
+    print("=" * 60)
+    print("TESTE: GET CONDICIONAL")
+    print("=" * 60)
+
+    aplicacao = _Aplicacao()
+    status, headers, corpo = aplicacao.requisitar('/api/dashboard/resumo', 'periodo=mes-atual')
+    etag = headers['etag']
+    assert status == 200 and corpo == b'{"execucao":1}'
+    assert etag.startswith('W/"') and headers['cache-control'] == 'private, no-cache'
+    print("[OK] 200 com ETag fraco e Cache-Control")
+
+    status, headers, corpo = aplicacao.requisitar(
+        '/api/dashboard/resumo', 'periodo=mes-atual', headers={'If-None-Match': etag}
+    )
+    assert status == 304 and corpo == b''
+    assert headers['etag'] == etag and aplicacao.execucoes == 1
+    print("[OK] 304 sem corpo, rota não executada")
+
+    status, _, _ = aplicacao.requisitar(
+        '/api/dashboard/resumo', 'periodo=ano-atual', headers={'If-None-Match': etag}
+    )
+    assert status == 200 and aplicacao.execucoes == 2
+    print("[OK] outros parâmetros: outro ETag, rota executada")
+
+
+def test_formas_de_if_none_match():
+    """Testa If-None-Match forte (sem W/), em lista e '*', e parâmetros normalizados"""
+    aplicacao = _Aplicacao()
+    _, headers, _ = aplicacao.requisitar('/api/projetado/mensal', 'filiais=1002,1001&ano=2025')
+    etag = headers['etag']
+    forte = etag.removeprefix('W/')
+
+    for valor in (forte, f'W/"outro", {etag}', f'"outro",{forte}', '*'):
+        status, _, corpo = aplicacao.requisitar(
+            '/api/projetado/mensal', 'filiais=1002,1001&ano=2025', headers={'If-None-Match': valor}
+        )
+        assert status == 304 and corpo == b'', valor
+
+    status, _, _ = aplicacao.requisitar(
+        '/api/projetado/mensal', 'filiais=1002,1001&ano=2025', headers={'If-None-Match': 'W/"outro"'}
+    )
+    assert status == 200
+
+    # Mesmos parâmetros em outra ordem / filiais reordenadas / parâmetro vazio: mesmo ETag
+    _, headers, _ = aplicacao.requisitar('/api/projetado/mensal', 'ano=2025&filiais=1001, 1002&filtro=')
+    assert headers['etag'] == etag
+    print("\n[OK] forte, lista, '*' e parâmetros em outra ordem")
+
+
+def test_etag_muda_com_geracao_e_dia():
+    """Testa a troca do ETag após nova_geracao() (sincronização) e na virada do dia"""
+    print("\n" + "=" * 60)
+    print("TESTE: INVALIDAÇÃO DO ETAG")
+    print("=" * 60)
+
+    aplicacao = _Aplicacao()
+    datetime_original = etag_modulo.datetime
+    etag_modulo.datetime = _DataFalsa(datetime(2025, 3, 10, 23, 59))
+    try:
+        _, headers, _ = aplicacao.requisitar('/api/dashboard/resumo')
+        antes = headers['etag']
+
+        cache_consultas.nova_geracao()
+        status, headers, _ = aplicacao.requisitar('/api/dashboard/resumo', headers={'If-None-Match': antes})
+        depois_sincronizacao = headers['etag']
+        assert status == 200 and depois_sincronizacao != antes
+        print("[OK] nova geração do cache muda o ETag")
+
+        etag_modulo.datetime = _DataFalsa(datetime(2025, 3, 11, 0, 0))
+        status, headers, _ = aplicacao.requisitar(
+            '/api/dashboard/resumo', headers={'If-None-Match': depois_sincronizacao}
+        )
+        assert status == 200 and headers['etag'] not in (antes, depois_sincronizacao)
+        print("[OK] virada do dia muda o ETag")
+    finally:
+        etag_modulo.datetime = datetime_original
+
+
+def test_requisicoes_nao_cobertas():
+    """Testa que POST, respostas de erro e rotas fora de /api/dashboard e /api/projetado passam direto"""
+    aplicacao = _Aplicacao()
+    _, headers, _ = aplicacao.requisitar('/api/dashboard/resumo')
+    etag = headers['etag']
+
+    status, headers, _ = aplicacao.requisitar(
+        '/api/dashboard/resumo', metodo='POST', headers={'If-None-Match': etag}
+    )
+    assert status == 200 and 'etag' not in headers
+    print("\n[OK] POST não é condicional nem recebe ETag")
+
+    status, headers, corpo = aplicacao.requisitar('/api/dashboard/erro', headers={'If-None-Match': 'W/"outro"'})
+    assert status == 500 and 'etag' not in headers and 'cache-control' not in headers
+    assert corpo == b'{"detail":"falhou"}'
+    print("[OK] resposta 500 sem ETag")
+
+    execucoes = aplicacao.execucoes
+    status, headers, _ = aplicacao.requisitar('/api/sincronizacao/status', headers={'If-None-Match': '*'})
+    assert status == 200 and 'etag' not in headers and aplicacao.execucoes == execucoes + 1
+    print("[OK] rota fora do dashboard/projetado intocada")
+
+
+if __name__ == "__main__":
+    test_304_com_if_none_match()
+    test_formas_de_if_none_match()
+    test_etag_muda_com_geracao_e_dia()
+    test_requisicoes_nao_cobertas()
+    print("=" * 60)
+    print("TESTES CONCLUÍDOS!")
+    print("=" * 60)
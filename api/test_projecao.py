@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Script de teste para validar o motor de projeção (services/projecao_service.py)
+As médias da MatrizMensal (somas acumuladas) são comparadas com um cálculo
+direto, mês a mês, sobre os mesmos lançamentos. Não precisa de banco.
+"""
+from datetime import date
+
+import numpy as np
+
+from services.projecao_service import MatrizMensal, ProjecaoService, validar_parametros
+from services.snapshot_analitico import SEM_VALOR
+from utils.periodos import indice_mes
+
+CONTAS = [101, 202, 303, SEM_VALOR]
+FILIAIS = [1001, 1002]
+
+
+def _lancamentos(quantidade: int = 600, semente: int = 7):
+    """Lançamentos aleatórios de 2023-01 a 2025-12"""
+    rng = np.random.default_rng(semente)
+    inicio, fim = date(2023, 1, 1).toordinal(), date(2025, 12, 31).toordinal()
+    codfil = rng.choice(FILIAIS, quantidade)
+    ctafin = rng.choice(CONTAS, quantidade)
+    dias = rng.integers(inicio, fim + 1, quantidade)
+    valores = np.round(rng.uniform(10, 5000, quantidade), 2)
+    return codfil, ctafin, dias, valores
+
+
+def _media_direta(codfil, ctafin, dias, valores, mes_vigente, meses, ponderacao, fator, filiais=None):
+    """Média por conta somando os totais mensais da janela um a um"""
+    janela = range(mes_vigente - meses, mes_vigente)
+    if ponderacao == 'simples':
+        pesos = [1.0] * meses
+    elif ponderacao == 'ponderada':
+        pesos = [float(i + 1) for i in range(meses)]
+    else:
+        pesos = [fator ** (mes_vigente - 1 - m) for m in janela]
+
+    medias, ultimos = {}, {}
+    for conta in np.unique(ctafin):
+        totais = {m: 0.0 for m in janela}
+        ultimo = -1
+        for f, c, d, v in zip(codfil, ctafin, dias, valores):
+            mes = indice_mes(date.fromordinal(int(d)))
+            if c != conta or mes not in totais or (filiais and str(f) not in filiais):
+                continue
+            totais[mes] += v
+            ultimo = max(ultimo, int(d))
+        medias[int(conta)] = sum(p * totais[m] for p, m in zip(pesos, janela)) / sum(pesos)
+        ultimos[int(conta)] = ultimo
+    return medias, ultimos
+
+
+def _comparar(matriz, lancamentos, mes_vigente, meses, ponderacao, fator=0.5, filiais=None):
+    media, ultimo = matriz.media(mes_vigente, meses, ponderacao, fator, filiais)
+    esperado, ultimo_esperado = _media_direta(*lancamentos, mes_vigente, meses, ponderacao, fator, filiais)
+    for i, conta in enumerate(matriz.contas.tolist()):
+        assert np.isclose(media[i], esperado[conta], rtol=1e-9, atol=1e-6), (
+            ponderacao, mes_vigente, meses, conta, media[i], esperado[conta]
+        )
+        assert ultimo[i] == ultimo_esperado[conta], (ponderacao, mes_vigente, meses, conta)
+
+
+def test_medias_conferem_com_calculo_direto():
+    """Testa simples, ponderada e exponencial em janelas dentro, antes e depois do histórico"""
+    print("=" * 60)
+    print("TESTE: MÉDIAS DA MATRIZ MENSAL")
+    print("=" * 60)
+
+    lancamentos = _lancamentos()
+    matriz = MatrizMensal(*lancamentos)
+    assert matriz.qtd_meses == 36
+
+    casos = [
+        (date(2024, 6, 1), 3),    # janela no meio do histórico
+        (date(2024, 1, 1), 12),   # janela exatamente sobre 2023
+        (date(2023, 3, 1), 6),    # começa antes do histórico
+        (date(2023, 1, 1), 3),    # inteira antes do histórico
+        (date(2026, 2, 1), 4),    # termina depois do histórico
+        (date(2027, 1, 1), 2),    # inteira depois do histórico
+    ]
+    for vigente, meses in casos:
+        for ponderacao in ('simples', 'ponderada', 'exponencial'):
+            _comparar(matriz, lancamentos, indice_mes(vigente), meses, ponderacao)
+            _comparar(matriz, lancamentos, indice_mes(vigente), meses, ponderacao, fator=1.0)
+        print(f"[OK] {vigente.strftime('%Y-%m')} com {meses} meses")
+
+
+def test_filtro_de_filiais():
+    """Testa a média restrita a uma filial"""
+    lancamentos = _lancamentos()
+    matriz = MatrizMensal(*lancamentos)
+    for ponderacao in ('simples', 'ponderada', 'exponencial'):
+        _comparar(matriz, lancamentos, indice_mes(date(2025, 3, 1)), 5, ponderacao, filiais=['1002'])
+    print("\n[OK] média por filial")
+
+
+def test_fator_pequeno_usa_soma_direta():
+    """Testa o fator exponencial que estoura a escala acumulada (fator^-m): cai na soma direta"""
+    print("\n" + "=" * 60)
+    print("TESTE: FATOR EXPONENCIAL PEQUENO")
+    print("=" * 60)
+
+    lancamentos = _lancamentos()
+    matriz = MatrizMensal(*lancamentos)
+    for fator in (1e-3, 1e-12, 1e-300):
+        for vigente, meses in ((date(2025, 11, 1), 6), (date(2023, 2, 1), 4), (date(2026, 3, 1), 5)):
+            _comparar(matriz, lancamentos, indice_mes(vigente), meses, 'exponencial', fator)
+        estourou = matriz._exponencial[fator] is None
+        print(f"[OK] fator {fator}: {'soma direta' if estourou else 'escala acumulada'}")
+
+    # 1e-12 ** -35 não cabe num float: precisa ter usado a soma direta
+    assert matriz._exponencial[1e-12] is None
+    assert matriz._exponencial[1e-3] is not None
+
+
+def test_matriz_vazia():
+    """Testa a projeção sem lançamentos"""
+    resultado = ProjecaoService.projetar([], [], [], '2025-02-01', '2025-02-28')
+    assert resultado['total'] == 0 and resultado['diario'] == [] and resultado['contas'] == []
+    print("\n[OK] sem lançamentos: projeção vazia")
+
+
+def test_regra_e_data_ancora():
+    """Testa a escolha média x vigente e a data âncora da média, limitada ao período"""
+    print("\n" + "=" * 60)
+    print("TESTE: REGRA DA PROJEÇÃO E DATA ÂNCORA")
+    print("=" * 60)
+
+    d = lambda texto: date.fromisoformat(texto).toordinal()
+    ctafin = [
+        1, 1, 1,    # conta 1: média 300 nos 3 meses, último lançamento em 31/01
+        2, 2,       # conta 2: média 100, vigente 500 -> usa o vigente
+        3,          # conta 3: só lançamento fora da janela -> fica de fora
+        4, 4,       # conta 4: média 200, último lançamento em 15/12 -> âncora 15/02
+    ]
+    dias = [
+        d('2024-11-10'), d('2024-12-10'), d('2025-01-31'),
+        d('2024-12-05'), d('2025-02-10'),
+        d('2024-06-01'),
+        d('2024-12-15'), d('2025-02-03'),
+    ]
+    valores = [300, 300, 300, 300, 500, 999, 600, 50]
+
+    resultado = ProjecaoService.projetar(ctafin, dias, valores, '2025-02-01', '2025-02-28')
+    contas = {c['ctafin']: c for c in resultado['contas']}
+
+    assert set(contas) == {1, 2, 4}
+    # Dia 31 num mês de 28 dias: âncora no último dia do período
+    assert contas[1]['usa_media'] and contas[1]['valor'] == 300 and contas[1]['data'] == '2025-02-28'
+    assert not contas[2]['usa_media'] and contas[2]['valor'] == 500 and contas[2]['data'] is None
+    assert contas[4]['usa_media'] and contas[4]['valor'] == 200 and contas[4]['data'] == '2025-02-15'
+    assert resultado['total'] == 1000
+    assert resultado['diario'] == [
+        {'data': '2025-02-10', 'total': 500.0},
+        {'data': '2025-02-15', 'total': 200.0},
+        {'data': '2025-02-28', 'total': 300.0},
+    ]
+    print("[OK] média x vigente e âncora no fim do mês")
+
+    # Período vigente encerrado antes da âncora: a média cai no último dia do período
+    resultado = ProjecaoService.projetar(ctafin, dias, valores, '2025-02-01', '2025-02-12')
+    contas = {c['ctafin']: c for c in resultado['contas']}
+    assert contas[1]['data'] == '2025-02-12' and contas[4]['data'] == '2025-02-12'
+    assert {'data': '2025-02-12', 'total': 500.0} in resultado['diario']
+    print("[OK] âncora limitada ao fim do período")
+
+
+def test_parametros_invalidos():
+    """Testa a validação de meses, ponderação e fator"""
+    for meses, ponderacao, fator in ((0, 'simples', 0.5), (3, 'mediana', 0.5), (3, 'exponencial', 0), (3, 'exponencial', 1.5)):
+        try:
+            validar_parametros(meses, ponderacao, fator)
+        except ValueError:
+            continue
+        raise AssertionError(f"parâmetros aceitos: {meses}, {ponderacao}, {fator}")
+    validar_parametros(1, 'exponencial', 1.0)
+    print("\n[OK] parâmetros inválidos rejeitados")
+
+
+if __name__ == "__main__":
+    test_medias_conferem_com_calculo_direto()
+    test_filtro_de_filiais()
+    test_fator_pequeno_usa_soma_direta()
+    test_matriz_vazia()
+    test_regra_e_data_ancora()
+    test_parametros_invalidos()
+    print("=" * 60)
+    print("TESTES CONCLUÍDOS!")
+    print("=" * 60)
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Script de teste para validar o rateio E301RAT das consultas de contas a receber
+(services/rateio_senior.py). Confere o SQL gerado e o MapaRateio: não precisa de banco.
+"""
+from services.rateio_senior import MODOS_RATEIO, ORDEM_RATEIO, MapaRateio, sql_linhas_rateio, sql_rateio, validar_modo
+
+
+def test_ordem_fixa_em_todos_os_modos():
+    """Testa que todo TOP 1 e a consulta do hash_join ordenam o rateio pela mesma ORDEM_RATEIO"""
+    print("=" * 60)
+    print("TESTE: ORDEM DO RATEIO")
+    print("=" * 60)
+
+    colunas, juncao = sql_rateio('subconsulta')
+    assert colunas.count('TOP 1') == colunas.count(f"ORDER BY {ORDEM_RATEIO}") == 2
+
+    colunas, juncao = sql_rateio('outer_apply')
+    assert juncao.count('TOP 1') == juncao.count(f"ORDER BY {ORDEM_RATEIO}") == 1
+
+    assert sql_rateio('hash_join') == ('', '')
+    linhas = sql_linhas_rateio("FROM E301TCR WHERE E301TCR.CODEMP = 1")
+    assert linhas.rstrip().endswith(
+        f"ORDER BY E301RAT.CODEMP, E301RAT.CODFIL, E301RAT.NUMTIT, E301RAT.CODTPT, {ORDEM_RATEIO}"
+    )
+    print(f"[OK] {', '.join(MODOS_RATEIO)} ordenam por {ORDEM_RATEIO}")
+
+
+def test_mapa_fica_com_a_primeira_linha():
+    """Testa o MapaRateio: primeira linha de cada título, NULL como 0 e título sem rateio"""
+    mapa = MapaRateio([
+        {'CODEMP': 1, 'CODFIL': 1001, 'NUMTIT': 'A1', 'CODTPT': 'DP', 'CODCCU': None, 'CTAFIN': 301},
+        {'CODEMP': 1, 'CODFIL': 1001, 'NUMTIT': 'A1', 'CODTPT': 'DP', 'CODCCU': 10, 'CTAFIN': 302},
+        {'CODEMP': 1, 'CODFIL': 1001, 'NUMTIT': 'B2', 'CODTPT': 'DP', 'CODCCU': 20, 'CTAFIN': 303},
+        {'CODEMP': 1, 'CODFIL': 1001, 'NUMTIT': 'B2', 'CODTPT': 'DP', 'CODCCU': 30, 'CTAFIN': 304},
+    ])
+    assert len(mapa) == 2
+
+    titulo = lambda numtit: {'CODEMP': 1, 'CODFIL': 1001, 'NUMTIT': numtit, 'CODTPT': 'DP'}
+    assert mapa.aplicar(titulo('A1'))['CODCCU'] == 0 and mapa.aplicar(titulo('A1'))['CTAFIN'] == 301
+    assert (mapa.aplicar(titulo('B2'))['CODCCU'], mapa.aplicar(titulo('B2'))['CTAFIN']) == (20, 303)
+    assert (mapa.aplicar(titulo('C3'))['CODCCU'], mapa.aplicar(titulo('C3'))['CTAFIN']) == (0, 0)
+    print("\n[OK] primeira linha de cada título; sem rateio -> 0")
+
+
+def test_modo_invalido():
+    """Testa a validação do modo"""
+    try:
+        validar_modo('merge_join')
+        raise AssertionError("modo inválido aceito")
+    except ValueError:
+        pass
+    print("\n[OK] modo inválido rejeitado")
+
+
+if __name__ == "__main__":
+    test_ordem_fixa_em_todos_os_modos()
+    test_mapa_fica_com_a_primeira_linha()
+    test_modo_invalido()
+    print("=" * 60)
+    print("TESTES CONCLUÍDOS!")
+    print("=" * 60)
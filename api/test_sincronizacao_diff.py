@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Script de teste para validar a detecção de mudanças da sincronização incremental
+(services/sincronizacao_diff.py). Usa o CursorFalso de apoio_testes.py: não precisa de banco.
+"""
+import uuid
+
+from apoio_testes import CursorFalso
+from services.sincronizacao_diff import DiffLinhas
+
+
+IDS = [uuid.uuid5(uuid.NAMESPACE_OID, f"titulo-{i}") for i in range(5)]
+
+
+def _diff() -> DiffLinhas:
+    # Locais: 0, 1, 2, 3 (com ids em formatos diferentes, como o driver pode devolver)
+    cursor = CursorFalso([
+        {'id': IDS[0], 'HASH_LINHA': b'h0'},
+        {'id': str(IDS[1]), 'HASH_LINHA': b'h1'},
+        {'id': IDS[2].bytes, 'HASH_LINHA': b'h2'},
+        {'id': str(IDS[3]).upper(), 'HASH_LINHA': None},
+    ])
+    diff = DiffLinhas.carregar_local(cursor, 'contas_receber')
+    assert cursor.comandos == [("SELECT id, HASH_LINHA FROM contas_receber", None)]
+    return diff
+
+
+def test_classificacao():
+    """Testa a separação em inseridas / atualizadas / inalteradas / removidas"""
+    print("=" * 60)
+    print("TESTE: CLASSIFICAÇÃO DAS LINHAS DO SENIOR")
+    print("=" * 60)
+
+    diff = _diff()
+    assert diff.total_local == 4
+
+    senior = [
+        (str(IDS[0]), 'a', b'h0'),        # inalterada
+        (str(IDS[1]), 'b', b'h1-novo'),   # atualizada
+        (str(IDS[3]), 'd', b'h3'),        # atualizada (hash local NULL, linha antiga)
+        (str(IDS[4]), 'e', b'h4'),        # nova
+    ]
+    # Em dois lotes, como na sincronização
+    alteradas = diff.filtrar(senior[:2]) + diff.filtrar(senior[2:])
+
+    assert alteradas == senior[1:]
+    assert (diff.inseridos, diff.atualizados, diff.inalterados) == (1, 2, 1)
+    assert diff.removidos() == [str(IDS[2])]
+    print("[OK] 1 nova, 2 atualizadas, 1 inalterada, 1 removida")
+
+
+def test_resumo():
+    """Testa os contadores e o percentual alterado do resumo"""
+    diff = _diff()
+    diff.filtrar([
+        (str(IDS[0]), b'h0'),
+        (str(IDS[1]), b'h1'),
+        (str(IDS[2]), b'h2-novo'),
+        (str(IDS[4]), b'h4'),
+    ])
+
+    assert diff.resumo() == {
+        'linhas_locais': 4,
+        'linhas_senior': 4,
+        'inseridos': 1,
+        'atualizados': 1,
+        'removidos': 1,
+        'inalterados': 2,
+        'percentual_alterado': 75.0
+    }
+    print("\n[OK] resumo: 3 de 4 linhas alteradas (75%)")
+
+
+def test_sem_mudancas_e_tabela_vazia():
+    """Testa os extremos: nada mudou, e primeira carga com a tabela local vazia"""
+    diff = _diff()
+    diff.filtrar([(str(IDS[i]), h) for i, h in ((0, b'h0'), (1, b'h1'), (2, b'h2'), (3, None))])
+    resumo = diff.resumo()
+    assert resumo['inalterados'] == 4 and resumo['percentual_alterado'] == 0.0
+    assert diff.removidos() == []
+
+    vazio = DiffLinhas.carregar_local(CursorFalso([]), 'contas_pagar')
+    linhas = [(str(i), b'h') for i in IDS]
+    assert vazio.filtrar(linhas) == linhas
+    assert vazio.resumo()['inseridos'] == 5 and vazio.resumo()['percentual_alterado'] == 100.0
+
+    assert DiffLinhas('contas_pagar', {}).resumo()['percentual_alterado'] == 0.0
+    print("\n[OK] sem mudanças: nada a gravar; tabela vazia: tudo inserido")
+
+
+if __name__ == "__main__":
+    test_classificacao()
+    test_resumo()
+    test_sem_mudancas_e_tabela_vazia()
+    print("=" * 60)
+    print("TESTES CONCLUÍDOS!")
+    print("=" * 60)
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Script de teste para validar os jobs de sincronização (services/sincronizacao_jobs.py)
+O pool 'sincronizacao' do executor é trocado por um PoolFalso: os jobs só rodam
+quando o teste manda.
+"""
+from datetime import datetime, timedelta
+
+import services.sincronizacao_jobs as jobs_modulo
+from apoio_testes import PoolFalso
+from services.sincronizacao_jobs import GerenciadorJobs, reportar_progresso
+
+
+def _com_pool(teste):
+    """Troca executor.pools de services.sincronizacao_jobs por um PoolFalso no pool 'sincronizacao'"""
+    def executar():
+        pools_originais = jobs_modulo.executor.pools
+        pool = PoolFalso()
+        jobs_modulo.executor.pools = {'sincronizacao': pool}
+        try:
+            teste(pool)
+        finally:
+            jobs_modulo.executor.pools = pools_originais
+    executar.__name__ = teste.__name__
+    executar.__doc__ = teste.__doc__
+    return executar
+
+
+def _sucesso(**extra):
+    return {'success': True, **extra}
+
+
+@_com_pool
+def test_pedidos_repetidos_coalescidos(pool):
+    """Testa a coalescência: mesmo tipo e parâmetros reaproveitam o job ativo"""
+    print("=" * 60)
+    print("TESTE: COALESCÊNCIA")
+    print("=" * 60)
+
+    gerenciador = GerenciadorJobs()
+    job = gerenciador.submeter('receber', _sucesso, data_inicio='2025-01-01', filial=None)
+    repetido = gerenciador.submeter('receber', _sucesso, data_inicio='2025-01-01')
+    assert repetido is job and job.coalescidos == 1
+    assert len(pool.pendentes) == 1
+    print("[OK] pedido repetido na fila volta o mesmo job (parâmetro None ignorado)")
+
+    outro = gerenciador.submeter('receber', _sucesso, data_inicio='2025-02-01')
+    outro_tipo = gerenciador.submeter('pagar', _sucesso, data_inicio='2025-01-01')
+    assert len({job.id, outro.id, outro_tipo.id}) == 3 and len(pool.pendentes) == 3
+    print("[OK] parâmetros ou tipo diferentes geram outro job")
+
+    pool.executar()
+    assert job.status == 'sucesso' and job.resultado == {'success': True}
+    assert gerenciador.ativos() == []
+    novo = gerenciador.submeter('receber', _sucesso, data_inicio='2025-01-01')
+    assert novo is not job and novo.coalescidos == 0
+    assert gerenciador.obter(job.id) is job and gerenciador.obter(novo.id) is novo
+    print("[OK] após a conclusão, o mesmo pedido gera um job novo")
+
+
+@_com_pool
+def test_status_de_erro(pool):
+    """Testa o status 'erro' para success False (com a mensagem) e para exceção"""
+    def falhar():
+        raise ConnectionError("Senior indisponível")
+
+    gerenciador = GerenciadorJobs()
+    sem_sucesso = gerenciador.submeter('a', lambda: {'success': False, 'mensagem': 'tabela bloqueada'})
+    excecao = gerenciador.submeter('b', falhar)
+    pool.executar()
+
+    assert (sem_sucesso.status, sem_sucesso.erro) == ('erro', 'tabela bloqueada')
+    assert (excecao.status, excecao.erro) == ('erro', 'Senior indisponível')
+    assert excecao.concluido_em is not None and gerenciador.ativos() == []
+    print("\n[OK] success False e exceção terminam em erro, com a mensagem")
+
+
+@_com_pool
+def test_pool_saturado_nao_registra_job(pool):
+    """Testa a fila cheia: o erro propaga e nenhum job fica registrado como ativo"""
+    gerenciador = GerenciadorJobs()
+    pool.saturado = True
+    try:
+        gerenciador.submeter('receber', _sucesso)
+        raise AssertionError("fila cheia não propagada")
+    except RuntimeError:
+        pass
+    assert gerenciador.ativos() == []
+
+    pool.saturado = False
+    job = gerenciador.submeter('receber', _sucesso)
+    assert job.coalescidos == 0 and len(pool.pendentes) == 1
+    print("\n[OK] fila cheia não deixa job fantasma para coalescer")
+
+
+@_com_pool
+def test_retencao_dos_concluidos(pool):
+    """Testa _limpar_concluidos: só os MAX_JOBS_CONCLUIDOS concluídos mais recentes ficam, e os ativos nunca saem"""
+    print("\n" + "=" * 60)
+    print("TESTE: RETENÇÃO")
+    print("=" * 60)
+
+    maximo_original = jobs_modulo.MAX_JOBS_CONCLUIDOS
+    jobs_modulo.MAX_JOBS_CONCLUIDOS = 2
+    try:
+        gerenciador = GerenciadorJobs()
+        concluidos = []
+        for i in range(4):
+            concluidos.append(gerenciador.submeter('receber', _sucesso, lote=i))
+            pool.executar()
+        ativo = gerenciador.submeter('pagar', _sucesso)
+        na_fila = gerenciador.submeter('receber', _sucesso, lote=99)
+
+        assert [gerenciador.obter(job.id) for job in concluidos] == [None, None, concluidos[2], concluidos[3]]
+        assert gerenciador.obter(ativo.id) is ativo and gerenciador.obter(na_fila.id) is na_fila
+        assert gerenciador.ativos() == [ativo, na_fila]
+        print("[OK] 2 concluídos mais antigos descartados; ativos mantidos")
+    finally:
+        jobs_modulo.MAX_JOBS_CONCLUIDOS = maximo_original
+
+
+@_com_pool
+def test_progresso_percentual_e_eta(pool):
+    """Testa reportar_progresso: soma das etapas, percentual, ETA pela vazão e fase"""
+    print("\n" + "=" * 60)
+    print("TESTE: PROGRESSO")
+    print("=" * 60)
+
+    gerenciador = GerenciadorJobs()
+    progressos = []
+
+    def sincronizar():
+        job = gerenciador.ativos()[0]
+        job.iniciado_em = datetime.now() - timedelta(seconds=10)
+        reportar_progresso('contas_receber', fase='lendo_senior', linhas=200, total=600)
+        reportar_progresso('contas_pagar', fase='aplicando', linhas=50, total=400)
+        progressos.append(job.progresso())
+        reportar_progresso('contas_receber', fase='concluida', linhas=600)
+        reportar_progresso('contas_pagar', fase='concluida', linhas=450)
+        return _sucesso()
+
+    job = gerenciador.submeter('tudo', sincronizar)
+    assert job.progresso()['percentual'] is None and job.progresso()['fase'] is None
+    pool.executar()
+
+    durante = progressos[0]
+    assert (durante['linhas_processadas'], durante['linhas_estimadas']) == (250, 1000)
+    assert durante['percentual'] == 25.0
+    # 250 linhas em 10s -> faltam 750 linhas, 30s
+    assert durante['eta_segundos'] == 30
+    assert durante['fase'] == 'contas_receber: lendo_senior; contas_pagar: aplicando'
+    print("[OK] 25% em 10s: ETA de 30s")
+
+    final = job.progresso()
+    assert final['percentual'] == 100.0 and final['linhas_processadas'] == 1050
+    assert final['eta_segundos'] is None and final['fase'] == 'sucesso'
+    print("[OK] concluído: 100% (linhas além da estimativa limitadas), sem ETA")
+
+    reportar_progresso('contas_receber', linhas=1)  # Fora de um job: sem efeito
+    assert job.progresso()['linhas_processadas'] == 1050
+    print("[OK] reportar_progresso fora de um job não faz nada")
+
+
+if __name__ == "__main__":
+    test_pedidos_repetidos_coalescidos()
+    test_status_de_erro()
+    test_pool_saturado_nao_registra_job()
+    test_retencao_dos_concluidos()
+    test_progresso_percentual_e_eta()
+    print("=" * 60)
+    print("TESTES CONCLUÍDOS!")
+    print("=" * 60)
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Script de teste para validar o orquestrador das etapas da sincronização
+(services/sincronizacao_orquestrador.py). As etapas são funções locais: não precisa de banco.
+"""
+import threading
+import time
+
+from services.sincronizacao_orquestrador import EtapaSincronizacao, OrquestradorSincronizacao
+
+
+def _sucesso(**extras):
+    return lambda: {'success': True, **extras}
+
+
+def test_dependencias_em_ordem():
+    """Testa que uma etapa só começa depois que as dependências terminaram com sucesso"""
+    print("=" * 60)
+    print("TESTE: ORDEM DAS DEPENDÊNCIAS")
+    print("=" * 60)
+
+    ordem = []
+    lock = threading.Lock()
+
+    def etapa(nome):
+        def executar():
+            with lock:
+                ordem.append(('inicio', nome))
+            time.sleep(0.02)
+            with lock:
+                ordem.append(('fim', nome))
+            return {'success': True}
+        return executar
+
+    eventos = []
+    registros = OrquestradorSincronizacao([
+        EtapaSincronizacao('contas_pagar', etapa('contas_pagar'), depende_de=['plano_financeiro']),
+        EtapaSincronizacao('contas_receber', etapa('contas_receber'), depende_de=['plano_financeiro']),
+        EtapaSincronizacao('plano_financeiro', etapa('plano_financeiro')),
+        EtapaSincronizacao('centro_custo', etapa('centro_custo')),
+    ], max_paralelismo=2, ao_mudar_etapa=lambda nome, status: eventos.append((nome, status))).executar()
+
+    assert all(r['status'] == 'sucesso' for r in registros.values())
+    fim_plano = ordem.index(('fim', 'plano_financeiro'))
+    assert ordem.index(('inicio', 'contas_pagar')) > fim_plano
+    assert ordem.index(('inicio', 'contas_receber')) > fim_plano
+    assert sorted(eventos) == sorted(
+        [(nome, 'em_andamento') for nome in registros] + [(nome, 'concluida') for nome in registros]
+    )
+    print("[OK] contas a receber/pagar começam após o plano financeiro")
+
+
+def test_falha_ignora_dependentes():
+    """Testa que a falha (erro ou exceção) ignora as dependentes, inclusive indiretas, e não as independentes"""
+    print("\n" + "=" * 60)
+    print("TESTE: FALHA DE DEPENDÊNCIA")
+    print("=" * 60)
+
+    def explodir():
+        raise RuntimeError("Senior indisponível")
+
+    executadas = []
+
+    def registrar(nome):
+        def executar():
+            executadas.append(nome)
+            return {'success': True}
+        return executar
+
+    registros = OrquestradorSincronizacao([
+        EtapaSincronizacao('plano_financeiro', lambda: {'success': False, 'mensagem': 'falhou'}),
+        EtapaSincronizacao('contas_pagar', registrar('contas_pagar'), depende_de=['plano_financeiro']),
+        EtapaSincronizacao('resumo', registrar('resumo'), depende_de=['contas_pagar']),
+        EtapaSincronizacao('centro_custo', explodir),
+        EtapaSincronizacao('rateio', registrar('rateio'), depende_de=['centro_custo']),
+        EtapaSincronizacao('independente', registrar('independente')),
+    ], max_paralelismo=2).executar()
+
+    assert registros['plano_financeiro']['status'] == 'erro'
+    assert registros['centro_custo']['status'] == 'erro' and 'Senior indisponível' in registros['centro_custo']['erro']
+    for nome in ('contas_pagar', 'resumo', 'rateio'):
+        assert registros[nome]['status'] == 'ignorada', nome
+        assert registros[nome]['resultado'] is None and registros[nome]['duracao_ms'] == 0
+    assert 'plano_financeiro' in registros['contas_pagar']['erro']
+    assert 'contas_pagar' in registros['resumo']['erro']
+    assert executadas == ['independente']
+    print("[OK] dependentes ignoradas, independente executada")
+
+
+def test_dependencia_inexistente_e_ciclo():
+    """Testa a dependência desconhecida (ValueError) e o ciclo (etapas ignoradas, sem travar)"""
+    try:
+        OrquestradorSincronizacao([EtapaSincronizacao('contas_pagar', _sucesso(), depende_de=['plano'])])
+        raise AssertionError("dependência inexistente aceita")
+    except ValueError as e:
+        assert "'plano'" in str(e)
+
+    registros = OrquestradorSincronizacao([
+        EtapaSincronizacao('a', _sucesso(), depende_de=['b']),
+        EtapaSincronizacao('b', _sucesso(), depende_de=['a']),
+        EtapaSincronizacao('c', _sucesso()),
+    ]).executar()
+
+    assert registros['c']['status'] == 'sucesso'
+    for nome in ('a', 'b'):
+        assert registros[nome]['status'] == 'ignorada' and registros[nome]['erro'] == 'Dependência circular'
+    print("\n[OK] dependência inexistente rejeitada; ciclo ignorado")
+
+
+def test_limite_de_paralelismo():
+    """Testa que no máximo max_paralelismo etapas rodam ao mesmo tempo"""
+    print("\n" + "=" * 60)
+    print("TESTE: LIMITE DE PARALELISMO")
+    print("=" * 60)
+
+    for limite in (1, 2, 3):
+        lock = threading.Lock()
+        rodando = [0]
+        pico = [0]
+
+        def executar():
+            with lock:
+                rodando[0] += 1
+                pico[0] = max(pico[0], rodando[0])
+            time.sleep(0.03)
+            with lock:
+                rodando[0] -= 1
+            return {'success': True}
+
+        registros = OrquestradorSincronizacao(
+            [EtapaSincronizacao(f"etapa_{i}", executar) for i in range(6)], max_paralelismo=limite
+        ).executar()
+
+        assert all(r['status'] == 'sucesso' for r in registros.values())
+        assert pico[0] == limite, (limite, pico[0])
+        print(f"[OK] max_paralelismo={limite}: pico de {pico[0]} etapas simultâneas")
+
+
+if __name__ == "__main__":
+    test_dependencias_em_ordem()
+    test_falha_ignora_dependentes()
+    test_dependencia_inexistente_e_ciclo()
+    test_limite_de_paralelismo()
+    print("=" * 60)
+    print("TESTES CONCLUÍDOS!")
+    print("=" * 60)
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Script de teste para validar o agrupamento de chamadas simultâneas (utils/single_flight.py)
+A função agrupada fica presa num Event até todas as threads estarem esperando por ela.
+"""
+import threading
+import time
+
+from utils.single_flight import SingleFlight
+
+SEGUNDOS_LIMITE = 5
+
+
+def _esperar(condicao):
+    limite = time.monotonic() + SEGUNDOS_LIMITE
+    while not condicao():
+        assert time.monotonic() < limite, "tempo esgotado esperando as threads"
+        time.sleep(0.005)
+
+
+def _disparar(grupo, funcao, seguidores, *args):
+    """
+    Inicia o líder e os seguidores com os mesmos argumentos, esperando todos entrarem.
+    Retorna (threads, resultados); resultados recebe o valor ou a exceção de cada thread.
+    """
+    resultados = []
+
+    def chamar():
+        try:
+            resultados.append(funcao(*args))
+        except Exception as e:
+            resultados.append(e)
+
+    threads = [threading.Thread(target=chamar) for _ in range(seguidores + 1)]
+    threads[0].start()
+    _esperar(lambda: len(grupo.estatisticas()['em_andamento']) == 1)
+    for thread in threads[1:]:
+        thread.start()
+    _esperar(lambda: grupo.estatisticas()['em_andamento'][0]['aguardando'] == seguidores)
+    return threads, resultados
+
+
+def _juntar(threads):
+    for thread in threads:
+        thread.join(SEGUNDOS_LIMITE)
+        assert not thread.is_alive()
+
+
+def test_seguidores_recebem_o_resultado_do_lider():
+    """Testa que chamadas simultâneas com a mesma chave executam uma vez e recebem o mesmo objeto"""
+    print("=" * 60)
+    print("TESTE: RESULTADO COMPARTILHADO")
+    print("=" * 60)
+
+    grupo = SingleFlight('teste')
+    liberar = threading.Event()
+    execucoes = []
+
+    @grupo.agrupar
+    def consultar(periodo, filiais=None):
+        execucoes.append(periodo)
+        liberar.wait(SEGUNDOS_LIMITE)
+        return {'periodo': periodo}
+
+    threads, resultados = _disparar(grupo, consultar, 4, '2025-01')
+    liberar.set()
+    _juntar(threads)
+
+    assert execucoes == ['2025-01']
+    assert len(resultados) == 5 and all(r is resultados[0] for r in resultados)
+    estatisticas = grupo.estatisticas()
+    assert estatisticas['execucoes'] == 1 and estatisticas['chamadas_agrupadas'] == 4
+    assert estatisticas['pico_aguardando'] == 4
+    assert estatisticas['em_andamento'] == []
+    print("[OK] 5 chamadas, 1 execução")
+
+
+def test_seguidores_recebem_a_excecao_do_lider():
+    """Testa que a exceção do líder chega a todos que esperavam por ele"""
+    grupo = SingleFlight('teste')
+    liberar = threading.Event()
+    erro = ConnectionError("Senior indisponível")
+
+    @grupo.agrupar
+    def consultar(periodo):
+        liberar.wait(SEGUNDOS_LIMITE)
+        raise erro
+
+    threads, resultados = _disparar(grupo, consultar, 3, '2025-01')
+    liberar.set()
+    _juntar(threads)
+
+    assert len(resultados) == 4 and all(r is erro for r in resultados)
+    assert grupo.estatisticas()['em_andamento'] == []
+    print("\n[OK] exceção propagada a todas as chamadas")
+
+
+def test_chamada_posterior_executa_de_novo():
+    """Testa a limpeza: depois de concluída, a mesma chave dispara uma nova execução"""
+    grupo = SingleFlight('teste')
+    execucoes = []
+
+    @grupo.agrupar
+    def consultar(periodo, filiais=None):
+        execucoes.append(periodo)
+        if len(execucoes) == 2:
+            raise ValueError("falha")
+        return len(execucoes)
+
+    assert consultar('2025-01') == 1
+    try:
+        consultar('2025-01')
+        raise AssertionError("a exceção não foi propagada")
+    except ValueError:
+        pass
+    assert consultar('2025-01') == 3
+    assert grupo.estatisticas()['execucoes'] == 3 and grupo.estatisticas()['em_andamento'] == []
+    print("\n[OK] chave liberada após sucesso e após erro")
+
+
+def test_chaves_diferentes_nao_se_agrupam():
+    """Testa que argumentos diferentes executam em paralelo, e argumentos equivalentes se agrupam"""
+    grupo = SingleFlight('teste')
+    liberar = threading.Event()
+    execucoes = []
+
+    @grupo.agrupar
+    def consultar(periodo, filiais=None):
+        execucoes.append((periodo, filiais))
+        liberar.wait(SEGUNDOS_LIMITE)
+        return periodo
+
+    threads = [
+        threading.Thread(target=consultar, args=('2025-01', ['1002', '1001'])),
+        threading.Thread(target=consultar, args=('2025-02',)),
+    ]
+    for thread in threads:
+        thread.start()
+    _esperar(lambda: len(grupo.estatisticas()['em_andamento']) == 2)
+
+    # Mesmas filiais em outra ordem: espera a execução em andamento
+    seguidor = threading.Thread(target=consultar, args=('2025-01',), kwargs={'filiais': ['1001', '1002']})
+    seguidor.start()
+    _esperar(lambda: grupo.estatisticas()['chamadas_agrupadas'] == 1)
+
+    liberar.set()
+    _juntar(threads + [seguidor])
+    assert len(execucoes) == 2
+    print("\n[OK] chaves diferentes executam separadas; filiais em outra ordem se agrupam")
+
+
+if __name__ == "__main__":
+    test_seguidores_recebem_o_resultado_do_lider()
+    test_seguidores_recebem_a_excecao_do_lider()
+    test_chamada_posterior_executa_de_novo()
+    test_chaves_diferentes_nao_se_agrupam()
+    print("=" * 60)
+    print("TESTES CONCLUÍDOS!")
+    print("=" * 60)
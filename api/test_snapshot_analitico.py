@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Script de teste para validar o snapshot analítico do dashboard (services/snapshot_analitico.py)
+As respostas do snapshot são comparadas com as consultas SQL que ele substitui
+(contas_pagar_local_service / contas_receber_local_service), reproduzidas em Python
+sobre as mesmas linhas. Não precisa de banco.
+"""
+import threading
+import time
+from collections import defaultdict
+from datetime import date
+
+import numpy as np
+
+import services.snapshot_analitico as snapshot_modulo
+from config import settings
+from services.snapshot_analitico import GerenciadorSnapshot, SEM_VALOR, SnapshotAnalitico, TitulosColunares
+
+# (data ajustada, valor, codfil, ctafin, codccu, código e nome do fornecedor)
+LINHAS_PAGAR = [
+    ('2025-02-03', 1500.00, 1001, 101, 10, 1, 'ALFA'),
+    ('2025-02-03', 250.50, 1002, 102, 20, 2, 'BETA'),
+    ('2025-02-05', 800.00, 1001, 101, None, 3, 'GAMA'),
+    ('2025-02-10', 3200.00, 1002, 103, 10, 1, 'ALFA'),
+    ('2025-02-10', 120.25, 1001, None, 30, 4, 'DELTA'),
+    ('2025-02-17', 999.99, 1003, 104, 20, 2, 'BETA'),
+    ('2025-02-28', 60.00, 1001, 105, None, 5, 'ALFA'),  # Mesmo nome, outro código: outra entidade
+    ('2025-01-31', 700.00, 1001, 101, 10, 1, 'ALFA'),   # Fora do período
+    ('2025-03-03', 410.00, 1002, 102, 20, 2, 'BETA'),   # Fora do período
+]
+
+# CTARED -> [(DESCTA, NIVCTA, NATCTA)]; 101 se repete entre modelos do plano
+PLANO = {
+    101: [('ALUGUEL', 6, 'D'), ('ALUGUEL (MODELO 2)', 6, 'D')],
+    102: [('ENERGIA', 6, 'D')],
+    103: [('FOLHA', 5, 'D')],         # Nível 5: fora do ranking
+    104: [('VENDAS', 6, 'C')],        # Receita: fora do ranking de despesas
+    105: [('MATERIAL', 6, 'D')],
+}
+
+INICIO, FIM = '2025-02-01', '2025-02-28'
+
+
+def _titulos(linhas, tabela='contas_pagar') -> TitulosColunares:
+    """Monta as colunas como TitulosColunares.carregar faz com as linhas do banco"""
+    indices, nomes, entidade = {}, [], []
+    for linha in linhas:
+        chave = (linha[5], linha[6])
+        if chave not in indices:
+            indices[chave] = len(nomes)
+            nomes.append(linha[6])
+        entidade.append(indices[chave])
+    coluna = lambda i: np.array([SEM_VALOR if l[i] is None else l[i] for l in linhas], dtype=np.int32)
+    return TitulosColunares(
+        tabela,
+        np.array([date.fromisoformat(l[0]).toordinal() for l in linhas], dtype=np.int32),
+        np.array([l[1] for l in linhas], dtype=np.float64),
+        coluna(2), coluna(3), coluna(4),
+        np.array(entidade, dtype=np.int32),
+        nomes
+    )
+
+
+def _snapshot(linhas=LINHAS_PAGAR) -> SnapshotAnalitico:
+    return SnapshotAnalitico(_titulos(linhas), _titulos([], 'contas_receber'), PLANO, {})
+
+
+def _no_periodo(linhas, inicio=INICIO, fim=FIM, filiais=None):
+    return [
+        l for l in linhas
+        if inicio <= l[0] <= fim and (not filiais or str(l[2]) in filiais)
+    ]
+
+
+def test_total_e_por_dia():
+    """Testa o total (com o mínimo de zero) e a série diária, com e sem filtro de filiais"""
+    print("=" * 60)
+    print("TESTE: TOTAL E SÉRIE DIÁRIA")
+    print("=" * 60)
+
+    snapshot = _snapshot()
+    for filiais in (None, ['1001'], ['1002', '1003'], ['9999']):
+        linhas = _no_periodo(LINHAS_PAGAR, filiais=filiais)
+        assert snapshot.total('contas_pagar', INICIO, FIM, filiais) == round(sum(l[1] for l in linhas), 2)
+
+        por_dia = defaultdict(float)
+        for l in linhas:
+            por_dia[l[0]] += l[1]
+        esperado = [{'data': d, 'total': round(t, 2)} for d, t in sorted(por_dia.items())]
+        assert snapshot.dados_diarios('contas_pagar', INICIO, FIM, filiais) == esperado
+        print(f"[OK] filiais {filiais}: total {snapshot.total('contas_pagar', INICIO, FIM, filiais)}")
+
+    # Sem data_fim: tudo a partir do início
+    assert snapshot.total('contas_pagar', '2025-03-01') == 410.00
+
+    # Estornos maiores que os lançamentos: total negativo vira zero, como o max(total, 0) do SQL
+    negativo = _snapshot([('2025-02-03', 100.0, 1001, 101, 10, 1, 'ALFA'), ('2025-02-04', -300.0, 1001, 101, 10, 1, 'ALFA')])
+    assert negativo.total('contas_pagar', INICIO, FIM) == 0
+    assert negativo.dados_diarios('contas_pagar', INICIO, FIM) == [
+        {'data': '2025-02-03', 'total': 100.0}, {'data': '2025-02-04', 'total': -300.0}
+    ]
+    print("[OK] total negativo limitado a zero")
+
+
+def _top_contas_sql(linhas, limit, natureza='D', filiais=None):
+    """INNER JOIN plano_financeiro + NATCTA/NIVCTA = 6 + GROUP BY CTAFIN, DESCTA, NIVCTA, NATCTA"""
+    totais = defaultdict(float)
+    for l in _no_periodo(linhas, filiais=filiais):
+        for descta, nivcta, natcta in PLANO.get(l[3], ()):
+            if natcta == natureza and nivcta == 6:
+                totais[(l[3], descta, nivcta, natcta)] += l[1]
+    ordenado = sorted(totais.items(), key=lambda item: -item[1])[:limit]
+    return [
+        {
+            'nome': f"{ctafin:04d} - {descta}",
+            'total': round(total, 2),
+            'nivel': nivcta,
+            'recdep': 'RECEITA' if natcta == 'C' else 'DESPESA'
+        }
+        for (ctafin, descta, nivcta, natcta), total in ordenado
+    ]
+
+
+def test_top_contas():
+    """Testa o ranking por conta: plano nível 6 e natureza, CTARED repetido e limit"""
+    print("\n" + "=" * 60)
+    print("TESTE: TOP CONTAS")
+    print("=" * 60)
+
+    snapshot = _snapshot()
+    for limit in (10, 3, 2, 1):
+        for filiais in (None, ['1001']):
+            resultado = snapshot.top_contas('contas_pagar', INICIO, FIM, limit, filiais)
+            assert resultado == _top_contas_sql(LINHAS_PAGAR, limit, filiais=filiais), (limit, filiais)
+
+    completo = snapshot.top_contas('contas_pagar', INICIO, FIM)
+    nomes = [c['nome'] for c in completo]
+    assert nomes[:2] == ['0101 - ALUGUEL', '0101 - ALUGUEL (MODELO 2)']
+    assert completo[0]['total'] == completo[1]['total'] == 2300.00
+    assert not any(n.startswith('0103') or n.startswith('0104') for n in nomes)
+    assert len(snapshot.top_contas('contas_pagar', INICIO, FIM, 1)) == 1
+    print(f"[OK] {nomes}")
+
+
+def test_top_entidades_e_centro_custo():
+    """Testa o ranking de fornecedores (por código e nome) e o agrupamento por centro de custo"""
+    snapshot = _snapshot()
+    linhas = _no_periodo(LINHAS_PAGAR)
+
+    por_fornecedor = defaultdict(float)
+    for l in linhas:
+        por_fornecedor[(l[5], l[6])] += l[1]
+    esperado = [{'nome': nome, 'total': round(t, 2)} for (_, nome), t in sorted(por_fornecedor.items(), key=lambda i: -i[1])]
+    assert snapshot.top_entidades('contas_pagar', INICIO, FIM) == esperado
+    assert snapshot.top_entidades('contas_pagar', INICIO, FIM, 2) == esperado[:2]
+    assert [e['nome'] for e in esperado].count('ALFA') == 2
+
+    por_centro = defaultdict(float)
+    for l in linhas:
+        por_centro['Sem Centro de Custo' if l[4] is None else str(l[4])] += l[1]
+    esperado = [{'centro_custo': c, 'total': round(t, 2)} for c, t in sorted(por_centro.items(), key=lambda i: -i[1])]
+    assert snapshot.despesas_por_centro_custo(INICIO, FIM) == esperado
+    assert {'centro_custo': 'Sem Centro de Custo', 'total': 860.0} in esperado
+    print("\n[OK] top fornecedores e centros de custo (NULL -> 'Sem Centro de Custo')")
+
+
+class _TitulosFalsos:
+    """Tabela carregada pelo teste de concorrência: guarda a versão publicada no momento da leitura"""
+
+    publicadas = {}
+    ao_carregar = None
+
+    def __init__(self, tabela, versao):
+        self.tabela, self.versao, self.bytes = tabela, versao, 0
+
+    def __len__(self):
+        return 0
+
+    @classmethod
+    def carregar(cls, tabela):
+        versao = cls.publicadas[tabela]
+        if cls.ao_carregar:
+            cls.ao_carregar(tabela)
+        return cls(tabela, versao)
+
+
+def test_reconstrucoes_simultaneas_sem_snapshot():
+    """
+    Testa receber e pagar reconstruindo ao mesmo tempo sem snapshot: a cópia antiga de
+    contas_pagar lida pela primeira reconstrução não pode sobrescrever a da segunda
+    """
+    print("\n" + "=" * 60)
+    print("TESTE: RECONSTRUÇÕES SIMULTÂNEAS")
+    print("=" * 60)
+
+    originais = (snapshot_modulo.TitulosColunares, GerenciadorSnapshot._carregar_plano, settings.SNAPSHOT_ANALITICO_ATIVO)
+    lendo_pagar, liberar = threading.Event(), threading.Event()
+
+    def ao_carregar(tabela):
+        # A reconstrução de contas_receber fica presa lendo a contas_pagar ainda antiga
+        if tabela == 'contas_pagar' and threading.current_thread() is receber:
+            lendo_pagar.set()
+            liberar.wait(5)
+
+    try:
+        snapshot_modulo.TitulosColunares = _TitulosFalsos
+        GerenciadorSnapshot._carregar_plano = staticmethod(lambda: {})
+        settings.SNAPSHOT_ANALITICO_ATIVO = True
+        _TitulosFalsos.publicadas = {'contas_receber': 1, 'contas_pagar': 0}
+        _TitulosFalsos.ao_carregar = ao_carregar
+
+        gerenciador = GerenciadorSnapshot()
+        receber = threading.Thread(target=gerenciador.reconstruir, args=('contas_receber',))
+        receber.start()
+        assert lendo_pagar.wait(5)
+
+        # contas_pagar publica e reconstrói enquanto a outra ainda lê a versão antiga
+        _TitulosFalsos.publicadas['contas_pagar'] = 1
+        pagar = threading.Thread(target=gerenciador.reconstruir, args=('contas_pagar',))
+        pagar.start()
+        time.sleep(0.05)
+        liberar.set()
+        receber.join(5)
+        pagar.join(5)
+
+        atual = gerenciador._atual
+        assert (atual.receber.versao, atual.pagar.versao) == (1, 1), (atual.receber.versao, atual.pagar.versao)
+        print("[OK] snapshot final com as duas tabelas publicadas")
+    finally:
+        snapshot_modulo.TitulosColunares = originais[0]
+        GerenciadorSnapshot._carregar_plano = originais[1]
+        settings.SNAPSHOT_ANALITICO_ATIVO = originais[2]
+        _TitulosFalsos.ao_carregar = None
+
+
+if __name__ == "__main__":
+    test_total_e_por_dia()
+    test_top_contas()
+    test_top_entidades_e_centro_custo()
+    test_reconstrucoes_simultaneas_sem_snapshot()
+    print("=" * 60)
+    print("TESTES CONCLUÍDOS!")
+    print("=" * 60)
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Script de teste para validar as consultas parametrizadas (utils/sql_parametrizado.py)
+Usa o BancoFalso de apoio_testes.py, que formata o texto com os parâmetros como
+o pymssql (operador %), sem banco.
+"""
+from apoio_testes import BancoFalso
+from utils.sql_parametrizado import ConsultaParametrizada, lista_sql, sql_lista
+
+
+def _sql_interno(texto: str) -> str:
+    """Primeiro argumento do sp_executesql, com as aspas desfeitas"""
+    inicio = texto.index("N'") + 2
+    fim = texto.index("', N'")
+    return texto[inicio:fim].replace("''", "'")
+
+
+def test_escape_de_aspas_e_percentual():
+    """Testa o texto do EXEC: aspas dobradas no N'...' e % sobrevivendo à formatação do pymssql"""
+    print("=" * 60)
+    print("TESTE: ESCAPE DO TEXTO DO SP_EXECUTESQL")
+    print("=" * 60)
+
+    sql = "SELECT * FROM E095FOR WHERE NOMFOR LIKE '%LTDA%' AND SITFOR = 'A' AND CODFOR = @codigo"
+    consulta = ConsultaParametrizada(sql, {'@codigo': 'INT'})
+
+    assert consulta.texto == (
+        "EXEC sp_executesql N'SELECT * FROM E095FOR WHERE NOMFOR LIKE ''%%LTDA%%'' "
+        "AND SITFOR = ''A'' AND CODFOR = @codigo', N'@codigo INT', @codigo = %s"
+    )
+    print("[OK] aspas dobradas e % escapado")
+
+    conexao = BancoFalso([{'CODFOR': 42}])
+    assert consulta.executar(conexao, codigo=42) == [{'CODFOR': 42}]
+    _, params, enviado = conexao.chamadas[0]
+    assert params == (42,)
+    assert enviado.endswith(", N'@codigo INT', @codigo = 42")
+    assert _sql_interno(enviado) == sql
+    print("[OK] após a formatação o servidor recebe o SQL original")
+
+
+def test_ordem_dos_parametros():
+    """Testa que os valores seguem a ordem de declaração, não a ordem dos argumentos"""
+    consulta = ConsultaParametrizada(
+        "SELECT 1 WHERE @fim >= @inicio AND CODFIL IN (SELECT value FROM STRING_SPLIT(@filiais, ','))",
+        {'@inicio': 'DATE', '@fim': 'DATE', '@filiais': 'VARCHAR(MAX)'}
+    )
+
+    assert consulta.texto.endswith(
+        "N'@inicio DATE, @fim DATE, @filiais VARCHAR(MAX)', @inicio = %s, @fim = %s, @filiais = %s"
+    )
+    assert consulta.parametros(filiais='1001,1002', fim='20250131', inicio='20250101') == (
+        '20250101', '20250131', '1001,1002'
+    )
+
+    # O texto não muda com os valores: o plano é reaproveitado
+    conexao = BancoFalso()
+    consulta.executar(conexao, inicio='20250101', fim='20250131', filiais='1001')
+    consulta.executar(conexao, inicio='20250201', fim='20250228', filiais='1001,1002,3001')
+    assert conexao.chamadas[0][0] == conexao.chamadas[1][0] == consulta.texto
+    print("\n[OK] valores na ordem de declaração, texto constante")
+
+    try:
+        consulta.parametros(inicio='20250101')
+        raise AssertionError("parâmetros faltando aceitos")
+    except ValueError as e:
+        assert '@fim' in str(e) and '@filiais' in str(e)
+    print("[OK] parâmetro faltando rejeitado")
+
+
+def test_lista_sql():
+    """Testa o valor das listas: códigos limpos e recusa de qualquer coisa além de letras e números"""
+    print("\n" + "=" * 60)
+    print("TESTE: LISTAS")
+    print("=" * 60)
+
+    assert lista_sql(['1001', ' 1002 ', 3001, 'A1']) == '1001,1002,3001,A1'
+    assert lista_sql([]) == ''
+    print("[OK] códigos válidos")
+
+    invalidos = ["1001'", "1001,1002", "1001; DROP TABLE x", "", "10 01", "1001--", "ção"]
+    for valor in invalidos:
+        try:
+            lista_sql(['1001', valor])
+        except ValueError:
+            continue
+        raise AssertionError(f"código aceito: {valor!r}")
+    print(f"[OK] {len(invalidos)} códigos inválidos rejeitados")
+
+
+def test_sql_lista():
+    """Testa a subconsulta que abre a lista no servidor, nos dois modos"""
+    assert sql_lista('@filiais', 'string_split') == "SELECT value FROM STRING_SPLIT(@filiais, ',')"
+    xml = sql_lista('@filiais', 'xml')
+    assert "REPLACE(@filiais, ',', '</i><i>')" in xml and "nodes('/i')" in xml
+    try:
+        sql_lista('@filiais', 'json')
+        raise AssertionError("modo inválido aceito")
+    except ValueError:
+        pass
+
+    # Dentro de uma consulta parametrizada, as aspas da subconsulta também são escapadas
+    consulta = ConsultaParametrizada(
+        f"SELECT 1 WHERE CODFIL IN ({sql_lista('@filiais', 'string_split')})", {'@filiais': 'VARCHAR(MAX)'}
+    )
+    conexao = BancoFalso()
+    consulta.executar(conexao, filiais=lista_sql(['1001', '1002']))
+    assert _sql_interno(conexao.chamadas[0][2]) == consulta.sql
+    print("\n[OK] STRING_SPLIT e XML")
+
+
+if __name__ == "__main__":
+    test_escape_de_aspas_e_percentual()
+    test_ordem_dos_parametros()
+    test_lista_sql()
+    test_sql_lista()
+    print("=" * 60)
+    print("TESTES CONCLUÍDOS!")
+    print("=" * 60)
@@ -0,0 +1,138 @@
+"""
+Inserção em massa nas tabelas sincronizadas
+executemany do pymssql envia um INSERT por linha (uma ida e volta ao servidor
+por registro). Aqui as linhas são empacotadas em INSERTs com várias tuplas no
+VALUES, e vários desses INSERTs seguem juntos no mesmo envio.
+
+escrever_isolando_erros mantém o relatório por linha do antigo loop de
+cursor.execute: cada lote roda após um savepoint e, se falhar, é desfeito e
+dividido ao meio até sobrarem só as linhas com erro (uma busca binária:
+k linhas ruins num lote de n custam cerca de 2k·log2(n) envios, não n).
+"""
+
+from typing import Callable, Dict, List, Sequence
+
+from config import settings
+
+# Limites do SQL Server
+MAX_PARAMETROS = 2100  # Parâmetros por comando
+MAX_LINHAS_VALUES = 1000  # Linhas por cláusula VALUES
+
+ESTRATEGIAS = ('valores', 'executemany')
+
+# Savepoint de cada lote em escrever_isolando_erros (o ROLLBACK volta ao mais recente com o nome)
+SAVEPOINT_LOTE = 'lote_insercao'
+
+
+class BulkInsertWriter:
+    """
+    Grava tuplas numa tabela usando a estratégia configurada
+
+    Estratégias:
+    - 'valores': INSERT ... VALUES (...), (...), ... com até min(1000, 2100 // colunas)
+      linhas por comando, e até linhas_por_envio linhas por ida ao servidor
+    - 'executemany': um INSERT por linha (comportamento antigo, mantido para comparação)
+
+    Uso:
+        writer = BulkInsertWriter(cursor, 'centro_custo', ['CODMPC', 'CTARED', ...])
+        writer.escrever(linhas)
+    """
+
+    def __init__(
+        self,
+        cursor,
+        tabela: str,
+        colunas: Sequence[str],
+        estrategia: str = None,
+        linhas_por_envio: int = None,
+        tablock: bool = False
+    ):
+        estrategia = estrategia or settings.SYNC_BULK_ESTRATEGIA
+        if estrategia not in ESTRATEGIAS:
+            raise ValueError(f"Estratégia de inserção inválida: {estrategia}. Use uma de {ESTRATEGIAS}")
+
+        self.cursor = cursor
+        self.tabela = tabela
+        self.colunas = list(colunas)
+        self.estrategia = estrategia
+        self.linhas_por_comando = max(1, min(MAX_LINHAS_VALUES, MAX_PARAMETROS // len(self.colunas)))
+        self.linhas_por_envio = max(self.linhas_por_comando, linhas_por_envio or settings.SYNC_BULK_LINHAS_POR_ENVIO)
+
+        # TABLOCK: um único lock de tabela em vez de milhares de locks de linha
+        # (só para tabelas sem leitores concorrentes, como as de staging)
+        hint = " WITH (TABLOCK)" if tablock else ""
+        self._prefixo = f"INSERT INTO {tabela}{hint} ({', '.join(self.colunas)}) VALUES "
+        self._tupla = '(' + ', '.join(['%s'] * len(self.colunas)) + ')'
+        self._comandos: Dict[int, str] = {}  # Texto SQL por quantidade de linhas
+
+        self.linhas_gravadas = 0
+        self.envios = 0
+        self.lotes_divididos = 0
+
+    def _comando(self, qtd_linhas: int) -> str:
+        """INSERT com qtd_linhas tuplas no VALUES (cacheado por tamanho)"""
+        comando = self._comandos.get(qtd_linhas)
+        if comando is None:
+            comando = self._prefixo + ', '.join([self._tupla] * qtd_linhas)
+            self._comandos[qtd_linhas] = comando
+        return comando
+
+    def escrever(self, linhas: List[tuple]) -> int:
+        """Grava as linhas e retorna quantas foram gravadas"""
+        if not linhas:
+            return 0
+
+        if self.estrategia == 'executemany':
+            self.cursor.executemany(self._comando(1), linhas)
+            self.envios += len(linhas)
+        else:
+            for inicio in range(0, len(linhas), self.linhas_por_envio):
+                self._enviar(linhas[inicio:inicio + self.linhas_por_envio])
+
+        self.linhas_gravadas += len(linhas)
+        return len(linhas)
+
+    def _enviar(self, linhas: List[tuple]):
+        """Monta um lote de INSERTs multi-linha e envia numa única chamada"""
+        comandos = []
+        parametros = []
+        for inicio in range(0, len(linhas), self.linhas_por_comando):
+            bloco = linhas[inicio:inicio + self.linhas_por_comando]
+            comandos.append(self._comando(len(bloco)))
+            for linha in bloco:
+                parametros.extend(linha)
+
+        self.cursor.execute(';\n'.join(comandos), tuple(parametros))
+        self.envios += 1
+
+    def escrever_isolando_erros(self, linhas: List[tuple], ao_falhar: Callable[[int, Exception], None]) -> int:
+        """
+        Grava as linhas na transação corrente, pulando as que o servidor recusar
+        Cada lote de linhas_por_envio linhas fica atrás de um savepoint; um lote com
+        erro é desfeito e dividido ao meio, recursivamente, até isolar as linhas
+        inválidas, reportadas em ao_falhar(índice em linhas, exceção).
+        Se o servidor abortar a transação inteira, o ROLLBACK do savepoint falha e o erro sobe.
+
+        Returns:
+            Quantidade de linhas gravadas
+        """
+        gravadas = 0
+        for inicio in range(0, len(linhas), self.linhas_por_envio):
+            gravadas += self._gravar_ou_dividir(linhas, inicio, min(inicio + self.linhas_por_envio, len(linhas)), ao_falhar)
+        return gravadas
+
+    def _gravar_ou_dividir(self, linhas: List[tuple], inicio: int, fim: int, ao_falhar) -> int:
+        self.cursor.execute(f"SAVE TRANSACTION {SAVEPOINT_LOTE}")
+        try:
+            return self.escrever(linhas[inicio:fim])
+        except Exception as e:
+            self.cursor.execute(f"ROLLBACK TRANSACTION {SAVEPOINT_LOTE}")
+            if fim - inicio == 1:
+                ao_falhar(inicio, e)
+                return 0
+            self.lotes_divididos += 1
+            meio = (inicio + fim) // 2
+            return (
+                self._gravar_ou_dividir(linhas, inicio, meio, ao_falhar)
+                + self._gravar_ou_dividir(linhas, meio, fim, ao_falhar)
+            )
@@ -0,0 +1,334 @@
+"""
+Cache de resultados das consultas do dashboard e do banco local
+As tabelas locais só mudam quando uma sincronização roda, então a mesma
+consulta com os mesmos argumentos devolve o mesmo resultado até a próxima
+carga. Cada entrada guarda a geração em que foi calculada; a sincronização
+chama nova_geracao() ao terminar e todas as entradas antigas deixam de valer
+de uma vez, sem varrer o cache. O TTL cobre alterações feitas fora da
+sincronização e os períodos relativos a hoje.
+
+Uso:
+    class ContasPagarLocalService:
+        @staticmethod
+        @cache_consultas.memoizar
+        def obter_top_despesas(data_inicio, data_fim, limit=10, filiais=None): ...
+
+    cache_consultas.nova_geracao()  # ao final da sincronização
+
+Os resultados são compartilhados entre as chamadas: quem recebe não deve alterá-los.
+
+CacheSWR (stale-while-revalidate) é a variante para as consultas diretas ao
+Senior, que não têm sincronização para invalidá-las: dentro do prazo de
+frescor a resposta sai do cache; depois dele, o valor antigo é devolvido na
+hora e uma atualização roda em segundo plano no pool 'senior'.
+"""
+
+import functools
+import inspect
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+import executor
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+_AUSENTE = object()
+
+
+def normalizar_argumento(valor: Any) -> Hashable:
+    """
+    Forma canônica de um argumento para compor a chave do cache
+    - textos sem espaços nas pontas
+    - listas/tuplas/conjuntos viram tuplas ordenadas de texto (filiais ['1002', 1001] == [1001, '1002'])
+    - lista vazia equivale a None (sem filtro)
+    """
+    if isinstance(valor, str):
+        return valor.strip()
+    if isinstance(valor, (list, tuple, set, frozenset)):
+        if not valor:
+            return None
+        return tuple(sorted(str(v).strip() for v in valor))
+    return valor
+
+
+def montar_chave(nome: str, assinatura: inspect.Signature, args: tuple, kwargs: dict) -> Hashable:
+    """Chave (função, argumentos normalizados), com os valores padrão aplicados"""
+    argumentos = assinatura.bind(*args, **kwargs)
+    argumentos.apply_defaults()
+    return (nome, tuple((k, normalizar_argumento(v)) for k, v in argumentos.arguments.items()))
+
+
+class CacheResultados:
+    """
+    Cache LRU com TTL e invalidação por geração, seguro entre threads.
+    - No máximo max_itens entradas; além disso a menos usada recentemente é descartada
+    - Entradas com mais de ttl_segundos ou de uma geração anterior contam como miss
+    """
+
+    def __init__(self, nome: str, max_itens: int, ttl_segundos: float, ativo: bool = True):
+        self.nome = nome
+        self.max_itens = max(1, max_itens)
+        self.ttl_segundos = ttl_segundos
+        self.ativo = ativo
+
+        self._lock = threading.Lock()
+        self._entradas: "OrderedDict[Hashable, Tuple[Any, int, float]]" = OrderedDict()
+        self._geracao = 0
+
+        # Métricas acumuladas
+        self._hits = 0
+        self._misses = 0
+        self._expiradas = 0
+        self._descartadas = 0
+        self._invalidacoes = 0
+
+    @property
+    def geracao(self) -> int:
+        return self._geracao
+
+    def obter(self, chave: Hashable) -> Any:
+        """Valor da chave, ou _AUSENTE se não houver entrada válida"""
+        agora = time.monotonic()
+        with self._lock:
+            entrada = self._entradas.get(chave)
+            if entrada is None:
+                self._misses += 1
+                return _AUSENTE
+
+            valor, geracao, expira_em = entrada
+            if geracao != self._geracao or agora >= expira_em:
+                del self._entradas[chave]
+                self._expiradas += 1
+                self._misses += 1
+                return _AUSENTE
+
+            self._entradas.move_to_end(chave)
+            self._hits += 1
+            return valor
+
+    def guardar(self, chave: Hashable, valor: Any, geracao: int):
+        """
+        Guarda o valor calculado na geração informada.
+        Se a geração mudou durante o cálculo (sincronização no meio), o valor é descartado.
+        """
+        with self._lock:
+            if geracao != self._geracao:
+                return
+            self._entradas[chave] = (valor, geracao, time.monotonic() + self.ttl_segundos)
+            self._entradas.move_to_end(chave)
+            while len(self._entradas) > self.max_itens:
+                self._entradas.popitem(last=False)
+                self._descartadas += 1
+
+    def nova_geracao(self) -> int:
+        """Invalida todas as entradas (chamado ao final de cada sincronização)"""
+        with self._lock:
+            self._geracao += 1
+            self._invalidacoes += 1
+            self._entradas.clear()
+            return self._geracao
+
+    def memoizar(self, func: Callable) -> Callable:
+        """
+        Decorator: guarda o resultado de func por argumentos normalizados
+        (posicionais e nomeados resolvidos pela assinatura, com os valores padrão)
+        """
+        assinatura = inspect.signature(func)
+        nome = f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not self.ativo:
+                return func(*args, **kwargs)
+
+            chave = montar_chave(nome, assinatura, args, kwargs)
+            valor = self.obter(chave)
+            if valor is not _AUSENTE:
+                return valor
+
+            geracao = self._geracao
+            valor = func(*args, **kwargs)
+            self.guardar(chave, valor, geracao)
+            return valor
+
+        return wrapper
+
+    def estatisticas(self) -> Dict[str, Any]:
+        """Métricas do cache: acertos, faltas, expirações, descartes por tamanho e invalidações"""
+        with self._lock:
+            consultas = self._hits + self._misses
+            return {
+                'nome': self.nome,
+                'ativo': self.ativo,
+                'geracao': self._geracao,
+                'itens': len(self._entradas),
+                'max_itens': self.max_itens,
+                'ttl_segundos': self.ttl_segundos,
+                'hits': self._hits,
+                'misses': self._misses,
+                'taxa_acerto': round(self._hits / consultas, 4) if consultas else 0.0,
+                'expiradas': self._expiradas,
+                'descartadas': self._descartadas,
+                'invalidacoes': self._invalidacoes
+            }
+
+
+class CacheSWR:
+    """
+    Cache stale-while-revalidate, LRU e seguro entre threads.
+    - Até fresco_segundos: devolve o valor do cache
+    - Até max_stale_segundos: devolve o valor antigo e agenda uma atualização em
+      segundo plano (uma por chave; após uma falha, espera fresco_segundos para tentar de novo)
+    - Além disso (ou sem entrada): consulta na hora
+    """
+
+    def __init__(
+        self,
+        nome: str,
+        max_itens: int,
+        fresco_segundos: float,
+        max_stale_segundos: float,
+        pool: str = 'senior',
+        ativo: bool = True
+    ):
+        self.nome = nome
+        self.max_itens = max(1, max_itens)
+        self.fresco_segundos = fresco_segundos
+        self.max_stale_segundos = max(max_stale_segundos, fresco_segundos)
+        self.pool = pool
+        self.ativo = ativo
+
+        self._lock = threading.Lock()
+        self._entradas: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+        self._atualizando: set = set()
+        self._falhou_em: Dict[Hashable, float] = {}
+
+        # Métricas acumuladas
+        self._frescos = 0
+        self._antigos = 0
+        self._misses = 0
+        self._atualizacoes = 0
+        self._falhas_atualizacao = 0
+        self._descartadas = 0
+
+    def _guardar(self, chave: Hashable, valor: Any, obtido_em: float):
+        with self._lock:
+            self._entradas[chave] = (valor, obtido_em)
+            self._entradas.move_to_end(chave)
+            self._falhou_em.pop(chave, None)
+            while len(self._entradas) > self.max_itens:
+                self._entradas.popitem(last=False)
+                self._descartadas += 1
+
+    def _atualizar(self, chave: Hashable, func: Callable, args: tuple, kwargs: dict):
+        """Atualização em segundo plano de uma entrada antiga"""
+        inicio = time.monotonic()
+        try:
+            self._guardar(chave, func(*args, **kwargs), inicio)
+            with self._lock:
+                self._atualizacoes += 1
+        except Exception as e:
+            logger.warning(f"[cache {self.nome}] Falha ao atualizar {chave[0]}: {str(e)}")
+            with self._lock:
+                self._falhas_atualizacao += 1
+                self._falhou_em[chave] = time.monotonic()
+        finally:
+            with self._lock:
+                self._atualizando.discard(chave)
+
+    def _agendar_atualizacao(self, chave: Hashable, func: Callable, args: tuple, kwargs: dict, agora: float):
+        with self._lock:
+            if chave in self._atualizando:
+                return
+            falhou_em = self._falhou_em.get(chave)
+            if falhou_em is not None and agora - falhou_em < self.fresco_segundos:
+                return
+            self._atualizando.add(chave)
+
+        try:
+            executor.pools[self.pool].submeter(self._atualizar, chave, func, args, kwargs)
+        except Exception as e:
+            # Pool saturado: serve o valor antigo e tenta de novo na próxima leitura
+            logger.warning(f"[cache {self.nome}] Atualização de {chave[0]} não agendada: {str(e)}")
+            with self._lock:
+                self._atualizando.discard(chave)
+
+    def memoizar(self, func: Callable) -> Callable:
+        """
+        Decorator: aplica o stale-while-revalidate às chamadas de func.
+        A função original fica em wrapper.sem_cache (para quem precisa do dado atual, como a sincronização).
+        """
+        assinatura = inspect.signature(func)
+        nome = f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not self.ativo:
+                return func(*args, **kwargs)
+
+            chave = montar_chave(nome, assinatura, args, kwargs)
+            agora = time.monotonic()
+            with self._lock:
+                entrada = self._entradas.get(chave)
+                idade = agora - entrada[1] if entrada is not None else None
+                if entrada is not None and idade <= self.max_stale_segundos:
+                    self._entradas.move_to_end(chave)
+                    if idade <= self.fresco_segundos:
+                        self._frescos += 1
+                    else:
+                        self._antigos += 1
+                else:
+                    self._misses += 1
+
+            if idade is not None and idade <= self.max_stale_segundos:
+                if idade > self.fresco_segundos:
+                    self._agendar_atualizacao(chave, func, args, kwargs, agora)
+                return entrada[0]
+
+            valor = func(*args, **kwargs)
+            self._guardar(chave, valor, agora)
+            return valor
+
+        wrapper.sem_cache = func
+        return wrapper
+
+    def estatisticas(self) -> Dict[str, Any]:
+        """Métricas: respostas frescas, antigas (com atualização em segundo plano), misses e atualizações"""
+        with self._lock:
+            return {
+                'nome': self.nome,
+                'ativo': self.ativo,
+                'itens': len(self._entradas),
+                'max_itens': self.max_itens,
+                'fresco_segundos': self.fresco_segundos,
+                'max_stale_segundos': self.max_stale_segundos,
+                'hits_frescos': self._frescos,
+                'hits_antigos': self._antigos,
+                'misses': self._misses,
+                'atualizando': len(self._atualizando),
+                'atualizacoes': self._atualizacoes,
+                'falhas_atualizacao': self._falhas_atualizacao,
+                'descartadas': self._descartadas
+            }
+
+
+# Consultas do dashboard e dos services do banco local
+cache_consultas = CacheResultados(
+    'consultas',
+    settings.CACHE_CONSULTAS_MAX_ITENS,
+    settings.CACHE_CONSULTAS_TTL_SEGUNDOS,
+    ativo=settings.CACHE_CONSULTAS_ATIVO
+)
+
+# Consultas diretas ao Senior (títulos do período, em aberto e liquidados)
+cache_senior = CacheSWR(
+    'senior',
+    settings.SENIOR_CACHE_MAX_ITENS,
+    settings.SENIOR_CACHE_FRESCO_SEGUNDOS,
+    settings.SENIOR_CACHE_MAX_STALE_SEGUNDOS,
+    ativo=settings.SENIOR_CACHE_ATIVO
+)
@@ -0,0 +1,79 @@
+"""
+Chaves naturais e impressão digital (hash) das linhas sincronizadas do Senior
+O id local passa a ser derivado da chave natural do título (uuid5), então a
+mesma linha do Senior recebe sempre o mesmo id, e o HASH_LINHA permite saber
+se ela mudou desde a última sincronização sem comparar coluna a coluna.
+"""
+
+import hashlib
+import uuid
+from typing import Any, Callable, Dict, Sequence, Tuple
+
+# Namespace fixo: mudar este valor muda todos os ids gerados
+NAMESPACE_SINCRONIZACAO = uuid.UUID('004bde6b-51ba-4242-872d-3e6622106b88')
+
+# Colunas que identificam um título em cada tabela
+# - contas_receber: mesma chave do índice único IX_contas_receber_unique
+# - contas_pagar: um título tem uma linha por rateio (E501RAT), por isso CTAFIN/CODCCU
+CHAVES_NATURAIS: Dict[str, Tuple[str, ...]] = {
+    'contas_receber': ('CODEMP', 'CODFIL', 'NUMTIT', 'CODTPT', 'CODCLI'),
+    'contas_pagar': ('CODEMP', 'CODFIL', 'CODFOR', 'NUMTIT', 'CODTPT', 'SEQMOV', 'CTAFIN', 'CODCCU'),
+}
+
+
+def _texto(valor: Any) -> str:
+    """Representação estável de um valor (1001 e '1001' viram o mesmo texto)"""
+    if valor is None:
+        return ''
+    return str(valor).strip()
+
+
+def hash_linha(valores: Sequence[Any]) -> bytes:
+    """Impressão digital (MD5, 16 bytes) dos valores de uma linha"""
+    texto = '\x1f'.join('\x00' if v is None else _texto(v) for v in valores)
+    return hashlib.md5(texto.encode('utf-8')).digest()
+
+
+class GeradorIds:
+    """
+    Gera o id determinístico de cada linha a partir da chave natural.
+    Linhas repetidas com a mesma chave (ex: dois rateios na mesma conta e centro de custo)
+    recebem um número de ocorrência, para que os ids continuem únicos.
+    O número depende da ordem de chegada: a consulta de origem precisa de ORDER BY pela
+    chave e por colunas que desempatem as repetições (ver QUERY_CONTAS_PAGAR), senão
+    repetições trocam de id entre execuções e aparecem no diff como alterações.
+    Use uma instância por execução de sincronização.
+    """
+
+    def __init__(self, tabela: str):
+        self.tabela = tabela
+        self.colunas_chave = CHAVES_NATURAIS[tabela]
+        self._ocorrencias: Dict[Tuple[str, ...], int] = {}
+
+    def chave(self, row: Dict[str, Any]) -> Tuple[str, ...]:
+        return tuple(_texto(row.get(coluna)) for coluna in self.colunas_chave)
+
+    def id_para(self, row: Dict[str, Any]) -> str:
+        chave = self.chave(row)
+        ocorrencia = self._ocorrencias.get(chave, 0)
+        self._ocorrencias[chave] = ocorrencia + 1
+        nome = f"{self.tabela}|{'|'.join(chave)}|{ocorrencia}"
+        return str(uuid.uuid5(NAMESPACE_SINCRONIZACAO, nome))
+
+
+class MontadorLinhas:
+    """
+    Transforma uma linha do Senior na tupla (id, *valores, HASH_LINHA)
+
+    Args:
+        tabela: tabela local (define a chave natural)
+        valores: função que extrai da linha do Senior os valores das colunas de dados
+    """
+
+    def __init__(self, tabela: str, valores: Callable[[Dict[str, Any]], tuple]):
+        self._ids = GeradorIds(tabela)
+        self._valores = valores
+
+    def __call__(self, row: Dict[str, Any]) -> tuple:
+        valores = self._valores(row)
+        return (self._ids.id_para(row),) + tuple(valores) + (hash_linha(valores),)
@@ -0,0 +1,84 @@
+"""
+ETag e GET condicional para os endpoints que leem só o banco local
+Os dados do dashboard e do projetado só mudam com uma sincronização, então a
+resposta é determinada por (geração do cache de consultas, rota, parâmetros
+normalizados, dia atual). O ETag é calculado a partir disso antes de chamar a
+rota: se o navegador mandar o mesmo valor em If-None-Match, a resposta é 304
+sem tocar nos services.
+
+O dia atual entra na chave porque períodos como 'mes-atual' e a projeção de
+despesas dependem da data de hoje; o identificador do processo, porque a
+geração recomeça do zero quando a API reinicia.
+"""
+
+import hashlib
+import uuid
+from datetime import datetime
+from typing import Iterable
+
+import pytz
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import Response
+
+from config import settings
+from utils.cache import cache_consultas
+
+# Rotas cobertas (todas leem apenas tabelas locais, atualizadas pela sincronização)
+PREFIXOS_ETAG = ('/api/dashboard/', '/api/projetado/')
+
+# Parâmetros com listas separadas por vírgula, comparadas sem considerar a ordem
+PARAMETROS_LISTA = {'filiais'}
+
+# Sempre revalida com o servidor; a resposta é por usuário (não vai para caches compartilhados)
+CACHE_CONTROL = 'private, no-cache'
+
+_INSTANCIA = uuid.uuid4().hex
+
+
+def calcular_etag(caminho: str, parametros: Iterable[tuple[str, str]]) -> str:
+    """ETag fraco de uma requisição GET: W/"<md5 de instância, geração, dia, rota e parâmetros>" """
+    normalizados = []
+    for chave, valor in parametros:
+        valor = valor.strip()
+        if chave in PARAMETROS_LISTA:
+            valor = ','.join(sorted(v.strip() for v in valor.split(',') if v.strip()))
+        if valor:
+            normalizados.append(f"{chave}={valor}")
+
+    hoje = datetime.now(pytz.timezone(settings.TIMEZONE)).date().isoformat()
+    texto = '\x1f'.join([_INSTANCIA, str(cache_consultas.geracao), hoje, caminho.rstrip('/'), *sorted(normalizados)])
+    return f'W/"{hashlib.md5(texto.encode("utf-8")).hexdigest()}"'
+
+
+def _corresponde(if_none_match: str, etag: str) -> bool:
+    """Comparação fraca (RFC 9110): ignora o prefixo W/ e aceita lista ou '*'"""
+    valor = etag.removeprefix('W/')
+    for candidato in if_none_match.split(','):
+        candidato = candidato.strip()
+        if candidato == '*' or candidato.removeprefix('W/') == valor:
+            return True
+    return False
+
+
+class ETagMiddleware(BaseHTTPMiddleware):
+    """
+    Responde 304 Not Modified quando If-None-Match bate com o ETag atual
+    e adiciona ETag / Cache-Control nas respostas 200 das rotas cobertas
+    """
+
+    async def dispatch(self, request: Request, call_next):
+        if request.method != 'GET' or not request.url.path.startswith(PREFIXOS_ETAG):
+            return await call_next(request)
+
+        etag = calcular_etag(request.url.path, request.query_params.multi_items())
+
+        if_none_match = request.headers.get('if-none-match')
+        if if_none_match and _corresponde(if_none_match, etag):
+            return Response(status_code=304, headers={'ETag': etag, 'Cache-Control': CACHE_CONTROL})
+
+        response = await call_next(request)
+        if response.status_code == 200:
+            response.headers['ETag'] = etag
+            response.headers['Cache-Control'] = CACHE_CONTROL
+        return response
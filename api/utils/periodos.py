@@ -0,0 +1,59 @@
+"""
+Utilitários de períodos (meses e períodos de comparação)
+"""
+
+from datetime import date, datetime, timedelta
+from typing import List, Tuple
+
+from dateutil.relativedelta import relativedelta
+
+
+def inicio_mes(data: date) -> date:
+    """Primeiro dia do mês da data"""
+    return data.replace(day=1)
+
+
+def fim_mes(data: date) -> date:
+    """Último dia do mês da data"""
+    return inicio_mes(data) + relativedelta(months=1, days=-1)
+
+
+def meses_anteriores(data: date, quantidade: int) -> List[Tuple[date, date]]:
+    """
+    Os `quantidade` meses completos anteriores ao mês da data, do mais antigo
+    para o mais recente: [(inicio, fim), ...]
+
+    Exemplo:
+        meses_anteriores(date(2025, 3, 15), 3)
+        -> [(2024-12-01, 2024-12-31), (2025-01-01, 2025-01-31), (2025-02-01, 2025-02-28)]
+    """
+    primeiro_dia = inicio_mes(data)
+    meses = []
+    for n in range(quantidade, 0, -1):
+        inicio = primeiro_dia - relativedelta(months=n)
+        meses.append((inicio, fim_mes(inicio)))
+    return meses
+
+
+def periodo_anterior(data_inicio: str, data_fim: str) -> Tuple[str, str]:
+    """
+    Período de mesma duração imediatamente antes de [data_inicio, data_fim]
+    (usado nas comparações do dashboard). Datas no formato 'YYYY-MM-DD'.
+    """
+    inicio = datetime.strptime(data_inicio, '%Y-%m-%d')
+    fim = datetime.strptime(data_fim, '%Y-%m-%d')
+    duracao = (fim - inicio).days
+
+    inicio_anterior = inicio - timedelta(days=duracao + 1)
+    fim_anterior = inicio - timedelta(days=1)
+    return inicio_anterior.strftime('%Y-%m-%d'), fim_anterior.strftime('%Y-%m-%d')
+
+
+def indice_mes(data: date) -> int:
+    """Número sequencial do mês (ano * 12 + mês - 1), para indexar matrizes mensais"""
+    return data.year * 12 + data.month - 1
+
+
+def mes_do_indice(indice: int) -> date:
+    """Primeiro dia do mês de um índice gerado por indice_mes"""
+    return date(indice // 12, indice % 12 + 1, 1)
@@ -0,0 +1,107 @@
+"""
+Single-flight: chamadas idênticas e simultâneas compartilham uma única execução
+Quando vários usuários abrem a mesma página ao mesmo tempo, cada requisição
+dispararia a sua própria consulta de minutos ao Senior. Aqui a primeira
+chamada executa e as demais com os mesmos argumentos (normalizados como no
+cache, ver utils/cache.py) esperam por ela e recebem o mesmo resultado - ou a
+mesma exceção.
+
+Uso:
+    class ContasPagarSeniorService:
+        @staticmethod
+        @single_flight_senior.agrupar
+        def obter_contas_pagar_do_senior(periodo, filiais=None): ...
+"""
+
+import functools
+import inspect
+import threading
+from typing import Any, Callable, Dict, Hashable
+
+from utils.cache import montar_chave
+
+
+class _Chamada:
+    """Execução em andamento de uma chave"""
+
+    def __init__(self):
+        self.concluida = threading.Event()
+        self.resultado: Any = None
+        self.erro: BaseException = None
+        self.aguardando = 0
+
+
+class SingleFlight:
+    """Agrupa chamadas simultâneas com a mesma chave numa execução só, com métricas de fan-in"""
+
+    def __init__(self, nome: str):
+        self.nome = nome
+        self._lock = threading.Lock()
+        self._em_andamento: Dict[Hashable, _Chamada] = {}
+
+        # Métricas acumuladas
+        self._execucoes = 0
+        self._agrupadas = 0
+        self._pico_aguardando = 0
+
+    def executar(self, chave: Hashable, func: Callable, *args, **kwargs) -> Any:
+        """Executa func, ou espera a execução já em andamento para a mesma chave"""
+        with self._lock:
+            chamada = self._em_andamento.get(chave)
+            if chamada is not None:
+                chamada.aguardando += 1
+                self._agrupadas += 1
+                self._pico_aguardando = max(self._pico_aguardando, chamada.aguardando)
+                lider = False
+            else:
+                chamada = _Chamada()
+                self._em_andamento[chave] = chamada
+                self._execucoes += 1
+                lider = True
+
+        if not lider:
+            chamada.concluida.wait()
+            if chamada.erro is not None:
+                raise chamada.erro
+            return chamada.resultado
+
+        try:
+            chamada.resultado = func(*args, **kwargs)
+            return chamada.resultado
+        except BaseException as e:
+            chamada.erro = e
+            raise
+        finally:
+            # Remove antes de liberar: chamadas que chegarem depois disparam uma nova execução
+            with self._lock:
+                del self._em_andamento[chave]
+            chamada.concluida.set()
+
+    def agrupar(self, func: Callable) -> Callable:
+        """Decorator: aplica o single-flight às chamadas de func, por argumentos normalizados"""
+        assinatura = inspect.signature(func)
+        nome = f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return self.executar(montar_chave(nome, assinatura, args, kwargs), func, *args, **kwargs)
+
+        return wrapper
+
+    def estatisticas(self) -> Dict[str, Any]:
+        """Execuções, chamadas que esperaram por outra e quem está aguardando agora"""
+        with self._lock:
+            return {
+                'nome': self.nome,
+                'execucoes': self._execucoes,
+                'chamadas_agrupadas': self._agrupadas,
+                'pico_aguardando': self._pico_aguardando,
+                'em_andamento': [
+                    {'funcao': chave[0], 'argumentos': dict(chave[1]), 'aguardando': chamada.aguardando}
+                    for chave, chamada in self._em_andamento.items()
+                ]
+            }
+
+
+# Consultas pesadas ao Senior (títulos em aberto e liquidados)
+single_flight_senior = SingleFlight('senior')
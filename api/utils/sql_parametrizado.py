@@ -0,0 +1,90 @@
+"""
+Consultas parametrizadas via sp_executesql
+O pymssql substitui os parâmetros no próprio texto antes de enviar, então
+"WHERE DATPPT >= %s" com datas diferentes chega ao servidor como textos
+diferentes, e cada período/filial compila um plano novo. Aqui o SQL fica
+constante e os valores vão como parâmetros do sp_executesql: o servidor
+reaproveita o plano em cache do texto interno para qualquer combinação.
+
+Listas (ex: filiais) vão num único parâmetro texto separado por vírgula e são
+abertas no servidor com STRING_SPLIT (nível de compatibilidade 130+) ou, em
+bancos mais antigos, com XML (settings.SENIOR_LISTA_SPLIT = 'xml').
+
+Uso:
+    consulta = ConsultaParametrizada(
+        f"SELECT ... WHERE DATPPT BETWEEN @data_inicio AND @data_fim AND CODFIL IN ({sql_lista('@filiais')})",
+        {'@data_inicio': 'DATE', '@data_fim': 'DATE', '@filiais': 'VARCHAR(MAX)'}
+    )
+    linhas = consulta.executar(senior_db, data_inicio='20250101', data_fim='20250131', filiais=lista_sql(filiais))
+"""
+
+import re
+from typing import Any, Dict, Iterable, List, Optional
+
+from config import settings
+
+MODOS_LISTA = ('string_split', 'xml')
+
+# Códigos aceitos nas listas (filiais): letras e números
+_CODIGO_VALIDO = re.compile(r'^[0-9A-Za-z]+$')
+
+
+def sql_lista(parametro: str, modo: Optional[str] = None) -> str:
+    """
+    Subconsulta que abre um parâmetro 'a,b,c' em linhas (coluna value),
+    para uso em "coluna IN (...)"
+    """
+    modo = modo or settings.SENIOR_LISTA_SPLIT
+    if modo == 'string_split':
+        return f"SELECT value FROM STRING_SPLIT({parametro}, ',')"
+    if modo == 'xml':
+        return (
+            "SELECT item.value('.', 'VARCHAR(50)') AS value "
+            f"FROM (SELECT CAST('<i>' + REPLACE({parametro}, ',', '</i><i>') + '</i>' AS XML) AS doc) AS lista "
+            "CROSS APPLY lista.doc.nodes('/i') AS itens(item)"
+        )
+    raise ValueError(f"Modo de lista inválido: {modo}. Use um de: {', '.join(MODOS_LISTA)}")
+
+
+def lista_sql(valores: Iterable[Any]) -> str:
+    """Valor do parâmetro de lista: códigos sem espaços, separados por vírgula"""
+    codigos: List[str] = []
+    for valor in valores:
+        codigo = str(valor).strip()
+        if not _CODIGO_VALIDO.match(codigo):
+            raise ValueError(f"Código inválido na lista: {valor!r}")
+        codigos.append(codigo)
+    return ','.join(codigos)
+
+
+class ConsultaParametrizada:
+    """
+    SQL constante executado com sp_executesql
+    O texto do EXEC também é constante: só os valores dos parâmetros mudam entre chamadas.
+    """
+
+    def __init__(self, sql: str, parametros: Dict[str, str]):
+        """
+        Args:
+            sql: texto da consulta, referenciando os parâmetros como @nome
+            parametros: {'@nome': 'TIPO SQL'} na ordem de declaração
+        """
+        self.sql = sql
+        self.nomes = list(parametros)
+        declaracao = ', '.join(f"{nome} {tipo}" for nome, tipo in parametros.items())
+
+        # Aspas dobradas dentro do N'...'; % dobrado porque o pymssql formata o texto com os parâmetros
+        interno = sql.replace("'", "''").replace('%', '%%')
+        atribuicoes = ', '.join(f"{nome} = %s" for nome in self.nomes)
+        self.texto = f"EXEC sp_executesql N'{interno}', N'{declaracao}', {atribuicoes}"
+
+    def parametros(self, **valores) -> tuple:
+        """Valores na ordem de declaração (nomes sem o @)"""
+        faltando = [nome for nome in self.nomes if nome[1:] not in valores]
+        if faltando:
+            raise ValueError(f"Parâmetros não informados: {', '.join(faltando)}")
+        return tuple(valores[nome[1:]] for nome in self.nomes)
+
+    def executar(self, conexao, **valores) -> list:
+        """Executa no banco informado (db ou senior_db) e retorna as linhas"""
+        return conexao.execute_query(self.texto, self.parametros(**valores))
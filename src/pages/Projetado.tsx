@@ -197,66 +197,33 @@ export default function ProjetadoPage() {
     }
   }
 
-  // Busca dados do resumo
+  // Busca resumo, gráfico e rankings numa única requisição (/api/dashboard/overview)
   useEffect(() => {
-    const fetchResumo = async () => {
+    const fetchOverview = async () => {
       try {
         setLoadingResumo(true)
-        console.log('Buscando resumo para período:', selectedPeriod, 'filiais:', selectedFiliais)
+        setLoadingGrafico(true)
+        setLoadingNovosGraficos(true)
         const filiais = selectedFiliais.length > 0 ? selectedFiliais : undefined
-        const data = await DashboardService.obterResumo(selectedPeriod, filiais)
-        console.log('Resumo recebido:', data)
-        setResumo(data)
+        const { widgets } = await DashboardService.obterOverview(selectedPeriod, filiais, 10)
+
+        setResumo(widgets.resumo)
+        setDadosGrafico(widgets.grafico_receitas_despesas)
+        setTopDespesas(widgets.top_despesas)
+        setTopReceitas(widgets.top_receitas)
+        setTopFornecedores(widgets.top_fornecedores)
+        setTopClientes(widgets.top_clientes)
       } catch (err: any) {
-        console.error('Erro ao buscar resumo:', err)
+        console.error('Erro ao buscar dados do dashboard:', err)
         console.error('Erro detalhado:', err.response?.data, err.message)
       } finally {
         setLoadingResumo(false)
-      }
-    }
-
-    fetchResumo()
-  }, [selectedPeriod, selectedFiliais])
-
-  // Busca dados dos gráficos
-  useEffect(() => {
-    const fetchGrafico = async () => {
-      try {
-        setLoadingGrafico(true)
-        const filiais = selectedFiliais.length > 0 ? selectedFiliais : undefined
-        const data = await DashboardService.obterGraficoReceitasDespesas(selectedPeriod, filiais)
-        setDadosGrafico(data)
-      } catch (err) {
-        console.error('Erro ao buscar gráfico:', err)
-      } finally {
         setLoadingGrafico(false)
-      }
-    }
-
-    fetchGrafico()
-  }, [selectedPeriod, selectedFiliais])
-
-  // Busca dados dos novos gráficos
-  useEffect(() => {
-    const fetchNovosGraficos = async () => {
-      try {
-        setLoadingNovosGraficos(true)
-        const filiais = selectedFiliais.length > 0 ? selectedFiliais : undefined
-        const [despesas, receitas] = await Promise.all([
-          DashboardService.obterTopDespesas(selectedPeriod, 10, filiais),
-          DashboardService.obterTopReceitas(selectedPeriod, 10, filiais)
-        ])
-
-        setTopDespesas(despesas)
-        setTopReceitas(receitas)
-      } catch (err) {
-        console.error('Erro ao buscar novos gráficos:', err)
-      } finally {
         setLoadingNovosGraficos(false)
       }
     }
 
-    fetchNovosGraficos()
+    fetchOverview()
   }, [selectedPeriod, selectedFiliais])
 
   // Busca dados de recebíveis de cartão (PROJETADO - A RECEBER)
@@ -46,6 +46,23 @@ export interface FluxoCaixa {
   despesas: number
 }
 
+export interface Overview {
+  periodo_inicio: string
+  periodo_fim: string
+  widgets: {
+    resumo: ResumoFinanceiro
+    grafico_receitas_despesas: DadosGrafico[]
+    fluxo_caixa: FluxoCaixa[]
+    top_despesas: TopItem[]
+    top_receitas: TopItem[]
+    top_fornecedores: TopItem[]
+    top_clientes: TopItem[]
+    despesas_por_centro_custo: CentroCusto[]
+  }
+  tempos_ms: Record<string, number>
+  tempo_total_ms: number
+}
+
 export class DashboardService {
   static async obterResumo(periodo: string = 'mes-atual', filiais?: string[]): Promise<ResumoFinanceiro> {
     const params: any = { periodo }
@@ -126,4 +143,13 @@ export class DashboardService {
     const response = await api.get<FluxoCaixa[]>('/api/dashboard/fluxo-caixa', { params })
     return response.data
   }
+
+  static async obterOverview(periodo: string = 'mes-atual', filiais?: string[], limit: number = 10): Promise<Overview> {
+    const params: any = { periodo, limit }
+    if (filiais && filiais.length > 0) {
+      params.filiais = filiais.join(',')
+    }
+    const response = await api.get<Overview>('/api/dashboard/overview', { params })
+    return response.data
+  }
 }
@@ -9,6 +9,25 @@ export interface SincronizacaoResponse {
   log_id?: string
 }
 
+export interface JobSincronizacao {
+  job_id: string
+  tipo: string
+  parametros: Record<string, unknown>
+  status: 'na_fila' | 'em_andamento' | 'sucesso' | 'erro'
+  fase?: string
+  linhas_processadas: number
+  linhas_estimadas?: number
+  percentual?: number
+  eta_segundos?: number
+  coalescidos: number
+  criado_em: string
+  iniciado_em?: string
+  concluido_em?: string
+  duracao_ms?: number
+  resultado?: SincronizacaoResponse
+  erro?: string
+}
+
 export interface StatusSincronizacaoResponse {
   ultima_sincronizacao?: string
   tipo?: string
@@ -16,71 +35,100 @@ export interface StatusSincronizacaoResponse {
   registros_inseridos?: number
   tempo_execucao_ms?: number
   mensagem_erro?: string
+  job?: JobSincronizacao
+  jobs_ativos?: JobSincronizacao[]
 }
 
+// Intervalo entre consultas de progresso do job
+const INTERVALO_POLLING_MS = 2000
+
 export class SincronizacaoService {
+  /**
+   * Aguarda o job de sincronização terminar consultando /status
+   * @param job Job retornado pelo POST de sincronização
+   * @param onProgresso Chamado a cada consulta com o progresso (fase, linhas, ETA)
+   */
+  static async aguardarJob(
+    job: JobSincronizacao,
+    onProgresso?: (job: JobSincronizacao) => void
+  ): Promise<SincronizacaoResponse> {
+    let atual = job
+    while (atual.status === 'na_fila' || atual.status === 'em_andamento') {
+      onProgresso?.(atual)
+      await new Promise((resolve) => setTimeout(resolve, INTERVALO_POLLING_MS))
+      const status = await SincronizacaoService.obterStatus(undefined, atual.job_id)
+      atual = status.job ?? atual
+    }
+    onProgresso?.(atual)
+
+    return {
+      success: atual.status === 'sucesso',
+      tipo: atual.resultado?.tipo ?? atual.tipo,
+      registros_inseridos: atual.resultado?.registros_inseridos ?? 0,
+      tempo_execucao_ms: atual.resultado?.tempo_execucao_ms ?? atual.duracao_ms ?? 0,
+      mensagem: atual.resultado?.mensagem ?? atual.erro ?? '',
+      log_id: atual.resultado?.log_id
+    }
+  }
+
   /**
    * Sincroniza contas a receber do Senior para o banco local
    * @param periodo Período no formato YYYY-MM (ex: 2025-11)
    */
-  static async sincronizarContasReceber(periodo: string): Promise<SincronizacaoResponse> {
-    const response = await api.post<SincronizacaoResponse>(
+  static async sincronizarContasReceber(
+    periodo: string,
+    onProgresso?: (job: JobSincronizacao) => void
+  ): Promise<SincronizacaoResponse> {
+    const response = await api.post<JobSincronizacao>(
       '/api/sincronizacao/contas-receber',
       {},
-      {
-        params: { periodo },
-        timeout: 600000 // 10 minutos
-      }
+      { params: { periodo } }
     )
-    return response.data
+    return SincronizacaoService.aguardarJob(response.data, onProgresso)
   }
 
   /**
    * Sincroniza contas a pagar do Senior para o banco local
    * @param periodo Período no formato YYYY-MM (ex: 2025-11)
    */
-  static async sincronizarContasPagar(periodo: string): Promise<SincronizacaoResponse> {
-    const response = await api.post<SincronizacaoResponse>(
+  static async sincronizarContasPagar(
+    periodo: string,
+    onProgresso?: (job: JobSincronizacao) => void
+  ): Promise<SincronizacaoResponse> {
+    const response = await api.post<JobSincronizacao>(
       '/api/sincronizacao/contas-pagar',
       {},
-      {
-        params: { periodo },
-        timeout: 600000 // 10 minutos
-      }
+      { params: { periodo } }
     )
-    return response.data
+    return SincronizacaoService.aguardarJob(response.data, onProgresso)
   }
 
   /**
    * Sincroniza centro de custo do Senior para o banco local
    */
-  static async sincronizarCentroCusto(): Promise<SincronizacaoResponse> {
-    const response = await api.post<SincronizacaoResponse>(
-      '/api/sincronizacao/centro-custo',
-      {},
-      { timeout: 600000 } // 10 minutos
-    )
-    return response.data
+  static async sincronizarCentroCusto(
+    onProgresso?: (job: JobSincronizacao) => void
+  ): Promise<SincronizacaoResponse> {
+    const response = await api.post<JobSincronizacao>('/api/sincronizacao/centro-custo', {})
+    return SincronizacaoService.aguardarJob(response.data, onProgresso)
   }
 
   /**
    * Sincroniza ambas as tabelas (contas a receber e contas a pagar)
    */
-  static async sincronizarTudo(): Promise<SincronizacaoResponse> {
-    const response = await api.post<SincronizacaoResponse>(
-      '/api/sincronizacao/tudo',
-      {},
-      { timeout: 600000 } // 10 minutos
-    )
-    return response.data
+  static async sincronizarTudo(
+    onProgresso?: (job: JobSincronizacao) => void
+  ): Promise<SincronizacaoResponse> {
+    const response = await api.post<JobSincronizacao>('/api/sincronizacao/tudo', {})
+    return SincronizacaoService.aguardarJob(response.data, onProgresso)
   }
 
   /**
-   * Obtém o status da última sincronização
+   * Obtém o status da última sincronização e, se informado, o progresso do job
    */
-  static async obterStatus(tipo?: string): Promise<StatusSincronizacaoResponse> {
+  static async obterStatus(tipo?: string, jobId?: string): Promise<StatusSincronizacaoResponse> {
     const response = await api.get<StatusSincronizacaoResponse>('/api/sincronizacao/status', {
-      params: tipo ? { tipo } : undefined
+      params: { ...(tipo ? { tipo } : {}), ...(jobId ? { job_id: jobId } : {}) }
     })
     return response.data
   }